@@ -9,7 +9,9 @@ import os
 
 from pathlib import Path
 
-from mmdet.apis import init_detector
+import mmcv
+from mmdet.apis import fuse_gaze_heads, inference_autocast, init_detector, init_detector_cached
+from mmdet.core.export.model_wrappers import ONNXRuntimeMultiClueGaze
 from mmdet.datasets.pipelines import Compose
 import torch
 from mmcv.parallel import collate, scatter
@@ -37,6 +39,42 @@ def parse_args():
         help='visualize output (creates a new video with estimated gaze)',
         action='store_true'
         )
+
+    parser.add_argument(
+        '--backend',
+        help='inference backend of the gaze model',
+        choices=['pytorch', 'onnxruntime'],
+        default='pytorch'
+        )
+
+    parser.add_argument(
+        '--onnx-file',
+        dest='onnx_file',
+        help='ONNX file exported by tools/deployment/gaze2onnx.py (only used with --backend onnxruntime)',
+        type=str,
+        default=os.path.dirname(str(Path.cwd())) + '/ckpts/multiclue_gaze_r50_gaze360.onnx'
+        )
+
+    parser.add_argument(
+        '--device',
+        help='device used for inference with the pytorch backend',
+        type=str,
+        default='cuda:0'
+        )
+
+    parser.add_argument(
+        '--precision',
+        help='inference precision of the gaze model with the pytorch backend (fp16 needs a CUDA device)',
+        choices=['fp32', 'bf16', 'fp16'],
+        default='fp32'
+        )
+
+    parser.add_argument(
+        '--no-model-cache',
+        dest='model_cache',
+        help='load the gaze model from the checkpoint instead of the cached state dict',
+        action='store_false'
+        )
     
     return parser.parse_args()
 
@@ -104,13 +142,15 @@ def load_datas(data, test_pipeline, datas):
     datas.append(test_pipeline(data))
 
 
-def infer(datas,model,clip,i):
+def infer(datas,model,clip,i,device,precision='fp32'):
     datas = sorted(datas, key=lambda x:x['img_metas'].data['filename']) # 按帧顺序 img名称从小到大
     datas = collate(datas, samples_per_gpu=len(frame_id)) # 用来形成batch用的
     datas['img_metas'] = datas['img_metas'].data
     datas['img'] = datas['img'].data
-    datas = scatter(datas, ["cuda:0"])[0]
-    with torch.no_grad():
+    # The onnxruntime backend and CPU inference take the collated tensors as they are.
+    if device != 'cpu':
+        datas = scatter(datas, [device])[0]
+    with torch.no_grad(), inference_autocast(precision, device):
         (det_bboxes, det_labels), det_gazes = model(
                 return_loss=False,
                 rescale=True,
@@ -226,12 +266,34 @@ if __name__ == '__main__':
 
 
 
-    model = init_detector(
-            os.path.dirname(str(Path.cwd())) + '/configs/multiclue_gaze/multiclue_gaze_r50_gaze360.py',
-            os.path.dirname(str(Path.cwd())) + '/ckpts/multiclue_gaze_r50_gaze360.pth',
-            device="cuda:0",
-            cfg_options=None,)
-    cfg = model.cfg
+    config_path = os.path.dirname(str(Path.cwd())) + '/configs/multiclue_gaze/multiclue_gaze_r50_gaze360.py'
+
+    if args.backend == 'onnxruntime':
+        # The ONNX model runs on the CPU execution provider (or CUDA if onnxruntime-gpu is installed),
+        # the inputs are handed over as CPU tensors.
+        model = ONNXRuntimeMultiClueGaze(args.onnx_file)
+        cfg = mmcv.Config.fromfile(config_path)
+        device = 'cpu'
+        assert args.precision == 'fp32', '--precision is only supported by the pytorch backend'
+    else:
+        checkpoint_path = os.path.dirname(str(Path.cwd())) + '/ckpts/multiclue_gaze_r50_gaze360.pth'
+        if args.model_cache:
+            # The first run caches the loaded weights in ckpts/cache, later runs skip reading the checkpoint.
+            model = init_detector_cached(
+                    config_path,
+                    checkpoint_path,
+                    device=args.device,
+                    cache_dir=os.path.dirname(str(Path.cwd())) + '/ckpts/cache')
+        else:
+            model = init_detector(
+                    config_path,
+                    checkpoint_path,
+                    device=args.device,
+                    cfg_options=None,)
+        # the gaze MLPs of the face, eyes and head run as one batched matmul
+        fuse_gaze_heads(model)
+        cfg = model.cfg
+        device = args.device
 
 
 
@@ -269,7 +331,7 @@ if __name__ == '__main__':
                 load_datas(cur_data,test_pipeline,datas)
                 
                 if len(datas)>max_len or j==(len(frame_id)-1):
-                    infer(datas,model,clip,i)
+                    infer(datas,model,clip,i,device,args.precision)
                     datas = []
                     if j==(len(frame_id)-1):
                         clip['gaze_p'+str(i)] = np.concatenate(clip['gaze_p'+str(i)],axis=0)
@@ -25,6 +25,10 @@ def parse_args():
     parser.add_argument('--classes', nargs='+', type=int, help='filter by class: --class 0, or --class 0 2 3')
     parser.add_argument('--agnostic-nms', action='store_true', help='class-agnostic NMS')
     parser.add_argument('--augment', action='store_true', help='augmented inference')
+    parser.add_argument('--cache-dir', type=str, default=str(Path.cwd()) + '/cache', help='cache of fused models for fast startup, empty to disable')
+    parser.add_argument('--precision', choices=['fp32', 'bf16', 'fp16'], default=None, help='inference precision (default: fp16 on CUDA, fp32 on CPU)')
+    parser.add_argument('--int8', action='store_true', help='INT8 post-training quantization (CPU only)')
+    parser.add_argument('--int8-calib-frames', type=int, default=32, help='number of frames used for INT8 calibration')
     parser.add_argument('--update', action='store_true', help='update all models')
     parser.add_argument('--project', default='runs/detect', help='save results to project/name')
     parser.add_argument('--name', default='exp', help='save results to project/name')
@@ -1,4 +1,5 @@
 import argparse
+import contextlib
 import time
 from pathlib import Path
 
@@ -12,7 +13,7 @@ from utils.datasets import LoadStreams, LoadImages
 from utils.general import check_img_size, check_requirements, check_imshow, non_max_suppression, apply_classifier, \
     scale_coords, xyxy2xywh, strip_optimizer, set_logging, increment_path
 from utils.plots import plot_one_box
-from utils.torch_utils import select_device, load_classifier, time_synchronized
+from utils.torch_utils import select_device, load_classifier, time_synchronized, quantize_int8
 
 
 def detect(opt,save_img=False):
@@ -26,10 +27,16 @@ def detect(opt,save_img=False):
     # Initialize
     set_logging()
     device = select_device(opt.device)
-    half = device.type != 'cpu'  # half precision only supported on CUDA
+    int8 = getattr(opt, 'int8', False)
+    assert not int8 or device.type == 'cpu', 'INT8 inference is only supported on CPU'
+    precision = getattr(opt, 'precision', None) or ('fp16' if device.type != 'cpu' else 'fp32')
+    assert precision != 'fp16' or device.type != 'cpu', 'fp16 inference is only supported on CUDA, use bf16 on CPU'
+    assert precision == 'fp32' or not int8, 'INT8 inference requires --precision fp32'
+    half = precision == 'fp16'  # half precision only supported on CUDA
+    bf16 = precision == 'bf16'  # bf16 autocast, BN-fused convs run in bf16 and NMS in fp32
 
     # Load model
-    model = attempt_load(weights, map_location=device)  # load FP32 model
+    model = attempt_load(weights, map_location=device, cache_dir=getattr(opt, 'cache_dir', None))  # load FP32 model
     stride = int(model.stride.max())  # model stride
     imgsz = check_img_size(imgsz, s=stride)  # check img_size
     if half:
@@ -51,6 +58,18 @@ def detect(opt,save_img=False):
         save_img = True
         dataset = LoadImages(source, img_size=imgsz, stride=stride)
 
+    if int8:  # calibrate on the first frames of the source
+        # a separate loader, so that the frames are still detected from the start of the video
+        calib_dataset = dataset if webcam else LoadImages(source, img_size=imgsz, stride=stride)
+        calib_imgs = []
+        for _, img, _, _ in calib_dataset:
+            calib_imgs.append(torch.from_numpy(img).float().div(255.0).unsqueeze(0))
+            if len(calib_imgs) >= opt.int8_calib_frames:
+                break
+        if not webcam and calib_dataset.cap is not None:
+            calib_dataset.cap.release()
+        model = quantize_int8(model, calib_imgs)
+
     # Get names and colors
     names = model.module.names if hasattr(model, 'module') else model.names
     colors = [[random.randint(0, 255) for _ in range(3)] for _ in names]
@@ -68,7 +87,9 @@ def detect(opt,save_img=False):
 
         # Inference
         t1 = time_synchronized()
-        pred = model(img, augment=opt.augment)[0]
+        with torch.autocast(device.type, dtype=torch.bfloat16) if bf16 else contextlib.nullcontext():
+            pred = model(img, augment=opt.augment)[0]
+        pred = pred.float()
 
         # Apply NMS
         pred = non_max_suppression(pred, opt.conf_thres, opt.iou_thres, classes=opt.classes, agnostic=opt.agnostic_nms)
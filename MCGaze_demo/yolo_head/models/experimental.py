@@ -1,5 +1,10 @@
 # This file contains experimental modules
 
+import hashlib
+import inspect
+import os
+from pathlib import Path
+
 import numpy as np
 import torch
 import torch.nn as nn
@@ -110,12 +115,42 @@ class Ensemble(nn.ModuleList):
         return y, None  # inference, train output
 
 
-def attempt_load(weights, map_location=None):
+def source_hash():
+    # Hash of the torch version and of the sources of the classes a pickled model is made of
+    sha = hashlib.sha256(torch.__version__.encode())
+    root = Path(__file__).resolve().parents[1]
+    for f in sorted((root / 'models').glob('*.py')) + sorted((root / 'utils').glob('*.py')):
+        sha.update(f.read_bytes())
+    return sha.hexdigest()
+
+
+def load_fused(w, map_location=None, cache_dir=None):
+    # Loads a fused FP32 model, through a cache of fused models if cache_dir is given. The cached model is a pickled
+    # module, so the key covers the weights file and the model sources: any code change invalidates the cache
+    if not cache_dir:
+        return torch.load(w, map_location=map_location)['model'].float().fuse().eval()
+    stat = os.stat(w)
+    key = hashlib.sha256(f'{os.path.abspath(w)}:{stat.st_size}:{stat.st_mtime_ns}:{source_hash()}'.encode()).hexdigest()[:16]
+    f = Path(cache_dir) / f'{Path(w).stem}_fused_{key}.pt'
+    if f.exists():
+        kwargs = {'mmap': True} if 'mmap' in inspect.signature(torch.load).parameters else {}  # torch>=2.1
+        if 'weights_only' in inspect.signature(torch.load).parameters:
+            kwargs['weights_only'] = False
+        return torch.load(f, map_location='cpu', **kwargs).to(map_location or 'cpu').eval()
+    model = torch.load(w, map_location='cpu')['model'].float().fuse().eval()
+    f.parent.mkdir(parents=True, exist_ok=True)
+    tmp = f.with_suffix(f'.{os.getpid()}.tmp')
+    torch.save(model, tmp)
+    os.replace(tmp, f)  # atomic, concurrent workers never read a partial file
+    return model.to(map_location or 'cpu')
+
+
+def attempt_load(weights, map_location=None, cache_dir=None):
     # Loads an ensemble of models weights=[a,b,c] or a single model weights=[a] or weights=a
     model = Ensemble()
     for w in weights if isinstance(weights, list) else [weights]:
         #attempt_download(w)
-        model.append(torch.load(w, map_location=map_location)['model'].float().fuse().eval())  # load FP32 model
+        model.append(load_fused(w, map_location, cache_dir))  # load FP32 model
 
     # Compatibility updates
     for m in model.modules():
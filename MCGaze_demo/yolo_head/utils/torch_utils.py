@@ -169,6 +169,25 @@ def prune(model, amount=0.3):
     print(' %.3g global sparsity' % sparsity(model))
 
 
+def quantize_int8(model, calib_imgs, engine='fbgemm'):
+    # Post-training static INT8 quantization of the Conv2d() layers of a fused (CPU) model, calibrated on calib_imgs
+    import torch.quantization as tq
+    torch.backends.quantized.engine = engine
+    print('Quantizing model... ', end='')
+    for m in model.modules():
+        for name, c in list(m.named_children()):
+            if type(c) is nn.Conv2d:
+                c.qconfig = tq.get_default_qconfig(engine)
+                setattr(m, name, tq.QuantWrapper(c))  # quantize input, dequantize output
+    tq.prepare(model, inplace=True)
+    with torch.no_grad():
+        for img in calib_imgs:  # observe activation ranges
+            model(img)
+    tq.convert(model, inplace=True)
+    print('%g Conv2d() layers quantized' % sum(type(m) is tq.QuantWrapper for m in model.modules()))
+    return model
+
+
 def fuse_conv_and_bn(conv, bn):
     # Fuse convolution and batchnorm layers https://tehnokv.com/posts/fusing-batchnorm-and-conv/
     fusedconv = nn.Conv2d(conv.in_channels,
@@ -0,0 +1,7 @@
+_base_ = './mpeblink.py'
+
+# The training annotations are packed into <ann>.packed.npy/.npz next to the
+# annotation file and memory-mapped, so the dataloader workers share them
+# instead of each growing its own copy of the json. The packed files are
+# rebuilt when the annotation file changes.
+data = dict(train=dict(ann_backend='packed'))
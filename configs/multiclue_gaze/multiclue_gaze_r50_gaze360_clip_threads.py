@@ -0,0 +1,9 @@
+_base_ = './multiclue_gaze_r50_gaze360.py'
+
+# Each dataloader worker loads and transforms the frames of a training clip
+# on a pool of 4 threads. The clip parameters are still sampled in the
+# worker, so the clips match a serial run under the same seed. Lower
+# workers_per_gpu if the CPU is oversubscribed.
+data = dict(train=dict(clip_num_threads=4))
+
+work_dir = './work_dirs/multi-clue_gaze_r50_gaze360_clip_threads'
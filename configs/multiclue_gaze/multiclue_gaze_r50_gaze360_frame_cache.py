@@ -0,0 +1,30 @@
+_base_ = './multiclue_gaze_r50_gaze360.py'
+
+data_root = 'data/gaze360/'
+img_norm_cfg = dict(
+    mean=[123.675, 116.28, 103.53], std=[58.395, 57.12, 57.375], to_rgb=True)
+
+# The frames are center cropped and rescaled offline by
+# tools/dataset_converters/gaze360/build_frame_cache.py. The crop is fixed to
+# 0.68 of the frame, i.e. the random crop size of CenterCrop with
+# crop_type='relative_range' in the base config is not used.
+train_pipeline = [
+    dict(
+        type='LoadAnnotations',
+        with_bbox=True,
+        with_gaze=True,
+        with_id=True),
+    dict(
+        type='LoadImageFromFrameCache',
+        cache_prefix=data_root + 'train_frame_cache'),
+    dict(type='RandomFlip', flip_ratio=0.5),
+    dict(type='Normalize', **img_norm_cfg),
+    dict(type='Pad', size_divisor=32),
+    dict(type='DefaultFormatBundle'),
+    dict(
+        type='Collect',
+        keys=['img', 'gt_bboxes', 'gt_labels', 'gt_gazes', 'gt_ids']),
+]
+data = dict(train=dict(pipeline=train_pipeline))
+
+work_dir = './work_dirs/multi-clue_gaze_r50_gaze360_frame_cache'
@@ -0,0 +1,13 @@
+_base_ = './multiclue_gaze_r50_gaze360.py'
+
+# Each worker keeps the last 64 decoded frames, and batches are drawn from
+# chunks of 8 consecutive frames of a video, so most frames of the
+# overlapping clips of a batch are decoded once. The cache costs
+# 64 * frame size of memory per worker. With video_sampler, each GPU reads
+# its own subset of the videos in an epoch.
+data = dict(
+    clip_chunk_size=8,
+    video_sampler=True,
+    train=dict(frame_cache_size=64, frame_cache_log_interval=10000))
+
+work_dir = './work_dirs/multi-clue_gaze_r50_gaze360_frame_lru'
@@ -0,0 +1,9 @@
+_base_ = './multiclue_gaze_r50_gaze360.py'
+
+# The training annotations are packed into <ann>.packed.npy/.npz next to the
+# annotation file and memory-mapped, so the dataloader workers share them
+# instead of each growing its own copy of the json. The packed files are
+# rebuilt when the annotation file changes.
+data = dict(train=dict(ann_backend='packed'))
+
+work_dir = './work_dirs/multi-clue_gaze_r50_gaze360_packed_ann'
@@ -0,0 +1,34 @@
+_base_ = './multiclue_gaze_r50_gaze360.py'
+
+data_root = 'data/gaze360/'
+img_norm_cfg = dict(
+    mean=[123.675, 116.28, 103.53], std=[58.395, 57.12, 57.375], to_rgb=True)
+
+# The frames are read from data/gaze360/train_rawframes.bin, built by
+# tools/dataset_converters/gaze360/build_video_shard.py, instead of the
+# train_rawframes directory. The frames of a clip are read at once.
+train_pipeline = [
+    dict(
+        type='LoadImageFromFile',
+        file_client_args=dict(
+            backend='video_shard', root=data_root + 'train_rawframes')),
+    dict(
+        type='LoadAnnotations',
+        with_bbox=True,
+        with_gaze=True,
+        with_id=True),
+    dict(
+        type='CenterCrop', crop_size=(0.68, 0.68),
+        crop_type='relative_range'),
+    dict(type='Resize', img_scale=(224, 224), keep_ratio=True),
+    dict(type='RandomFlip', flip_ratio=0.5),
+    dict(type='Normalize', **img_norm_cfg),
+    dict(type='Pad', size_divisor=32),
+    dict(type='DefaultFormatBundle'),
+    dict(
+        type='Collect',
+        keys=['img', 'gt_bboxes', 'gt_labels', 'gt_gazes', 'gt_ids']),
+]
+data = dict(train=dict(pipeline=train_pipeline))
+
+work_dir = './work_dirs/multi-clue_gaze_r50_gaze360_video_shard'
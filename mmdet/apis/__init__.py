@@ -1,6 +1,8 @@
 # Copyright (c) OpenMMLab. All rights reserved.
-from .inference import (async_inference_detector, inference_detector,
-                        init_detector, show_result_pyplot)
+from .inference import (async_inference_detector, fuse_gaze_heads,
+                        inference_autocast, inference_detector,
+                        init_detector, init_detector_cached,
+                        show_result_pyplot)
 from .test import multi_gpu_test, single_gpu_test
 from .train import (get_root_logger, init_random_seed, set_random_seed,
                     train_detector)
@@ -8,5 +10,6 @@ from .train import (get_root_logger, init_random_seed, set_random_seed,
 __all__ = [
     'get_root_logger', 'set_random_seed', 'train_detector', 'init_detector',
     'async_inference_detector', 'inference_detector', 'show_result_pyplot',
-    'multi_gpu_test', 'single_gpu_test', 'init_random_seed'
+    'multi_gpu_test', 'single_gpu_test', 'init_random_seed',
+    'inference_autocast', 'init_detector_cached', 'fuse_gaze_heads'
 ]
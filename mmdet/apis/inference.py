@@ -1,4 +1,10 @@
 # Copyright (c) OpenMMLab. All rights reserved.
+import contextlib
+import hashlib
+import inspect
+import json
+import os
+import os.path as osp
 import warnings
 
 import mmcv
@@ -35,12 +41,7 @@ def init_detector(config, checkpoint=None, device='cuda:0', cfg_options=None):
                         f'but got {type(config)}')
     if cfg_options is not None:
         config.merge_from_dict(cfg_options)
-    if 'pretrained' in config.model:
-        config.model.pretrained = None
-    elif 'init_cfg' in config.model.backbone:
-        config.model.backbone.init_cfg = None
-    config.model.train_cfg = None
-    model = build_detector(config.model, test_cfg=config.get('test_cfg'))
+    model = _build_test_detector(config)
     if checkpoint is not None:
         checkpoint = load_checkpoint(model, checkpoint, map_location='cpu', revise_keys=[(r'^module\.', ''), ('mask_head', 'blink_head')])
         if 'CLASSES' in checkpoint.get('meta', {}):
@@ -50,12 +51,168 @@ def init_detector(config, checkpoint=None, device='cuda:0', cfg_options=None):
             warnings.warn('Class names are not saved in the checkpoint\'s '
                           'meta data, use COCO classes by default.')
             model.CLASSES = get_classes('coco')
+    model.to(device)
+    model.eval()
+    return model
+
+
+def _build_test_detector(config):
+    """Build the detector of a config for inference, without weights."""
+    if 'pretrained' in config.model:
+        config.model.pretrained = None
+    elif 'init_cfg' in config.model.backbone:
+        config.model.backbone.init_cfg = None
+    config.model.train_cfg = None
+    model = build_detector(config.model, test_cfg=config.get('test_cfg'))
     model.cfg = config  # save the config in the model for convenience
+    return model
+
+
+def _detector_cache_key(config, checkpoint):
+    """Hash the model config and the identity of the checkpoint file.
+
+    The checkpoint is identified by its path, size and modification time
+    instead of its content, hashing hundreds of MB would cost more than the
+    cache saves.
+    """
+    sha = hashlib.sha256(
+        json.dumps(config._cfg_dict.to_dict(), sort_keys=True,
+                   default=str).encode())
+    if checkpoint is not None:
+        stat = os.stat(checkpoint)
+        sha.update(f'{osp.abspath(checkpoint)}:{stat.st_size}:'
+                   f'{stat.st_mtime_ns}'.encode())
+    return sha.hexdigest()[:16]
+
+
+def init_detector_cached(config,
+                         checkpoint=None,
+                         device='cuda:0',
+                         cfg_options=None,
+                         cache_dir='.cache/detectors'):
+    """Initialize a detector through a warm-start cache.
+
+    The first call builds the detector with :func:`init_detector` and saves
+    its state dict and class names to ``cache_dir``, keyed by a hash of the
+    config and the checkpoint. Later calls build the model from the config
+    and load that state dict instead of the checkpoint, which skips reading
+    the whole checkpoint and revising its keys; with torch>=2.1 the tensors
+    are memory-mapped and assigned without a copy.
+
+    Only tensors are cached, never the module itself, so a cached entry
+    stays valid when the code of the model changes. An entry that no longer
+    matches the model is rebuilt from the checkpoint.
+
+    Args:
+        config (str or :obj:`mmcv.Config`): Config file path or the config
+            object.
+        checkpoint (str, optional): Checkpoint path. If left as None, the model
+            will not load any weights.
+        device (str): The device the model is moved to.
+        cfg_options (dict): Options to override some settings in the used
+            config.
+        cache_dir (str): Directory of the cached models.
+
+    Returns:
+        nn.Module: The constructed detector.
+    """
+    if isinstance(config, str):
+        config = mmcv.Config.fromfile(config)
+    elif not isinstance(config, mmcv.Config):
+        raise TypeError('config must be a filename or Config object, '
+                        f'but got {type(config)}')
+    if cfg_options is not None:
+        config.merge_from_dict(cfg_options)
+    cache_file = osp.join(cache_dir,
+                          f'{_detector_cache_key(config, checkpoint)}.pth')
+
+    model = None
+    if osp.exists(cache_file):
+        load_params = inspect.signature(torch.load).parameters
+        load_kwargs = dict(map_location='cpu')
+        if 'mmap' in load_params:
+            load_kwargs['mmap'] = True
+        if 'weights_only' in load_params:
+            load_kwargs['weights_only'] = True
+        cached = torch.load(cache_file, **load_kwargs)
+        model = _build_test_detector(config)
+        state_kwargs = {}
+        if 'assign' in inspect.signature(model.load_state_dict).parameters:
+            state_kwargs['assign'] = True
+        try:
+            model.load_state_dict(cached['state_dict'], **state_kwargs)
+            if cached['CLASSES'] is not None:
+                model.CLASSES = cached['CLASSES']
+        except (KeyError, RuntimeError) as e:
+            warnings.warn(f'Rebuilding the stale cache {cache_file}: {e}')
+            model = None
+    if model is None:
+        model = init_detector(config, checkpoint, device='cpu')
+        mmcv.mkdir_or_exist(cache_dir)
+        # write to a temporary file first so that concurrent workers never
+        # read a partially written cache
+        tmp_file = f'{cache_file}.{os.getpid()}.tmp'
+        torch.save(
+            dict(
+                state_dict=model.state_dict(),
+                CLASSES=getattr(model, 'CLASSES', None)), tmp_file)
+        os.replace(tmp_file, cache_file)
     model.to(device)
     model.eval()
     return model
 
 
+def fuse_gaze_heads(model):
+    """Pack the face, eyes and head MLPs of the gaze heads of a model into
+    batched weights for inference.
+
+    This is inference-equivalent and keeps the state dict unchanged, see
+    :meth:`GazeHead.fuse_regions`. Call it after the checkpoint is loaded.
+    It cannot be combined with the dynamic INT8 quantization of the RoI
+    head: the fused forward runs on FP32 copies of the weights and would
+    bypass the quantized layers, so either is refused after the other.
+
+    Args:
+        model (nn.Module): The model, in eval mode.
+
+    Returns:
+        nn.Module: The model itself.
+    """
+    for module in model.modules():
+        if hasattr(module, 'fuse_regions'):
+            module.fuse_regions()
+    return model
+
+
+def inference_autocast(precision='fp32', device='cuda:0'):
+    """Get the autocast context for mixed-precision inference.
+
+    Numerically sensitive ops (RoI align, box decoding and the normalization
+    of the gaze vectors) are kept in FP32 by the models themselves.
+
+    Args:
+        precision (str): One of 'fp32', 'bf16' and 'fp16'. Defaults to
+            'fp32'.
+        device (str or :obj:`torch.device`): The device the model runs on.
+
+    Returns:
+        contextmanager: The autocast context, a null context for 'fp32'.
+    """
+    if precision == 'fp32':
+        return contextlib.nullcontext()
+    dtypes = dict(bf16=torch.bfloat16, fp16=torch.float16)
+    if precision not in dtypes:
+        raise ValueError(f'precision must be one of fp32, bf16 and fp16, '
+                         f'but got {precision}')
+    if not hasattr(torch, 'autocast'):
+        raise RuntimeError('bf16 and fp16 inference requires torch>=1.10')
+    device_type = torch.device(device).type
+    if device_type == 'cpu' and precision == 'fp16':
+        raise ValueError('fp16 autocast is only supported on CUDA, '
+                         'use bf16 on CPU')
+    return torch.autocast(device_type, dtype=dtypes[precision])
+
+
 class LoadImage:
     """Deprecated.
 
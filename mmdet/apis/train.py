@@ -105,7 +105,9 @@ def train_detector(model,
             dist=distributed,
             seed=cfg.seed,
             runner_type=runner_type,
-            persistent_workers=cfg.data.get('persistent_workers', False))
+            persistent_workers=cfg.data.get('persistent_workers', False),
+            clip_chunk_size=cfg.data.get('clip_chunk_size', 0),
+            video_sampler=cfg.data.get('video_sampler', False))
         for ds in dataset
     ]   # 所以batchsize好像是2
 
@@ -169,7 +171,8 @@ def train_detector(model,
         cfg.get('momentum_config', None),
         custom_hooks_config=cfg.get('custom_hooks', None))
 
-    if distributed:
+    # the video sampler is seeded by the epoch in non-distributed training
+    if distributed or cfg.data.get('video_sampler', False):
         if isinstance(runner, EpochBasedRunner):
             runner.register_hook(DistSamplerSeedHook())
 
@@ -206,4 +209,8 @@ def train_detector(model,
         runner.resume(cfg.resume_from)
     elif cfg.load_from:
         runner.load_checkpoint(cfg.load_from)
+    # continue the sequence of samples of a resumed iteration based training
+    for data_loader in data_loaders:
+        if hasattr(data_loader.batch_sampler, 'set_start_iter'):
+            data_loader.batch_sampler.set_start_iter(runner.iter)
     runner.run(data_loaders, cfg.workflow)
@@ -6,11 +6,6 @@ from ..transforms import bbox_cxcywh_to_xyxy
 from .assign_result import AssignResult
 from .base_assigner import BaseAssigner
 
-try:
-    from scipy.optimize import linear_sum_assignment
-except ImportError:
-    linear_sum_assignment = None
-
 
 @BBOX_ASSIGNERS.register_module()
 class FixedAssigner(BaseAssigner):
@@ -48,6 +43,7 @@ class FixedAssigner(BaseAssigner):
         self.cls_cost = build_match_cost(cls_cost)
         self.reg_cost = build_match_cost(reg_cost)
         self.iou_cost = build_match_cost(iou_cost)
+        self._template_cache = {}
 
     def assign(self,
                bbox_pred,
@@ -93,60 +89,87 @@ class FixedAssigner(BaseAssigner):
         """
         assert gt_bboxes_ignore is None, \
             'Only case when gt_bboxes_ignore is None is supported.'
-        clip_length = len(bbox_pred)
-        total_gt_ids = torch.unique(torch.cat(gt_ids))
+        return self.assign_batch(bbox_pred, gt_bboxes, len(bbox_pred))
 
-        num_gts = total_gt_ids.numel()
+    def assign_batch(self, bbox_pred, gt_bboxes, clip_length):
+        """Assign the queries of all frames of a batch of clips.
 
-        num_bboxes = bbox_pred[0].size(0)
-        # 1. assign -1 by default
-        assigned_gt_inds = bbox_pred[0].new_full((num_bboxes, ),
-                                                 -1,
-                                                 dtype=torch.long)
-        assigned_labels = bbox_pred[0].new_full((num_bboxes, ),
-                                                -1,
-                                                dtype=torch.long)
-        
-        if num_gts == 0 or num_bboxes == 0:
-            # No ground truth or boxes, return empty assignment
-            if num_gts == 0:
-                # No ground truth, assign all to background
-                assigned_gt_inds[:] = 0
-            return [
-                AssignResult(
-                    num_gts, assigned_gt_inds, None, labels=assigned_labels)
-                for _ in range(clip_length)
-            ]
+        The assignment is fixed: the queries predict the face, eyes and head
+        in this order, so a frame with 3 gts (face, eyes, head) assigns them
+        to the first 3 queries, and a frame with only the head gt assigns it
+        to the last query and the others to background. Nothing depends on
+        the predictions, the results are built from a few template tensors
+        kept on the device, without any host/device sync. The positive and
+        negative indices are fixed as well, they are set as the ``pos_inds``
+        and ``neg_inds`` extra properties for
+        :meth:`PseudoSampler.sample_batch`.
 
-        assign_results = []
-        for _ in range(clip_length):
-            num_gt_bboxes = gt_bboxes[_].size(0)
-            assigned_gt_inds = bbox_pred[0].new_full((num_bboxes, ),
-                                                 -1,
-                                                 dtype=torch.long)
-            assigned_labels = bbox_pred[0].new_full((num_bboxes, ),
-                                                -1,
-                                                dtype=torch.long)
-            if num_gt_bboxes == 1:# 只有head_bboxes有gt
-                num_gts = 1
-                # assign 前两维 to background
-                assigned_gt_inds[:-1] = 0
-                assigned_gt_inds[-1] = 1
-
-                assigned_labels[-1] = 2
+        Args:
+            bbox_pred (Tensor | list[Tensor]): Predicted boxes of all
+                frames, only the device and the number of queries are used.
+                Shape [num_frames, num_query, 4].
+            gt_bboxes (list[Tensor]): Ground truth boxes of each frame.
+            clip_length (int): Number of frames of a clip, a clip without
+                any gt is assigned to background.
 
+        Returns:
+            list[:obj:`AssignResult`]: The assigned result of each frame.
+        """
+        num_bboxes = bbox_pred[0].size(0)
+        gt_inds, labels, pos_inds, neg_inds = self._templates(
+            bbox_pred[0], num_bboxes)
+        # the number of gts of each frame is known on the host
+        num_gts = [gt.size(0) for gt in gt_bboxes]
+        rows, frame_num_gts = [], []
+        for start in range(0, len(gt_bboxes), clip_length):
+            clip_num_gts = num_gts[start:start + clip_length]
+            if sum(clip_num_gts) == 0 or num_bboxes == 0:
+                # No ground truth or boxes, assign all to background
+                rows += [0] * len(clip_num_gts)
+                frame_num_gts += [max(clip_num_gts)] * len(clip_num_gts)
             else:
-                num_gts = 3                
-                assigned_gt_inds[0] = 1
-                assigned_gt_inds[1] = 2
-                assigned_gt_inds[2] = 3
-
-                assigned_labels[0] = 0
-                assigned_labels[1] = 1
-                assigned_labels[2] = 2
-
-            assign_results.append(
-                AssignResult(
-                    num_gts, assigned_gt_inds, None, labels=assigned_labels))
+                for n in clip_num_gts:
+                    # 只有head_bboxes有gt
+                    rows.append(1 if n == 1 else 2)
+                    frame_num_gts.append(1 if n == 1 else 3)
+        # one gather for all frames, the results do not share memory with
+        # the templates
+        frame_gt_inds = torch.stack([gt_inds[row] for row in rows])
+        frame_labels = torch.stack([labels[row] for row in rows])
+        assign_results = []
+        for i, (row, n) in enumerate(zip(rows, frame_num_gts)):
+            assign_result = AssignResult(
+                n, frame_gt_inds[i], None, labels=frame_labels[i])
+            # the indices are only read, they are shared with the templates
+            assign_result.set_extra_property('pos_inds', pos_inds[row])
+            assign_result.set_extra_property('neg_inds', neg_inds[row])
+            assign_results.append(assign_result)
         return assign_results
 
+    def _templates(self, tensor, num_bboxes):
+        """The ``gt_inds``, ``labels`` and positive and negative indices of
+        the frames without gt, with only the head and with face, eyes and
+        head, cached per device and number of queries."""
+        key = (tensor.device, num_bboxes)
+        if key not in self._template_cache:
+            gt_inds = [[0] * num_bboxes, [0] * num_bboxes, [-1] * num_bboxes]
+            labels = [[-1] * num_bboxes for _ in range(3)]
+            if num_bboxes > 0:
+                # assign 前两维 to background
+                gt_inds[1][-1] = 1
+                labels[1][-1] = 2
+                gt_inds[2][:3] = [1, 2, 3]
+                labels[2][:3] = [0, 1, 2]
+            pos_inds = [
+                tensor.new_tensor([i for i, ind in enumerate(row) if ind > 0],
+                                  dtype=torch.long) for row in gt_inds
+            ]
+            neg_inds = [
+                tensor.new_tensor([i for i, ind in enumerate(row) if ind == 0],
+                                  dtype=torch.long) for row in gt_inds
+            ]
+            self._template_cache[key] = (
+                tensor.new_tensor(gt_inds, dtype=torch.long),
+                tensor.new_tensor(labels, dtype=torch.long), pos_inds,
+                neg_inds)
+        return self._template_cache[key]
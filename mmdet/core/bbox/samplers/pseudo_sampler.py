@@ -43,3 +43,62 @@ class PseudoSampler(BaseSampler):
         sampling_result = SamplingResult(pos_inds, neg_inds, bboxes, gt_bboxes,
                                          assign_result, gt_flags)
         return sampling_result
+
+    def sample_batch(self, assign_results, bboxes, gt_bboxes):
+        """Directly returns the sampling results of a batch of images.
+
+        An assigner whose indices are known in advance (e.g.
+        :class:`FixedAssigner`) sets them as the ``pos_inds`` and
+        ``neg_inds`` extra properties of its results, which are used as they
+        are. Otherwise the indices of all images are computed in one pass
+        over the stacked ``gt_inds`` instead of two ``nonzero`` per image,
+        the only host/device sync is the one reading their numbers.
+
+        Args:
+            assign_results (list[:obj:`AssignResult`]): Assigned results of
+                each image, all with the same number of bboxes.
+            bboxes (list[torch.Tensor]): Bounding boxes of each image.
+            gt_bboxes (list[torch.Tensor]): Ground truth boxes of each image.
+
+        Returns:
+            list[:obj:`SamplingResult`]: sampler results of each image
+        """
+        if len(assign_results) == 0:
+            return []
+        pos_inds = [
+            res.get_extra_property('pos_inds') for res in assign_results
+        ]
+        neg_inds = [
+            res.get_extra_property('neg_inds') for res in assign_results
+        ]
+        if any(inds is None for inds in pos_inds + neg_inds):
+            pos_inds, neg_inds = self._batch_inds(assign_results)
+
+        sampling_results = []
+        for i, assign_result in enumerate(assign_results):
+            gt_flags = bboxes[i].new_zeros(
+                bboxes[i].shape[0], dtype=torch.uint8)
+            sampling_results.append(
+                SamplingResult(pos_inds[i], neg_inds[i], bboxes[i],
+                               gt_bboxes[i], assign_result, gt_flags))
+        return sampling_results
+
+    def _batch_inds(self, assign_results):
+        """The positive and negative indices of each of the assign results,
+        sorted like ``nonzero().unique()`` does."""
+        gt_inds = torch.stack([res.gt_inds for res in assign_results])
+        num_bboxes = gt_inds.size(1)
+        # sort the positive, then the negative, then the ignored indices,
+        # each in ascending order
+        group = (gt_inds == 0).long() + 2 * (gt_inds < 0).long()
+        order = torch.argsort(
+            group * num_bboxes +
+            torch.arange(num_bboxes, device=gt_inds.device),
+            dim=1)
+        num_pos, num_neg = torch.stack(
+            [(group == 0).sum(1), (group == 1).sum(1)]).tolist()
+        pos_inds = [order[i, :n] for i, n in enumerate(num_pos)]
+        neg_inds = [
+            order[i, num_pos[i]:num_pos[i] + n] for i, n in enumerate(num_neg)
+        ]
+        return pos_inds, neg_inds
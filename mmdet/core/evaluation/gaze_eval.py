@@ -0,0 +1,192 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import math
+from itertools import chain
+
+import torch
+from mmcv.utils import print_log
+
+from mmdet.models.losses.gaze_arccos_loss import yaw_pitch_to_vector
+
+GAZE_CUES = ('fusion_gazes', 'face_gazes', 'eyes_gazes', 'head_gazes')
+
+
+def gaze_yaw(gazes):
+    """Absolute yaw of gazes in degrees, 0 for a gaze towards the camera.
+
+    Args:
+        gazes (Tensor): Gaze vectors or (yaw, pitch), shape [N, 3] or
+            [N, 2].
+
+    Returns:
+        Tensor: The yaw of each gaze, shape [N].
+    """
+    if gazes.size(-1) == 3:
+        gazes = gazes / torch.norm(gazes, dim=-1, keepdim=True)
+        yaw = torch.atan2(gazes[:, 0], -gazes[:, 2])
+    else:
+        yaw = gazes[:, 0]
+    return 180 * torch.abs(yaw) / math.pi
+
+
+def angular_errors(preds, gts):
+    """Angular errors between predicted and ground truth gazes in degrees.
+
+    The ground truth is normalized, the predictions are expected to be unit
+    vectors as returned by the gaze heads.
+
+    Args:
+        preds (Tensor): Predicted gaze vectors or (yaw, pitch), shape
+            [N, 3] or [N, 2].
+        gts (Tensor): Ground truth gaze vectors or (yaw, pitch), shape
+            [N, 3] or [N, 2].
+
+    Returns:
+        Tensor: The error of each gaze, shape [N].
+    """
+    if preds.size(-1) == 2:
+        preds = yaw_pitch_to_vector(preds)
+    if gts.size(-1) == 2:
+        gts = yaw_pitch_to_vector(gts)
+    # acos is ill-conditioned near +-1, always evaluate it in fp32
+    preds = preds.float()
+    gts = gts.float()
+    gts = gts / torch.norm(gts, dim=-1, keepdim=True)
+    return 180 * torch.acos((gts * preds).sum(-1)) / math.pi
+
+
+def smooth_video_gazes(gazes, video_lens, alpha=0.6):
+    """Temporal smoothing of the gazes of the concatenated frames of several
+    videos.
+
+    Each frame is blended with the mean of its previous and next frames of
+    the same video, ``alpha * g[i] + (1 - alpha) * (g[i-1] + g[i+1]) / 2``,
+    and normalized. The first and last frames of a video are blended with
+    their only neighbour, videos of a single frame are kept as is.
+
+    Args:
+        gazes (Tensor): Gazes of the frames of all videos, shape [N, D].
+        video_lens (Sequence[int]): Number of frames of each video, sum to N.
+        alpha (float): Weight of the frame itself, 1 to disable smoothing.
+            Defaults to 0.6.
+
+    Returns:
+        Tensor: The smoothed gazes, shape [N, D].
+    """
+    video_lens = torch.as_tensor(video_lens, dtype=torch.long)
+    idx = torch.arange(gazes.size(0))
+    first = torch.repeat_interleave(
+        torch.cumsum(video_lens, 0) - video_lens, video_lens)
+    last = first + torch.repeat_interleave(video_lens, video_lens) - 1
+    # the first and last frames take their only neighbour twice
+    prev_idx = torch.where(idx == first, idx + 1, idx - 1)
+    next_idx = torch.where(idx == last, idx - 1, idx + 1)
+    max_idx = max(gazes.size(0) - 1, 0)
+    prev_idx = prev_idx.clamp(0, max_idx)
+    next_idx = next_idx.clamp(0, max_idx)
+
+    smoothed = alpha * gazes + (1 - alpha) * (gazes[prev_idx] +
+                                              gazes[next_idx]) / 2
+    smoothed = smoothed / torch.norm(smoothed, dim=1, keepdim=True)
+    return torch.where((first == last).unsqueeze(1), gazes, smoothed)
+
+
+class Gaze360Evaluator:
+    """Mean angular errors of gaze results on the Gaze360 test split.
+
+    The errors are averaged over all frames (360), the frames with a ground
+    truth yaw within 90 degrees (front 90) and within 20 degrees (front 20).
+
+    The results of the videos are added with :meth:`update` in any order,
+    e.g. while the inference is still running. :meth:`evaluate` then
+    concatenates the results of the added videos and computes the errors of
+    all their frames at once.
+
+    Args:
+        anno_data (dict): Annotations of the split, the ground truth of the
+            i-th video is ``anno_data['annotations'][i]['gaze']``.
+        cues (Sequence[str]): Keys of the gazes to evaluate in the results.
+            Defaults to :data:`GAZE_CUES`.
+        alpha (float): Weight of a frame in the temporal smoothing of the
+            predictions, 1 to disable it. Defaults to 0.6.
+    """
+
+    def __init__(self, anno_data, cues=GAZE_CUES, alpha=0.6):
+        self.cues = tuple(cues)
+        self.alpha = alpha
+        gazes = [ann['gaze'] for ann in anno_data['annotations']]
+        self.video_lens = [len(gaze) for gaze in gazes]
+        self.video_offsets = [0]
+        for video_len in self.video_lens[:-1]:
+            self.video_offsets.append(self.video_offsets[-1] + video_len)
+        self.gt_gazes = torch.tensor(list(chain.from_iterable(gazes)))
+        gt_yaw = gaze_yaw(self.gt_gazes)
+        self.front_90 = gt_yaw <= 90
+        self.front_20 = gt_yaw <= 20
+        self.results = {}
+
+    def __len__(self):
+        return len(self.results)
+
+    def update(self, video_idx, result):
+        """Add the result of a video.
+
+        Args:
+            video_idx (int): Index of the video in the annotations.
+            result (dict): The gazes of each frame of the video for each cue,
+                lists or tensors of shape [num_frames, D].
+        """
+        for cue in self.cues:
+            assert len(result[cue]) == self.video_lens[video_idx], \
+                f'{cue} of video {video_idx} has {len(result[cue])} ' \
+                f'frames, but {self.video_lens[video_idx]} are annotated'
+        self.results[video_idx] = {
+            cue: torch.as_tensor(result[cue]).detach().cpu().float()
+            for cue in self.cues
+        }
+
+    def evaluate(self):
+        """Compute the mean angular errors of the videos added so far.
+
+        Returns:
+            dict[str, tuple[float]]: The 360, front 90 and front 20 errors of
+                each cue.
+        """
+        assert len(self.results) > 0, 'No result has been added'
+        video_inds = sorted(self.results)
+        video_lens = [self.video_lens[idx] for idx in video_inds]
+        if len(video_inds) == len(self.video_lens):
+            frame_inds = slice(None)
+        else:
+            frame_inds = torch.cat([
+                torch.arange(self.video_offsets[idx],
+                             self.video_offsets[idx] + self.video_lens[idx])
+                for idx in video_inds
+            ])
+        gt_gazes = self.gt_gazes[frame_inds]
+        masks = (torch.ones_like(self.front_90[frame_inds]),
+                 self.front_90[frame_inds], self.front_20[frame_inds])
+
+        maes = {}
+        for cue in self.cues:
+            preds = torch.cat([self.results[idx][cue] for idx in video_inds])
+            preds = smooth_video_gazes(preds, video_lens, self.alpha)
+            errors = angular_errors(preds, gt_gazes).double()
+            maes[cue] = tuple(errors[mask].mean().item() for mask in masks)
+        return maes
+
+
+def print_gaze_summary(maes, logger=None):
+    """Print the mean angular errors of :meth:`Gaze360Evaluator.evaluate`.
+
+    Args:
+        maes (dict[str, tuple[float]]): The 360, front 90 and front 20 errors
+            of each cue.
+        logger (logging.Logger | str | None): The way to print the summary.
+            See `mmcv.utils.print_log()` for details. Default: None.
+    """
+    for cue, (mae_360, mae_front_90, mae_front_20) in maes.items():
+        print_log(
+            f'{cue} mean angular error 360: {mae_360:.2f}\n'
+            f'{cue} mean angular front 90: {mae_front_90:.2f}\n'
+            f'{cue} mean angular front 20: {mae_front_20:.2f}\n',
+            logger=logger)
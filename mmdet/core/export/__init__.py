@@ -4,9 +4,10 @@ from .onnx_helper import (add_dummy_nms_for_onnx, dynamic_clip_for_onnx,
 from .pytorch2onnx import (build_model_from_cfg,
                            generate_inputs_and_wrap_model,
                            preprocess_example_input)
+from .quantization import quantize_dynamic, quantize_static
 
 __all__ = [
     'build_model_from_cfg', 'generate_inputs_and_wrap_model',
     'preprocess_example_input', 'get_k_for_topk', 'add_dummy_nms_for_onnx',
-    'dynamic_clip_for_onnx'
+    'dynamic_clip_for_onnx', 'quantize_dynamic', 'quantize_static'
 ]
@@ -181,3 +181,134 @@ class TensorRTDetector(DeployBaseDetector):
             outputs = [outputs[name] for name in self.model.output_names]
         outputs = [out.detach().cpu().numpy() for out in outputs]
         return outputs
+
+
+class ONNXRuntimeMultiClueGaze(DeployBaseDetector):
+    """Wrapper for MultiClueGaze clip inference with ONNXRuntime.
+
+    The ONNX file is expected to be exported by
+    ``tools/deployment/gaze2onnx.py``, i.e. to take a ``(B, T, C, H, W)``
+    input named ``input`` and the ``(B, T, 2)`` height and width of the
+    frames before padding named ``img_shape``, and to return ``dets`` and
+    the ``gaze``, ``face_gaze``, ``eyes_gaze`` and ``head_gaze`` outputs.
+
+    The wrapper accepts the same inputs as :class:`MultiClueGaze` in test
+    mode and returns results in the same ``(det_bboxes, det_labels),
+    det_gazes`` layout, so it can be used as a drop-in replacement.
+
+    Args:
+        onnx_file (str): Path of the ONNX file.
+        class_names (tuple[str], optional): Class names. Defaults to None.
+        device_id (int): CUDA device id, only used when onnxruntime-gpu is
+            installed. Defaults to 0.
+        num_threads (int, optional): Number of intra-op threads of the CPU
+            execution provider. Defaults to None, i.e. the ORT default.
+    """
+
+    output_names = ('dets', 'gaze', 'face_gaze', 'eyes_gaze', 'head_gaze')
+    gaze_keys = ('gaze_score', 'face_gaze_score', 'eyes_gaze_score',
+                 'head_gaze_score')
+    # the face, eyes and head boxes of a frame, as labelled by
+    # MultiClueGazeROIHead.simple_test
+    region_labels = (0, 1, 2)
+
+    def __init__(self, onnx_file, class_names=None, device_id=0,
+                 num_threads=None):
+        super(ONNXRuntimeMultiClueGaze, self).__init__(class_names, device_id)
+        import onnxruntime as ort
+
+        ort_custom_op_path = ''
+        try:
+            from mmcv.ops import get_onnxruntime_op_path
+            ort_custom_op_path = get_onnxruntime_op_path()
+        except (ImportError, ModuleNotFoundError):
+            warnings.warn('If input model has custom op from mmcv, \
+                you may have to build mmcv with ONNXRuntime from source.')
+        session_options = ort.SessionOptions()
+        session_options.graph_optimization_level = \
+            ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads is not None:
+            session_options.intra_op_num_threads = num_threads
+        if osp.exists(ort_custom_op_path):
+            session_options.register_custom_ops_library(ort_custom_op_path)
+        providers = ['CPUExecutionProvider']
+        options = [{}]
+        if ort.get_device() == 'GPU':
+            providers.insert(0, 'CUDAExecutionProvider')
+            options.insert(0, {'device_id': device_id})
+        self.sess = ort.InferenceSession(
+            onnx_file,
+            session_options,
+            providers=providers,
+            provider_options=options)
+        # the fixed dims are ints, the dynamic ones are names
+        self.input_shape = self.sess.get_inputs()[0].shape
+        # older exports decode the proposals against the padded input
+        self.with_img_shape = 'img_shape' in [
+            node.name for node in self.sess.get_inputs()
+        ]
+
+    def forward_test(self, imgs, img_metas, **kwargs):
+        clip = imgs[0]
+        if clip.dim() == 4:
+            clip = clip[None]
+        for dim, size in zip(self.input_shape, clip.shape):
+            if isinstance(dim, int) and dim != size:
+                raise ValueError(
+                    f'The ONNX model takes inputs of shape '
+                    f'{self.input_shape}, but got a clip of shape '
+                    f'{tuple(clip.shape)}. Export it with dynamic batch and '
+                    f'clip axes, the default of '
+                    f'tools/deployment/gaze2onnx.py.')
+        B, T, _, H, W = clip.shape
+        img_shape = np.array([meta['img_shape'][:2] for meta in img_metas[0]],
+                             dtype=np.float32)
+        img_shape = np.broadcast_to(img_shape, (B * T, 2)).reshape(B, T, 2)
+        feeds = {'input': clip.detach().cpu().numpy().astype(np.float32)}
+        if self.with_img_shape:
+            feeds['img_shape'] = np.ascontiguousarray(img_shape)
+        elif (img_shape != (H, W)).any():
+            raise ValueError(
+                f'The ONNX model decodes the proposals against the padded '
+                f'input shape {(H, W)}, but the frames are smaller. Export '
+                f'it again with tools/deployment/gaze2onnx.py, which takes '
+                f'the img_shape of the frames as an input.')
+        ort_outputs = self.sess.run(list(self.output_names), feeds)
+        return [torch.from_numpy(output) for output in ort_outputs]
+
+    def forward(self,
+                img,
+                img_metas,
+                return_loss=False,
+                rescale=False,
+                format=False,
+                **kwargs):
+        assert not return_loss, 'ONNXRuntime backend only supports testing'
+        dets, *gazes = self.forward_test(img, img_metas)
+        img_metas = img_metas[0]
+        num_regions = dets.size(-2)
+        assert num_regions == len(self.region_labels), \
+            f'Expected {len(self.region_labels)} boxes per frame, ' \
+            f'got {num_regions}'
+        dets = dets.reshape(-1, num_regions, dets.size(-1))
+        det_bboxes, det_labels = [], []
+        for i, img_meta in enumerate(img_metas):
+            dets_per_img = dets[i]
+            if rescale:
+                dets_per_img[:, :4] /= dets_per_img.new_tensor(
+                    img_meta['scale_factor'])
+            det_bboxes.append(dets_per_img)
+            det_labels.append(list(self.region_labels))
+        gaze_results = {
+            key: gaze.reshape(-1, gaze.size(-1))
+            for key, gaze in zip(self.gaze_keys, gazes)
+        }
+        if format:
+            bbox_results = [
+                bbox2result(det_bboxes[i], det_labels[i],
+                            len(self.region_labels))
+                for i in range(len(img_metas))
+            ]
+        else:
+            bbox_results = (det_bboxes, det_labels)
+        return bbox_results, gaze_results
@@ -0,0 +1,64 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import torch
+import torch.nn as nn
+import torch.quantization as tq
+from mmcv.cnn import fuse_conv_bn
+
+
+def quantize_dynamic(model):
+    """Dynamically quantize the ``nn.Linear`` layers of the RoI head (the
+    dynamic convs, attention projections, FFNs and gaze MLPs) to INT8.
+
+    The gaze heads must not be fused by ``fuse_gaze_heads``, their fused
+    forward would keep running on FP32 copies of the weights.
+
+    Args:
+        model (nn.Module): The MultiClueGaze model on CPU in eval mode.
+
+    Returns:
+        nn.Module: The model, with its RoI head replaced.
+    """
+    if any(getattr(m, 'fused', False) for m in model.roi_head.modules()):
+        raise ValueError('Cannot quantize fused gaze heads, fuse_gaze_heads '
+                         'and dynamic quantization are mutually exclusive')
+    model.roi_head = tq.quantize_dynamic(
+        model.roi_head, {nn.Linear}, dtype=torch.qint8)
+    return model
+
+
+def quantize_static(model, calib_clips, engine='fbgemm'):
+    """Statically quantize the convs of the backbone and the neck to INT8.
+
+    The BN layers are folded into the convs first, then every ``nn.Conv2d``
+    is wrapped by a :class:`QuantWrapper` so that the activations are
+    quantized per layer and the rest of the model keeps running in FP32.
+
+    Args:
+        model (nn.Module): The MultiClueGaze model on CPU in eval mode.
+        calib_clips (list[dict]): Collated clips used to observe the
+            activation ranges, the keyword arguments of a test forward.
+        engine (str): Quantized engine, ``fbgemm`` (x86) or ``qnnpack``
+            (ARM).
+
+    Returns:
+        nn.Module: The model, with its backbone and neck converted.
+    """
+    torch.backends.quantized.engine = engine
+    qconfig = tq.get_default_qconfig(engine)
+    for name in ('backbone', 'neck'):
+        module = fuse_conv_bn(getattr(model, name))
+        for m in list(module.modules()):
+            for child_name, child in list(m.named_children()):
+                if type(child) is nn.Conv2d:
+                    child.qconfig = qconfig
+                    setattr(m, child_name, tq.QuantWrapper(child))
+        tq.prepare(module, inplace=True)
+        setattr(model, name, module)
+
+    with torch.no_grad():
+        for datas in calib_clips:
+            model(return_loss=False, rescale=True, **datas)
+
+    for name in ('backbone', 'neck'):
+        tq.convert(getattr(model, name), inplace=True)
+    return model
@@ -0,0 +1,99 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import torch
+
+
+class ClipMerger:
+    """Merge the outputs of the overlapping clips of a video.
+
+    The clips are added in order of their start frame. The frames a clip
+    shares with the clips before it are averaged with the merged outputs,
+    the others are copied, into buffers of the whole video allocated at the
+    first clip. Boxes with a score lower than ``person_threshold`` have their
+    coordinates set to 0, and an averaged box is set to 0 if either side is
+    below the threshold.
+
+    The average is a running one: a frame covered by three clips gets
+    ``((a + b) / 2 + c) / 2``, as the sliding-window test has always done.
+
+    Args:
+        num_frames (int): Number of frames of the video.
+        person_threshold (float): Score threshold of the boxes.
+            Defaults to 0.5.
+
+    Example:
+        >>> merger = ClipMerger(10)
+        >>> for start in (0, 3):
+        ...     merger.add(start, torch.rand(7, 3, 5),
+        ...                fusion_gazes=torch.rand(7, 3))
+        >>> results = merger.results()
+        >>> results['bboxes'].shape, results['fusion_gazes'].shape
+        (torch.Size([10, 3, 5]), torch.Size([10, 3]))
+    """
+
+    def __init__(self, num_frames, person_threshold=0.5):
+        self.num_frames = num_frames
+        self.person_threshold = person_threshold
+        # end of the frames merged so far
+        self.end = 0
+        self.buffers = None
+
+    def add(self, start, det_bboxes=None, **outputs):
+        """Merge the outputs of a clip.
+
+        Args:
+            start (int): Index of the first frame of the clip in the video,
+                the clips must cover the video without gaps.
+            det_bboxes (Tensor, optional): Boxes of the clip, shape
+                (clip_len, num_regions, 5).
+            **outputs (Tensor): Other outputs of the clip to average, e.g.
+                the gazes, of shape (clip_len, ...).
+        """
+        if det_bboxes is not None:
+            outputs['bboxes'] = det_bboxes
+        clip_len = next(iter(outputs.values())).size(0)
+        assert start <= self.end, \
+            f'The clip starting at {start} leaves a gap after {self.end}'
+        assert start + clip_len <= self.num_frames
+        if self.buffers is None:
+            self.buffers = {
+                key: value.new_zeros((self.num_frames, *value.shape[1:]))
+                for key, value in outputs.items()
+            }
+        overlap = max(self.end - start, 0)
+        shared = slice(start, start + overlap)
+        new = slice(start + overlap, start + clip_len)
+
+        for key, value in outputs.items():
+            if key == 'bboxes':
+                continue
+            buffer = self.buffers[key]
+            buffer[new] = value[overlap:]
+            if overlap:
+                buffer[shared] = (buffer[shared] + value[:overlap]) / 2
+
+        if det_bboxes is not None:
+            coords, scores = torch.split(det_bboxes, [4, 1], dim=-1)
+            mask = scores < self.person_threshold
+            coords = coords.masked_fill(mask, 0)
+            buffer = self.buffers['bboxes']
+            buffer[new] = torch.cat([coords, scores], dim=-1)[overlap:]
+            if overlap:
+                prev_coords, prev_scores = torch.split(
+                    buffer[shared], [4, 1], dim=-1)
+                mask = (prev_scores < self.person_threshold) | mask[:overlap]
+                coords = ((prev_coords + coords[:overlap]) / 2).masked_fill(
+                    mask, 0)
+                scores = (prev_scores + scores[:overlap]) / 2
+                buffer[shared] = torch.cat([coords, scores], dim=-1)
+        self.end = max(self.end, start + clip_len)
+
+    def results(self):
+        """The merged outputs of the whole video.
+
+        Returns:
+            dict[str, Tensor]: ``bboxes`` and the other outputs, of shape
+                (num_frames, ...).
+        """
+        assert self.end == self.num_frames, \
+            f'Only {self.end} of {self.num_frames} frames have been merged'
+        return self.buffers
@@ -1,22 +1,37 @@
 # Copyright (c) OpenMMLab. All rights reserved.
+from mmdet.utils import lazy_import
 from .builder import DATASETS, PIPELINES, build_dataloader, build_dataset
-from .cityscapes import CityscapesDataset
-from .coco import CocoDataset
-from .coco_panoptic import CocoPanopticDataset
-from .custom import CustomDataset
-from .dataset_wrappers import (ClassBalancedDataset, ConcatDataset,
-                               MultiImageMixDataset, RepeatDataset)
-from .deepfashion import DeepFashionDataset
-from .lvis import LVISDataset, LVISV1Dataset, LVISV05Dataset
-from .openimages import OpenImagesChallengeDataset, OpenImagesDataset
-from .samplers import DistributedGroupSampler, DistributedSampler, GroupSampler
+# NumClassCheckHook registers into the HOOKS registry of mmcv, which does not
+# import on demand
 from .utils import (NumClassCheckHook, get_loading_pipeline,
                     replace_ImageToTensor)
-from .voc import VOCDataset
-from .wider_face import WIDERFaceDataset
-from .xml_style import XMLDataset
-from .mpeblink import MPEblinkDataset
-from .gaze360 import Gaze360Dataset
+
+# Submodules are imported on first access of a name they export.
+__getattr__, __dir__ = lazy_import(
+    __name__, {
+        'CityscapesDataset': 'cityscapes',
+        'CocoDataset': 'coco',
+        'CocoPanopticDataset': 'coco_panoptic',
+        'CustomDataset': 'custom',
+        'ClassBalancedDataset': 'dataset_wrappers',
+        'ConcatDataset': 'dataset_wrappers',
+        'MultiImageMixDataset': 'dataset_wrappers',
+        'RepeatDataset': 'dataset_wrappers',
+        'DeepFashionDataset': 'deepfashion',
+        'LVISDataset': 'lvis',
+        'LVISV1Dataset': 'lvis',
+        'LVISV05Dataset': 'lvis',
+        'OpenImagesChallengeDataset': 'openimages',
+        'OpenImagesDataset': 'openimages',
+        'DistributedGroupSampler': 'samplers',
+        'DistributedSampler': 'samplers',
+        'GroupSampler': 'samplers',
+        'VOCDataset': 'voc',
+        'WIDERFaceDataset': 'wider_face',
+        'XMLDataset': 'xml_style',
+        'MPEblinkDataset': 'mpeblink',
+        'Gaze360Dataset': 'gaze360'
+    })
 
 __all__ = [
     'CustomDataset', 'XMLDataset', 'CocoDataset', 'DeepFashionDataset',
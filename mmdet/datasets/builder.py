@@ -9,12 +9,14 @@ import numpy as np
 import torch
 from mmcv.parallel import collate
 from mmcv.runner import get_dist_info
-from mmcv.utils import TORCH_VERSION, Registry, build_from_cfg, digit_version
+from mmcv.utils import TORCH_VERSION, build_from_cfg, digit_version
 from torch.utils.data import DataLoader
 
+from mmdet.utils import LazyRegistry
 from .samplers import (DistributedGroupSampler, DistributedSampler,
-                       GroupSampler, InfiniteBatchSampler,
-                       InfiniteGroupBatchSampler)
+                       DistributedVideoSampler, GroupSampler,
+                       InfiniteBatchSampler, InfiniteClipBatchSampler,
+                       InfiniteGroupBatchSampler, InfiniteVideoBatchSampler)
 
 if platform.system() != 'Windows':
     # https://github.com/pytorch/pytorch/issues/973
@@ -25,8 +27,8 @@ if platform.system() != 'Windows':
     soft_limit = min(max(4096, base_soft_limit), hard_limit)
     resource.setrlimit(resource.RLIMIT_NOFILE, (soft_limit, hard_limit))
 
-DATASETS = Registry('dataset')
-PIPELINES = Registry('pipeline')
+DATASETS = LazyRegistry('dataset', packages=('mmdet.datasets', ))
+PIPELINES = LazyRegistry('pipeline', packages=('mmdet.datasets', ))
 
 
 def _concat_dataset(cfg, default_args=None):
@@ -93,6 +95,8 @@ def build_dataloader(dataset,
                      seed=None,
                      runner_type='EpochBasedRunner',
                      persistent_workers=False,
+                     clip_chunk_size=0,
+                     video_sampler=False,
                      **kwargs):
     """Build PyTorch DataLoader.
 
@@ -115,6 +119,16 @@ def build_dataloader(dataset,
             the worker processes after a dataset has been consumed once.
             This allows to maintain the workers `Dataset` instances alive.
             This argument is only valid when PyTorch>=1.7.0. Default: False.
+        clip_chunk_size (int): If positive, shuffle chunks of up to
+            ``clip_chunk_size`` consecutive frames of a video with
+            :obj:`InfiniteClipBatchSampler` instead of single frames, so that
+            overlapping clips are loaded by the same worker. Only used with
+            `IterBasedRunner`. Default: 0.
+        video_sampler (bool): If True and ``shuffle``, shard the videos of a
+            clip dataset across ranks and shuffle chunks of
+            ``clip_chunk_size`` frames (whole videos if 0) with
+            :obj:`InfiniteVideoBatchSampler` or
+            :obj:`DistributedVideoSampler`. Default: False.
         kwargs: any keyword argument to be used to initialize DataLoader
 
     Returns:
@@ -139,7 +153,23 @@ def build_dataloader(dataset,
         # a mini-batch indices each time.
         # it can be used in both `DataParallel` and
         # `DistributedDataParallel`
-        if shuffle:
+        if shuffle and video_sampler:
+            batch_sampler = InfiniteVideoBatchSampler(
+                dataset,
+                batch_size,
+                world_size,
+                rank,
+                seed=seed,
+                chunk_size=clip_chunk_size)
+        elif shuffle and clip_chunk_size > 0:
+            batch_sampler = InfiniteClipBatchSampler(
+                dataset,
+                batch_size,
+                world_size,
+                rank,
+                seed=seed,
+                chunk_size=clip_chunk_size)
+        elif shuffle:
             batch_sampler = InfiniteGroupBatchSampler(
                 dataset, batch_size, world_size, rank, seed=seed)
         else:
@@ -152,6 +182,15 @@ def build_dataloader(dataset,
                 shuffle=False)
         batch_size = 1
         sampler = None
+    elif shuffle and video_sampler:
+        # in non-distributed training all videos go to the single loader
+        sampler = DistributedVideoSampler(
+            dataset,
+            world_size if dist else 1,
+            rank if dist else 0,
+            seed=seed,
+            chunk_size=clip_chunk_size)
+        batch_sampler = None
     else:
         if dist:
             # DistributedGroupSampler will definitely shuffle the data to
@@ -0,0 +1,27 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+from collections import defaultdict
+
+import numpy as np
+
+
+class ClipIndexMixin(object):
+    """Index of the frames of a video dataset by video, used to sample the
+    neighbours of a frame into a clip."""
+
+    def _build_clip_index(self):
+        """Index the frames of ``self.data_infos`` by video.
+
+        ``frame2idx`` maps ``(vid, frame_id)`` to its index in
+        ``self.data_infos`` and ``vid2valid_frames`` holds the sorted frame
+        ids of each video that are kept in ``self.data_infos``, so that
+        sampling the neighbours of a frame in ``prepare_train_clip`` does
+        not scan the whole dataset.
+        """
+        self.frame2idx = {info: i for i, info in enumerate(self.data_infos)}
+        vid2valid_frames = defaultdict(list)
+        for vid, frame_id in self.data_infos:
+            vid2valid_frames[vid].append(frame_id)
+        self.vid2valid_frames = {
+            vid: np.array(sorted(frames), dtype=np.int64)
+            for vid, frames in vid2valid_frames.items()
+        }
@@ -0,0 +1,203 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import os
+import threading
+from collections import OrderedDict
+
+import mmcv
+import numpy as np
+from mmcv.utils import print_log
+
+
+def center_crop_rescale(img, crop_ratio, img_scale):
+    """Center crop a frame and rescale it keeping the aspect ratio.
+
+    The crop is the one of ``CenterCrop`` with ``crop_type='relative'`` and
+    the rescaling the one of ``Resize`` with ``keep_ratio=True``.
+
+    Args:
+        img (np.ndarray): The frame.
+        crop_ratio (float): Relative size of the crop.
+        img_scale (tuple[int]): Scale the crop is rescaled to.
+
+    Returns:
+        tuple[np.ndarray, tuple[int]]: The processed frame and the crop
+            (x1, y1, x2, y2) in the original frame.
+    """
+    h, w = img.shape[:2]
+    crop_h, crop_w = int(h * crop_ratio + 0.5), int(w * crop_ratio + 0.5)
+    y1, x1 = int((h - crop_h) / 2 + 0.5), int((w - crop_w) / 2 + 0.5)
+    img = img[y1:y1 + crop_h, x1:x1 + crop_w]
+    return mmcv.imrescale(img, img_scale), (x1, y1, x1 + crop_w, y1 + crop_h)
+
+
+class FrameCache:
+    """Preprocessed frames stored as raw pixels in a memory-mapped file.
+
+    The pixels of all frames are concatenated in ``<prefix>.bin``, the index
+    in ``<prefix>.npz`` holds the sorted file names and, for each frame, its
+    offset and shape in the buffer, the shape of the original frame and the
+    crop taken from it. Frames are looked up by file name (i.e.
+    ``<vid>/<frame>.png``) without any per frame python object, so the cache
+    is shared by the dataloader workers through the page cache.
+
+    Args:
+        prefix (str): Prefix of the cache files.
+    """
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+        with np.load(prefix + '.npz') as f:
+            self.index = {key: f[key] for key in f.files}
+        self.buffer = np.memmap(prefix + '.bin', dtype=np.uint8, mode='r')
+
+    def __len__(self):
+        return len(self.index['filenames'])
+
+    def __contains__(self, filename):
+        return self._find(filename) is not None
+
+    def _find(self, filename):
+        filenames = self.index['filenames']
+        i = np.searchsorted(filenames, filename)
+        if i < len(filenames) and filenames[i] == filename:
+            return i
+        return None
+
+    def get(self, filename):
+        """Get a frame.
+
+        Args:
+            filename (str): File name of the frame relative to the image
+                prefix of the dataset.
+
+        Returns:
+            tuple: The frame (a read-only view of the cache), the shape of
+                the original frame and the crop (x1, y1, x2, y2) taken from
+                it.
+        """
+        i = self._find(filename)
+        if i is None:
+            raise KeyError(f'{filename} is not in the frame cache '
+                           f'{self.prefix}')
+        offset = self.index['offsets'][i]
+        shape = tuple(self.index['shapes'][i])
+        img = self.buffer[offset:offset + int(np.prod(shape))].reshape(shape)
+        return (img, tuple(self.index['ori_shapes'][i]),
+                tuple(self.index['crop_boxes'][i]))
+
+    @staticmethod
+    def write(prefix, frames, **meta):
+        """Write frames to a cache.
+
+        Args:
+            prefix (str): Prefix of the cache files.
+            frames (Iterable[tuple]): File name, processed frame, shape of
+                the original frame and crop of each frame.
+            **meta: Saved with the index, e.g. the crop ratio and scale.
+        """
+        filenames, offsets, shapes, ori_shapes, crop_boxes = [], [], [], [], []
+        offset = 0
+        with open(prefix + '.bin', 'wb') as f:
+            for filename, img, ori_shape, crop_box in frames:
+                img = np.ascontiguousarray(img, dtype=np.uint8)
+                f.write(img.tobytes())
+                filenames.append(filename)
+                offsets.append(offset)
+                shapes.append(img.shape)
+                ori_shapes.append(ori_shape)
+                crop_boxes.append(crop_box)
+                offset += img.nbytes
+        order = np.argsort(filenames)
+        np.savez(
+            prefix + '.npz',
+            filenames=np.array(filenames)[order],
+            offsets=np.array(offsets, dtype=np.int64)[order],
+            shapes=np.array(shapes, dtype=np.int64).reshape(-1, 3)[order],
+            ori_shapes=np.array(ori_shapes, dtype=np.int64).reshape(-1,
+                                                                    3)[order],
+            crop_boxes=np.array(crop_boxes, dtype=np.int64).reshape(-1,
+                                                                    4)[order],
+            **{k: np.array(v)
+               for k, v in meta.items()})
+
+
+class LRUFrameCache:
+    """A bounded least recently used cache of decoded frames.
+
+    The clips of neighbouring frames overlap, so with clips of ``T`` frames
+    each frame is decoded about ``T`` times per epoch. A dataset keeps one
+    cache per dataloader worker (the cache is empty when the workers are
+    forked) and ``LoadImageFromFile`` looks the frames up in it, see
+    ``Gaze360Dataset``. It only pays off if neighbouring clips are loaded by
+    the same worker, e.g. with ``InfiniteClipBatchSampler``.
+
+    The cache is thread safe, as the frames of a clip may be loaded by a
+    thread pool (``Compose(num_threads=...)``).
+
+    Args:
+        capacity (int): Maximum number of cached frames. Each worker holds up
+            to ``capacity`` decoded frames in memory.
+        log_interval (int): Log the hit rate of the worker every
+            ``log_interval`` lookups, 0 to disable. Defaults to 0.
+        logger (str): Name of the logger. Defaults to 'mmdet'.
+    """
+
+    def __init__(self, capacity, log_interval=0, logger='mmdet'):
+        assert capacity > 0
+        self.capacity = capacity
+        self.log_interval = log_interval
+        self.logger = logger
+        self.frames = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.frames)
+
+    def __contains__(self, key):
+        # unlike get, a membership test neither counts as a lookup nor
+        # refreshes the frame
+        with self._lock:
+            return key in self.frames
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['frames'] = OrderedDict()
+        state['_lock'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.
+
+    def get(self, key):
+        """Get a frame, None if it is not cached."""
+        with self._lock:
+            img = self.frames.get(key)
+            if img is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.frames.move_to_end(key)
+            lookups = self.hits + self.misses
+        if self.log_interval > 0 and lookups % self.log_interval == 0:
+            print_log(
+                f'frame cache of process {os.getpid()}: '
+                f'hit rate {self.hit_rate:.3f} ({self.hits} hits, '
+                f'{self.misses} misses, {len(self)} frames)',
+                logger=self.logger)
+        return img
+
+    def put(self, key, img):
+        """Cache a frame, evicting the least recently used one if full."""
+        with self._lock:
+            self.frames[key] = img
+            self.frames.move_to_end(key)
+            while len(self.frames) > self.capacity:
+                self.frames.popitem(last=False)
@@ -6,17 +6,23 @@ import mmcv
 import numpy as np
 import torch
 from mmcv.parallel import DataContainer as DC
+
+from mmdet.models.losses.gaze_arccos_loss import (vector_to_yaw_pitch,
+                                                  yaw_pitch_to_vector)
 # from pycocotools.ytvos import YTVOS
 # from .mpeblink_api import YTVOS
-from .mpeblink_api import MPEblink
+from .mpeblink_api import MPEblink, PackedMPEblink, StreamMPEblink
 
 from .builder import DATASETS
+from .clip_mixins import ClipIndexMixin
 from .custom import CustomDataset
+from .frame_cache import LRUFrameCache
 from .pipelines import Compose
+from .video_ann_store import VideoAnnStore
 
 
 @DATASETS.register_module()
-class Gaze360Dataset(CustomDataset):
+class Gaze360Dataset(ClipIndexMixin, CustomDataset):
 
     CLASSES = ('person_face')
 
@@ -31,7 +37,12 @@ class Gaze360Dataset(CustomDataset):
                  seg_prefix=None,
                  proposal_file=None,
                  test_mode=False,
-                 filter_empty_gt=True):
+                 filter_empty_gt=True,
+                 ann_cache=True,
+                 ann_backend='json',
+                 clip_num_threads=0,
+                 frame_cache_size=0,
+                 frame_cache_log_interval=0):
         self.ann_file = ann_file
         self.clip_length = clip_length
         self.gaze_dim = gaze_dim
@@ -41,6 +52,10 @@ class Gaze360Dataset(CustomDataset):
         self.proposal_file = proposal_file
         self.test_mode = test_mode
         self.filter_empty_gt = filter_empty_gt
+        self.ann_cache = ann_cache
+        assert ann_backend in ('json', 'packed', 'stream')
+        self.ann_backend = ann_backend
+        self._ann_store = None
         self.CLASSES = self.get_classes(classes)  # tuple类型，就是上面的CLASSSES写的那些字符串类别
 
         # join paths if data_root is specified
@@ -74,6 +89,7 @@ class Gaze360Dataset(CustomDataset):
             if self.proposals is not None:
                 self.proposals = [self.proposals[i] for i in valid_inds]
 
+        self._build_clip_index()
 
         # set group flag for the sampler
         if not self.test_mode:
@@ -81,10 +97,20 @@ class Gaze360Dataset(CustomDataset):
         # print(f'sample_num = {len(self.sampled_data_infos)}')
         print(f'origin__num = {len(self.data_infos)}')
         # processing pipeline
-        self.pipeline = Compose(pipeline)
+        # frames of a clip are loaded and transformed by a thread pool
+        self.pipeline = Compose(pipeline, num_threads=clip_num_threads)
+        # decoded frames shared by the overlapping clips of a worker
+        self.frame_cache = LRUFrameCache(
+            frame_cache_size, log_interval=frame_cache_log_interval
+        ) if frame_cache_size > 0 else None
 
     def load_annotations(self, ann_file):
-        self.mpeblink = MPEblink(ann_file)   # coco api来读其gt标注文件的
+        # the packed api shares its memory-mapped index with the workers,
+        # the stream api reads a json lines file lazily in the same way
+        api = dict(
+            json=MPEblink, packed=PackedMPEblink,
+            stream=StreamMPEblink)[self.ann_backend]
+        self.mpeblink = api(ann_file)   # coco api来读其gt标注文件的
         self.cat_ids = self.mpeblink.getCatIds() # 就是类别1-40的数字组成的list
         self.cat2label = {cat_id: i for i, cat_id in enumerate(self.cat_ids)} # 变成一个字典{1:0,2:1,3:2 ..... 40:39}代表类别和标签的映射关系，实际上就是1-40变为0-39
         vid_ids = self.mpeblink.getVidIds() # 一个列表1-2238，是video的数量
@@ -106,6 +132,25 @@ class Gaze360Dataset(CustomDataset):
         self.vid2frame = vid2frame
         return img_ids
 
+    @property
+    def ann_store(self):
+        """:obj:`VideoAnnStore`: The annotations of all videos as arrays,
+        indexed like ``self.vid_infos``.
+
+        Built on first use and cached next to the annotation file unless
+        ``ann_cache`` is False.
+        """
+        if self._ann_store is None:
+            options = dict(gaze_dim=self.gaze_dim, clip_border=True)
+            vid_ids = [vid_info['id'] for vid_info in self.vid_infos]
+            self._ann_store = VideoAnnStore.load_or_build(
+                self.ann_file,
+                lambda: VideoAnnStore.from_api(self.mpeblink, vid_ids,
+                                               self.cat2label, **options),
+                cache_file=None if self.ann_cache else False,
+                **options)
+        return self._ann_store
+
     def _set_group_flag(self):
         """Set flag according to image aspect ratio.
 
@@ -124,32 +169,15 @@ class Gaze360Dataset(CustomDataset):
         ids_with_ann = []
 
         if self.filter_empty_gt:
-            for i, (vid, frame_id) in enumerate(self.data_infos):
-                vid_id = self.vid_infos[vid]['id']
-                ann_ids = self.mpeblink.getAnnIds(vidIds=[vid_id]) # 返回Video id=1的annotation的id,这个video里有几个instance就会返回几个id
-                ann_info = self.mpeblink.loadAnns(ann_ids) #根据返回的id取出它们的annotation信息
-                #############
-                # sign = 0
-                # for ann in ann_info:
-                #     if frame_id>=len(ann['bboxes']):
-                #         print(1)
-                #         print(f'vid_id={vid_id}')
-                #         sign = 1
-                # if sign == 1:
-                #     continue
-                ############
-                print(vid_id)
-                if vid_id == 5:
-                    print(1)
-
-                anns = [
-                    ann['bboxes'][frame_id] for ann in ann_info
-                    if ann['bboxes'][frame_id] is not None
-                ]
-                if anns:
-                    ids_with_ann.append(1)    # 最终，ids_with_ann有完整帧数个元素(61845)如果某一帧没有instance,则该元素值为0，如果这一帧有的instance有，有的instance的bbox是none,则元素值也是1，最终，sum()=61341
-                else:
-                    ids_with_ann.append(0)
+            # whether a frame has at least one annotated instance
+            vid2has_ann = [
+                self.ann_store.video(vid)['valid'].any(axis=1)
+                for vid in range(len(self.vid_infos))
+            ]
+            ids_with_ann = [
+                vid2has_ann[vid][frame_id]
+                for vid, frame_id in self.data_infos
+            ]
         for i, (vid, frame_id) in enumerate(self.data_infos): # 下面这个循环是进一步看有没有图像分辨率小于32的，实际没有
             if self.filter_empty_gt and not ids_with_ann[i]:
                 continue
@@ -171,132 +199,19 @@ class Gaze360Dataset(CustomDataset):
 # TODO:czg 这里加上对应的eye_bboxes和face_bboxes
     def get_ann_info(self, idx):
         vid, frame_id = self.data_infos[idx]
-        vid_id = self.vid_infos[vid]['id'] # 其实就是vid+1吧
-        ann_ids = self.mpeblink.getAnnIds(vidIds=[vid_id])
-        ann_info = self.mpeblink.loadAnns(ann_ids)# 这里的ann_info把对应id的帧标签提取出来，包括h,w,len,gaze,bboxes等所有
-        return self._parse_ann_info(ann_info, frame_id)
+        return self.ann_store.ann_info(vid, frame_id)
 
     def get_cat_ids(self, idx):
         vid, frame_id = self.data_infos[idx]
-        vid_id = self.vid_infos[vid]['id']
-        ann_ids = self.mpeblink.getAnnIds(vidIds=[vid_id])
-        ann_info = self.mpeblink.loadAnns(ann_ids)
-        return [ann['category_id'] for ann in ann_info]
+        return self.ann_store.video(vid)['cat_ids'].tolist()
 
     ################# 参照gaze360的模板  #################
     def yaw_pitch_to_vector(self, x):
-        x = np.reshape(x, (-1, 2))
-        output = np.zeros((x.shape[0], 3))
-        output[:,2] = - np.cos(x[:,1]) * np.cos(x[:,0])
-        output[:,0] = np.cos(x[:,1]) * np.sin(x[:,0])
-        output[:,1] = np.sin(x[:,1])
-        return output
+        return yaw_pitch_to_vector(torch.as_tensor(x)).numpy()
 
     #  output的第一维是yaw，第二维是pitch
     def vector_to_yaw_pitch(self, x):
-        # spherical_vector[0] = math.atan2(normalized_gaze[0],-normalized_gaze[2])
-        # spherical_vector[1] = math.asin(normalized_gaze[1])
-        x = np.reshape(x, (-1, 3))
-        x = x / np.linalg.norm(x, axis=1).reshape(-1, 1)
-        output = np.zeros((x.shape[0], 2))
-        output[:,0] = np.arctan2(x[:,0], - x[:,2])
-        output[:,1] = np.arcsin(x[:,1])
-        return output
-
-    def _parse_ann_info(self, ann_info, frame_id):
-        """Parse bbox and mask annotation.
-
-        Args:
-            ann_info (list[dict]): Annotation info of an image.
-            with_mask (bool): Whether to parse mask annotations.
-
-        Returns:
-            dict: A dict containing the following keys: bboxes, bboxes_ignore,
-                labels, masks, seg_map. "masks" are raw annotations and not
-                decoded into binary masks.
-        """
-        gt_bboxes = []
-        gt_labels = []
-        gt_ids = []
-        gt_bboxes_ignore = []
-        gt_masks = []
-        gt_blinks = []
-        gt_gazes = []
-
-        for i, ann in enumerate(ann_info):  # 遍历每一个instance
-            bbox = ann['bboxes'][frame_id]  # 提取这个instance的[frame_id]那一帧的bbox
-            # area = ann['areas'][frame_id]
-            if bbox is None: # 这里要注意，如果这一帧的某个instance gt是none,那么这个instance(这一帧)不会写在gt中
-                continue
-            x1, y1, w, h = bbox
-            # if area <= 0 or w < 1 or h < 1:
-            #     continue
-            if (x1 is None) or (y1 is None) or (w is None) or (h is None):
-                print(1)
-            if x1 < 0:
-                x1 = 0.0
-            if y1 < 0:
-                y1 = 0.0 
-            bbox = [x1, y1, x1 + w, y1 + h]
-
-            if ann.get('iscrowd', False):
-                gt_bboxes_ignore.append(bbox)
-            else:
-                gt_bboxes.append(bbox)
-                gt_ids.append(ann['id'] -
-                              1)  # youtube instance id start from 1. 把从1开始变为从0开始算id
-                gt_labels.append(self.cat2label[ann['category_id']]) # 这个好像也是类别从1开始变为从0开始，也就是json中的类别减1
-                # gt_masks.append(self.youtube.annToMask(ann, frame_id)) # 应该是转化为一个0-1的mask 对于眨眼，先把mask去掉
-                
-                # if frame_id >=len(ann['blinks_binary']):
-                #     print('weiduyouwenti!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!')
-                # gt_blinks.append(ann['blinks_binary'][frame_id])
-                # 将gaze转换成特定要的维度（2或3维） 此处的gaze原本为list, 下面的else情况为不需要转换的
-                gaze = np.array(ann['gaze'][frame_id], dtype=np.float32)
-                if gaze.shape[-1] != self.gaze_dim:
-                    if self.gaze_dim == 2:
-                        gaze = self.vector_to_yaw_pitch(gaze)
-                    else:
-                        gaze = self.yaw_pitch_to_vector(gaze)
-                    gt_gazes.append(gaze.reshape(gaze.shape[1]))
-                else:
-                    gt_gazes.append(ann['gaze'][frame_id])
-
-                # if ann['blink'][frame_id] == 1:
-                #     print('blink=1 in dataloader')
-                # else:
-                #     print('blink = 0 in dataloader')
-        if gt_bboxes:
-            gt_bboxes = np.array(gt_bboxes, dtype=np.float32) # 就是从list转为numpy array
-            gt_labels = np.array(gt_labels, dtype=np.int64)
-            # gt_blinks = np.array(gt_blinks, dtype=np.int64)
-            gt_gazes = np.array(gt_gazes, dtype=np.float32)
-            #gt_gazes = gt_gazes.astype(np.float32)
-        else:   # 这个循环我估计没进过吧，因为前面滤过一次valid_ins了
-            gt_bboxes = np.zeros((0, 4), dtype=np.float32)
-            gt_labels = np.array([], dtype=np.int64)
-
-
-        if gt_bboxes_ignore:
-            gt_bboxes_ignore = np.array(gt_bboxes_ignore, dtype=np.float32)
-        else:
-            gt_bboxes_ignore = np.zeros((0, 4), dtype=np.float32)
-
-        # ann = dict(
-        #     bboxes=gt_bboxes,
-        #     labels=gt_labels,
-        #     bboxes_ignore=gt_bboxes_ignore,
-        #     masks=gt_masks,
-        #     ids=gt_ids)
-        ann = dict(
-            bboxes=gt_bboxes,
-            labels=gt_labels,
-            blinks=gt_blinks,
-            gazes=gt_gazes,
-            bboxes_ignore=gt_bboxes_ignore,
-            ids=gt_ids)
-# 此处的数据类型还都不是tensor
-        return ann
+        return vector_to_yaw_pitch(torch.as_tensor(x)).numpy()
 
     def pre_pipeline(self, results):
         results['img_prefix'] = self.img_prefix
@@ -306,7 +221,9 @@ class Gaze360Dataset(CustomDataset):
         results['mask_fields'] = []
         results['seg_fields'] = []
         results['gaze_fields'] = []
-# prepare_train_clip -> prepare_train_img -> get_ann_info -> _parse_ann_info
+        if self.frame_cache is not None:
+            results['frame_cache'] = self.frame_cache
+# prepare_train_clip -> prepare_train_img -> get_ann_info
     def __getitem__(self, idx):
         if self.test_mode:
             raise NotImplementedError
@@ -320,24 +237,20 @@ class Gaze360Dataset(CustomDataset):
     def prepare_train_clip(self, idx):
         vid, frame_id = self.data_infos[idx]
         vid_info = self.vid_infos[vid]
-        sample_range = range(len(vid_info['filenames']))
-        valid_idxs = []
-        for i in sample_range:
-            valid_idx = (vid, i)
-            if valid_idx in self.data_infos:
-                valid_idxs.append(valid_idx)
-        assert len(valid_idxs) > 0
+        valid_frames = self.vid2valid_frames[vid]
+        assert len(valid_frames) > 0
+        first_frame, last_frame = int(valid_frames[0]), int(valid_frames[-1])
         # valid_idxs.sort()
         # 上面几行是根据valid_idx来确定当前视频内有哪些帧可以被采样选取
         frame_interval = 1  # 现在是2帧一采样
-        index_pre = [(vid, frame_id - frame_interval*i) for i in range(1, self.clip_length//2 + 1) if (frame_id - frame_interval*i) >= valid_idxs[0][1] and (vid,frame_id - frame_interval*i) in valid_idxs ]
-        pre_res = [(vid, valid_idxs[0][1]) for i in range(0, self.clip_length//2 - len(index_pre))] # 补第一帧可用帧补剩下的
+        index_pre = [(vid, frame_id - frame_interval*i) for i in range(1, self.clip_length//2 + 1) if (frame_id - frame_interval*i) >= first_frame and (vid,frame_id - frame_interval*i) in self.frame2idx]
+        pre_res = [(vid, first_frame) for i in range(0, self.clip_length//2 - len(index_pre))] # 补第一帧可用帧补剩下的
         index_pre = index_pre + pre_res
-        index_post = [(vid, frame_id + frame_interval*i) for i in range(1, self.clip_length//2 +1) if (frame_id + frame_interval*i) <= valid_idxs[-1][1] and (vid,frame_id + frame_interval*i) in valid_idxs ]
-        post_res = [(vid, valid_idxs[-1][1]) for i in range(0, self.clip_length//2 - len(index_post))] # 用最后一可用帧补
+        index_post = [(vid, frame_id + frame_interval*i) for i in range(1, self.clip_length//2 +1) if (frame_id + frame_interval*i) <= last_frame and (vid,frame_id + frame_interval*i) in self.frame2idx]
+        post_res = [(vid, last_frame) for i in range(0, self.clip_length//2 - len(index_post))] # 用最后一可用帧补
         index_post += post_res
         index_except_center = index_pre + index_post
-        valid_idxs = [idx] + [self.data_infos.index(_) for _ in index_except_center]
+        valid_idxs = [idx] + [self.frame2idx[_] for _ in index_except_center]
         valid_idxs.sort()
         # try:
         #     valid_idxs = [idx] + [
@@ -349,22 +262,11 @@ class Gaze360Dataset(CustomDataset):
         #     print(e, vid_info)
         #     return None
 
-        clip = []
-
-        for _ in valid_idxs:
-            clip.append(self.prepare_train_img(_))
-
-            # if sum(clip[-1]['gt_blinks'].data) > 0 :
-            #     print(f'there is 1 after self.prepare_train_img')
-
-            if _ == valid_idxs[0]:
-                for tsfm in self.pipeline.transforms:
-                    if hasattr(tsfm, 'isfix'):
-                        tsfm.isfix = True
-            elif _ == valid_idxs[-1]:
-                for tsfm in self.pipeline.transforms:
-                    if hasattr(tsfm, 'isfix'):
-                        tsfm.isfix = False
+        # the frames share the random parameters of the augmentations
+        clip = self.pipeline.clip_call(
+            [self._prepare_train_results(_) for _ in valid_idxs])
+        if clip is None:
+            return None
 
         data = {}
         for key in clip[0]:
@@ -382,14 +284,18 @@ class Gaze360Dataset(CustomDataset):
     def prepare_test_clip(self, idx):
         raise NotImplementedError
 
-    def prepare_train_img(self, idx):
+    def _prepare_train_results(self, idx):
+        """Result dict of a training frame before the pipeline."""
         img_info = self.get_img_info(idx)   # 获取一些信息，比较重要的是图像的路径，其实该函数内部可以通过vid获取整个视频的信息list，只不过这里取出了frame_id那一帧的信息
         ann_info = self.get_ann_info(idx)
         results = dict(img_info=img_info, ann_info=ann_info)
         if self.proposals is not None:
             results['proposals'] = self.proposals[idx]
         self.pre_pipeline(results)
-        return self.pipeline(results)
+        return results
+
+    def prepare_train_img(self, idx):
+        return self.pipeline(self._prepare_train_results(idx))
 
     def __len__(self):
         return len(self.data_infos)
@@ -38,6 +38,128 @@ def _isArrayLike(obj):
     return hasattr(obj, '__iter__') and hasattr(obj, '__len__')
 
 
+# keys of the records of a json lines annotation file and of their lists in
+# the json one
+_JSONL_LISTS = dict(
+    video='videos', annotation='annotations', category='categories')
+
+
+def load_ann_file(annotation_file):
+    """Load a json or json lines (``.jsonl``, see :class:`JsonlAnnWriter`)
+    annotation file as the dict of the json format."""
+    if not annotation_file.endswith('.jsonl'):
+        return json.load(open(annotation_file, 'r'))
+    dataset = {key: [] for key in _JSONL_LISTS.values()}
+    with open(annotation_file, 'r') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            (key, record), = json.loads(line).items()
+            if key in _JSONL_LISTS:
+                dataset[_JSONL_LISTS[key]].append(record)
+            else:
+                dataset[key] = record
+    return dataset
+
+
+class JsonlAnnWriter:
+    """Write an annotation file in the json lines format, one record per
+    line, e.g. ``{"video": {...}}`` or ``{"annotation": {...}}``.
+
+    The converters write each video and its annotations as soon as they are
+    done, instead of keeping the whole dataset in memory for a single
+    ``json.dump``. The file is read lazily by :class:`StreamMPEblink`, or
+    as a whole by :func:`load_ann_file` and :class:`MPEblink`.
+
+    The lines are written to a temporary file, renamed to ``ann_file`` when
+    the writer is closed without error and removed otherwise. If
+    ``ann_file`` is a ``.json`` file, it is written in the json format from
+    the lines when the writer is closed, one list at a time, so the records
+    are still never all in memory.
+
+    Args:
+        ann_file (str): Location of the annotation file, ``.jsonl`` or
+            ``.json``.
+        info (dict, optional): The "info" of the dataset.
+        licenses (dict, optional): The "licenses" of the dataset.
+        categories (list[dict]): The categories of the dataset.
+
+    Example:
+        >>> with JsonlAnnWriter('train.jsonl', categories=categories) as f:
+        ...     for video, anns in videos:
+        ...         f.add_video(video, anns)
+    """
+
+    def __init__(self, ann_file, info=None, licenses=None, categories=()):
+        self.ann_file = ann_file
+        self._tmp_file = f'{ann_file}.{os.getpid()}.tmp'
+        self._f = open(self._tmp_file, 'w')
+        for key, record in (('info', info), ('licenses', licenses)):
+            if record is not None:
+                self._write(key, record)
+        for category in categories:
+            self._write('category', category)
+
+    def _write(self, key, record):
+        self._f.write(json.dumps({key: record}) + '\n')
+
+    def add_video(self, video, anns=()):
+        """Write a video and its annotations."""
+        self._write('video', video)
+        for ann in anns:
+            self._write('annotation', ann)
+
+    def close(self):
+        self._f.close()
+        if self.ann_file.endswith('.jsonl'):
+            os.replace(self._tmp_file, self.ann_file)
+            return
+        json_tmp_file = f'{self.ann_file}.{os.getpid()}.json.tmp'
+        try:
+            self._dump_json(json_tmp_file)
+            os.replace(json_tmp_file, self.ann_file)
+        finally:
+            for tmp_file in (self._tmp_file, json_tmp_file):
+                if os.path.exists(tmp_file):
+                    os.remove(tmp_file)
+
+    def _records(self):
+        with open(self._tmp_file, 'r') as f:
+            for line in f:
+                (key, record), = json.loads(line).items()
+                yield key, record
+
+    def _dump_json(self, json_file):
+        """Write the lines as the dict of the json format, reading them
+        once for the single records and once for each list."""
+        fields = [
+            f'{json.dumps(key)}: {json.dumps(record)}'
+            for key, record in self._records() if key not in _JSONL_LISTS
+        ]
+        with open(json_file, 'w') as f:
+            f.write('{' + ', '.join(fields))
+            for i, (key, name) in enumerate(_JSONL_LISTS.items()):
+                sep = ', ' if fields or i > 0 else ''
+                f.write(f'{sep}{json.dumps(name)}: [')
+                first = True
+                for record_key, record in self._records():
+                    if record_key == key:
+                        f.write(('' if first else ', ') + json.dumps(record))
+                        first = False
+                f.write(']')
+            f.write('}')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self._f.close()
+            os.remove(self._tmp_file)
+
+
 class MPEblink:
     def __init__(self, annotation_file=None):
         """
@@ -52,7 +174,7 @@ class MPEblink:
         if not annotation_file == None:
             print('loading annotations into memory...')
             tic = time.time()
-            dataset = json.load(open(annotation_file, 'r'))
+            dataset = load_ann_file(annotation_file)
             assert type(dataset)==dict, 'annotation file format {} not supported'.format(type(dataset))
             print('Done (t={:0.2f}s)'.format(time.time()- tic))
             self.dataset = dataset
@@ -252,3 +374,314 @@ class MPEblink:
         return res
 
 
+
+
+class PackedMPEblink(MPEblink):
+    """MPEblink api backed by flat, memory-mapped arrays.
+
+    :class:`MPEblink` keeps the whole json and several dict-of-lists indexes
+    as python objects. Each dataloader worker ends up with its own copy of
+    them, as the refcount updates of the workers write to the pages shared
+    copy-on-write with the main process.
+
+    This backend packs the json encoded videos and annotations into one
+    ``uint8`` buffer, stored in a ``.npy`` file next to the annotation file
+    and memory-mapped read-only, so all processes share the same page
+    cache. The indexes are a few numpy arrays. ``getAnnIds``, ``getVidIds``,
+    ``loadAnns`` and ``loadVids`` have the same interface as
+    :class:`MPEblink`, the loaded dicts are decoded on each call, so
+    modifying them does not change the api.
+
+    Args:
+        annotation_file (str): Location of the annotation file.
+        cache_prefix (str, optional): Prefix of the packed files
+            ``<cache_prefix>.npy`` and ``<cache_prefix>.npz``. Defaults to
+            the annotation file without extension plus ``.packed``.
+    """
+
+    VERSION = 1
+
+    def __init__(self, annotation_file, cache_prefix=None):
+        if cache_prefix is None:
+            cache_prefix = os.path.splitext(annotation_file)[0] + '.packed'
+        meta = self._file_meta(annotation_file)
+        blob_file, index_file = cache_prefix + '.npy', cache_prefix + '.npz'
+
+        index = None
+        if os.path.exists(blob_file) and os.path.exists(index_file):
+            with np.load(index_file) as f:
+                if str(f['meta']) == meta:
+                    index = {k: f[k] for k in f.files}
+        if index is None:
+            print('packing annotations...')
+            tic = time.time()
+            blob, index = self._pack(load_ann_file(annotation_file))
+            index['meta'] = np.array(meta)
+            tmp_prefix = f'{cache_prefix}.{os.getpid()}.tmp'
+            np.save(tmp_prefix + '.npy', blob)
+            np.savez(tmp_prefix + '.npz', **index)
+            os.replace(tmp_prefix + '.npy', blob_file)
+            os.replace(tmp_prefix + '.npz', index_file)
+            print('Done (t={:0.2f}s)'.format(time.time() - tic))
+
+        self.blob = np.load(blob_file, mmap_mode='r')
+        self._init_index(index)
+
+    def _file_meta(self, annotation_file):
+        """Identifies the version of an annotation file the packed files
+        were built from."""
+        stat = os.stat(annotation_file)
+        return json.dumps(
+            dict(
+                version=self.VERSION,
+                size=stat.st_size,
+                mtime_ns=stat.st_mtime_ns))
+
+    def _init_index(self, index):
+        self.index = index
+        self.cats = {cat['id']: cat for cat in self._decode_all('cat')}
+        self.dataset = dict(categories=list(self.cats.values()))
+        self._sorted_ids = {
+            kind: self._sort_ids(kind)
+            for kind in ('ann', 'vid')
+        }
+        # anns are stored grouped by video, a video's anns are a range
+        self._vid2ann_range = {
+            vid_id: (start, stop)
+            for vid_id, start, stop in zip(index['ann_range_vid_ids'].tolist(),
+                                           index['ann_range_starts'].tolist(),
+                                           index['ann_range_stops'].tolist())
+        }
+
+    @staticmethod
+    def _pack(dataset):
+        """Pack the records of a dataset into a buffer and build the
+        indexes."""
+        anns = dataset.get('annotations', [])
+        vids = dataset.get('videos', [])
+        cats = dataset.get('categories', [])
+        order, index = PackedMPEblink._ann_index(anns)
+        anns = [anns[i] for i in order]
+
+        chunks, offset = [], 0
+        for kind, records in (('ann', anns), ('vid', vids), ('cat', cats)):
+            offsets = [offset]
+            for record in records:
+                chunk = json.dumps(record).encode()
+                chunks.append(chunk)
+                offset += len(chunk)
+                offsets.append(offset)
+            index[f'{kind}_offsets'] = np.array(offsets, dtype=np.int64)
+        blob = np.frombuffer(b''.join(chunks), dtype=np.uint8)
+        index['vid_ids'] = np.array([vid['id'] for vid in vids],
+                                    dtype=np.int64)
+        return blob, index
+
+    @staticmethod
+    def _ann_index(anns):
+        """Group anns by video, keeping their order within each video, and
+        build their indexes.
+
+        Args:
+            anns (list[dict]): The anns, only their "id", "video_id",
+                "category_id", "avg_area" and "iscrowd" are used.
+
+        Returns:
+            tuple[np.ndarray, dict]: The order of the anns grouped by video
+                and the indexes of the grouped anns.
+        """
+        ann_vid_ids = np.array([ann['video_id'] for ann in anns],
+                               dtype=np.int64)
+        order = np.argsort(ann_vid_ids, kind='stable')
+        anns = [anns[i] for i in order]
+        ann_vid_ids = ann_vid_ids[order]
+        index = dict(ann_file_pos=np.argsort(order).astype(np.int64))
+
+        index['ann_ids'] = np.array([ann['id'] for ann in anns],
+                                    dtype=np.int64)
+        index['ann_vid_ids'] = ann_vid_ids
+        index['ann_cat_ids'] = np.array([ann['category_id'] for ann in anns],
+                                        dtype=np.int64)
+        index['ann_avg_areas'] = np.array(
+            [ann.get('avg_area', np.nan) for ann in anns], dtype=np.float64)
+        # -1 for anns without iscrowd
+        index['ann_iscrowd'] = np.array(
+            [int(ann.get('iscrowd', -1)) for ann in anns], dtype=np.int64)
+        range_vid_ids, starts = np.unique(ann_vid_ids, return_index=True)
+        index['ann_range_vid_ids'] = range_vid_ids
+        index['ann_range_starts'] = starts.astype(np.int64)
+        index['ann_range_stops'] = np.append(starts[1:],
+                                             len(anns)).astype(np.int64)
+        return order, index
+
+    def _decode(self, kind, i):
+        offsets = self.index[f'{kind}_offsets']
+        return json.loads(self.blob[offsets[i]:offsets[i + 1]].tobytes())
+
+    def _decode_all(self, kind):
+        num = len(self.index[f'{kind}_offsets']) - 1
+        return [self._decode(kind, i) for i in range(num)]
+
+    def _sort_ids(self, kind):
+        """Sort the ids of the records for the lookups of
+        :meth:`_positions`."""
+        ids = self.index[f'{kind}_ids']
+        order = np.argsort(ids, kind='stable')
+        # a duplicated id resolves to its last record, as in a dict
+        order = order[::-1][np.unique(ids[order][::-1], return_index=True)[1]]
+        return ids[order], order
+
+    def _positions(self, ids, kind):
+        """Positions of the records with ids ``ids``."""
+        sorted_ids, order = self._sorted_ids[kind]
+        ids = np.asarray(ids, dtype=np.int64).reshape(-1)
+        pos = np.searchsorted(sorted_ids, ids)
+        found = pos < len(sorted_ids)
+        found[found] = sorted_ids[pos[found]] == ids[found]
+        if not found.all():
+            raise KeyError(ids[~found][0].item())
+        return order[pos]
+
+    def getAnnIds(self, vidIds=[], catIds=[], areaRng=[], iscrowd=None):
+        vidIds = vidIds if _isArrayLike(vidIds) else [vidIds]
+        catIds = catIds if _isArrayLike(catIds) else [catIds]
+
+        if len(vidIds) == 0:
+            pos = self.index['ann_file_pos']
+        else:
+            pos = np.concatenate([
+                np.arange(*self._vid2ann_range[vid_id])
+                for vid_id in vidIds if vid_id in self._vid2ann_range
+            ] + [np.zeros(0, dtype=np.int64)])
+        if len(catIds) != 0:
+            pos = pos[np.isin(self.index['ann_cat_ids'][pos], catIds)]
+        if len(areaRng) != 0:
+            areas = self.index['ann_avg_areas'][pos]
+            pos = pos[(areas > areaRng[0]) & (areas < areaRng[1])]
+        if iscrowd is not None:
+            pos = pos[self.index['ann_iscrowd'][pos] == int(iscrowd)]
+        return self.index['ann_ids'][pos].tolist()
+
+    def getVidIds(self, vidIds=[], catIds=[]):
+        vidIds = vidIds if _isArrayLike(vidIds) else [vidIds]
+        catIds = catIds if _isArrayLike(catIds) else [catIds]
+
+        if len(vidIds) == len(catIds) == 0:
+            return list(dict.fromkeys(self.index['vid_ids'].tolist()))
+        ids = set(vidIds)
+        for i, catId in enumerate(catIds):
+            cat_vid_ids = set(self.index['ann_vid_ids'][
+                self.index['ann_cat_ids'] == catId].tolist())
+            if i == 0 and len(ids) == 0:
+                ids = cat_vid_ids
+            else:
+                ids &= cat_vid_ids
+        return list(ids)
+
+    def loadAnns(self, ids=[]):
+        if _isArrayLike(ids) or type(ids) == int:
+            return [
+                self._decode('ann', i) for i in self._positions(ids, 'ann')
+            ]
+
+    def loadVids(self, ids=[]):
+        if _isArrayLike(ids) or type(ids) == int:
+            return [
+                self._decode('vid', i) for i in self._positions(ids, 'vid')
+            ]
+
+    def loadRes(self, resFile):
+        api = MPEblink()
+        api.dataset['videos'] = self._decode_all('vid')
+        api.dataset['categories'] = self.dataset['categories']
+        api.createIndex()
+        return api.loadRes(resFile)
+
+
+class StreamMPEblink(PackedMPEblink):
+    """MPEblink api reading a json lines annotation file lazily.
+
+    The annotation file (see :class:`JsonlAnnWriter`) is memory-mapped and
+    its records are decoded when they are loaded, like the packed buffer of
+    :class:`PackedMPEblink`. The index of the records, their byte ranges
+    in the file and the fields the queries filter on, is built in a single
+    pass over the lines, which decodes one record at a time, and cached in
+    an ``.npz`` file next to the annotation file.
+
+    Args:
+        annotation_file (str): Location of the annotation file, ``.jsonl``.
+        cache_prefix (str, optional): Prefix of the index file
+            ``<cache_prefix>.npz``. Defaults to the annotation file without
+            extension plus ``.index``.
+    """
+
+    VERSION = 1
+
+    def __init__(self, annotation_file, cache_prefix=None):
+        if cache_prefix is None:
+            cache_prefix = os.path.splitext(annotation_file)[0] + '.index'
+        meta = self._file_meta(annotation_file)
+        index_file = cache_prefix + '.npz'
+
+        index = None
+        if os.path.exists(index_file):
+            with np.load(index_file) as f:
+                if str(f['meta']) == meta:
+                    index = {k: f[k] for k in f.files}
+        if index is None:
+            print('indexing annotations...')
+            tic = time.time()
+            index = self._scan(annotation_file)
+            index['meta'] = np.array(meta)
+            tmp_file = f'{cache_prefix}.{os.getpid()}.tmp.npz'
+            np.savez(tmp_file, **index)
+            os.replace(tmp_file, index_file)
+            print('Done (t={:0.2f}s)'.format(time.time() - tic))
+
+        self.blob = np.memmap(annotation_file, dtype=np.uint8, mode='r')
+        self._init_index(index)
+
+    @staticmethod
+    def _scan(annotation_file):
+        """Build the index of the records of an annotation file."""
+        kinds = dict(annotation='ann', video='vid', category='cat')
+        spans = {kind: [] for kind in kinds.values()}
+        anns, vid_ids = [], []
+        offset = 0
+        with open(annotation_file, 'rb') as f:
+            for line in f:
+                start, offset = offset, offset + len(line)
+                if not line.strip():
+                    continue
+                (key, record), = json.loads(line).items()
+                kind = kinds.get(key)
+                if kind is None:
+                    continue
+                spans[kind].append((start, offset))
+                if kind == 'ann':
+                    anns.append({
+                        field: record[field]
+                        for field in ('id', 'video_id', 'category_id',
+                                      'avg_area', 'iscrowd')
+                        if field in record
+                    })
+                elif kind == 'vid':
+                    vid_ids.append(record['id'])
+
+        order, index = PackedMPEblink._ann_index(anns)
+        for kind, kind_spans in spans.items():
+            index[f'{kind}_spans'] = np.array(
+                kind_spans, dtype=np.int64).reshape(-1, 2)
+        # the spans of the anns grouped by video
+        index['ann_spans'] = index['ann_spans'][order]
+        index['vid_ids'] = np.array(vid_ids, dtype=np.int64)
+        return index
+
+    def _decode(self, kind, i):
+        start, stop = self.index[f'{kind}_spans'][i]
+        (record, ) = json.loads(self.blob[start:stop].tobytes()).values()
+        return record
+
+    def _decode_all(self, kind):
+        num = len(self.index[f'{kind}_spans'])
+        return [self._decode(kind, i) for i in range(num)]
@@ -204,27 +204,43 @@ class MPEblinkEval:
         # compute iou between each dt and gt region
         # iscrowd = [int(o['iscrowd']) for o in gt]
         #ious = maskUtils.iou(d,g,iscrowd)
-        def iou_seq(d_seq, g_seq):
-            i = .0
-            u = .0
-            for d, g in zip(d_seq, g_seq):  # 遍历每一帧
-                if d and g: # 若这帧的pred和gt都不是none,则计算这帧他俩的交集和并集，添加到总的交集和总的并集里
-                    i += self.compute_frame_i(d,g)  # 这函数是我自己写的
-                    u += self.compute_frame_u(d,g)
-                elif not d and g:
-                    u += g[2]*g[3]
-                elif d and not g:   # 如果gt是none但是有预测，则加并集
-                    u += d[2]*d[3]   # 代表w*h，也就是当前帧bbox的面积
-            if not u > .0:
-                print("Mask sizes in video {} and category {} may not match!".format(vidId, catId))
-            iou = i / u if u > .0 else .0
-            return iou
+        # 整个video的[D, G, T]交集和并集一次算完，而不是逐对逐帧地循环
+        num_frames = max([len(seq) for seq in d + g], default=0)
+        d_boxes, d_valid, d_len = self._seq_boxes(d, num_frames)
+        g_boxes, g_valid, g_len = self._seq_boxes(g, num_frames)
+        d_boxes = d_boxes[:, None]  # [D, 1, T, 4]
+        g_boxes = g_boxes[None]     # [1, G, T, 4]
+        iw = np.minimum(d_boxes[..., 0] + d_boxes[..., 2], g_boxes[..., 0] + g_boxes[..., 2]) \
+            - np.maximum(d_boxes[..., 0], g_boxes[..., 0])
+        ih = np.minimum(d_boxes[..., 1] + d_boxes[..., 3], g_boxes[..., 1] + g_boxes[..., 3]) \
+            - np.maximum(d_boxes[..., 1], g_boxes[..., 1])
+        # 只有这帧的pred和gt都不是none才有交集，否则并集就是不为none的那个bbox的面积
+        both = d_valid[:, None] & g_valid[None]
+        frame_i = np.where(both, iw.clip(0) * ih.clip(0), 0)
+        frame_u = d_boxes[..., 2] * d_boxes[..., 3] + g_boxes[..., 2] * g_boxes[..., 3] - frame_i
+        # 和zip一样，每对只算到两个序列中较短的那个的长度
+        within = np.arange(num_frames) < np.minimum(d_len[:, None], g_len[None])[..., None]
+        i = np.where(within, frame_i, 0).sum(-1)
+        u = np.where(within, frame_u, 0).sum(-1)
+        for _ in zip(*np.nonzero(~(u > .0))):
+            print("Mask sizes in video {} and category {} may not match!".format(vidId, catId))
         ious = np.zeros([len(d), len(g)])
-        for i, j in np.ndindex(ious.shape):
-            ious[i, j] = iou_seq(d[i], g[j])    # 计算指定pred和gt的st iou video instance level
-        #print(vidId, catId, ious.shape, ious)
+        np.divide(i, u, out=ious, where=u > .0)
         return ious # 这个video里这一类的，[预测为这类的query, num_gt]
 
+    @staticmethod
+    def _seq_boxes(seqs, num_frames):
+        # 把bbox序列转成[N, T, 4]的数组，none的帧是全0且valid为False
+        boxes = np.zeros((len(seqs), num_frames, 4))
+        valid = np.zeros((len(seqs), num_frames), dtype=bool)
+        for n, seq in enumerate(seqs):
+            frames = [t for t, box in enumerate(seq) if box]
+            if frames:
+                boxes[n, frames] = [seq[t][:4] for t in frames]
+                valid[n, frames] = True
+        lengths = np.array([len(seq) for seq in seqs], dtype=np.int64)
+        return boxes, valid, lengths
+
     def compute_frame_i(self, d, g):
         # 计算当前帧d和g的交集面积
         left_column_max = max(d[0], g[0])
@@ -339,31 +355,24 @@ class MPEblinkEval:
         dtm  = np.zeros((T,D))
         gtIg = np.array([g['_ignore'] for g in gt])
         dtIg = np.zeros((T,D))
-        if not len(ious)==0:    # 下面确定gt和pred的匹配关系，最终效果上确实和activitynet的相同
-            for tind, t in enumerate(p.iouThrs):    # 遍历的是IoU阈值,0.5:0.95一共10个取值
-                for dind, d in enumerate(dt):
-                    # information about best match so far (m=-1 -> unmatched)
-                    iou = min([t,1-1e-10])
-                    m   = -1
-                    for gind, g in enumerate(gt):
-                        # if this gt already matched, and not a crowd, continue
-                        if gtm[tind,gind]>0:  # 如果这个gt已经被match过了，则尝试下一个gt
-                            continue
-                        # if dt matched to reg gt, and on ignore gt, stop
-                        if m>-1 and gtIg[m]==0 and gtIg[gind]==1:   # 这里的m不等于gind,而是等于gind-1，是上一轮循环的产物，因为前面gt按gt ignore排过序，所以如果下一个是ignore,则后面的全部gt都是被ignore的
-                            break
-                        # continue to next gt unless better match made
-                        if ious[dind,gind] < iou:
-                            continue
-                        # if match successful and best so far, store appropriately
-                        iou=ious[dind,gind] # 这里iou会更新为当前最大的iou,因此，循环完之后，匹配的确实是iou最大的
-                        m=gind
-                    # if match made store id of match for both dt and gt
-                    if m ==-1:
-                        continue
-                    dtIg[tind,dind] = gtIg[m]
-                    dtm[tind,dind]  = gt[m]['id']   # 第dind个pred匹配到了第m个（m=gind）gt，现在记录其匹配到的gt的id
-                    gtm[tind,m]     = d['id']   # 编号为gind的gt被匹配到了pred,现在记录其匹配到的pred的id
+        if not len(ious)==0 and G > 0:    # 下面确定gt和pred的匹配关系，最终效果上确实和activitynet的相同
+            # pred还是按置信度从大到小贪心地匹配，但每个pred在全部IoU阈值下的匹配一次算完
+            thrs = np.minimum(p.iouThrs, 1-1e-10)[:, None]
+            gtIds = np.array([g['id'] for g in gt])
+            for dind, d in enumerate(dt):
+                # 还没被match过且IoU不小于阈值的gt, [T, G]
+                cand = (gtm <= 0) & (ious[dind] >= thrs)
+                # if dt can match a reg gt, ignore gts are not considered
+                reg = cand & (gtIg == 0)
+                cand = np.where(reg.any(1, keepdims=True), reg, cand)
+                # IoU最大的gt，有并列时取最后一个，和逐个gt比较时的结果相同
+                m = G - 1 - np.where(cand, ious[dind], -1)[:, ::-1].argmax(1)
+                tind = np.nonzero(cand.any(1))[0]
+                m = m[tind]
+                # if match made store id of match for both dt and gt
+                dtIg[tind, dind] = gtIg[m]
+                dtm[tind, dind] = gtIds[m]   # 第dind个pred匹配到了第m个gt，现在记录其匹配到的gt的id
+                gtm[tind, m] = d['id']   # 编号为m的gt被匹配到了pred,现在记录其匹配到的pred的id
         # set unmatched detections outside of area range to ignore
         a = np.array([d['avg_area']<aRng[0] or d['avg_area']>aRng[1] for d in dt]).reshape((1, len(dt)))    # 筛选出avg_area不在当前指定范围内的pred的坐标吧
         dtIg = np.logical_or(dtIg, np.logical_and(dtm==0, np.repeat(a,T,0)))    # 就是对于前面没被匹配的pred（准备当成FP），如果其avg_area不在指定范围内，这个pre也ignore，估计就是不算指标
@@ -433,16 +442,13 @@ class MPEblinkEval:
                 # print(1)
                 for iou in range(0,10):
                     iou_type = 0.5 + iou*0.05
-                    gt_collection = []
-                    dt_collection = []
-                    for gt_index in range(0,len(gt_match_info[iou])):
-                        matched_dt_id = int(gt_match_info[iou][gt_index])
-                        if matched_dt_id == 0:
-                            continue
-                        real_gt_id = gt_index+1
-                        self.cocoGt.loadAnns(real_gt_id)
-                        gt_collection.append({'gt_ID':real_gt_id, 'blinks':self.cocoGt.loadAnns(real_gt_id)[0]['blinks']})
-                        dt_collection.append({'gt_ID':real_gt_id, 'blinks':self.cocoDt.loadAnns(matched_dt_id)[0]['blinks_converted']})
+                    gt_index = np.nonzero(gt_match_info[iou])[0]  # 被匹配到的gt
+                    real_gt_ids = (gt_index + 1).tolist()
+                    matched_dt_ids = gt_match_info[iou][gt_index].astype(int).tolist()
+                    gt_collection = [{'gt_ID': real_gt_id, 'blinks': ann['blinks']}
+                                     for real_gt_id, ann in zip(real_gt_ids, self.cocoGt.loadAnns(real_gt_ids))]
+                    dt_collection = [{'gt_ID': real_gt_id, 'blinks': ann['blinks_converted']}
+                                     for real_gt_id, ann in zip(real_gt_ids, self.cocoDt.loadAnns(matched_dt_ids))]
                     self.blink_eval_info.append({'iou':iou_type, 'areaRng':_pe.areaRng[a0], 'dt_data':dt_collection, 'gt_data':gt_collection})
 
 
@@ -473,39 +479,8 @@ class MPEblinkEval:
                     tps = np.logical_and(               dtm,  np.logical_not(dtIg) )    # 把前面得到的dtm转化为0-1 bool值，也就是TP了！匹配到gt的就是ture,没匹配到gt(=0)的就是false了
                     fps = np.logical_and(np.logical_not(dtm), np.logical_not(dtIg) )    # FP就是TP取反
 
-                    tp_sum = np.cumsum(tps, axis=1).astype(dtype=np.float)  # 开始求累积tp个数了，没毛病
-                    fp_sum = np.cumsum(fps, axis=1).astype(dtype=np.float)
-                    for t, (tp, fp) in enumerate(zip(tp_sum, fp_sum)):  # 遍历每一行，也就是遍历每个iou阈值
-                        tp = np.array(tp)
-                        fp = np.array(fp)
-                        nd = len(tp)
-                        rc = tp / npig  # recall
-                        pr = tp / (fp+tp+np.spacing(1)) # precision
-                        q  = np.zeros((R,)) # R估计是画pr曲线的切片个数，现在是101
-                        ss = np.zeros((R,))
-
-                        if nd:
-                            recall[t,k,a,m] = rc[-1]
-                        else:
-                            recall[t,k,a,m] = 0
-
-                        # numpy is slow without cython optimization for accessing elements
-                        # use python array gets significant speed improvement
-                        pr = pr.tolist(); q = q.tolist()
-
-                        for i in range(nd-1, 0, -1):
-                            if pr[i] > pr[i-1]:
-                                pr[i-1] = pr[i] # 这个是确保precision是按置信度单调递减的
-
-                        inds = np.searchsorted(rc, p.recThrs, side='left') # 在数组rc中插入数组p.recThrs,返回list,指明了p.recThrs中对应元素应该插入在rc中的位置，就是为了画pr曲线微分用的
-                        try:
-                            for ri, pi in enumerate(inds):
-                                q[ri] = pr[pi]  # q应该是pr曲线了，细分成101个点
-                                ss[ri] = dtScoresSorted[pi] # 这个是把pr曲线对应的每个细分点的置信度拿出来
-                        except:
-                            pass
-                        precision[t,:,k,a,m] = np.array(q)
-                        scores[t,:,k,a,m] = np.array(ss)
+                    recall[:,k,a,m], precision[:,:,k,a,m], scores[:,:,k,a,m] = \
+                        self._pr_curves(tps, fps, npig, dtScoresSorted, p.recThrs)
         self.eval = {
             'params': p,
             'counts': [T, R, K, A, M],
@@ -517,6 +492,31 @@ class MPEblinkEval:
         toc = time.time()
         print('DONE (t={:0.2f}s).'.format( toc-tic))
 
+    @staticmethod
+    def _pr_curves(tps, fps, npig, dtScoresSorted, recThrs):
+        '''
+        Recall, interpolated precision and scores at recThrs of each IoU threshold
+        :param tps, fps: [TxD] tp and fp flags of the dts sorted by score
+        :return: recall [T], precision [TxR] and scores [TxR]
+        '''
+        tp_sum = np.cumsum(tps, axis=1).astype(float)  # 开始求累积tp个数了，没毛病
+        fp_sum = np.cumsum(fps, axis=1).astype(float)
+        T, nd = tp_sum.shape
+        rc = tp_sum / npig  # recall
+        pr = tp_sum / (fp_sum+tp_sum+np.spacing(1)) # precision
+        recall = rc[:, -1] if nd else np.zeros(T)
+        # 确保precision是按置信度单调递减的，即从后往前取累积最大值
+        pr = np.maximum.accumulate(pr[:, ::-1], axis=1)[:, ::-1]
+        precision = np.zeros((T, len(recThrs)))    # pr曲线，细分成R=101个点
+        scores = np.zeros((T, len(recThrs)))    # pr曲线对应的每个细分点的置信度
+        for t in range(T):
+            inds = np.searchsorted(rc[t], recThrs, side='left')
+            # 超出最大recall的点保持为0
+            valid = inds < nd
+            precision[t, valid] = pr[t, inds[valid]]
+            scores[t, valid] = dtScoresSorted[inds[valid]]
+        return recall, precision, scores
+
     def action_ap(self):
         # 根据获取的blink的信息来计算action-level的AP
         index=0
@@ -524,14 +524,12 @@ class MPEblinkEval:
             index +=1
             if index>10: # 现在是懒得输出area不为all的情况，若想输出，把index去掉就完事
                 break
-            gt = np.empty(shape=[0, 3], dtype=int)
-            for instance in config['gt_data']:
-                for blink_event in instance['blinks']:
-                    gt = np.append(gt, [[instance['gt_ID'], blink_event[0], blink_event[1]]], axis=0)
-            dt = np.empty(shape=[0, 4], dtype=float)
-            for instance in config['dt_data']:
-                for blink_event in instance['blinks']:
-                    dt = np.append(dt,[[instance['gt_ID'],blink_event[0],blink_event[1],blink_event[2]]], axis=0)
+            gt = np.array([[instance['gt_ID'], blink_event[0], blink_event[1]]
+                           for instance in config['gt_data']
+                           for blink_event in instance['blinks']]).reshape(-1, 3)
+            dt = np.array([[instance['gt_ID'], blink_event[0], blink_event[1], blink_event[2]]
+                           for instance in config['dt_data']
+                           for blink_event in instance['blinks']], dtype=float).reshape(-1, 4)
             ground_truth = pd.DataFrame({
                 'video-id': gt[:, 0],
                 't-start': gt[:, 1],
@@ -576,52 +574,43 @@ class MPEblinkEval:
         ap = np.zeros(len(tiou_thresholds))
 
         npos = float(len(ground_truth))
-        lock_gt = np.ones((len(tiou_thresholds), len(ground_truth))) * -1  # [num_tiou, num_gt] 初始值全为-1
+        lock_gt = np.zeros((len(tiou_thresholds), len(ground_truth)), dtype=bool)  # [num_tiou, num_gt] 是否已经被匹配
         # Sort predictions by decreasing score order.
-        sort_idx = prediction['score'].values.argsort()[::-1]
-        prediction = prediction.loc[sort_idx].reset_index(drop=True)  # 按置信度从高到低排序，不区分video_id
+        sort_idx = prediction['score'].values.argsort()[::-1]  # 按置信度从高到低排序，不区分video_id
+        pred_video_ids = prediction['video-id'].values[sort_idx]
+        pred_segments = prediction[['t-start', 't-end']].values[sort_idx]
+        gt_segments = ground_truth[['t-start', 't-end']].values
 
         # Initialize true positive and false positive vectors.
         tp = np.zeros((len(tiou_thresholds), len(prediction)))
         fp = np.zeros((len(tiou_thresholds), len(prediction)))
 
         # Adaptation to query faster
-        ground_truth_gbvn = ground_truth.groupby('video-id')
+        ground_truth_gbvn = ground_truth.groupby('video-id').indices
+        tiou_thresholds = np.asarray(tiou_thresholds)[:, None]
 
         # Assigning true positive to truly grount truth instances.
-        for idx, this_pred in prediction.iterrows():  # 遍历每一个prediction
-            # print(this_pred)
-            try:
-                # Check if there is at least one ground truth in the video associated.
-                ground_truth_videoid = ground_truth_gbvn.get_group(
-                    this_pred['video-id'])  # 获取当前prediction的video_id对应的全部gt
-            except Exception as e:
+        for idx, (video_id, this_pred) in enumerate(zip(pred_video_ids, pred_segments)):  # 遍历每一个prediction
+            # Check if there is at least one ground truth in the video associated.
+            this_gt = ground_truth_gbvn.get(video_id)  # 获取当前prediction的video_id对应的全部gt
+            if this_gt is None:
                 fp[:, idx] = 1
                 continue
-
-            this_gt = ground_truth_videoid.reset_index()
-            tiou_arr = self.segment_iou(this_pred[['t-start', 't-end']].values,
-                                   this_gt[['t-start', 't-end']].values)
+            tiou_arr = self.segment_iou(this_pred, gt_segments[this_gt])
             # We would like to retrieve the predictions with highest tiou score.
             tiou_sorted_idx = tiou_arr.argsort()[::-1]
-            for tidx, tiou_thr in enumerate(tiou_thresholds):
-                for jdx in tiou_sorted_idx:  # 按tIoU从大到小的顺序遍历
-                    if tiou_arr[jdx] < tiou_thr:
-                        fp[tidx, idx] = 1  # 如果小于iou则直接被视为FP，不用试iou更小的gt了，因为最大的都不满足
-                        break
-                    if lock_gt[
-                        tidx, this_gt.loc[jdx]['index']] >= 0:  # 如果被匹配过，则continue，去看下一个tIoU稍小一些的gt是不是能满足阈值条件、是否被匹配过。
-                        continue
-                    # Assign as true positive after the filters above.
-                    tp[tidx, idx] = 1  # 在这个iou_threshold下，这个样本是TP
-                    lock_gt[tidx, this_gt.loc[jdx]['index']] = idx  # 在这个iou_threshold下，把这个gt锁住，代表已经被匹配
-                    break
-
-                if fp[tidx, idx] == 0 and tp[tidx, idx] == 0:  # 如果每个gt都满足阈值条件但都已经被匹配过了，则该prediction还是FP
-                    fp[tidx, idx] = 1
-
-        tp_cumsum = np.cumsum(tp, axis=1).astype(np.float)
-        fp_cumsum = np.cumsum(fp, axis=1).astype(np.float)
+            this_gt = this_gt[tiou_sorted_idx]
+            # 按tIoU从大到小的顺序，第一个小于阈值的gt之前的gt才满足阈值条件，[num_tiou, num_gt]
+            above = np.logical_and.accumulate(~(tiou_arr[tiou_sorted_idx] < tiou_thresholds), axis=1)
+            # 满足阈值条件且没被匹配过的第一个gt就是匹配结果，没有这样的gt则该prediction是FP
+            free = above & ~lock_gt[:, this_gt]
+            matched = free.any(1)
+            tp[matched, idx] = 1  # 在这个iou_threshold下，这个样本是TP
+            fp[~matched, idx] = 1
+            lock_gt[matched, this_gt[free.argmax(1)[matched]]] = True  # 在这个iou_threshold下，把这个gt锁住，代表已经被匹配
+
+        tp_cumsum = np.cumsum(tp, axis=1).astype(float)
+        fp_cumsum = np.cumsum(fp, axis=1).astype(float)
         recall_cumsum = tp_cumsum / npos  # 得到每个置信度下的recall有多高
 
         precision_cumsum = tp_cumsum / (tp_cumsum + fp_cumsum)  # 得到每个置信度下的precision有多高
@@ -667,8 +656,7 @@ class MPEblinkEval:
     def interpolated_prec_rec(self,prec, rec):
         mprec = np.hstack([[0], prec, [0]])
         mrec = np.hstack([[0], rec, [1]])
-        for i in range(len(mprec) - 1)[::-1]:
-            mprec[i] = max(mprec[i], mprec[i + 1])
+        mprec = np.maximum.accumulate(mprec[::-1])[::-1]
         idx = np.where(mrec[1::] != mrec[0:-1])[0] + 1
         ap = np.sum((mrec[idx] - mrec[idx - 1]) * mprec[idx])
         return ap
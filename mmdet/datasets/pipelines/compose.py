@@ -1,5 +1,8 @@
 # Copyright (c) OpenMMLab. All rights reserved.
 import collections
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
 from mmcv.utils import build_from_cfg
 
@@ -13,10 +16,17 @@ class Compose:
     Args:
         transforms (Sequence[dict | callable]): Sequence of transform object or
             config dict to be composed.
+        num_threads (int): Number of threads :meth:`clip_call` processes the
+            frames of a clip with, 0 to process them sequentially. Image
+            decoding and resizing release the GIL, so a few threads per
+            dataloader worker speed up loading a clip. Defaults to 0.
     """
 
-    def __init__(self, transforms):
+    def __init__(self, transforms, num_threads=0):
         assert isinstance(transforms, collections.abc.Sequence)
+        self.num_threads = num_threads
+        self._executor = None
+        self._executor_pid = None
         self.transforms = []
         for transform in transforms:
             if isinstance(transform, dict):
@@ -37,11 +47,83 @@ class Compose:
            dict: Transformed data.
         """
 
-        for t in self.transforms:
-            data = t(data)
-            if data is None:
+        return _apply_transforms(self.transforms, data)
+
+    def clip_call(self, clip):
+        """Apply the transforms to all frames of a clip.
+
+        A transform with a ``sample_clip_params`` method (e.g. ``Resize``,
+        ``RandomFlip`` and ``CenterCrop``) samples its random parameters once
+        from the first frame and is called with them on every frame, so the
+        frames of a clip are augmented consistently without any state kept
+        in the transforms. The frames are processed concurrently by
+        ``num_threads`` threads between these transforms.
+
+        The files of the frames are first read at once, see
+        :meth:`prefetch_clip`.
+
+        Args:
+            clip (list[dict]): Result dicts of the frames of a clip.
+
+        Returns:
+            list[dict] | None: Transformed frames, None if a transform drops
+                any of them.
+        """
+        self.prefetch_clip(clip)
+        executor = self._get_executor()
+        i = 0
+        while i < len(self.transforms):
+            t = self.transforms[i]
+            if hasattr(t, 'sample_clip_params'):
+                func = partial(t, params=t.sample_clip_params(clip[0]))
+                i += 1
+            else:
+                # run consecutive per frame transforms in one go
+                j = i + 1
+                while j < len(self.transforms) and not hasattr(
+                        self.transforms[j], 'sample_clip_params'):
+                    j += 1
+                func = partial(_apply_transforms, self.transforms[i:j])
+                i = j
+            if executor is not None:
+                clip = list(executor.map(func, clip))
+            else:
+                clip = [func(data) for data in clip]
+            if any(data is None for data in clip):
                 return None
-        return data
+        return clip
+
+    def prefetch_clip(self, clip):
+        """Give all frames of a clip to the transforms with a
+        ``prefetch_clip`` method (e.g. ``LoadImageFromFile``), to read their
+        files at once.
+
+        Args:
+            clip (list[dict]): Result dicts of the frames of a clip, updated
+                in place.
+        """
+        for t in self.transforms:
+            if hasattr(t, 'prefetch_clip'):
+                t.prefetch_clip(clip)
+
+    def _get_executor(self):
+        """The thread pool of the current process.
+
+        It is created on first use in each process, as the dataloader
+        workers are forked from the main process.
+        """
+        if self.num_threads <= 0:
+            return None
+        if self._executor is None or self._executor_pid != os.getpid():
+            self._executor = ThreadPoolExecutor(self.num_threads)
+            self._executor_pid = os.getpid()
+        return self._executor
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_executor'] = None
+        state['_executor_pid'] = None
+        return state
 
     def __repr__(self):
         format_string = self.__class__.__name__ + '('
@@ -53,3 +135,11 @@ class Compose:
             format_string += f'    {str_}'
         format_string += '\n)'
         return format_string
+
+
+def _apply_transforms(transforms, data):
+    for t in transforms:
+        data = t(data)
+        if data is None:
+            return None
+    return data
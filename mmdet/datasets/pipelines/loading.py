@@ -7,6 +7,9 @@ import pycocotools.mask as maskUtils
 
 from mmdet.core import BitmapMasks, PolygonMasks
 from ..builder import PIPELINES
+from ..frame_cache import FrameCache
+from ..video_shard import VideoShardBackend  # noqa: F401, registers it
+from .transforms import CenterCrop
 
 try:
     from panopticapi.utils import rgb2id
@@ -21,7 +24,14 @@ class LoadImageFromFile:
     Required keys are "img_prefix" and "img_info" (a dict that must contain the
     key "filename"). Added or updated keys are "filename", "img", "img_shape",
     "ori_shape" (same as `img_shape`), "pad_shape" (same as `img_shape`),
-    "scale_factor" (1.0) and "img_norm_cfg" (means=0 and stds=1).
+    "scale_factor" (1.0) and "img_norm_cfg" (means=0 and stds=1). If the
+    results have a "frame_cache" (an :obj:`LRUFrameCache`), the decoded
+    image is looked up in and added to it.
+
+    With a file client backend that reads several files at once (e.g.
+    ``backend='video_shard'``, see :class:`VideoShardBackend`),
+    ``Compose.clip_call`` reads the frames of a clip in one go with
+    :meth:`prefetch_clip`.
 
     Args:
         to_float32 (bool): Whether to convert the loaded image to a float32
@@ -32,17 +42,22 @@ class LoadImageFromFile:
         file_client_args (dict): Arguments to instantiate a FileClient.
             See :class:`mmcv.fileio.FileClient` for details.
             Defaults to ``dict(backend='disk')``.
+        imdecode_backend (str): Backend for :func:`mmcv.imfrombytes`, e.g.
+            'cv2' or 'turbojpeg' (needs PyTurboJPEG) for faster decoding of
+            jpeg frames. Defaults to 'cv2'.
     """
 
     def __init__(self,
                  to_float32=False,
                  color_type='color',
                  channel_order='bgr',
-                 file_client_args=dict(backend='disk')):
+                 file_client_args=dict(backend='disk'),
+                 imdecode_backend='cv2'):
         self.to_float32 = to_float32
         self.color_type = color_type
         self.channel_order = channel_order
         self.file_client_args = file_client_args.copy()
+        self.imdecode_backend = imdecode_backend
         self.file_client = None
 
     def __call__(self, results):
@@ -58,17 +73,27 @@ class LoadImageFromFile:
         if self.file_client is None:
             self.file_client = mmcv.FileClient(**self.file_client_args)
 
-        if results['img_prefix'] is not None:
-            filename = osp.join(results['img_prefix'],
-                                results['img_info']['filename'])
-        else:
-            filename = results['img_info']['filename']
-
-        img_bytes = self.file_client.get(filename)
-        img = mmcv.imfrombytes(
-            img_bytes, flag=self.color_type, channel_order=self.channel_order) # 目前是按bgr读的
+        filename = self._filename(results)
+
+        # decoded frames shared by overlapping clips, see LRUFrameCache
+        frame_cache = results.get('frame_cache')
+        img = frame_cache.get(filename) if frame_cache is not None else None
+        img_bytes = results.pop('img_bytes', None)
+        if img is None:
+            if img_bytes is None:
+                img_bytes = self.file_client.get(filename)
+            img = mmcv.imfrombytes(
+                img_bytes,
+                flag=self.color_type,
+                channel_order=self.channel_order,
+                backend=self.imdecode_backend) # 目前是按bgr读的
+            if frame_cache is not None:
+                frame_cache.put(filename, img)
         if self.to_float32:
             img = img.astype(np.float32)
+        elif frame_cache is not None:
+            # the cached frame must not be modified by the transforms
+            img = img.copy()
 
         results['filename'] = filename
         results['ori_filename'] = results['img_info']['filename']
@@ -78,11 +103,46 @@ class LoadImageFromFile:
         results['img_fields'] = ['img']
         return results
 
+    @staticmethod
+    def _filename(results):
+        if results['img_prefix'] is not None:
+            return osp.join(results['img_prefix'],
+                            results['img_info']['filename'])
+        return results['img_info']['filename']
+
+    def prefetch_clip(self, clip):
+        """Read the files of the frames of a clip at once.
+
+        The content of each file is added as "img_bytes" to the result dict
+        of its frame. Frames already in the "frame_cache" of their result
+        dict are not read. Nothing is done if the file client backend has no
+        ``get_many`` method.
+
+        Args:
+            clip (list[dict]): Result dicts of the frames of a clip.
+        """
+        if self.file_client is None:
+            self.file_client = mmcv.FileClient(**self.file_client_args)
+        get_many = getattr(self.file_client.client, 'get_many', None)
+        if get_many is None:
+            return
+        clip = [
+            results for results in clip
+            if results.get('frame_cache') is None
+            or self._filename(results) not in results['frame_cache']
+        ]
+        if not clip:
+            return
+        filenames = [self._filename(results) for results in clip]
+        for results, img_bytes in zip(clip, get_many(filenames)):
+            results['img_bytes'] = img_bytes
+
     def __repr__(self):
         repr_str = (f'{self.__class__.__name__}('
                     f'to_float32={self.to_float32}, '
                     f"color_type='{self.color_type}', "
                     f"channel_order='{self.channel_order}', "
+                    f"imdecode_backend='{self.imdecode_backend}', "
                     f'file_client_args={self.file_client_args})')
         return repr_str
 
@@ -119,6 +179,102 @@ class LoadImageFromWebcam(LoadImageFromFile):
         return results
 
 
+@PIPELINES.register_module()
+class LoadImageFromFrameCache:
+    """Load a center cropped and rescaled frame from a :class:`FrameCache`.
+
+    Replaces ``LoadImageFromFile``, ``CenterCrop`` with a fixed relative crop
+    and ``Resize`` with ``keep_ratio=True`` in a pipeline, for frames
+    processed offline by ``tools/dataset_converters/gaze360/
+    build_frame_cache.py``. It must come after ``LoadAnnotations``, as the
+    boxes are cropped and rescaled with the frame.
+
+    Added or updated keys are the ones of ``LoadImageFromFile`` as well as
+    "scale_factor" and "keep_ratio" of ``Resize``.
+
+    Args:
+        cache_prefix (str): Prefix of the cache files.
+        to_float32 (bool): Whether to convert the loaded image to a float32
+            numpy array. Defaults to False.
+        allow_negative_crop (bool): Whether to keep a frame whose crop does
+            not contain any bbox area. Defaults to False.
+        bbox_clip_border (bool): Whether to clip the boxes to the frame.
+            Defaults to True.
+    """
+
+    def __init__(self,
+                 cache_prefix,
+                 to_float32=False,
+                 allow_negative_crop=False,
+                 bbox_clip_border=True):
+        self.cache_prefix = cache_prefix
+        self.to_float32 = to_float32
+        self.allow_negative_crop = allow_negative_crop
+        self.bbox_clip_border = bbox_clip_border
+        self.cache = None
+        # crops the boxes the same way as the replaced CenterCrop
+        self.crop = CenterCrop(
+            crop_size=(1., 1.),
+            crop_type='relative',
+            bbox_clip_border=bbox_clip_border)
+
+    def __call__(self, results):
+        """Call functions to load the frame and crop and rescale the boxes.
+
+        Args:
+            results (dict): Result dict from :obj:`mmdet.CustomDataset`.
+
+        Returns:
+            dict | None: The dict contains the loaded frame and meta
+                information, None if no box is left in the crop.
+        """
+        if self.cache is None:
+            self.cache = FrameCache(self.cache_prefix)
+
+        if results['img_prefix'] is not None:
+            filename = osp.join(results['img_prefix'],
+                                results['img_info']['filename'])
+        else:
+            filename = results['img_info']['filename']
+        img, ori_shape, crop_box = self.cache.get(
+            results['img_info']['filename'])
+        img = img.astype(np.float32) if self.to_float32 else img.copy()
+
+        results['filename'] = filename
+        results['ori_filename'] = results['img_info']['filename']
+        results['img'] = img
+        results['img_shape'] = img.shape
+        results['ori_shape'] = ori_shape
+        results['pad_shape'] = img.shape
+        results['img_fields'] = ['img']
+
+        crop_h, crop_w = crop_box[3] - crop_box[1], crop_box[2] - crop_box[0]
+        results = self.crop._crop_bboxes(results, crop_box, (crop_h, crop_w),
+                                         self.allow_negative_crop)
+        if results is None:
+            return None
+        scale_factor = np.array(
+            [img.shape[1] / crop_w, img.shape[0] / crop_h] * 2,
+            dtype=np.float32)
+        for key in results.get('bbox_fields', []):
+            bboxes = results[key] * scale_factor
+            if self.bbox_clip_border:
+                bboxes[:, 0::2] = np.clip(bboxes[:, 0::2], 0, img.shape[1])
+                bboxes[:, 1::2] = np.clip(bboxes[:, 1::2], 0, img.shape[0])
+            results[key] = bboxes
+        results['scale_factor'] = scale_factor
+        results['keep_ratio'] = True
+        return results
+
+    def __repr__(self):
+        repr_str = (f'{self.__class__.__name__}('
+                    f"cache_prefix='{self.cache_prefix}', "
+                    f'to_float32={self.to_float32}, '
+                    f'allow_negative_crop={self.allow_negative_crop}, '
+                    f'bbox_clip_border={self.bbox_clip_border})')
+        return repr_str
+
+
 @PIPELINES.register_module()
 class LoadMultiChannelImageFromFiles:
     """Load multi-channel images from a list of separate channel files.
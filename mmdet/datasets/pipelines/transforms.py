@@ -101,8 +101,6 @@ class Resize:
         # TODO: refactor the override option in Resize
         self.override = override
         self.bbox_clip_border = bbox_clip_border
-        self.isfix = False
-        self.rec = None
 
     @staticmethod
     def random_select(img_scales):
@@ -208,7 +206,6 @@ class Resize:
 
         results['scale'] = scale
         results['scale_idx'] = scale_idx
-        self.rec = (scale, scale_idx)
 
     def _resize_img(self, results):
         """Resize images with ``results['scale']``."""
@@ -278,40 +275,61 @@ class Resize:
                     backend=self.backend)
             results[key] = gt_seg
 
-    def __call__(self, results):
+    def _get_scale(self, results):
+        """Set ``results['scale']``, sampling it if needed."""
+        if 'scale' not in results:
+            if 'scale_factor' in results:
+                img_shape = results['img'].shape[:2]
+                scale_factor = results['scale_factor']
+                assert isinstance(scale_factor, float)
+                results['scale'] = tuple(
+                    [int(x * scale_factor) for x in img_shape][::-1])
+            else:
+                self._random_scale(results)
+        else:
+            if not self.override:
+                assert 'scale_factor' not in results, (
+                    'scale and scale_factor cannot be both set.')
+            else:
+                results.pop('scale')
+                if 'scale_factor' in results:
+                    results.pop('scale_factor')
+                self._random_scale(results)
+
+    def sample_clip_params(self, results):
+        """Sample the scale shared by all frames of a clip.
+
+        Args:
+            results (dict): Result dict of the first frame, not modified.
+
+        Returns:
+            dict: ``scale`` and ``scale_idx`` to pass to :meth:`__call__`.
+        """
+        results = results.copy()
+        self._get_scale(results)
+        return {
+            key: results[key]
+            for key in ('scale', 'scale_idx') if key in results
+        }
+
+    def __call__(self, results, params=None):
         """Call function to resize images, bounding boxes, masks, semantic
         segmentation map.
 
         Args:
             results (dict): Result dict from loading pipeline.
+            params (dict, optional): Parameters from
+                :meth:`sample_clip_params`, used instead of sampling new ones.
 
         Returns:
             dict: Resized results, 'img_shape', 'pad_shape', 'scale_factor', \
                 'keep_ratio' keys are added into result dict.
         """
 
-        if not self.isfix:
-            if 'scale' not in results:
-                if 'scale_factor' in results:
-                    img_shape = results['img'].shape[:2]
-                    scale_factor = results['scale_factor']
-                    assert isinstance(scale_factor, float)
-                    results['scale'] = tuple(
-                        [int(x * scale_factor) for x in img_shape][::-1])
-                else:
-                    self._random_scale(results)
-            else:
-                if not self.override:
-                    assert 'scale_factor' not in results, (
-                        'scale and scale_factor cannot be both set.')
-                else:
-                    results.pop('scale')
-                    if 'scale_factor' in results:
-                        results.pop('scale_factor')
-                    self._random_scale(results)
+        if params:
+            results.update(params)
         else:
-            results['scale'] = self.rec[0]
-            results['scale_idx'] = self.rec[1]
+            self._get_scale(results)
 
         self._resize_img(results) # 根据scale来resize img
         self._resize_bboxes(results)
@@ -392,8 +410,6 @@ class RandomFlip:
 
         if isinstance(flip_ratio, list):
             assert len(self.flip_ratio) == len(self.direction)
-        self.rec = None
-        self.isfix = False
 
     def bbox_flip(self, bboxes, img_shape, direction):
         """Flip bboxes horizontally.
@@ -460,45 +476,61 @@ class RandomFlip:
                 raise ValueError(f"Invalid flipping direction '{direction}'")
         return flipped
 
-    def __call__(self, results):
+    def _random_direction(self):
+        """Sample a flip direction, None means non-flip."""
+        if isinstance(self.direction, list):
+            # None means non-flip
+            direction_list = self.direction + [None]
+        else:
+            # None means non-flip
+            direction_list = [self.direction, None]
+
+        if isinstance(self.flip_ratio, list):
+            non_flip_ratio = 1 - sum(self.flip_ratio)
+            flip_ratio_list = self.flip_ratio + [non_flip_ratio]
+        else:
+            non_flip_ratio = 1 - self.flip_ratio
+            # exclude non-flip
+            single_ratio = self.flip_ratio / (len(direction_list) - 1)
+            flip_ratio_list = [single_ratio] * (len(direction_list) -
+                                                1) + [non_flip_ratio]
+
+        return np.random.choice(direction_list, p=flip_ratio_list)
+
+    def sample_clip_params(self, results):
+        """Sample the flip shared by all frames of a clip.
+
+        Args:
+            results (dict): Result dict of the first frame, not modified.
+
+        Returns:
+            dict: ``flip`` and ``flip_direction`` to pass to
+                :meth:`__call__`.
+        """
+        if 'flip' in results:
+            return {}
+        cur_dir = self._random_direction()
+        return dict(flip=cur_dir is not None, flip_direction=cur_dir)
+
+    def __call__(self, results, params=None):
         """Call function to flip bounding boxes, masks, semantic segmentation
         maps as well as gaze direction.
 
         Args:
             results (dict): Result dict from loading pipeline.
+            params (dict, optional): Parameters from
+                :meth:`sample_clip_params`, used instead of sampling new ones.
 
         Returns:
             dict: Flipped results, 'flip', 'flip_direction' keys are added \
                 into result dict.
         """
 
-        if not self.isfix:
-            if 'flip' not in results:
-                if isinstance(self.direction, list):
-                    # None means non-flip
-                    direction_list = self.direction + [None]
-                else:
-                    # None means non-flip
-                    direction_list = [self.direction, None]
-
-                if isinstance(self.flip_ratio, list):
-                    non_flip_ratio = 1 - sum(self.flip_ratio)
-                    flip_ratio_list = self.flip_ratio + [non_flip_ratio]
-                else:
-                    non_flip_ratio = 1 - self.flip_ratio
-                    # exclude non-flip
-                    single_ratio = self.flip_ratio / (len(direction_list) - 1)
-                    flip_ratio_list = [single_ratio] * (len(direction_list) -
-                                                        1) + [non_flip_ratio]
-
-                cur_dir = np.random.choice(direction_list, p=flip_ratio_list)
-                self.rec = cur_dir
-
-                results['flip'] = cur_dir is not None
-        else:
-            cur_dir = self.rec
+        if params:
+            results.update(params)
+        if 'flip' not in results:
+            cur_dir = self._random_direction()
             results['flip'] = cur_dir is not None
-
         if 'flip_direction' not in results:
             results['flip_direction'] = cur_dir
         if results['flip']:
@@ -1007,8 +1039,6 @@ class CenterCrop:
         self.allow_negative_crop = allow_negative_crop
         self.bbox_clip_border = bbox_clip_border
         self.recompute_bbox = recompute_bbox
-        self.isfix = False
-        self.rec = None
         # The key correspondence from bboxes to labels and masks.
         self.bbox2label = {
             'gt_bboxes': 'gt_labels',
@@ -1019,42 +1049,24 @@ class CenterCrop:
             'gt_bboxes_ignore': 'gt_masks_ignore'
         }
 
-    def _crop_data(self, results, crop_size, allow_negative_crop):
-        """Function to randomly crop images, bounding boxes, masks, semantic
-        segmentation maps.
+    def _crop_bboxes(self, results, crop_box, img_shape, allow_negative_crop):
+        """Crop the boxes (and the instance masks) to a region of the image.
 
         Args:
             results (dict): Result dict from loading pipeline.
-            crop_size (tuple): Expected absolute size after cropping, (h, w).
+            crop_box (tuple[int]): The cropped region, (x1, y1, x2, y2).
+            img_shape (tuple[int]): Shape of the cropped image.
             allow_negative_crop (bool): Whether to allow a crop that does not
-                contain any bbox area. Default to False.
+                contain any bbox area.
 
         Returns:
-            dict: Randomly cropped results, 'img_shape' key in result dict is
-                updated according to crop size.
+            dict | None: Results with cropped boxes, None if no box is left
+                and ``allow_negative_crop`` is False.
         """
-        assert crop_size[0] > 0 and crop_size[1] > 0
-        for key in results.get('img_fields', ['img']):
-            img = results[key]
-            margin_h = max(img.shape[0] - crop_size[0], 0)
-            margin_w = max(img.shape[1] - crop_size[1], 0)
-            offset_h =  int(margin_h / 2 + 0.5)
-            offset_w =  int(margin_w / 2 + 0.5)
-            # offset_h = np.random.randint(0, margin_h + 1)
-            # offset_w = np.random.randint(0, margin_w + 1)
-            crop_y1, crop_y2 = offset_h, offset_h + crop_size[0]
-            crop_x1, crop_x2 = offset_w, offset_w + crop_size[1]
-
-            # crop the image
-            img = img[crop_y1:crop_y2, crop_x1:crop_x2, ...]
-            img_shape = img.shape
-            results[key] = img
-        results['img_shape'] = img_shape
-
         # crop bboxes accordingly and clip to the image boundary
         for key in results.get('bbox_fields', []):
             # e.g. gt_bboxes and gt_bboxes_ignore
-            bbox_offset = np.array([offset_w, offset_h, offset_w, offset_h],
+            bbox_offset = np.array([crop_box[0], crop_box[1]] * 2,
                                    dtype=np.float32)
             bboxes = results[key] - bbox_offset
             if self.bbox_clip_border:
@@ -1088,9 +1100,48 @@ class CenterCrop:
             if mask_key in results:
                 results[mask_key] = results[mask_key][
                     valid_inds.nonzero()[0]].crop(
-                        np.asarray([crop_x1, crop_y1, crop_x2, crop_y2]))
+                        np.asarray(crop_box))
                 if self.recompute_bbox:
                     results[key] = results[mask_key].get_bboxes()
+        return results
+
+    def _crop_data(self, results, crop_size, allow_negative_crop):
+        """Function to randomly crop images, bounding boxes, masks, semantic
+        segmentation maps.
+
+        Args:
+            results (dict): Result dict from loading pipeline.
+            crop_size (tuple): Expected absolute size after cropping, (h, w).
+            allow_negative_crop (bool): Whether to allow a crop that does not
+                contain any bbox area. Default to False.
+
+        Returns:
+            dict: Randomly cropped results, 'img_shape' key in result dict is
+                updated according to crop size.
+        """
+        assert crop_size[0] > 0 and crop_size[1] > 0
+        for key in results.get('img_fields', ['img']):
+            img = results[key]
+            margin_h = max(img.shape[0] - crop_size[0], 0)
+            margin_w = max(img.shape[1] - crop_size[1], 0)
+            offset_h =  int(margin_h / 2 + 0.5)
+            offset_w =  int(margin_w / 2 + 0.5)
+            # offset_h = np.random.randint(0, margin_h + 1)
+            # offset_w = np.random.randint(0, margin_w + 1)
+            crop_y1, crop_y2 = offset_h, offset_h + crop_size[0]
+            crop_x1, crop_x2 = offset_w, offset_w + crop_size[1]
+
+            # crop the image
+            img = img[crop_y1:crop_y2, crop_x1:crop_x2, ...]
+            img_shape = img.shape
+            results[key] = img
+        results['img_shape'] = img_shape
+
+        results = self._crop_bboxes(results,
+                                    (crop_x1, crop_y1, crop_x2, crop_y2),
+                                    img_shape, allow_negative_crop)
+        if results is None:
+            return None
 
         # crop semantic seg
         for key in results.get('seg_fields', []):
@@ -1129,23 +1180,34 @@ class CenterCrop:
             crop_h, crop_w = crop_size + np.random.rand(1) * (1 - crop_size)
             return int(h * crop_h + 0.5), int(w * crop_w + 0.5)
 
-    def __call__(self, results):
+    def sample_clip_params(self, results):
+        """Sample the crop size shared by all frames of a clip.
+
+        Args:
+            results (dict): Result dict of the first frame, not modified.
+
+        Returns:
+            dict: ``crop_size`` to pass to :meth:`__call__`.
+        """
+        return dict(crop_size=self._get_crop_size(results['img'].shape[:2]))
+
+    def __call__(self, results, params=None):
         """Call function to randomly crop images, bounding boxes, masks,
         semantic segmentation maps.
 
         Args:
             results (dict): Result dict from loading pipeline.
+            params (dict, optional): Parameters from
+                :meth:`sample_clip_params`, used instead of sampling new ones.
 
         Returns:
             dict: Randomly cropped results, 'img_shape' key in result dict is
                 updated according to crop size.
         """
-        image_size = results['img'].shape[:2]
-        if not self.isfix:
-            crop_size = self._get_crop_size(image_size)
-            self.rec = crop_size
+        if params:
+            crop_size = params['crop_size']
         else:
-            crop_size = self.rec
+            crop_size = self._get_crop_size(results['img'].shape[:2])
         results = self._crop_data(results, crop_size, self.allow_negative_crop)
         return results
 
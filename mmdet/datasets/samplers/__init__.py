@@ -1,9 +1,13 @@
 # Copyright (c) OpenMMLab. All rights reserved.
 from .distributed_sampler import DistributedSampler
 from .group_sampler import DistributedGroupSampler, GroupSampler
-from .infinite_sampler import InfiniteBatchSampler, InfiniteGroupBatchSampler
+from .infinite_sampler import (InfiniteBatchSampler, InfiniteClipBatchSampler,
+                               InfiniteGroupBatchSampler)
+from .video_sampler import DistributedVideoSampler, InfiniteVideoBatchSampler
 
 __all__ = [
     'DistributedSampler', 'DistributedGroupSampler', 'GroupSampler',
-    'InfiniteGroupBatchSampler', 'InfiniteBatchSampler'
+    'InfiniteGroupBatchSampler', 'InfiniteBatchSampler',
+    'InfiniteClipBatchSampler', 'DistributedVideoSampler',
+    'InfiniteVideoBatchSampler'
 ]
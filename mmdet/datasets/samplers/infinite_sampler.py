@@ -7,6 +7,7 @@ from mmcv.runner import get_dist_info
 from torch.utils.data.sampler import Sampler
 
 from mmdet.core.utils import sync_random_seed
+from .video_sampler import split_video_chunks
 
 
 class InfiniteGroupBatchSampler(Sampler):
@@ -184,3 +185,72 @@ class InfiniteBatchSampler(Sampler):
     def set_epoch(self, epoch):
         """Not supported in `IterationBased` runner."""
         raise NotImplementedError
+
+
+class InfiniteClipBatchSampler(InfiniteGroupBatchSampler):
+    """Similar to `InfiniteGroupBatchSampler`, but shuffles chunks of
+    neighbouring frames of a clip dataset instead of single frames.
+
+    The clips of neighbouring frames overlap, and a batch is loaded by a
+    single dataloader worker, so with the frames of a batch drawn from a few
+    chunks of ``chunk_size`` consecutive frames of a video, most of the
+    frames of the clips are in the :obj:`LRUFrameCache` of the worker. Larger
+    chunks give higher hit rates but less diverse batches.
+
+    Args:
+        dataset (object): The dataset, ``data_infos`` must be the
+            ``(video, frame)`` of the samples ordered by video and frame.
+        batch_size (int): Same as `InfiniteGroupBatchSampler`.
+        world_size (int, optional): Number of processes participating in
+            distributed training. Default: None.
+        rank (int, optional): Rank of current process. Default: None.
+        seed (int): Random seed. Default: 0.
+        shuffle (bool): Whether shuffle the chunks. Default: True.
+        chunk_size (int): Maximum number of consecutive frames of a video in
+            a chunk. Default: 8.
+    """
+
+    def __init__(self,
+                 dataset,
+                 batch_size=1,
+                 world_size=None,
+                 rank=None,
+                 seed=0,
+                 shuffle=True,
+                 chunk_size=8):
+        self.chunks = [
+            chunk for chunks in split_video_chunks(dataset.data_infos,
+                                                   chunk_size)
+            for chunk in chunks
+        ]
+        self.chunk_size = chunk_size
+        super().__init__(
+            dataset,
+            batch_size=batch_size,
+            world_size=world_size,
+            rank=rank,
+            seed=seed,
+            shuffle=shuffle)
+
+    def _infinite_indices(self):
+        """Infinitely yield a sequence of chunks."""
+        g = torch.Generator()
+        g.manual_seed(self.seed)
+        while True:
+            if self.shuffle:
+                order = torch.randperm(len(self.chunks), generator=g).tolist()
+            else:
+                order = range(len(self.chunks))
+            yield from (self.chunks[i] for i in order)
+
+    def __iter__(self):
+        # chunks are sliced by rank and the indices of a chunk are kept
+        # together in a batch as far as possible
+        for chunk in self.indices:
+            for idx in chunk:
+                flag = self.flag[idx]
+                group_buffer = self.buffer_per_group[flag]
+                group_buffer.append(idx)
+                if len(group_buffer) == self.batch_size:
+                    yield group_buffer[:]
+                    del group_buffer[:]
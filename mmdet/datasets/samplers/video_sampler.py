@@ -0,0 +1,199 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import math
+
+import numpy as np
+import torch
+from mmcv.runner import get_dist_info
+from torch.utils.data.sampler import Sampler
+
+from mmdet.core.utils import sync_random_seed
+
+
+def split_video_chunks(data_infos, chunk_size=0):
+    """Split the indices of a clip dataset into chunks of consecutive frames
+    of a video.
+
+    Args:
+        data_infos (list[tuple]): ``(video, frame)`` of the samples, ordered
+            by video and frame.
+        chunk_size (int): Maximum number of frames in a chunk, 0 for one
+            chunk per video. Default: 0.
+
+    Returns:
+        list[list[list[int]]]: The chunks of each video.
+    """
+    videos = []
+    for idx, (vid, _) in enumerate(data_infos):
+        if idx == 0 or data_infos[idx - 1][0] != vid:
+            videos.append([[]])
+        elif chunk_size > 0 and len(videos[-1][-1]) == chunk_size:
+            videos[-1].append([])
+        videos[-1][-1].append(idx)
+    return videos
+
+
+class _VideoShardMixin:
+    """Per epoch assignment of the videos of a clip dataset to ranks.
+
+    All ranks compute the same plan from ``seed + epoch``: the videos are
+    shuffled and assigned greedily to the rank with the fewest frames so
+    far, then each rank shuffles the chunks of its videos. A rank thus
+    reads a disjoint subset of the videos, which keeps its page cache and
+    frame caches warm, while the batches still mix several videos. With
+    fewer videos than ranks, the ranks left without a video read the
+    videos of another rank.
+    """
+
+    def _init_shards(self, dataset, world_size, rank, seed, shuffle,
+                     chunk_size):
+        _rank, _world_size = get_dist_info()
+        self.world_size = _world_size if world_size is None else world_size
+        self.rank = _rank if rank is None else rank
+        self.dataset = dataset
+        self.shuffle = shuffle
+        self.chunk_size = chunk_size
+        # all ranks must shuffle with the same seed
+        self.seed = sync_random_seed(seed)
+        self.videos = split_video_chunks(dataset.data_infos, chunk_size)
+        assert self.videos, 'The dataset has no sample to draw'
+        self.video_sizes = np.array(
+            [sum(len(chunk) for chunk in chunks) for chunks in self.videos])
+        # the ranks draw the same number of samples per epoch
+        self.num_samples = math.ceil(len(dataset) / self.world_size)
+
+    def _epoch_indices(self, epoch):
+        """The indices of the rank in an epoch."""
+        g = torch.Generator()
+        g.manual_seed(self.seed + epoch)
+        if self.shuffle:
+            order = torch.randperm(len(self.videos), generator=g).tolist()
+        else:
+            order = range(len(self.videos))
+
+        loads = np.zeros(self.world_size, dtype=np.int64)
+        rank_chunks = [[] for _ in range(self.world_size)]
+        for vid in order:
+            rank = int(loads.argmin())
+            loads[rank] += self.video_sizes[vid]
+            rank_chunks[rank].extend(self.videos[vid])
+        chunks = rank_chunks[self.rank]
+        if not chunks:
+            # an empty rank would never fill a batch
+            busy_chunks = [chunks for chunks in rank_chunks if chunks]
+            chunks = busy_chunks[self.rank % len(busy_chunks)]
+        if self.shuffle:
+            # same generator state on all ranks, different chunks
+            perm = torch.randperm(len(chunks), generator=g).tolist()
+            chunks = [chunks[i] for i in perm]
+        indices = [idx for chunk in chunks for idx in chunk]
+
+        # repeat or drop the last chunks to balance the ranks
+        indices = (indices * math.ceil(self.num_samples / max(
+            len(indices), 1)))[:self.num_samples]
+        return indices
+
+
+class DistributedVideoSampler(_VideoShardMixin, Sampler):
+    """Sampler of clip datasets that shards videos across ranks and
+    shuffles chunks of consecutive frames instead of single frames.
+
+    Unlike `DistributedGroupSampler`, the aspect ratio flag is not taken
+    into account, as the frames of the clip datasets are cropped and
+    resized to a fixed scale.
+
+    Args:
+        dataset (object): The dataset, ``data_infos`` must be the
+            ``(video, frame)`` of the samples ordered by video and frame.
+        num_replicas (int, optional): Number of processes participating in
+            distributed training. Default: None.
+        rank (int, optional): Rank of current process. Default: None.
+        shuffle (bool): Whether shuffle the videos and chunks. Default: True.
+        seed (int): Random seed, the order of an epoch is determined by
+            ``seed + epoch``. Default: 0.
+        chunk_size (int): Maximum number of consecutive frames of a video in
+            a chunk, 0 to keep the frames of a video together. Default: 8.
+    """
+
+    def __init__(self,
+                 dataset,
+                 num_replicas=None,
+                 rank=None,
+                 shuffle=True,
+                 seed=0,
+                 chunk_size=8):
+        self._init_shards(dataset, num_replicas, rank, seed, shuffle,
+                          chunk_size)
+        self.epoch = 0
+
+    def __iter__(self):
+        return iter(self._epoch_indices(self.epoch))
+
+    def __len__(self):
+        return self.num_samples
+
+    def set_epoch(self, epoch):
+        self.epoch = epoch
+
+
+class InfiniteVideoBatchSampler(_VideoShardMixin, Sampler):
+    """Similar to `DistributedVideoSampler`, but designed for
+    iteration-based runners like `IterBasedRunner`: it yields mini-batches
+    of the indices of epoch 0, 1, ... without end.
+
+    As the order of each epoch is determined by the seed, the sampler can
+    seek to any iteration with :meth:`set_start_iter`, which is used to
+    continue the sequence of samples when training is resumed.
+
+    Args:
+        dataset (object): Same as `DistributedVideoSampler`.
+        batch_size (int): When model is :obj:`DistributedDataParallel`,
+            it is the number of training samples on each GPU.
+            When model is :obj:`DataParallel`, it is
+            `num_gpus * samples_per_gpu`.
+            Default : 1.
+        world_size (int, optional): Number of processes participating in
+            distributed training. Default: None.
+        rank (int, optional): Rank of current process. Default: None.
+        seed (int): Random seed. Default: 0.
+        shuffle (bool): Whether shuffle the videos and chunks. Default: True.
+        chunk_size (int): Same as `DistributedVideoSampler`. Default: 8.
+    """
+
+    def __init__(self,
+                 dataset,
+                 batch_size=1,
+                 world_size=None,
+                 rank=None,
+                 seed=0,
+                 shuffle=True,
+                 chunk_size=8):
+        self._init_shards(dataset, world_size, rank, seed, shuffle,
+                          chunk_size)
+        self.batch_size = batch_size
+        self.start_iter = 0
+
+    def set_start_iter(self, start_iter):
+        """Start the next iteration over the sampler at batch
+        ``start_iter``."""
+        self.start_iter = start_iter
+
+    def __iter__(self):
+        position = self.start_iter * self.batch_size
+        epoch, offset = divmod(position, self.num_samples)
+        batch_buffer = []
+        while True:
+            for idx in self._epoch_indices(epoch)[offset:]:
+                batch_buffer.append(idx)
+                if len(batch_buffer) == self.batch_size:
+                    yield batch_buffer
+                    batch_buffer = []
+            epoch += 1
+            offset = 0
+
+    def __len__(self):
+        """Length of base dataset."""
+        return len(self.dataset)
+
+    def set_epoch(self, epoch):
+        """Not supported in `IterationBased` runner."""
+        raise NotImplementedError
@@ -0,0 +1,258 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import json
+import os
+import os.path as osp
+import warnings
+
+import numpy as np
+import torch
+
+from mmdet.models.losses.gaze_arccos_loss import (vector_to_yaw_pitch,
+                                                  yaw_pitch_to_vector)
+
+# bump when the layout of the arrays changes to invalidate old caches
+STORE_VERSION = 1
+
+
+def _frame_array(values, num_frames, shape, dtype, fill):
+    """Stack the per frame values of an annotation, missing frames and
+    ``None`` entries are filled with ``fill``."""
+    out = np.full((num_frames, ) + shape, fill, dtype=dtype)
+    for t, value in enumerate(values[:num_frames]):
+        if value is not None:
+            out[t] = value
+    return out
+
+
+class VideoAnnStore:
+    """Annotations of a video dataset as flat numpy arrays.
+
+    The instances of a video with ``T`` frames and ``N`` instances occupy
+    ``T * N`` consecutive rows (frame major) of the per frame arrays, so the
+    annotations of a video or a frame are array slices:
+
+    - ``bboxes``: ``[T, N, 4]`` boxes in (x1, y1, x2, y2).
+    - ``valid``: ``[T, N]`` whether the instance is annotated in the frame.
+    - ``gazes``: ``[T, N, gaze_dim]``, only if built with ``gaze_dim``.
+    - ``blinks``: ``[T, N]``, only if built with ``with_blinks``.
+
+    and ``labels``, ``ids``, ``cat_ids`` and ``iscrowd`` of shape ``[N]``.
+
+    Compared to the dicts of the annotation api this is a handful of python
+    objects, which the dataloader workers share copy-on-write with the main
+    process, and converting the json (boxes, gaze formats) happens once,
+    see :meth:`load_or_build`.
+
+    Args:
+        arrays (dict[str, np.ndarray]): The arrays built by
+            :meth:`from_api`.
+    """
+
+    FRAME_KEYS = ('bboxes', 'valid', 'gazes', 'blinks')
+    INSTANCE_KEYS = ('labels', 'ids', 'cat_ids', 'iscrowd')
+
+    def __init__(self, arrays):
+        self.arrays = arrays
+        self.num_frames = arrays['num_frames']
+        self.num_insts = arrays['num_insts']
+        self.inst_offsets = np.concatenate(
+            [[0], np.cumsum(self.num_insts)]).astype(np.int64)
+        self.row_offsets = np.concatenate(
+            [[0], np.cumsum(self.num_frames * self.num_insts)]).astype(
+                np.int64)
+
+    def __len__(self):
+        return len(self.num_frames)
+
+    @classmethod
+    def from_api(cls,
+                 api,
+                 vid_ids,
+                 cat2label,
+                 gaze_dim=None,
+                 with_blinks=False,
+                 clip_border=False):
+        """Convert the annotations of the videos ``vid_ids`` of an api
+        (:class:`MPEblink`) to arrays.
+
+        Args:
+            api (MPEblink): The annotation api.
+            vid_ids (list[int]): Ids of the videos, the store is indexed by
+                the position in this list.
+            cat2label (dict[int, int]): Maps category ids to labels.
+            gaze_dim (int, optional): Store the gazes, converted to vectors
+                (3) or yaw and pitch (2). Defaults to None.
+            with_blinks (bool): Store ``blinks_binary``. Defaults to False.
+            clip_border (bool): Move boxes starting at negative coordinates
+                to 0 (their size is kept). Defaults to False.
+
+        Returns:
+            VideoAnnStore: The store.
+        """
+        num_frames, num_insts = [], []
+        frame_arrays = {key: [] for key in cls.FRAME_KEYS}
+        inst_arrays = {key: [] for key in cls.INSTANCE_KEYS}
+        for vid_id in vid_ids:
+            T = len(api.loadVids([vid_id])[0]['file_names'])
+            anns = api.loadAnns(api.getAnnIds(vidIds=[vid_id]))
+            num_frames.append(T)
+            num_insts.append(len(anns))
+
+            bboxes = np.zeros((T, len(anns), 4), dtype=np.float32)
+            valid = np.zeros((T, len(anns)), dtype=bool)
+            gazes = np.zeros((T, len(anns), gaze_dim or 0), dtype=np.float32)
+            blinks = np.zeros((T, len(anns)), dtype=np.int64)
+            for n, ann in enumerate(anns):
+                valid[:, n] = _frame_array(
+                    [bbox is not None for bbox in ann['bboxes']], T, (),
+                    bool, False)
+                xywh = _frame_array(ann['bboxes'], T, (4, ), np.float32, 0)
+                if clip_border:
+                    xywh[:, :2] = np.maximum(xywh[:, :2], 0)
+                xywh[:, 2:] += xywh[:, :2]
+                bboxes[:, n] = xywh
+                if gaze_dim is not None:
+                    gaze = [g for g in ann['gaze'] if g is not None]
+                    src_dim = len(gaze[0]) if gaze else gaze_dim
+                    gaze = _frame_array(ann['gaze'], T, (src_dim, ),
+                                        np.float32, np.nan)
+                    if src_dim != gaze_dim:
+                        convert = (
+                            vector_to_yaw_pitch
+                            if gaze_dim == 2 else yaw_pitch_to_vector)
+                        gaze = convert(torch.from_numpy(gaze)).numpy()
+                    gazes[:, n] = gaze
+                if with_blinks:
+                    blinks[:, n] = _frame_array(ann['blinks_binary'], T, (),
+                                                np.int64, 0)
+            frame_arrays['bboxes'].append(bboxes.reshape(-1, 4))
+            frame_arrays['valid'].append(valid.reshape(-1))
+            frame_arrays['gazes'].append(gazes.reshape(-1, gazes.shape[-1]))
+            frame_arrays['blinks'].append(blinks.reshape(-1))
+            inst_arrays['cat_ids'].extend(ann['category_id'] for ann in anns)
+            inst_arrays['labels'].extend(
+                cat2label[ann['category_id']] for ann in anns)
+            # instance ids start from 1
+            inst_arrays['ids'].extend(ann['id'] - 1 for ann in anns)
+            inst_arrays['iscrowd'].extend(
+                bool(ann.get('iscrowd', False)) for ann in anns)
+
+        if gaze_dim is None:
+            frame_arrays.pop('gazes')
+        if not with_blinks:
+            frame_arrays.pop('blinks')
+        empty = dict(
+            bboxes=np.zeros((0, 4), dtype=np.float32),
+            valid=np.zeros(0, dtype=bool),
+            gazes=np.zeros((0, gaze_dim or 0), dtype=np.float32),
+            blinks=np.zeros(0, dtype=np.int64))
+        arrays = {
+            key: np.concatenate(value) if value else empty[key]
+            for key, value in frame_arrays.items()
+        }
+        arrays['labels'] = np.array(inst_arrays['labels'], dtype=np.int64)
+        arrays['ids'] = np.array(inst_arrays['ids'], dtype=np.int64)
+        arrays['cat_ids'] = np.array(inst_arrays['cat_ids'], dtype=np.int64)
+        arrays['iscrowd'] = np.array(inst_arrays['iscrowd'], dtype=bool)
+        arrays['num_frames'] = np.array(num_frames, dtype=np.int64)
+        arrays['num_insts'] = np.array(num_insts, dtype=np.int64)
+        return cls(arrays)
+
+    @classmethod
+    def load_or_build(cls, ann_file, build, cache_file=None, **options):
+        """Load the store of an annotation file from its cache, or build and
+        cache it.
+
+        The cache is an ``.npz`` file next to the annotation file. It is
+        rebuilt when the annotation file or the ``options`` it was built with
+        change.
+
+        Args:
+            ann_file (str): The annotation file.
+            build (callable): Builds the store if the cache is missing or out
+                of date.
+            cache_file (str, optional): Path of the cache, False to disable
+                caching. Defaults to ``<ann_file without ext>.anns.npz``.
+            **options: Options the store is built with, e.g. ``gaze_dim``.
+
+        Returns:
+            VideoAnnStore: The store.
+        """
+        if cache_file is False:
+            return build()
+        if cache_file is None:
+            cache_file = osp.splitext(ann_file)[0] + '.anns.npz'
+        stat = os.stat(ann_file)
+        meta = json.dumps(
+            dict(
+                version=STORE_VERSION,
+                size=stat.st_size,
+                mtime_ns=stat.st_mtime_ns,
+                **options),
+            sort_keys=True)
+
+        if osp.exists(cache_file):
+            with np.load(cache_file) as f:
+                if 'meta' in f and str(f['meta']) == meta:
+                    return cls({k: f[k] for k in f.files if k != 'meta'})
+
+        store = build()
+        tmp_file = f'{cache_file}.{os.getpid()}.tmp.npz'
+        try:
+            np.savez(tmp_file, meta=np.array(meta), **store.arrays)
+            os.replace(tmp_file, cache_file)
+        except OSError as e:
+            warnings.warn(f'Failed to cache the annotations of {ann_file} '
+                          f'to {cache_file}: {e}')
+            if osp.exists(tmp_file):
+                os.remove(tmp_file)
+        return store
+
+    def video(self, vid):
+        """The arrays of the ``vid``-th video, frame arrays are reshaped to
+        ``[T, N, ...]``."""
+        T, N = int(self.num_frames[vid]), int(self.num_insts[vid])
+        rows = slice(self.row_offsets[vid], self.row_offsets[vid + 1])
+        insts = slice(self.inst_offsets[vid], self.inst_offsets[vid + 1])
+        out = {}
+        for key in self.FRAME_KEYS:
+            if key in self.arrays:
+                value = self.arrays[key][rows]
+                out[key] = value.reshape((T, N) + value.shape[1:])
+        for key in self.INSTANCE_KEYS:
+            out[key] = self.arrays[key][insts]
+        return out
+
+    def frame(self, vid, frame_id):
+        """The arrays of a frame, frame arrays have ``N`` rows."""
+        N = int(self.num_insts[vid])
+        start = self.row_offsets[vid] + frame_id * N
+        rows = slice(start, start + N)
+        insts = slice(self.inst_offsets[vid], self.inst_offsets[vid + 1])
+        out = {
+            key: self.arrays[key][rows]
+            for key in self.FRAME_KEYS if key in self.arrays
+        }
+        for key in self.INSTANCE_KEYS:
+            out[key] = self.arrays[key][insts]
+        return out
+
+    def ann_info(self, vid, frame_id):
+        """The annotation of a frame in the format of
+        ``CustomDataset.get_ann_info``.
+
+        Instances not annotated in the frame are skipped and crowd instances
+        go to ``bboxes_ignore``.
+        """
+        frame = self.frame(vid, frame_id)
+        keep = frame['valid'] & ~frame['iscrowd']
+        ignore = frame['valid'] & frame['iscrowd']
+        ann = dict(
+            bboxes=frame['bboxes'][keep],
+            labels=frame['labels'][keep],
+            blinks=frame['blinks'][keep] if 'blinks' in frame else [],
+            bboxes_ignore=frame['bboxes'][ignore],
+            ids=frame['ids'][keep])
+        if 'gazes' in frame:
+            ann['gazes'] = frame['gazes'][keep]
+        return ann
@@ -0,0 +1,195 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import os
+import os.path as osp
+import threading
+
+import numpy as np
+from mmcv.fileio import BaseStorageBackend, FileClient
+
+
+class VideoShard:
+    """Encoded frames of videos packed in a single file.
+
+    The png or jpeg bytes of the frames are concatenated in ``<prefix>.bin``,
+    the frames of a video one after the other in frame order. The index in
+    ``<prefix>.npz`` holds the sorted file names (i.e. ``<vid>/<frame>.png``)
+    and the offset and size of each frame in the file. A frame is read with
+    a single ``pread`` and the frames of a clip, which are neighbours in the
+    file, with a single read of the range covering them.
+
+    A shard replaces the hundreds of thousands of small files of a
+    ``<split>_rawframes`` directory, which are slow to copy and list and
+    cost a metadata lookup for each frame read.
+
+    Args:
+        prefix (str): Prefix of the shard files.
+    """
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+        with np.load(prefix + '.npz') as f:
+            self.index = {key: f[key] for key in f.files}
+        self._fd = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.index['filenames'])
+
+    def __contains__(self, filename):
+        return self._find(filename) is not None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_fd'] = None
+        state['_lock'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _find(self, filename):
+        filenames = self.index['filenames']
+        i = np.searchsorted(filenames, filename)
+        if i < len(filenames) and filenames[i] == filename:
+            return i
+        return None
+
+    def close(self):
+        """Close the file descriptor of the shard, a later read opens it
+        again."""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def __del__(self):
+        # the shard may be collected after a failed __init__
+        if getattr(self, '_fd', None) is not None:
+            self.close()
+
+    def _read(self, offset, size):
+        if self._fd is None:
+            # a file descriptor inherited by forked workers is still valid,
+            # pread does not move its position
+            self._fd = os.open(self.prefix + '.bin', os.O_RDONLY)
+        if hasattr(os, 'pread'):
+            return os.pread(self._fd, size, offset)
+        with self._lock:
+            os.lseek(self._fd, offset, os.SEEK_SET)
+            return os.read(self._fd, size)
+
+    def _locate(self, filenames):
+        inds = [self._find(filename) for filename in filenames]
+        for filename, i in zip(filenames, inds):
+            if i is None:
+                raise KeyError(f'{filename} is not in the video shard '
+                               f'{self.prefix}')
+        return (self.index['offsets'][inds].tolist(),
+                self.index['sizes'][inds].tolist())
+
+    def get(self, filename):
+        """Get the encoded bytes of a frame.
+
+        Args:
+            filename (str): File name of the frame relative to the frame
+                directory the shard was built from.
+
+        Returns:
+            bytes: The content of the frame file.
+        """
+        (offset, ), (size, ) = self._locate([filename])
+        return self._read(offset, size)
+
+    def get_many(self, filenames):
+        """Get the encoded bytes of several frames, e.g. of a clip.
+
+        The frames are read with a single read of the range covering them
+        if it is at most twice as large as the frames, which is the case
+        for neighbouring frames of a video.
+
+        Args:
+            filenames (list[str]): File names of the frames, may repeat.
+
+        Returns:
+            list[bytes]: The content of each frame file.
+        """
+        offsets, sizes = self._locate(filenames)
+        start = min(offsets)
+        end = max(offset + size for offset, size in zip(offsets, sizes))
+        num_bytes = sum(dict(zip(offsets, sizes)).values())
+        if end - start > 2 * num_bytes:
+            return [
+                self._read(offset, size)
+                for offset, size in zip(offsets, sizes)
+            ]
+        buffer = memoryview(self._read(start, end - start))
+        return [
+            bytes(buffer[offset - start:offset - start + size])
+            for offset, size in zip(offsets, sizes)
+        ]
+
+    @staticmethod
+    def write(prefix, frames):
+        """Write frames to a shard.
+
+        Args:
+            prefix (str): Prefix of the shard files.
+            frames (Iterable[tuple[str, bytes]]): File name and content of
+                each frame, the frames of a video in frame order.
+        """
+        filenames, offsets, sizes = [], [], []
+        offset = 0
+        with open(prefix + '.bin', 'wb') as f:
+            for filename, content in frames:
+                f.write(content)
+                filenames.append(filename)
+                offsets.append(offset)
+                sizes.append(len(content))
+                offset += len(content)
+        order = np.argsort(filenames)
+        np.savez(
+            prefix + '.npz',
+            filenames=np.array(filenames)[order],
+            offsets=np.array(offsets, dtype=np.int64)[order],
+            sizes=np.array(sizes, dtype=np.int64)[order])
+
+
+@FileClient.register_backend('video_shard')
+class VideoShardBackend(BaseStorageBackend):
+    """File client backend reading the frames of a directory from a
+    :class:`VideoShard`.
+
+    The paths under ``root`` are looked up in the shard by their path
+    relative to it, so a pipeline reads the shard by only changing the
+    ``file_client_args`` of ``LoadImageFromFile``::
+
+        dict(type='LoadImageFromFile',
+             file_client_args=dict(
+                 backend='video_shard',
+                 root='data/gaze360/train_rawframes'))
+
+    Args:
+        root (str): The frame directory the shard was built from, i.e. the
+            ``img_prefix`` of the dataset.
+        prefix (str, optional): Prefix of the shard files. Defaults to
+            ``root`` without its trailing slash, i.e.
+            ``data/gaze360/train_rawframes.bin`` and ``.npz``.
+    """
+
+    def __init__(self, root, prefix=None):
+        self.root = osp.normpath(root)
+        self.prefix = self.root if prefix is None else prefix
+        self.shard = VideoShard(self.prefix)
+
+    def _key(self, filepath):
+        return osp.relpath(str(filepath), self.root).replace('\\', '/')
+
+    def get(self, filepath):
+        return self.shard.get(self._key(filepath))
+
+    def get_many(self, filepaths):
+        """Read several frames at once, see :meth:`VideoShard.get_many`."""
+        return self.shard.get_many([self._key(path) for path in filepaths])
+
+    def get_text(self, filepath, encoding='utf-8'):
+        return self.get(filepath).decode(encoding)
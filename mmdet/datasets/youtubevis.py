@@ -9,12 +9,13 @@ from mmcv.parallel import DataContainer as DC
 from pycocotools.ytvos import YTVOS
 
 from .builder import DATASETS
+from .clip_mixins import ClipIndexMixin
 from .custom import CustomDataset
 from .pipelines import Compose
 
 
 @DATASETS.register_module()
-class YoutubeVISDataset(CustomDataset):
+class YoutubeVISDataset(ClipIndexMixin, CustomDataset):
 
     CLASSES = ('person_face')
 
@@ -70,6 +71,7 @@ class YoutubeVISDataset(CustomDataset):
             if self.proposals is not None:
                 self.proposals = [self.proposals[i] for i in valid_inds]
 
+        self._build_clip_index()
 
         # set group flag for the sampler
         if not self.test_mode:
@@ -270,24 +272,20 @@ class YoutubeVISDataset(CustomDataset):
     def prepare_train_clip(self, idx):
         vid, frame_id = self.data_infos[idx]
         vid_info = self.vid_infos[vid]
-        sample_range = range(len(vid_info['filenames']))
-        valid_idxs = []
-        for i in sample_range:
-            valid_idx = (vid, i)
-            if valid_idx in self.data_infos:
-                valid_idxs.append(valid_idx)
-        assert len(valid_idxs) > 0
+        valid_frames = self.vid2valid_frames[vid]
+        assert len(valid_frames) > 0
+        first_frame, last_frame = int(valid_frames[0]), int(valid_frames[-1])
         # valid_idxs.sort()
         # 上面几行是根据valid_idx来确定当前视频内有哪些帧可以被采样选取
         frame_interval = 2  # 现在是2帧一采样
-        index_pre = [(vid, frame_id - frame_interval*i) for i in range(1, self.clip_length//2 + 1) if (frame_id - frame_interval*i) >= valid_idxs[0][1] and (vid,frame_id - frame_interval*i) in valid_idxs ]
-        pre_res = [(vid, valid_idxs[0][1]) for i in range(0, self.clip_length//2 - len(index_pre))] # 补第一帧可用帧补剩下的
+        index_pre = [(vid, frame_id - frame_interval*i) for i in range(1, self.clip_length//2 + 1) if (frame_id - frame_interval*i) >= first_frame and (vid,frame_id - frame_interval*i) in self.frame2idx]
+        pre_res = [(vid, first_frame) for i in range(0, self.clip_length//2 - len(index_pre))] # 补第一帧可用帧补剩下的
         index_pre = index_pre + pre_res
-        index_post = [(vid, frame_id + frame_interval*i) for i in range(1, self.clip_length//2 +1) if (frame_id + frame_interval*i) <= valid_idxs[-1][1] and (vid,frame_id + frame_interval*i) in valid_idxs ]
-        post_res = [(vid, valid_idxs[-1][1]) for i in range(0, self.clip_length//2 - len(index_post))] # 用最后一可用帧补
+        index_post = [(vid, frame_id + frame_interval*i) for i in range(1, self.clip_length//2 +1) if (frame_id + frame_interval*i) <= last_frame and (vid,frame_id + frame_interval*i) in self.frame2idx]
+        post_res = [(vid, last_frame) for i in range(0, self.clip_length//2 - len(index_post))] # 用最后一可用帧补
         index_post += post_res
         index_except_center = index_pre + index_post
-        valid_idxs = [idx] + [self.data_infos.index(_) for _ in index_except_center]
+        valid_idxs = [idx] + [self.frame2idx[_] for _ in index_except_center]
         valid_idxs.sort()
         # try:
         #     valid_idxs = [idx] + [
@@ -299,22 +297,11 @@ class YoutubeVISDataset(CustomDataset):
         #     print(e, vid_info)
         #     return None
 
-        clip = []
-
-        for _ in valid_idxs:
-            clip.append(self.prepare_train_img(_))
-
-            # if sum(clip[-1]['gt_blinks'].data) > 0 :
-            #     print(f'there is 1 after self.prepare_train_img')
-
-            if _ == valid_idxs[0]:
-                for tsfm in self.pipeline.transforms:
-                    if hasattr(tsfm, 'isfix'):
-                        tsfm.isfix = True
-            elif _ == valid_idxs[-1]:
-                for tsfm in self.pipeline.transforms:
-                    if hasattr(tsfm, 'isfix'):
-                        tsfm.isfix = False
+        # the frames share the random parameters of the augmentations
+        clip = self.pipeline.clip_call(
+            [self._prepare_train_results(_) for _ in valid_idxs])
+        if clip is None:
+            return None
 
         data = {}
         for key in clip[0]:
@@ -332,14 +319,18 @@ class YoutubeVISDataset(CustomDataset):
     def prepare_test_clip(self, idx):
         raise NotImplementedError
 
-    def prepare_train_img(self, idx):
+    def _prepare_train_results(self, idx):
+        """Result dict of a training frame before the pipeline."""
         img_info = self.get_img_info(idx)   # 获取一些信息，比较重要的是图像的路径，其实该函数内部可以通过vid获取整个视频的信息list，只不过这里取出了frame_id那一帧的信息
         ann_info = self.get_ann_info(idx)
         results = dict(img_info=img_info, ann_info=ann_info)
         if self.proposals is not None:
             results['proposals'] = self.proposals[idx]
         self.pre_pipeline(results)
-        return self.pipeline(results)
+        return results
+
+    def prepare_train_img(self, idx):
+        return self.pipeline(self._prepare_train_results(idx))
 
     def __len__(self):
         return len(self.data_infos)
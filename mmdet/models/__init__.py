@@ -1,16 +1,21 @@
 # Copyright (c) OpenMMLab. All rights reserved.
-from .backbones import *  # noqa: F401,F403
+from mmdet.utils import lazy_import
 from .builder import (BACKBONES, DETECTORS, HEADS, LOSSES, NECKS,
                       ROI_EXTRACTORS, SHARED_HEADS, build_backbone,
                       build_detector, build_head, build_loss, build_neck,
                       build_roi_extractor, build_shared_head)
-from .dense_heads import *  # noqa: F401,F403
-from .detectors import *  # noqa: F401,F403
-from .losses import *  # noqa: F401,F403
-from .necks import *  # noqa: F401,F403
-from .plugins import *  # noqa: F401,F403
-from .roi_heads import *  # noqa: F401,F403
-from .seg_heads import *  # noqa: F401,F403
+
+# Detectors, heads, losses etc. are imported on first access of their name,
+# the registries import them on demand when a config refers to their type.
+__getattr__, __dir__ = lazy_import(
+    __name__,
+    subpackages=('backbones', 'dense_heads', 'detectors', 'losses', 'necks',
+                 'plugins', 'roi_heads', 'seg_heads'))
+
+# The plugins and utils register layers into the registries of mmcv
+# (PLUGIN_LAYERS, POSITIONAL_ENCODING, TRANSFORMER_LAYER, ...), which do not
+# import on demand, so they are imported up front.
+from . import plugins, utils  # noqa: F401, E402, isort:skip
 
 __all__ = [
     'BACKBONES', 'NECKS', 'ROI_EXTRACTORS', 'SHARED_HEADS', 'HEADS', 'LOSSES',
@@ -1,22 +1,30 @@
 # Copyright (c) OpenMMLab. All rights reserved.
-from .csp_darknet import CSPDarknet
-from .darknet import Darknet
-from .detectors_resnet import DetectoRS_ResNet
-from .detectors_resnext import DetectoRS_ResNeXt
-from .efficientnet import EfficientNet
-from .hourglass import HourglassNet
-from .hrnet import HRNet
-from .mobilenet_v2 import MobileNetV2
-from .pvt import PyramidVisionTransformer, PyramidVisionTransformerV2
-from .regnet import RegNet
-from .res2net import Res2Net
-from .resnest import ResNeSt
-from .resnet import ResNet, ResNetV1d
-from .resnext import ResNeXt
-from .ssd_vgg import SSDVGG
-from .swin import SwinTransformer
-from .trident_resnet import TridentResNet
-from .msgshift import MsgShifT
+from mmdet.utils import lazy_import
+
+# Submodules are imported on first access of a name they export.
+__getattr__, __dir__ = lazy_import(
+    __name__, {
+        'CSPDarknet': 'csp_darknet',
+        'Darknet': 'darknet',
+        'DetectoRS_ResNet': 'detectors_resnet',
+        'DetectoRS_ResNeXt': 'detectors_resnext',
+        'EfficientNet': 'efficientnet',
+        'HourglassNet': 'hourglass',
+        'HRNet': 'hrnet',
+        'MobileNetV2': 'mobilenet_v2',
+        'PyramidVisionTransformer': 'pvt',
+        'PyramidVisionTransformerV2': 'pvt',
+        'RegNet': 'regnet',
+        'Res2Net': 'res2net',
+        'ResNeSt': 'resnest',
+        'ResNet': 'resnet',
+        'ResNetV1d': 'resnet',
+        'ResNeXt': 'resnext',
+        'SSDVGG': 'ssd_vgg',
+        'SwinTransformer': 'swin',
+        'TridentResNet': 'trident_resnet',
+        'MsgShifT': 'msgshift'
+    })
 
 __all__ = [
     'RegNet', 'ResNet', 'ResNetV1d', 'ResNeXt', 'SSDVGG', 'HRNet',
@@ -2,9 +2,11 @@
 import warnings
 
 from mmcv.cnn import MODELS as MMCV_MODELS
-from mmcv.utils import Registry
 
-MODELS = Registry('models', parent=MMCV_MODELS)
+from mmdet.utils import LazyRegistry
+
+MODELS = LazyRegistry(
+    'models', packages=('mmdet.models', ), parent=MMCV_MODELS)
 
 BACKBONES = MODELS
 NECKS = MODELS
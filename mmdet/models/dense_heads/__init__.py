@@ -1,45 +1,57 @@
 # Copyright (c) OpenMMLab. All rights reserved.
-from .anchor_free_head import AnchorFreeHead
-from .anchor_head import AnchorHead
-from .atss_head import ATSSHead
-from .autoassign_head import AutoAssignHead
-from .cascade_rpn_head import CascadeRPNHead, StageCascadeRPNHead
-from .centernet_head import CenterNetHead
-from .centripetal_head import CentripetalHead
-from .corner_head import CornerHead
-from .deformable_detr_head import DeformableDETRHead
-from .detr_head import DETRHead
-from .embedding_rpn_head import EmbeddingRPNHead
-from .fcos_head import FCOSHead
-from .fovea_head import FoveaHead
-from .free_anchor_retina_head import FreeAnchorRetinaHead
-from .fsaf_head import FSAFHead
-from .ga_retina_head import GARetinaHead
-from .ga_rpn_head import GARPNHead
-from .gfl_head import GFLHead
-from .guided_anchor_head import FeatureAdaption, GuidedAnchorHead
-from .lad_head import LADHead
-from .ld_head import LDHead
-from .mask2former_head import Mask2FormerHead
-from .maskformer_head import MaskFormerHead
-from .nasfcos_head import NASFCOSHead
-from .paa_head import PAAHead
-from .pisa_retinanet_head import PISARetinaHead
-from .pisa_ssd_head import PISASSDHead
-from .reppoints_head import RepPointsHead
-from .retina_head import RetinaHead
-from .retina_sepbn_head import RetinaSepBNHead
-from .rpn_head import RPNHead
-from .sabl_retina_head import SABLRetinaHead
-from .solo_head import DecoupledSOLOHead, DecoupledSOLOLightHead, SOLOHead
-from .ssd_head import SSDHead
-from .tood_head import TOODHead
-from .vfnet_head import VFNetHead
-from .yolact_head import YOLACTHead, YOLACTProtonet, YOLACTSegmHead
-from .yolo_head import YOLOV3Head
-from .yolof_head import YOLOFHead
-from .yolox_head import YOLOXHead
-from .fixed_embedding_rpn_head import FixedEmbeddingRPNHead
+from mmdet.utils import lazy_import
+
+# Submodules are imported on first access of a name they export.
+__getattr__, __dir__ = lazy_import(
+    __name__, {
+        'AnchorFreeHead': 'anchor_free_head',
+        'AnchorHead': 'anchor_head',
+        'ATSSHead': 'atss_head',
+        'AutoAssignHead': 'autoassign_head',
+        'CascadeRPNHead': 'cascade_rpn_head',
+        'StageCascadeRPNHead': 'cascade_rpn_head',
+        'CenterNetHead': 'centernet_head',
+        'CentripetalHead': 'centripetal_head',
+        'CornerHead': 'corner_head',
+        'DeformableDETRHead': 'deformable_detr_head',
+        'DETRHead': 'detr_head',
+        'EmbeddingRPNHead': 'embedding_rpn_head',
+        'FCOSHead': 'fcos_head',
+        'FoveaHead': 'fovea_head',
+        'FreeAnchorRetinaHead': 'free_anchor_retina_head',
+        'FSAFHead': 'fsaf_head',
+        'GARetinaHead': 'ga_retina_head',
+        'GARPNHead': 'ga_rpn_head',
+        'GFLHead': 'gfl_head',
+        'FeatureAdaption': 'guided_anchor_head',
+        'GuidedAnchorHead': 'guided_anchor_head',
+        'LADHead': 'lad_head',
+        'LDHead': 'ld_head',
+        'Mask2FormerHead': 'mask2former_head',
+        'MaskFormerHead': 'maskformer_head',
+        'NASFCOSHead': 'nasfcos_head',
+        'PAAHead': 'paa_head',
+        'PISARetinaHead': 'pisa_retinanet_head',
+        'PISASSDHead': 'pisa_ssd_head',
+        'RepPointsHead': 'reppoints_head',
+        'RetinaHead': 'retina_head',
+        'RetinaSepBNHead': 'retina_sepbn_head',
+        'RPNHead': 'rpn_head',
+        'SABLRetinaHead': 'sabl_retina_head',
+        'DecoupledSOLOHead': 'solo_head',
+        'DecoupledSOLOLightHead': 'solo_head',
+        'SOLOHead': 'solo_head',
+        'SSDHead': 'ssd_head',
+        'TOODHead': 'tood_head',
+        'VFNetHead': 'vfnet_head',
+        'YOLACTHead': 'yolact_head',
+        'YOLACTProtonet': 'yolact_head',
+        'YOLACTSegmHead': 'yolact_head',
+        'YOLOV3Head': 'yolo_head',
+        'YOLOFHead': 'yolof_head',
+        'YOLOXHead': 'yolox_head',
+        'FixedEmbeddingRPNHead': 'fixed_embedding_rpn_head'
+    })
 
 __all__ = [
     'AnchorFreeHead', 'AnchorHead', 'GuidedAnchorHead', 'FeatureAdaption',
@@ -112,6 +112,35 @@ class FixedEmbeddingRPNHead(BaseModule):
         """Forward function in testing stage."""
         raise NotImplementedError
 
+    def onnx_export(self, img, img_metas):
+        """Decode init_proposal_bboxes for ONNX export.
+
+        Unlike :meth:`_decode_init_proposals`, the proposals are decoded
+        against ``img_metas[0]['img_shape_for_onnx']``, the ``(h, w)`` of
+        the input tensor or of each image as a tensor of shape
+        (batch_size, 2), so that no python loop over the images is traced.
+
+        Args:
+            img (list[Tensor]): List of FPN features.
+            img_metas (list[dict]): List of meta-information of images.
+
+        Returns:
+            Tuple(Tensor): Decoded proposal bboxes with shape
+                (batch_size, num_proposals, 4) and expanded proposal
+                features with shape
+                (batch_size, num_proposals, proposal_feature_channel).
+        """
+        num_imgs = img[0].size(0)
+        proposals = bbox_cxcywh_to_xyxy(self.init_proposal_bboxes.weight)
+        img_shape = img_metas[0]['img_shape_for_onnx']
+        h, w = img_shape[..., 0], img_shape[..., 1]
+        imgs_whwh = torch.stack([w, h, w, h], dim=-1).to(proposals)
+        proposals = (proposals[None] * imgs_whwh.view(-1, 1, 4)).expand(
+            num_imgs, *proposals.size())
+        init_proposal_features = self.init_proposal_features.weight[
+            None].expand(num_imgs, *self.init_proposal_features.weight.size())
+        return proposals, init_proposal_features
+
     def aug_test_rpn(self, feats, img_metas):
         raise NotImplementedError(
             'EmbeddingRPNHead does not support test-time augmentation')
@@ -1,49 +1,55 @@
 # Copyright (c) OpenMMLab. All rights reserved.
-from .atss import ATSS
-from .autoassign import AutoAssign
-from .base import BaseDetector
-from .cascade_rcnn import CascadeRCNN
-from .centernet import CenterNet
-from .cornernet import CornerNet
-from .deformable_detr import DeformableDETR
-from .detr import DETR
-from .fast_rcnn import FastRCNN
-from .faster_rcnn import FasterRCNN
-from .fcos import FCOS
-from .fovea import FOVEA
-from .fsaf import FSAF
-from .gfl import GFL
-from .grid_rcnn import GridRCNN
-from .htc import HybridTaskCascade
-from .kd_one_stage import KnowledgeDistillationSingleStageDetector
-from .lad import LAD
-from .mask2former import Mask2Former
-from .mask_rcnn import MaskRCNN
-from .mask_scoring_rcnn import MaskScoringRCNN
-from .maskformer import MaskFormer
-from .nasfcos import NASFCOS
-from .paa import PAA
-from .panoptic_fpn import PanopticFPN
-from .panoptic_two_stage_segmentor import TwoStagePanopticSegmentor
-from .point_rend import PointRend
-from .queryinst import QueryInst
-from .reppoints_detector import RepPointsDetector
-from .retinanet import RetinaNet
-from .rpn import RPN
-from .scnet import SCNet
-from .single_stage import SingleStageDetector
-from .solo import SOLO
-from .sparse_rcnn import SparseRCNN
-from .tood import TOOD
-from .trident_faster_rcnn import TridentFasterRCNN
-from .two_stage import TwoStageDetector
-from .vfnet import VFNet
-from .yolact import YOLACT
-from .yolo import YOLOV3
-from .yolof import YOLOF
-from .yolox import YOLOX
-from .instblink import InstBlink
-from .multiclue_gaze import MultiClueGaze
+from mmdet.utils import lazy_import
+
+# Submodules are imported on first access of a name they export.
+__getattr__, __dir__ = lazy_import(
+    __name__, {
+        'ATSS': 'atss',
+        'AutoAssign': 'autoassign',
+        'BaseDetector': 'base',
+        'CascadeRCNN': 'cascade_rcnn',
+        'CenterNet': 'centernet',
+        'CornerNet': 'cornernet',
+        'DeformableDETR': 'deformable_detr',
+        'DETR': 'detr',
+        'FastRCNN': 'fast_rcnn',
+        'FasterRCNN': 'faster_rcnn',
+        'FCOS': 'fcos',
+        'FOVEA': 'fovea',
+        'FSAF': 'fsaf',
+        'GFL': 'gfl',
+        'GridRCNN': 'grid_rcnn',
+        'HybridTaskCascade': 'htc',
+        'KnowledgeDistillationSingleStageDetector': 'kd_one_stage',
+        'LAD': 'lad',
+        'Mask2Former': 'mask2former',
+        'MaskRCNN': 'mask_rcnn',
+        'MaskScoringRCNN': 'mask_scoring_rcnn',
+        'MaskFormer': 'maskformer',
+        'NASFCOS': 'nasfcos',
+        'PAA': 'paa',
+        'PanopticFPN': 'panoptic_fpn',
+        'TwoStagePanopticSegmentor': 'panoptic_two_stage_segmentor',
+        'PointRend': 'point_rend',
+        'QueryInst': 'queryinst',
+        'RepPointsDetector': 'reppoints_detector',
+        'RetinaNet': 'retinanet',
+        'RPN': 'rpn',
+        'SCNet': 'scnet',
+        'SingleStageDetector': 'single_stage',
+        'SOLO': 'solo',
+        'SparseRCNN': 'sparse_rcnn',
+        'TOOD': 'tood',
+        'TridentFasterRCNN': 'trident_faster_rcnn',
+        'TwoStageDetector': 'two_stage',
+        'VFNet': 'vfnet',
+        'YOLACT': 'yolact',
+        'YOLOV3': 'yolo',
+        'YOLOF': 'yolof',
+        'YOLOX': 'yolox',
+        'InstBlink': 'instblink',
+        'MultiClueGaze': 'multiclue_gaze'
+    })
 
 __all__ = [
     'ATSS', 'BaseDetector', 'SingleStageDetector', 'TwoStageDetector', 'RPN',
@@ -102,7 +102,12 @@ class MultiClueGaze(QueryInst):
             imgs_whwh=imgs_whwh)
         return roi_losses
     
-    def simple_test(self, img, img_metas, rescale=False, format=False):
+    def simple_test(self,
+                    img,
+                    img_metas,
+                    rescale=False,
+                    format=False,
+                    clip_length=None):
         """Test function without test time augmentation.
 
         Args:
@@ -110,13 +115,17 @@ class MultiClueGaze(QueryInst):
             img_metas (list[dict]): List of image information.
             rescale (bool): Whether to rescale the results.
                 Defaults to False.
+            clip_length (int, optional): Number of frames of each clip when
+                the images are the frames of several clips of the same
+                length. Defaults to None, i.e. a single clip.
 
         Returns:
             list[list[np.ndarray]]: BBox results of each image and classes.
                 The outer list corresponds to each image. The inner list
                 corresponds to each class.
         """
-        B, T = 1, img.size(0)
+        T = img.size(0) if clip_length is None else clip_length
+        B = img.size(0) // T
         x = self.extract_feat(B, T, img)
         proposal_boxes, proposal_features, imgs_whwh = \
             self.rpn_head.simple_test_rpn(x, img_metas) # 这里的proposal_boxes和proposal_feature本身只有100个，也就是不包含时间维度，函数里先单纯复制，因为反正是初始值，下一个函数开始迭代更新
@@ -127,5 +136,43 @@ class MultiClueGaze(QueryInst):
             img_metas,
             imgs_whwh=imgs_whwh,
             rescale=rescale,
-            format=format)
-        return results
\ No newline at end of file
+            format=format,
+            clip_length=T)
+        return results
+
+    def onnx_export(self, img, img_metas, img_shape=None):
+        """Test function for exporting to ONNX, without test time augmentation.
+
+        Args:
+            img (torch.Tensor): Input clips with shape (B, T, C, H, W).
+            img_metas (list[dict]): List of image information.
+            img_shape (torch.Tensor, optional): Height and width of each
+                frame before padding, shape (B, T, 2). The proposals are
+                decoded against it like ``img_shape`` in :meth:`simple_test`.
+                Defaults to None, i.e. the frames are not padded and the
+                input shape is used.
+
+        Returns:
+            tuple[Tensor]: dets of shape (B, T, num_proposals, 5) and the
+                fused, face, eyes and head gaze vectors, each of shape
+                (B, T, gaze_dim).
+        """
+        B, T, C, H, W = img.shape
+        img = img.reshape(-1, C, H, W)
+        if img_shape is None:
+            img_shape = torch._shape_as_tensor(img)[2:]
+        else:
+            img_shape = img_shape.reshape(-1, 2)
+        img_metas[0]['img_shape_for_onnx'] = img_shape
+        x = self.extract_feat(B, T, img)
+        proposal_boxes, proposal_features = self.rpn_head.onnx_export(
+            x, img_metas)
+        dets, gaze_results = self.roi_head.onnx_export(
+            x, proposal_boxes, proposal_features, clip_length=T)
+        dets = dets.reshape(B, T, *dets.shape[1:])
+        outputs = [dets]
+        for key in ('gaze_score', 'face_gaze_score', 'eyes_gaze_score',
+                    'head_gaze_score'):
+            gaze = gaze_results[key]
+            outputs.append(gaze.reshape(B, T, gaze.size(-1)))
+        return tuple(outputs)
\ No newline at end of file
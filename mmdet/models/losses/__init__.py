@@ -1,27 +1,52 @@
 # Copyright (c) OpenMMLab. All rights reserved.
-from .accuracy import Accuracy, accuracy
-from .ae_loss import AssociativeEmbeddingLoss
-from .balanced_l1_loss import BalancedL1Loss, balanced_l1_loss
-from .cross_entropy_loss import (CrossEntropyLoss, binary_cross_entropy,
-                                 cross_entropy, mask_cross_entropy)
-from .dice_loss import DiceLoss
-from .focal_loss import FocalLoss, sigmoid_focal_loss
-from .gaussian_focal_loss import GaussianFocalLoss
-from .gfocal_loss import DistributionFocalLoss, QualityFocalLoss
-from .ghm_loss import GHMC, GHMR
-from .iou_loss import (BoundedIoULoss, CIoULoss, DIoULoss, GIoULoss, IoULoss,
-                       bounded_iou_loss, iou_loss)
-from .kd_loss import KnowledgeDistillationKLDivLoss
-from .mse_loss import MSELoss, mse_loss
-from .pisa_loss import carl_loss, isr_p
-from .seesaw_loss import SeesawLoss
-from .smooth_l1_loss import L1Loss, SmoothL1Loss, l1_loss, smooth_l1_loss
-from .utils import reduce_loss, weight_reduce_loss, weighted_loss
-from .varifocal_loss import VarifocalLoss
-from .gaze_cos_loss import GazeCosLoss
-from .gaze_arccos_loss import GazeArccosLoss
-from .gaze_temp_loss import GazeTempLoss
-from .gaze_pinball_loss import GazePinballLoss
+from mmdet.utils import lazy_import
+
+# Submodules are imported on first access of a name they export.
+__getattr__, __dir__ = lazy_import(
+    __name__, {
+        'Accuracy': 'accuracy',
+        'accuracy': 'accuracy',
+        'AssociativeEmbeddingLoss': 'ae_loss',
+        'BalancedL1Loss': 'balanced_l1_loss',
+        'balanced_l1_loss': 'balanced_l1_loss',
+        'CrossEntropyLoss': 'cross_entropy_loss',
+        'binary_cross_entropy': 'cross_entropy_loss',
+        'cross_entropy': 'cross_entropy_loss',
+        'mask_cross_entropy': 'cross_entropy_loss',
+        'DiceLoss': 'dice_loss',
+        'FocalLoss': 'focal_loss',
+        'sigmoid_focal_loss': 'focal_loss',
+        'GaussianFocalLoss': 'gaussian_focal_loss',
+        'DistributionFocalLoss': 'gfocal_loss',
+        'QualityFocalLoss': 'gfocal_loss',
+        'GHMC': 'ghm_loss',
+        'GHMR': 'ghm_loss',
+        'BoundedIoULoss': 'iou_loss',
+        'CIoULoss': 'iou_loss',
+        'DIoULoss': 'iou_loss',
+        'GIoULoss': 'iou_loss',
+        'IoULoss': 'iou_loss',
+        'bounded_iou_loss': 'iou_loss',
+        'iou_loss': 'iou_loss',
+        'KnowledgeDistillationKLDivLoss': 'kd_loss',
+        'MSELoss': 'mse_loss',
+        'mse_loss': 'mse_loss',
+        'carl_loss': 'pisa_loss',
+        'isr_p': 'pisa_loss',
+        'SeesawLoss': 'seesaw_loss',
+        'L1Loss': 'smooth_l1_loss',
+        'SmoothL1Loss': 'smooth_l1_loss',
+        'l1_loss': 'smooth_l1_loss',
+        'smooth_l1_loss': 'smooth_l1_loss',
+        'reduce_loss': 'utils',
+        'weight_reduce_loss': 'utils',
+        'weighted_loss': 'utils',
+        'VarifocalLoss': 'varifocal_loss',
+        'GazeCosLoss': 'gaze_cos_loss',
+        'GazeArccosLoss': 'gaze_arccos_loss',
+        'GazeTempLoss': 'gaze_temp_loss',
+        'GazePinballLoss': 'gaze_pinball_loss'
+    })
 
 __all__ = [
     'accuracy', 'Accuracy', 'cross_entropy', 'binary_cross_entropy',
@@ -3,10 +3,58 @@ import mmcv
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
+
 from ..builder import LOSSES
 from .utils import weighted_loss
 
 
+def yaw_pitch_to_vector(x):
+    """Convert gazes from (yaw, pitch) to unit vectors, ``[N, 2]`` to
+    ``[N, 3]``."""
+    x = torch.reshape(x, (-1, 2))
+    yaw, pitch = x.unbind(-1)
+    cos_pitch = torch.cos(pitch)
+    return torch.stack(
+        [cos_pitch * torch.sin(yaw),
+         torch.sin(pitch), -cos_pitch * torch.cos(yaw)],
+        dim=-1)
+
+
+def vector_to_yaw_pitch(x):
+    """Convert gazes from vectors to (yaw, pitch), ``[N, 3]`` to
+    ``[N, 2]``."""
+    x = torch.reshape(x, (-1, 3))
+    x = x / torch.norm(x, dim=1, keepdim=True)
+    return torch.stack(
+        [torch.atan2(x[:, 0], -x[:, 2]),
+         torch.asin(x[:, 1])], dim=-1)
+
+
+@mmcv.jit(derivate=True, coderize=True)
+@weighted_loss
+def gaze_arccos_loss(pred, target, eps=1e-6):
+    """Angular error between the predicted and target gazes.
+
+    Args:
+        pred (torch.Tensor): The prediction, 3D vectors or (yaw, pitch)
+            angles, shape (n, 3) or (n, 2).
+        target (torch.Tensor): The learning target of the prediction.
+        eps (float): Eps to avoid a zero norm and the infinite gradient of
+            acos at -1 and 1. Defaults to 1e-6.
+
+    Returns:
+        torch.Tensor: Calculated loss of each prediction, in radians.
+    """
+    if target.numel() == 0:
+        return pred.sum() * 0
+
+    if target.size(-1) != 3:
+        pred = yaw_pitch_to_vector(pred)
+        target = yaw_pitch_to_vector(target)
+    sim = F.cosine_similarity(pred, target, dim=-1, eps=eps)
+    sim = F.hardtanh(sim, -1.0 + eps, 1.0 - eps)
+    return torch.acos(sim)
+
 
 @LOSSES.register_module()
 class GazeArccosLoss(nn.Module):
@@ -39,7 +87,7 @@ class GazeArccosLoss(nn.Module):
             pred (torch.Tensor): The prediction.
             target (torch.Tensor): The learning target of the prediction.
             weight (torch.Tensor, optional): The weight of loss for each
-                prediction. Defaults to None.
+                prediction, shape (n, ) or (n, gaze_dim). Defaults to None.
             avg_factor (int, optional): Average factor that is used to average
                 the loss. Defaults to None.
             reduction_override (str, optional): The reduction method used to
@@ -49,35 +97,20 @@ class GazeArccosLoss(nn.Module):
         assert reduction_override in (None, 'none', 'mean', 'sum')
         reduction = (
             reduction_override if reduction_override else self.reduction)
-        gaze_dim = target.size(1)
-        if gaze_dim != 3:
-            pred = self.yaw_pitch_to_vector(pred)
-            target = self.yaw_pitch_to_vector(target)
-        sim = F.cosine_similarity(pred, target, dim=-1, eps=1e-6)
-        sim = F.hardtanh(sim, -1.0 + 1e-6, 1.0 - 1e-6)
-
-        # dot_product = torch.sum(pred * target, dim=-1)
-        # norm_pred = torch.sqrt(torch.sum(pred ** 2, dim=-1))
-        # norm_target = torch.sqrt(torch.sum(target ** 2, dim=-1))
-        # cos_sim = dot_product / (norm_pred * norm_target)
-
-        loss_angle = torch.acos(sim)
-        
-        return self.loss_weight*loss_angle.mean()
-
+        if weight is not None and weight.dim() > 1:
+            # the loss is computed per gaze, not per coordinate
+            weight = weight.mean(-1)
+        loss = self.loss_weight * gaze_arccos_loss(
+            pred,
+            target,
+            weight,
+            reduction=reduction,
+            avg_factor=avg_factor,
+            **kwargs)
+        return loss
 
     def yaw_pitch_to_vector(self, x):
-        x = torch.reshape(x, (-1, 2))
-        output = torch.zeros((x.shape[0], 3))
-        output[:,2] = - torch.cos(x[:,1]) * torch.cos(x[:,0])
-        output[:,0] = torch.cos(x[:,1]) * torch.sin(x[:,0])
-        output[:,1] = torch.sin(x[:,1])
-        return output
+        return yaw_pitch_to_vector(x)
 
     def vector_to_yaw_pitch(self, x):
-        x = torch.reshape(x, (-1, 3))
-        x = x / torch.norm(x, dim=1).reshape(-1, 1)
-        output = torch.zeros((x.shape[0], 2))
-        output[:,0] = torch.atan2(x[:,0], - x[:,2])
-        output[:,1] = torch.asin(x[:,1])
-        return output
\ No newline at end of file
+        return vector_to_yaw_pitch(x)
@@ -7,6 +7,36 @@ from ..builder import LOSSES
 from .utils import weighted_loss
 
 
+@mmcv.jit(derivate=True, coderize=True)
+@weighted_loss
+def gaze_temp_loss(pred, target, clip_len):
+    """Temporal smoothness loss of the gaze predictions of clips.
+
+    The loss of a frame is the L1 norm of the second difference of the gaze
+    over time. The time axis is padded by reflection, so the loss of the
+    first and last frames of a clip is ``|2 * g[0] - 2 * g[1]|`` and
+    ``|2 * g[-1] - 2 * g[-2]|``.
+
+    Args:
+        pred (torch.Tensor): The gaze predictions of the frames of the clips,
+            shape (num_clips * clip_len, gaze_dim).
+        target (torch.Tensor): The learning target of the prediction, only
+            used for its shape.
+        clip_len (int): Number of frames of a clip.
+
+    Returns:
+        torch.Tensor: Calculated loss of each frame.
+    """
+    if target.numel() == 0:
+        return pred.sum() * 0
+
+    gaze_dim = target.size(-1)
+    pred = pred.view(-1, clip_len, gaze_dim)
+    padded = torch.cat([pred[:, 1:2], pred, pred[:, -2:-1]], dim=1)
+    diff = 2 * padded[:, 1:-1] - padded[:, 2:] - padded[:, :-2]
+    return diff.abs().sum(dim=-1).view(-1)
+
+
 @LOSSES.register_module()
 class GazeTempLoss(nn.Module):
     """Gaze Temp loss.
@@ -14,18 +44,23 @@ class GazeTempLoss(nn.Module):
     Args:
         beta (float, optional): The threshold in the piecewise function.
             Defaults to 1.0.
+        clip_len (int): Number of frames of a clip.
         reduction (str, optional): The method to reduce the loss.
             Options are "none", "mean" and "sum". Defaults to "mean".
         loss_weight (float, optional): The weight of loss.
     """
 
-    def __init__(self, beta=1.0,clip_len =None,reduction='mean', loss_weight=1.0):
+    def __init__(self,
+                 beta=1.0,
+                 clip_len=None,
+                 reduction='mean',
+                 loss_weight=1.0):
         super(GazeTempLoss, self).__init__()
         self.beta = beta
         self.reduction = reduction
         self.loss_weight = loss_weight
         self.clip_len = clip_len
-        assert self.clip_len != None
+        assert self.clip_len is not None
 
     def forward(self,
                 pred,
@@ -40,7 +75,7 @@ class GazeTempLoss(nn.Module):
             pred (torch.Tensor): The prediction.
             target (torch.Tensor): The learning target of the prediction.
             weight (torch.Tensor, optional): The weight of loss for each
-                prediction. Defaults to None.
+                prediction, shape (n, ) or (n, gaze_dim). Defaults to None.
             avg_factor (int, optional): Average factor that is used to average
                 the loss. Defaults to None.
             reduction_override (str, optional): The reduction method used to
@@ -50,17 +85,15 @@ class GazeTempLoss(nn.Module):
         assert reduction_override in (None, 'none', 'mean', 'sum')
         reduction = (
             reduction_override if reduction_override else self.reduction)
-        # 下面由target得到gaze_dim
-        gaze_dim = target.size(1)
-
-
-        pred = pred.view(-1, self.clip_len, gaze_dim)  # 现在是 b，t，3
-        b_s = pred.shape[0]
-        loss = torch.zeros(b_s, self.clip_len).cuda()
-        loss[:, 0] = torch.sum(torch.abs(2 * pred[:, 0, :] - 2 * pred[:, 1, :]), dim=-1)
-        loss[:, -1] = torch.sum(torch.abs(2 * pred[:, -1, :] - 2 * pred[:, -2, :]), dim=-1)
-        loss[:,1:-1]= torch.sum(torch.abs(2 * pred[:, 1:-1, :] - pred[:, 2:, :] - pred[:, 0:-2, :]),dim=-1)
-        loss = loss.view(-1)
-
-
-        return self.loss_weight*loss.mean()
\ No newline at end of file
+        if weight is not None and weight.dim() > 1:
+            # the loss is computed per frame, not per coordinate
+            weight = weight.mean(-1)
+        loss = self.loss_weight * gaze_temp_loss(
+            pred,
+            target,
+            weight,
+            clip_len=self.clip_len,
+            reduction=reduction,
+            avg_factor=avg_factor,
+            **kwargs)
+        return loss
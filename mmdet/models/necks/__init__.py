@@ -1,20 +1,26 @@
 # Copyright (c) OpenMMLab. All rights reserved.
-from .bfp import BFP
-from .channel_mapper import ChannelMapper
-from .ct_resnet_neck import CTResNetNeck
-from .dilated_encoder import DilatedEncoder
-from .dyhead import DyHead
-from .fpg import FPG
-from .fpn import FPN
-from .fpn_carafe import FPN_CARAFE
-from .hrfpn import HRFPN
-from .nas_fpn import NASFPN
-from .nasfcos_fpn import NASFCOS_FPN
-from .pafpn import PAFPN
-from .rfp import RFP
-from .ssd_neck import SSDNeck
-from .yolo_neck import YOLOV3Neck
-from .yolox_pafpn import YOLOXPAFPN
+from mmdet.utils import lazy_import
+
+# Submodules are imported on first access of a name they export.
+__getattr__, __dir__ = lazy_import(
+    __name__, {
+        'BFP': 'bfp',
+        'ChannelMapper': 'channel_mapper',
+        'CTResNetNeck': 'ct_resnet_neck',
+        'DilatedEncoder': 'dilated_encoder',
+        'DyHead': 'dyhead',
+        'FPG': 'fpg',
+        'FPN': 'fpn',
+        'FPN_CARAFE': 'fpn_carafe',
+        'HRFPN': 'hrfpn',
+        'NASFPN': 'nas_fpn',
+        'NASFCOS_FPN': 'nasfcos_fpn',
+        'PAFPN': 'pafpn',
+        'RFP': 'rfp',
+        'SSDNeck': 'ssd_neck',
+        'YOLOV3Neck': 'yolo_neck',
+        'YOLOXPAFPN': 'yolox_pafpn'
+    })
 
 __all__ = [
     'FPN', 'BFP', 'ChannelMapper', 'HRFPN', 'NASFPN', 'FPN_CARAFE', 'PAFPN',
@@ -1,29 +1,27 @@
 # Copyright (c) OpenMMLab. All rights reserved.
-from .base_roi_head import BaseRoIHead
-from .bbox_heads import (BBoxHead, ConvFCBBoxHead, DIIHead,
-                         DoubleConvFCBBoxHead, SABLHead, SCNetBBoxHead,
-                         Shared2FCBBoxHead, Shared4Conv1FCBBoxHead)
-from .cascade_roi_head import CascadeRoIHead
-from .double_roi_head import DoubleHeadRoIHead
-from .dynamic_roi_head import DynamicRoIHead
-from .grid_roi_head import GridRoIHead
-from .htc_roi_head import HybridTaskCascadeRoIHead
-from .mask_heads import (CoarseMaskHead, FCNMaskHead, FeatureRelayHead,
-                         FusedSemanticHead, GlobalContextHead, GridHead,
-                         HTCMaskHead, MaskIoUHead, MaskPointHead,
-                         SCNetMaskHead, SCNetSemanticHead)
-from .mask_scoring_roi_head import MaskScoringRoIHead
-from .pisa_roi_head import PISARoIHead
-from .point_rend_roi_head import PointRendRoIHead
-from .roi_extractors import (BaseRoIExtractor, GenericRoIExtractor,
-                             SingleRoIExtractor)
-from .scnet_roi_head import SCNetRoIHead
-from .shared_heads import ResLayer
-from .sparse_roi_head import SparseRoIHead
-from .standard_roi_head import StandardRoIHead
-from .trident_roi_head import TridentRoIHead
-from .instblink_roi_head import InstBlinkRoIHead
-from .multiclue_gaze_roi_head import MultiClueGazeROIHead
+from mmdet.utils import lazy_import
+
+# Submodules are imported on first access of a name they export.
+__getattr__, __dir__ = lazy_import(
+    __name__, {
+        'BaseRoIHead': 'base_roi_head',
+        'CascadeRoIHead': 'cascade_roi_head',
+        'DoubleHeadRoIHead': 'double_roi_head',
+        'DynamicRoIHead': 'dynamic_roi_head',
+        'GridRoIHead': 'grid_roi_head',
+        'HybridTaskCascadeRoIHead': 'htc_roi_head',
+        'MaskScoringRoIHead': 'mask_scoring_roi_head',
+        'PISARoIHead': 'pisa_roi_head',
+        'PointRendRoIHead': 'point_rend_roi_head',
+        'SCNetRoIHead': 'scnet_roi_head',
+        'SparseRoIHead': 'sparse_roi_head',
+        'StandardRoIHead': 'standard_roi_head',
+        'TridentRoIHead': 'trident_roi_head',
+        'InstBlinkRoIHead': 'instblink_roi_head',
+        'MultiClueGazeROIHead': 'multiclue_gaze_roi_head'
+    },
+    subpackages=('bbox_heads', 'mask_heads', 'roi_extractors',
+                 'shared_heads'))
 
 __all__ = [
     'BaseRoIHead', 'CascadeRoIHead', 'DoubleHeadRoIHead', 'MaskScoringRoIHead',
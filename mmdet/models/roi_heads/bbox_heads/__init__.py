@@ -1,13 +1,21 @@
 # Copyright (c) OpenMMLab. All rights reserved.
-from .bbox_head import BBoxHead
-from .convfc_bbox_head import (ConvFCBBoxHead, Shared2FCBBoxHead,
-                               Shared4Conv1FCBBoxHead)
-from .dii_head import DIIHead
-from .double_bbox_head import DoubleConvFCBBoxHead
-from .sabl_head import SABLHead
-from .scnet_bbox_head import SCNetBBoxHead
-from .stqi_head import STQIHead
-from .gaze_stqi_head  import GazeSTQIHead
+from mmdet.utils import lazy_import
+
+# Submodules are imported on first access of a name they export.
+__getattr__, __dir__ = lazy_import(
+    __name__, {
+        'BBoxHead': 'bbox_head',
+        'ConvFCBBoxHead': 'convfc_bbox_head',
+        'Shared2FCBBoxHead': 'convfc_bbox_head',
+        'Shared4Conv1FCBBoxHead': 'convfc_bbox_head',
+        'DIIHead': 'dii_head',
+        'DoubleConvFCBBoxHead': 'double_bbox_head',
+        'SABLHead': 'sabl_head',
+        'SCNetBBoxHead': 'scnet_bbox_head',
+        'STQIHead': 'stqi_head',
+        'GazeSTQIHead': 'gaze_stqi_head'
+    })
+
 __all__ = [
     'BBoxHead', 'ConvFCBBoxHead', 'Shared2FCBBoxHead',
     'Shared4Conv1FCBBoxHead', 'DoubleConvFCBBoxHead', 'SABLHead', 'DIIHead',
@@ -16,6 +16,9 @@ from mmdet.models.utils import build_transformer
 
 @HEADS.register_module()
 class GazeSTQIHead(BBoxHead):
+    # the region predicted by each proposal
+    REGIONS = ('face', 'eyes', 'head')
+
     def __init__(self,
                  num_classes=80,
                  num_ffn_fcs=2,
@@ -153,17 +156,17 @@ class GazeSTQIHead(BBoxHead):
 
         proposal_feat = proposal_feat.permute(1, 0, 2) # [num_proposals,b*t,256] --> [b*t,num_proposals,256]变回来
         #########把以下注释掉就是去掉了temporal-self-atten
-        proposal_feat = proposal_feat.resize(N // clip_length, clip_length,
+        proposal_feat = proposal_feat.reshape(N // clip_length, clip_length,
                                              num_proposals,
                                              d).permute(1, 0, 2, 3) # [b*t,num_proposals,256] --> [t,b,num_proposals,256]
-        proposal_feat = proposal_feat.resize(clip_length,
+        proposal_feat = proposal_feat.reshape(clip_length,
                                              N * num_proposals // clip_length,
                                              d) # [t,b,num_proposals,256] --> [t,b*num_proposals,256],这是让每个proposal自己，在t维度内做self-atten，太妙了
         proposal_feat = self.attention_norm(self.attention(proposal_feat)) # 让每个proposal自己，在t维度内做self-atten
-        proposal_feat = proposal_feat.resize(clip_length, N // clip_length,
+        proposal_feat = proposal_feat.reshape(clip_length, N // clip_length,
                                              num_proposals,
                                              d).permute(1, 0, 2, 3) # [t,b*num_proposals,256] --> [b,t,num_proposals,256]
-        proposal_feat = proposal_feat.resize(N, num_proposals, d) # [b,t,num_proposals,256] --> [b*t,num_proposals,256] 又回到了最初的shape
+        proposal_feat = proposal_feat.reshape(N, num_proposals, d) # [b,t,num_proposals,256] --> [b*t,num_proposals,256] 又回到了最初的shape
         ############把以上注释掉就是去掉了temporal-self-atten
         attn_feats = proposal_feat
 
@@ -217,66 +220,96 @@ class GazeSTQIHead(BBoxHead):
              **kwargs):
         """"Loss function of DIIHead, get loss of all images.
 
+        The face, eyes and head regions (the proposals of a frame) of all
+        frames are computed together, each region is averaged over its own
+        number of positives as in :meth:`head_loss`.
+
         Args:
             cls_score (Tensor): Classification prediction
                 results of all class, has shape
-                (batch_size * num_proposals_single_image, num_classes)
-            bbox_pred (Tensor): Regression prediction results,
-                has shape
-                (batch_size * num_proposals_single_image, 4), the last
-                dimension 4 represents [tl_x, tl_y, br_x, br_y].
-            labels (Tensor): Label of each proposals, has shape
-                (batch_size * num_proposals_single_image
-            label_weights (Tensor): Classification loss
-                weight of each proposals, has shape
-                (batch_size * num_proposals_single_image
-            bbox_targets (Tensor): Regression targets of each
-                proposals, has shape
-                (batch_size * num_proposals_single_image, 4),
+                (batch_size, num_regions, num_classes)
+            bbox_pred (Tensor | list[Tensor]): Regression prediction results,
+                has shape (batch_size * num_regions, 4) or a list of
+                (num_regions, 4) per image, the last dimension 4 represents
+                [tl_x, tl_y, br_x, br_y].
+            labels (Tensor | list[Tensor]): Label of each proposals, has shape
+                (batch_size * num_regions, ) or a list of (num_regions, ).
+            label_weights (Tensor | list[Tensor]): Classification loss
+                weight of each proposals, same shape as ``labels``.
+            bbox_targets (Tensor | list[Tensor]): Regression targets of each
+                proposals, same shape as ``bbox_pred``,
                 the last dimension 4 represents
                 [tl_x, tl_y, br_x, br_y].
-            bbox_weights (Tensor): Regression loss weight of each
-                proposals's coordinate, has shape
-                (batch_size * num_proposals_single_image, 4),
+            bbox_weights (Tensor | list[Tensor]): Regression loss weight of
+                each proposals's coordinate, same shape as ``bbox_pred``.
             imgs_whwh (Tensor): imgs_whwh (Tensor): Tensor with\
-                shape (batch_size, num_proposals, 4), the last
+                shape (batch_size, num_regions, 4), the last
                 dimension means
                 [img_width,img_height, img_width, img_height].
-            reduction_override (str, optional): The reduction
-                method used to override the original reduction
-                method of the loss. Options are "none",
-                "mean" and "sum". Defaults to None,
+            reduction_override (str, optional): Not used.
 
             Returns:
-                dict[str, Tensor]: Dictionary of loss components
+                dict[str, dict[str, Tensor]]: Dictionary of loss components
+                    of each region.
         """
-        losses = dict()
-        num_region = labels[0].shape[0]
-
-        labels = torch.stack(labels, dim=0)
-        labels = [labels[:, i] for i in range(num_region)]
-
-        label_weights = torch.stack(label_weights, dim=0)
-        label_weights = [label_weights[:, i] for i in range(num_region)]
-
-        bbox_targets = torch.stack(bbox_targets,dim=0)
-        bbox_targets = [bbox_targets[:, i, :] for i in range(num_region)]
+        num_imgs, num_regions = cls_score.shape[:2]
+        # lists of per frame targets and predictions are flattened, so all
+        # regions of all frames go through each loss once
+        labels, label_weights, bbox_targets, bbox_weights, bbox_pred = [
+            torch.cat(x) if isinstance(x, (list, tuple)) else x
+            for x in (labels, label_weights, bbox_targets, bbox_weights,
+                      bbox_pred)
+        ]
+        labels = labels.reshape(-1)
+        label_weights = label_weights.reshape(-1)
+        bbox_targets = bbox_targets.reshape(-1, 4)
+        bbox_weights = bbox_weights.reshape(-1, 4)
+        bbox_pred = bbox_pred.reshape(-1, 4)
+        cls_score = cls_score.reshape(num_imgs * num_regions, -1)
+        imgs_whwh = imgs_whwh.reshape(num_imgs * num_regions, 4)
 
-        bbox_weights = torch.stack(bbox_weights,dim=0)
-        bbox_weights = [bbox_weights[:, i, :] for i in range(num_region)]
-
-        bbox_pred = torch.stack(bbox_pred,dim=0)
-        bbox_pred = [bbox_pred[:, i, :] for i in range(num_region)]
-
-        cls_score = [cls_score[:, i, :] for i in range(num_region)]
-        
-        imgs_whwh = [imgs_whwh[:, i, :] for i in range(num_region)]
+        bg_class_ind = self.num_classes
+        pos_inds = (labels >= 0) & (labels < bg_class_ind)
+        # each region is a binary classification, 0 is the object
+        labels = (~pos_inds).long()
+        region_pos = pos_inds.view(num_imgs, num_regions)
+        num_pos = region_pos.sum(0).float()
+        avg_factor = reduce_mean(num_pos) + torch.finfo(torch.float32).eps
+
+        def region_mean(loss, weight):
+            loss = loss.view(num_imgs * num_regions, -1) * weight.view(
+                num_imgs * num_regions, -1)
+            return loss.view(num_imgs, num_regions, -1).sum((0, 2)) / \
+                avg_factor
+
+        loss_cls = region_mean(
+            self.loss_cls(cls_score, labels, reduction_override='none'),
+            label_weights)
+        pred_labels = cls_score.argmax(-1)
+        pos_acc = ((pred_labels == labels) & pos_inds).view(
+            num_imgs, num_regions).sum(0) * 100. / num_pos.clamp(min=1)
+
+        # boxes of negatives have zero weights
+        bbox_weights = bbox_weights * pos_inds[:, None]
+        loss_bbox = region_mean(
+            self.loss_bbox(
+                bbox_pred / imgs_whwh,
+                bbox_targets / imgs_whwh,
+                reduction_override='none'), bbox_weights)
+        loss_iou = region_mean(
+            self.loss_iou(
+                bbox_pred, bbox_targets, reduction_override='none'),
+            bbox_weights.mean(-1))
 
-        losses['face'] = self.head_loss(cls_score[0], bbox_pred[0], labels[0], label_weights[0], bbox_targets[0], bbox_weights[0], imgs_whwh[0])
-        losses['eyes'] = self.head_loss(cls_score[1], bbox_pred[1], labels[1], label_weights[1], bbox_targets[1], bbox_weights[1], imgs_whwh[1])
-        losses['head'] = self.head_loss(cls_score[2], bbox_pred[2], labels[2], label_weights[2], bbox_targets[2], bbox_weights[2], imgs_whwh[2])
+        losses = dict()
+        for i, region in enumerate(self.REGIONS):
+            losses[region] = dict(
+                loss_cls=loss_cls[i],
+                pos_acc=pos_acc[i],
+                loss_bbox=loss_bbox[i],
+                loss_iou=loss_iou[i])
         return losses
-    
+
     @force_fp32(apply_to=('cls_score', 'bbox_pred'))
     def head_loss(self,
              cls_score,
@@ -420,9 +453,8 @@ class GazeSTQIHead(BBoxHead):
         """Calculate the ground truth for all samples in a batch according to
         the sampling_results.
 
-        Almost the same as the implementation in bbox_head, we passed
-        additional parameters pos_inds_list and neg_inds_list to
-        `_get_target_single` function.
+        The targets of all images are scattered into flat tensors at once,
+        the result is the same as calling `_get_target_single` on each image.
 
         Args:
             sampling_results (List[obj:SamplingResults]): Assign results of
@@ -458,32 +490,64 @@ class GazeSTQIHead(BBoxHead):
                   (num_proposals, 4) when `concat=False`, otherwise just a
                   single tensor has shape (num_all_proposals, 4).
         """
-        pos_inds_list = [res.pos_inds for res in sampling_results]
-        neg_inds_list = [res.neg_inds for res in sampling_results]
-        pos_bboxes_list = [res.pos_bboxes for res in sampling_results]
-        neg_bboxes_list = [res.neg_bboxes for res in sampling_results]
-        pos_gt_bboxes_list = [res.pos_gt_bboxes for res in sampling_results]
-        pos_gt_labels_list = [res.pos_gt_labels for res in sampling_results]
-        labels, label_weights, bbox_targets, bbox_weights = multi_apply(
-            self._get_target_single,
-            pos_inds_list,
-            neg_inds_list,
-            pos_bboxes_list,
-            neg_bboxes_list,
-            pos_gt_bboxes_list,
-            pos_gt_labels_list,
-            cfg=rcnn_train_cfg)
+        # the proposals of all images are indexed in one flat tensor, i.e.
+        # what _get_target_single does per image is a single scatter
+        num_samples = [
+            res.pos_bboxes.size(0) + res.neg_bboxes.size(0)
+            for res in sampling_results
+        ]
+        offsets = [0]
+        for n in num_samples[:-1]:
+            offsets.append(offsets[-1] + n)
+
+        def flat_inds(inds_list):
+            inds = torch.cat(inds_list)
+            # offsets are built on the host, no device sync
+            inds_offsets = inds.new_tensor([
+                offset for offset, i in zip(offsets, inds_list)
+                for _ in range(i.numel())
+            ])
+            return inds + inds_offsets
+
+        pos_inds = flat_inds([res.pos_inds for res in sampling_results])
+        neg_inds = flat_inds([res.neg_inds for res in sampling_results])
+        pos_bboxes = torch.cat([res.pos_bboxes for res in sampling_results])
+        pos_gt_bboxes = torch.cat(
+            [res.pos_gt_bboxes for res in sampling_results])
+        pos_gt_labels = torch.cat(
+            [res.pos_gt_labels for res in sampling_results])
+
+        # BG cat_id = num_classes, FG cat_id = [0, num_classes-1]
+        total = sum(num_samples)
+        labels = pos_bboxes.new_full((total, ), -1, dtype=torch.long)
+        label_weights = pos_bboxes.new_zeros(total)
+        bbox_targets = pos_bboxes.new_zeros(total, 4)
+        bbox_weights = pos_bboxes.new_zeros(total, 4)
+        if pos_inds.numel() > 0:
+            labels[pos_inds] = pos_gt_labels
+            pos_weight = 1.0 if rcnn_train_cfg.pos_weight <= 0 else \
+                rcnn_train_cfg.pos_weight
+            label_weights[pos_inds] = pos_weight
+            if not self.reg_decoded_bbox:
+                pos_bbox_targets = self.bbox_coder.encode(
+                    pos_bboxes, pos_gt_bboxes)
+            else:
+                pos_bbox_targets = pos_gt_bboxes
+            bbox_targets[pos_inds, :] = pos_bbox_targets
+            bbox_weights[pos_inds, :] = 1
+        if neg_inds.numel() > 0:
+            label_weights[neg_inds] = 1
+
         # label: 得到了100个proposal各自的label,对于匹配到gt的,结果就是gt,对于一类来说就是0,none-object对应的label为0+1=1
         # label_weights: 100个proposal都是1
         # bbox_target: 100个proposal中匹配到gt的就是gt的bbox,匹配到none-object的就是[0,0,0,0]
         # bbox_weight: 100个proposal中匹配到gt的就是1,匹配到none-object的就是0
         # 总得来说，匹配到none-object的也要算分类loss,标签是原始分类(max_label+1)，代表none-object类，而bbox不算none-object的loss，只算匹配到gt的
         # 这个是每一帧都有，帧级算loss,比如一个query匹配到一个instance,这个instance在某些帧被遮挡而没出现，那么这个query在这些帧里的label也是none-object,这样算loss就非常合理了
-        # 这个函数之前的操作是把输入转成list,每个元素是一帧的结果，调用多次self._get_target_single,每次的输入是一帧的，type是tensor
         # 其实这个函数的目的在于给计算loss的权重，对于分类，所有的都给weight=1,对于bbox,只有匹配到的正样本的loss weight=1,其余匹配到none-object的负样本的loss weight=0
-        if concat:
-            labels = torch.cat(labels, 0) # 把[b*t,num_proposal]展开成b*t*num_proposal
-            label_weights = torch.cat(label_weights, 0) # 同理展开
-            bbox_targets = torch.cat(bbox_targets, 0)
-            bbox_weights = torch.cat(bbox_weights, 0)
+        if not concat:
+            labels = labels.split(num_samples)
+            label_weights = label_weights.split(num_samples)
+            bbox_targets = bbox_targets.split(num_samples)
+            bbox_weights = bbox_weights.split(num_samples)
         return labels, label_weights, bbox_targets, bbox_weights
\ No newline at end of file
@@ -1,19 +1,25 @@
 # Copyright (c) OpenMMLab. All rights reserved.
-from .coarse_mask_head import CoarseMaskHead
-from .dynamic_mask_head import DynamicMaskHead
-from .fcn_mask_head import FCNMaskHead
-from .feature_relay_head import FeatureRelayHead
-from .fused_semantic_head import FusedSemanticHead
-from .global_context_head import GlobalContextHead
-from .grid_head import GridHead
-from .htc_mask_head import HTCMaskHead
-from .mask_point_head import MaskPointHead
-from .maskiou_head import MaskIoUHead
-from .scnet_mask_head import SCNetMaskHead
-from .scnet_semantic_head import SCNetSemanticHead
-from .base_blink_head import BaseBlinkHead
-from .blink_head import BlinkHead
-from .gaze_head import GazeHead
+from mmdet.utils import lazy_import
+
+# Submodules are imported on first access of a name they export.
+__getattr__, __dir__ = lazy_import(
+    __name__, {
+        'CoarseMaskHead': 'coarse_mask_head',
+        'DynamicMaskHead': 'dynamic_mask_head',
+        'FCNMaskHead': 'fcn_mask_head',
+        'FeatureRelayHead': 'feature_relay_head',
+        'FusedSemanticHead': 'fused_semantic_head',
+        'GlobalContextHead': 'global_context_head',
+        'GridHead': 'grid_head',
+        'HTCMaskHead': 'htc_mask_head',
+        'MaskPointHead': 'mask_point_head',
+        'MaskIoUHead': 'maskiou_head',
+        'SCNetMaskHead': 'scnet_mask_head',
+        'SCNetSemanticHead': 'scnet_semantic_head',
+        'BaseBlinkHead': 'base_blink_head',
+        'BlinkHead': 'blink_head',
+        'GazeHead': 'gaze_head'
+    })
 
 __all__ = [
     'FCNMaskHead', 'HTCMaskHead', 'FusedSemanticHead', 'GridHead',
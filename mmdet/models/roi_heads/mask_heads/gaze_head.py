@@ -2,6 +2,7 @@
 import numpy as np
 import torch
 import torch.nn as nn
+import torch.nn.functional as F
 import math
 from mmcv.runner import BaseModule, ModuleList, auto_fp16, force_fp32
 import copy
@@ -60,6 +61,8 @@ class GazeHead(BaseModule):
         super(GazeHead, self).__init__(init_cfg)
 
         self.fp16_enabled = False
+        # set by fuse_regions()
+        self.fused = False
         self.in_channels = in_channels
         self.gaze_dim = gaze_dim
 
@@ -152,6 +155,37 @@ class GazeHead(BaseModule):
                 (batch_size*num_proposals, num_classes,
                                         pooling_h*2, pooling_w*2).
         """
+        if self.fused and not self.training:
+            region_scores = self._forward_regions_fused(attn_feats)
+        else:
+            region_scores = self._forward_regions(attn_feats)
+        (face_gaze_score, eyes_gaze_score, head_gaze_score, face_confidence,
+         eyes_confidence, head_confidence) = region_scores
+
+        # 下面几行fuse所有region的pred gaze，得到fusion后的gaze_score
+        face_score = face_confidence.expand(face_gaze_score.shape)# [B*t, num_proposal(1), cls_score(1)]
+        eyes_score = eyes_confidence.expand(eyes_gaze_score.shape)
+        head_score = head_confidence.expand(head_gaze_score.shape)
+
+        gaze_feat = torch.cat((face_score * face_gaze_score, eyes_score * eyes_gaze_score, head_score * head_gaze_score), dim=1)
+        gaze_score = self.fc_gaze(gaze_feat)
+        
+        # gaze is 3D vector, need normalization. Normalize in fp32 so that
+        # fp16/bf16 inference still returns unit vectors.
+        gaze_score = gaze_score.float()
+        face_gaze_score = face_gaze_score.float()
+        eyes_gaze_score = eyes_gaze_score.float()
+        head_gaze_score = head_gaze_score.float()
+        gaze_score = gaze_score/torch.norm(gaze_score, dim=-1, keepdim=True)    
+        face_gaze_score = face_gaze_score/torch.norm(face_gaze_score, dim=-1, keepdim=True)
+        eyes_gaze_score = eyes_gaze_score/torch.norm(eyes_gaze_score, dim=-1, keepdim=True)
+        head_gaze_score = head_gaze_score/torch.norm(head_gaze_score, dim=-1, keepdim=True)
+
+        return gaze_score, face_gaze_score, eyes_gaze_score, head_gaze_score
+    
+
+    def _forward_regions(self, attn_feats):
+        """Run the gaze and confidence MLPs of each region one by one."""
         gaze_face_feat = attn_feats[:, 0, :]
         gaze_eyes_feat = attn_feats[:, 1, :]
         gaze_head_feat = attn_feats[:, 2, :]
@@ -184,23 +218,91 @@ class GazeHead(BaseModule):
         face_gaze_score = self.fc_face(gaze_face_feat)# shape=(224, 3)
         eyes_gaze_score = self.fc_eyes(gaze_eyes_feat)
         head_gaze_score = self.fc_head(gaze_head_feat)
-        
-        # 下面几行fuse所有region的pred gaze，得到fusion后的gaze_score
-        face_score = face_confidence.expand(face_gaze_score.shape)# [B*t, num_proposal(1), cls_score(1)]
-        eyes_score = eyes_confidence.expand(eyes_gaze_score.shape)
-        head_score = head_confidence.expand(head_gaze_score.shape)
 
-        gaze_feat = torch.cat((face_score * face_gaze_score, eyes_score * eyes_gaze_score, head_score * head_gaze_score), dim=1)
-        gaze_score = self.fc_gaze(gaze_feat)
-        
-        # gaze is 3D vector, need normalization.
-        gaze_score = gaze_score/torch.norm(gaze_score, dim=-1, keepdim=True)    
-        face_gaze_score = face_gaze_score/torch.norm(face_gaze_score, dim=-1, keepdim=True)
-        eyes_gaze_score = eyes_gaze_score/torch.norm(eyes_gaze_score, dim=-1, keepdim=True)
-        head_gaze_score = head_gaze_score/torch.norm(head_gaze_score, dim=-1, keepdim=True)
+        return (face_gaze_score, eyes_gaze_score, head_gaze_score,
+                face_confidence, eyes_confidence, head_confidence)
+
+    def _forward_regions_fused(self, attn_feats):
+        """Same as :meth:`_forward_regions`, but the MLPs of the 3 regions
+        run as batched matmuls with the weights packed by
+        :meth:`fuse_regions`."""
+        # [6, N, C]: face, eyes and head for the gaze, then for the
+        # confidence MLPs
+        feats = attn_feats[:, :3].transpose(0, 1)
+        feats = torch.cat([feats, feats])
+        for i, eps in enumerate(self._fused_ln_eps):
+            feats = torch.bmm(feats, getattr(self, f'_fused_fc{i}_weight'))
+            feats = F.layer_norm(feats, feats.shape[-1:], eps=eps)
+            feats = torch.addcmul(
+                getattr(self, f'_fused_ln{i}_bias'), feats,
+                getattr(self, f'_fused_ln{i}_weight')).relu()
+        gaze_scores = torch.baddbmm(self._fused_gaze_bias, feats[:3],
+                                    self._fused_gaze_weight)
+        confidences = torch.baddbmm(self._fused_confidence_bias, feats[3:],
+                                    self._fused_confidence_weight)
+        return (*gaze_scores.unbind(0), *confidences.unbind(0))
+
+    @torch.no_grad()
+    def fuse_regions(self):
+        """Pack the weights of the MLPs of the face, eyes and head regions
+        for the fused inference forward.
+
+        The packed weights are non-persistent buffers, so the state dict and
+        the checkpoints keep the per region layers. They are a copy of the
+        weights at the time of the call, call it again after loading other
+        weights. The fused forward is only used in eval mode.
+
+        The MLPs must not be quantized, the fused forward would run on
+        FP32 copies of the weights instead of the quantized layers.
 
-        return gaze_score, face_gaze_score, eyes_gaze_score, head_gaze_score
-    
+        Returns:
+            :obj:`GazeHead`: The head itself.
+        """
+        stacks = (self.gaze_face_fcs, self.gaze_eyes_fcs, self.gaze_head_fcs,
+                  self.gaze_face_confidence, self.gaze_eyes_confidence,
+                  self.gaze_head_confidence)
+        outputs = (self.fc_face, self.fc_eyes, self.fc_head,
+                   self.fc_face_confidence, self.fc_eyes_confidence,
+                   self.fc_head_confidence)
+        # each stack is (Linear, LN, ReLU) * 2
+        num_layers = len(stacks[0]) // 3
+        fcs = [stack[3 * i] for stack in stacks for i in range(num_layers)]
+        for fc in fcs + list(outputs):
+            if not isinstance(fc, nn.Linear):
+                raise TypeError(
+                    f'Cannot fuse the region MLPs of {type(fc).__name__} '
+                    f'layers, fuse_regions and the dynamic quantization of '
+                    f'the gaze head are mutually exclusive')
+        for i in range(num_layers):
+            fcs = [stack[3 * i] for stack in stacks]
+            norms = [stack[3 * i + 1] for stack in stacks]
+            self.register_buffer(
+                f'_fused_fc{i}_weight',
+                torch.stack([fc.weight.t() for fc in fcs]).contiguous(),
+                persistent=False)
+            self.register_buffer(
+                f'_fused_ln{i}_weight',
+                torch.stack([norm.weight for norm in norms]).unsqueeze(1),
+                persistent=False)
+            self.register_buffer(
+                f'_fused_ln{i}_bias',
+                torch.stack([norm.bias for norm in norms]).unsqueeze(1),
+                persistent=False)
+        self._fused_ln_eps = [
+            stacks[0][3 * i + 1].eps for i in range(num_layers)
+        ]
+
+        for name, fcs in (('gaze', outputs[:3]), ('confidence', outputs[3:])):
+            self.register_buffer(
+                f'_fused_{name}_weight',
+                torch.stack([fc.weight.t() for fc in fcs]).contiguous(),
+                persistent=False)
+            self.register_buffer(
+                f'_fused_{name}_bias',
+                torch.stack([fc.bias for fc in fcs]).unsqueeze(1),
+                persistent=False)
+        self.fused = True
+        return self
 
     def loss(self, gaze_results, gaze_targets, gaze_weights, reduction_override=None):
         loss = dict()
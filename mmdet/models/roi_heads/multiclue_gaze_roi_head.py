@@ -110,8 +110,10 @@ class MultiClueGazeROIHead(SparseRoIHead):
         num_imgs = len(img_metas)
         bbox_roi_extractor = self.bbox_roi_extractor[stage] # 每个stage的roi_align_extractor,内部有4个roi_extractor,对应FPN输出的四层特征
         bbox_head = self.bbox_head[stage]
-        bbox_feats = bbox_roi_extractor(x[:bbox_roi_extractor.num_inputs],
-                                        rois) # [b*t*num_proposal,256,所提取roi特征的w,所提取roi特征的h] 这一步做的应该是roi align,输入的rois是上一阶段得到的绝对bbox值吧
+        # RoI align and box decoding run in fp32 under fp16/bf16 autocast
+        bbox_feats = bbox_roi_extractor(
+            [feat.float() for feat in x[:bbox_roi_extractor.num_inputs]],
+            rois.float()) # [b*t*num_proposal,256,所提取roi特征的w,所提取roi特征的h] 这一步做的应该是roi align,输入的rois是上一阶段得到的绝对bbox值吧
         # cls_score, bbox_pred, object_feats, attn_feats = bbox_head(
         #     bbox_feats, object_feats, clip_length)
         cls_score, bbox_pred, object_feats, attn_feats = bbox_head(
@@ -121,7 +123,7 @@ class MultiClueGazeROIHead(SparseRoIHead):
         proposal_list = self.bbox_head[stage].refine_bboxes(
             rois,
             rois.new_zeros(len(rois)),  # dummy arg
-            bbox_pred.view(-1, bbox_pred.size(-1)),
+            bbox_pred.view(-1, bbox_pred.size(-1)).float(),
             [rois.new_zeros(object_feats.size(1)) for _ in range(num_imgs)],
             img_metas) # rois应该是上一个stage的qeury的bbox预测 [x1,y1,x2,y2]，bbox_pred是本阶段tgt预测的bbox,是个delta
         # 上面函数根据本阶段预测的delta得到更新的bbox t*[x1,y1,x2,y2]
@@ -231,34 +233,27 @@ class MultiClueGazeROIHead(SparseRoIHead):
             if gt_bboxes_ignore is None:
                 # TODO support ignore
                 gt_bboxes_ignore = [None for _ in range(num_imgs)]
-            sampling_results = []
             cls_pred_list = bbox_results['detach_cls_score_list']  # 每个输入图像的num_proposals个预测的分类值(B*t, num_proposals)
             proposal_list = bbox_results['detach_proposal_list']  # 每个输入图像的num_proposals个预测的bbox值(B*t, num_proposals, 4)
-            for i in range(B):
-                normolize_bbox_ccwh = []
-                for j in range(T):  # 遍历一个输入clip的每一帧
-                    normolize_bbox_ccwh.append(
-                        bbox_xyxy_to_cxcywh(proposal_list[i * T + j] /
-                                            imgs_whwh[i * T])) # proposal_list中的每一个元素绝对坐标的，这里和原图相除应该是得到0-1归一化值，这个i*t+j就是取出对应batch,对应图片对应帧的100个proposal出来
-                # 在这个clip里面每个proposal与每个gt的对应关系
-                assign_result = self.bbox_assigner[stage].assign(
-                    normolize_bbox_ccwh,            # 传入的bbox_pred只是提供一些shape信息,然后计算匹配cost,这个函数只是求分配的对应id,并没有做好每个pred的target gt
-                    cls_pred_list[i * T:i * T + T],     # 因此，该函数无需输入gaze
-                    gt_bboxes[i * T:i * T + T],
-                    gt_labels[i * T:i * T + T],
-                    img_metas[i * T],
-                    gt_ids=gt_ids[i * T:i * T + T]) # 这里要进行匈牙利匹配了，确实是输出的t帧和gt的t帧进行instance-level匹配,不过assign_result给出了帧级的匹配，就是如果这一帧少一个gt,那result这一帧匹配到none object
-                sampling_result = []
-                for j in range(T):  # 遍历每一帧
-                    #print("B:{}; T:{}".format(i, j))
-                    sampling_result.append(self.bbox_sampler[stage].sample(
-                        assign_result[j], proposal_list[i * T + j],gt_bboxes[i * T + j]
-                        ))  # 这个采样就是划分出了正负样本，其实没采样，比如100个proposal里有3个匹配到了gt,那么就返回三个正样本，97个负样本
-                sampling_results.extend(sampling_result)    # 上面的sample函数会给出正样本的bbox的gt
-            
+            # proposals of all frames normalized by the first frame of their
+            # clip in one go, (b*t, num_proposals, 4)
+            clip_whwh = imgs_whwh.view(B, T, *imgs_whwh.shape[1:])[:, :1]
+            normolize_bbox_ccwh = bbox_xyxy_to_cxcywh(
+                (torch.stack(proposal_list).view(B, T, num_proposals, 4) /
+                 clip_whwh).view(B * T, num_proposals, 4))
+            # 每个proposal与每个gt的对应关系, all clips of the batch at once.
+            # The fixed assignment only uses the shape of the predictions and
+            # the number of gts of each frame
+            assign_results = self.bbox_assigner[stage].assign_batch(
+                normolize_bbox_ccwh, gt_bboxes, T)
+            # 这个采样就是划分出了正负样本，其实没采样，比如100个proposal里有3个匹配到了gt,那么就返回三个正样本，97个负样本,
+            # all frames in one pass
+            sampling_results = self.bbox_sampler[stage].sample_batch(
+                assign_results, proposal_list, gt_bboxes)
+
             bbox_targets = self.bbox_head[stage].get_targets(
                 sampling_results, gt_bboxes, gt_labels, self.train_cfg[stage],
-                False) # bbox_targets是一个4维的tuple, 分别是labels,label_weights,bbox_targets,bbox_weights，作为后续算loss传入的4个参数 关于label的维度就是[b*t*num_proposals],关于bbox的就是[b*t*num_proposals,4]
+                True) # bbox_targets是一个4维的tuple, 分别是labels,label_weights,bbox_targets,bbox_weights，作为后续算loss传入的4个参数 关于label的维度就是[b*t*num_proposals],关于bbox的就是[b*t*num_proposals,4]
             cls_score = bbox_results['cls_score']   # [b*t,num_proposal,num_class]
             decode_bbox_pred = bbox_results['decode_bbox_pred'] # [b*t*num_proposal, 4]
 
@@ -291,7 +286,8 @@ class MultiClueGazeROIHead(SparseRoIHead):
                     img_metas,
                     imgs_whwh,
                     rescale=False,
-                    format=False):
+                    format=False,
+                    clip_length=None):
         """Test without augmentation.
 
         Args:
@@ -307,6 +303,8 @@ class MultiClueGazeROIHead(SparseRoIHead):
                     [img_width,img_height, img_width, img_height].
             rescale (bool): If True, return boxes in original image
                 space. Defaults to False.
+            clip_length (int, optional): Number of frames of each clip in
+                the batch. Defaults to None, i.e. all images are a clip.
 
         Returns:
             list[list[np.ndarray]] or list[tuple]: When no mask branch,
@@ -321,6 +319,8 @@ class MultiClueGazeROIHead(SparseRoIHead):
         assert self.with_bbox, 'Bbox head must be implemented.'
         # Decode initial proposals
         num_imgs = len(img_metas)
+        if clip_length is None:
+            clip_length = num_imgs
         proposal_list = [proposal_boxes[i] for i in range(num_imgs)]    # [t,num_proposal,4]
         ori_shapes = tuple(meta['ori_shape'] for meta in img_metas)
         scale_factors = tuple(meta['scale_factor'] for meta in img_metas)
@@ -337,7 +337,7 @@ class MultiClueGazeROIHead(SparseRoIHead):
         for stage in range(self.num_stages):
             rois = bbox2roi(proposal_list)
             bbox_results = self._bbox_forward(stage, x, rois, object_feats,
-                                              img_metas, clip_length=len(img_metas)) # 和train调用的同一函数
+                                              img_metas, clip_length=clip_length) # 和train调用的同一函数
             # 根据本阶段预测的delta得到更新的bbox [t,4] 4为[x1,y1,x2,y2]
             object_feats = bbox_results['object_feats']
             cls_score = bbox_results['cls_score']
@@ -348,6 +348,7 @@ class MultiClueGazeROIHead(SparseRoIHead):
         det_labels = []
         attn_feats = []
 
+        cls_score = cls_score.float()
         if self.bbox_head[-1].loss_cls.use_sigmoid:
             cls_score = cls_score.sigmoid()
         else:
@@ -382,3 +383,51 @@ class MultiClueGazeROIHead(SparseRoIHead):
             for i in range(0, len(bbox_results[0])):
                 segm_results.append(torch.zeros([10,1]))
             return bbox_results, segm_results
+
+    def onnx_export(self, x, proposal_boxes, proposal_features, clip_length):
+        """Test without augmentation for ONNX export.
+
+        The rois of all images are built with tensor ops instead of
+        :func:`bbox2roi` so that the batch and clip axes stay dynamic in the
+        exported graph. Boxes are not rescaled to the original image space.
+
+        Args:
+            x (list[Tensor]): list of multi-level img features.
+            proposal_boxes (Tensor): Decoded proposal bboxes, has shape
+                (batch_size, num_proposals, 4)
+            proposal_features (Tensor): Expanded proposal
+                features, has shape
+                (batch_size, num_proposals, proposal_feature_channel)
+            clip_length (int): Number of frames of each clip in the batch.
+
+        Returns:
+            tuple[Tensor, dict[str, Tensor]]: dets with shape
+            (batch_size, num_proposals, 5) and the gaze results of the last
+            stage, see :meth:`_gaze_forward`.
+        """
+        assert self.with_bbox, 'Bbox head must be implemented.'
+        num_imgs, num_proposals = proposal_boxes.shape[:2]
+        batch_inds = torch.arange(
+            num_imgs, device=proposal_boxes.device).to(proposal_boxes)
+        batch_inds = batch_inds.view(-1, 1, 1).expand(num_imgs, num_proposals,
+                                                      1)
+        object_feats = proposal_features
+        for stage in range(self.num_stages):
+            rois = torch.cat([batch_inds, proposal_boxes], dim=-1)
+            bbox_roi_extractor = self.bbox_roi_extractor[stage]
+            bbox_head = self.bbox_head[stage]
+            bbox_feats = bbox_roi_extractor(
+                x[:bbox_roi_extractor.num_inputs], rois.reshape(-1, 5))
+            cls_score, bbox_pred, object_feats, _ = bbox_head(
+                bbox_feats, object_feats, clip_length)
+            proposal_boxes = bbox_head.bbox_coder.decode(
+                proposal_boxes.reshape(-1, 4), bbox_pred.reshape(-1, 4))
+            proposal_boxes = proposal_boxes.reshape(num_imgs, num_proposals, 4)
+
+        if self.bbox_head[-1].loss_cls.use_sigmoid:
+            cls_score = cls_score.sigmoid()
+        else:
+            cls_score = cls_score.softmax(-1)[..., :-1]
+        dets = torch.cat([proposal_boxes, cls_score], dim=-1)
+        gaze_results = self._gaze_forward(stage, object_feats, cls_score)
+        return dets, gaze_results
@@ -1,6 +1,12 @@
 # Copyright (c) OpenMMLab. All rights reserved.
-from .base_roi_extractor import BaseRoIExtractor
-from .generic_roi_extractor import GenericRoIExtractor
-from .single_level_roi_extractor import SingleRoIExtractor
+from mmdet.utils import lazy_import
+
+# Submodules are imported on first access of a name they export.
+__getattr__, __dir__ = lazy_import(
+    __name__, {
+        'BaseRoIExtractor': 'base_roi_extractor',
+        'GenericRoIExtractor': 'generic_roi_extractor',
+        'SingleRoIExtractor': 'single_level_roi_extractor'
+    })
 
 __all__ = ['BaseRoIExtractor', 'SingleRoIExtractor', 'GenericRoIExtractor']
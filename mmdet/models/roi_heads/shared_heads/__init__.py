@@ -1,4 +1,10 @@
 # Copyright (c) OpenMMLab. All rights reserved.
-from .res_layer import ResLayer
+from mmdet.utils import lazy_import
+
+# Submodules are imported on first access of a name they export.
+__getattr__, __dir__ = lazy_import(
+    __name__, {
+        'ResLayer': 'res_layer'
+    })
 
 __all__ = ['ResLayer']
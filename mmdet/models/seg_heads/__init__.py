@@ -1,3 +1,11 @@
 # Copyright (c) OpenMMLab. All rights reserved.
-from .panoptic_fpn_head import PanopticFPNHead  # noqa: F401,F403
-from .panoptic_fusion_heads import *  # noqa: F401,F403
+from mmdet.utils import lazy_import
+
+# Submodules are imported on first access of a name they export.
+__getattr__, __dir__ = lazy_import(
+    __name__, {
+        'PanopticFPNHead': 'panoptic_fpn_head',
+        'BasePanopticFusionHead': 'panoptic_fusion_heads',
+        'HeuristicFusionHead': 'panoptic_fusion_heads',
+        'MaskFormerFusionHead': 'panoptic_fusion_heads'
+    })
@@ -1,5 +1,6 @@
 # Copyright (c) OpenMMLab. All rights reserved.
 from .collect_env import collect_env
+from .lazy_import import LazyRegistry, lazy_import
 from .logger import get_caller_name, get_root_logger, log_img_scale
 from .misc import find_latest_checkpoint, update_data_root
 from .setup_env import setup_multi_processes
@@ -7,5 +8,5 @@ from .setup_env import setup_multi_processes
 __all__ = [
     'get_root_logger', 'collect_env', 'find_latest_checkpoint',
     'update_data_root', 'setup_multi_processes', 'get_caller_name',
-    'log_img_scale'
+    'log_img_scale', 'LazyRegistry', 'lazy_import'
 ]
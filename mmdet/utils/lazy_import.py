@@ -0,0 +1,200 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import importlib
+import importlib.util
+import os
+import os.path as osp
+import re
+import sys
+from collections import defaultdict
+
+from mmcv.utils import Registry
+
+_REGISTER_RE = re.compile(
+    r'^\s*@?\w+\.register_module\(\s*(?:name\s*=\s*)?'
+    r'(?:[\'"](?P<name>\w+)[\'"])?')
+_CLASS_RE = re.compile(r'^class\s+(?P<name>\w+)')
+
+# package name -> {registered name -> [module names]}
+_REGISTER_INDEX = {}
+# package name -> ({exported name -> submodule}, lazy subpackages)
+_LAZY_NAMES = {}
+
+
+def lazy_import(package, names=None, subpackages=()):
+    """Defer the imports of a package to the first access of each name.
+
+    Returns a module level ``__getattr__`` and ``__dir__`` (PEP 562) that
+    import the submodule exporting a name the first time it is accessed,
+    instead of importing every submodule in ``__init__``.
+
+    Args:
+        package (str): Name of the package, ``__name__`` in its
+            ``__init__``.
+        names (dict[str, str], optional): Maps each exported name to the
+            submodule, relative to ``package``, it is imported from.
+        subpackages (tuple[str]): Subpackages, relative to ``package``,
+            whose names (their lazy table or ``__all__``) are exported as
+            well, so that they are not repeated in ``names``.
+
+    Returns:
+        tuple[callable]: ``__getattr__`` and ``__dir__`` of the package.
+    """
+    _LAZY_NAMES[package] = (dict(names or {}), tuple(subpackages))
+
+    def __getattr__(name):
+        names = _lazy_names(package)
+        if name in names:
+            module = importlib.import_module(f'{package}.{names[name]}')
+            value = getattr(module, name)
+        elif importlib.util.find_spec(f'{package}.{name}') is not None:
+            value = importlib.import_module(f'{package}.{name}')
+        else:
+            raise AttributeError(
+                f'module {package!r} has no attribute {name!r}')
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__():
+        return sorted(
+            set(vars(sys.modules[package])) | set(_lazy_names(package)))
+
+    return __getattr__, __dir__
+
+
+def _lazy_names(package):
+    """The names of a lazy package, including those of its subpackages,
+    mapped to the submodule each one is imported from."""
+    names, subpackages = _LAZY_NAMES[package]
+    if subpackages:
+        for subpackage in subpackages:
+            # the __init__ of a lazy subpackage only declares its table, an
+            # eager one exports its __all__
+            module = importlib.import_module(f'{package}.{subpackage}')
+            if module.__name__ in _LAZY_NAMES:
+                sub_names = _lazy_names(module.__name__)
+            else:
+                sub_names = getattr(module, '__all__', ())
+            for name in sub_names:
+                names.setdefault(name, subpackage)
+        _LAZY_NAMES[package] = (names, ())
+    return names
+
+
+def _build_register_index(package):
+    """Scan the sources of a package for ``register_module`` calls.
+
+    Reading the sources costs a few milliseconds, importing all the modules
+    to run their registrations costs seconds.
+    """
+    index = defaultdict(list)
+    module_files = {}
+    root = osp.dirname(importlib.import_module(package).__file__)
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            if not filename.endswith('.py'):
+                continue
+            path = osp.join(dirpath, filename)
+            parts = osp.splitext(osp.relpath(path, root))[0].split(os.sep)
+            if parts[-1] == '__init__':
+                parts = parts[:-1]
+            module = '.'.join([package] + parts)
+            module_files[module] = path
+            with open(path, encoding='utf-8') as f:
+                pending = False
+                for line in f:
+                    match = _REGISTER_RE.match(line)
+                    if match:
+                        if match.group('name'):
+                            index[match.group('name')].append(module)
+                        else:
+                            pending = line.lstrip().startswith('@')
+                        continue
+                    match = _CLASS_RE.match(line)
+                    if match and pending:
+                        index[match.group('name')].append(module)
+                        pending = False
+
+    # A name registered by several modules (e.g. old copies of a head kept
+    # next to the current one) resolves to the modules their package
+    # exports, the same ones an eager import of the package would run.
+    for name, modules in index.items():
+        if len(modules) > 1:
+            exported = [m for m in modules if _is_exported(module_files[m])]
+            index[name] = exported or modules
+    return dict(index)
+
+
+def _is_exported(path):
+    """Whether the ``__init__`` of its package imports a module file."""
+    basename = osp.splitext(osp.basename(path))[0]
+    init_file = osp.join(osp.dirname(path), '__init__.py')
+    with open(init_file, encoding='utf-8') as f:
+        return re.search(rf'[\'.]{basename}\b', f.read()) is not None
+
+
+def _get_register_index(package):
+    if package not in _REGISTER_INDEX:
+        _REGISTER_INDEX[package] = _build_register_index(package)
+    return _REGISTER_INDEX[package]
+
+
+def import_registered_module(name, packages):
+    """Import the modules of ``packages`` that register ``name``.
+
+    Args:
+        name (str): The registered name, e.g. ``'MultiClueGaze'``.
+        packages (tuple[str]): Packages to search.
+
+    Returns:
+        bool: Whether a module registering ``name`` was found.
+    """
+    found = False
+    for package in packages:
+        for module in _get_register_index(package).get(name, []):
+            importlib.import_module(module)
+            found = True
+    return found
+
+
+def import_all_registered_modules(packages):
+    """Import every module of ``packages`` that registers something."""
+    for package in packages:
+        for modules in _get_register_index(package).values():
+            for module in modules:
+                importlib.import_module(module)
+
+
+class LazyRegistry(Registry):
+    """A registry that imports the module registering a type on first use.
+
+    The packages of the registry are not imported up front, a lookup of a
+    name that is not registered yet imports the modules that register it,
+    found by :func:`import_registered_module`. If that fails, all modules of
+    the packages are imported before giving up.
+
+    Args:
+        name (str): Registry name.
+        packages (tuple[str]): Packages whose modules register into this
+            registry.
+        **kwargs: Other arguments of :class:`mmcv.utils.Registry`.
+    """
+
+    def __init__(self, name, packages=(), **kwargs):
+        super(LazyRegistry, self).__init__(name, **kwargs)
+        self._packages = tuple(packages)
+        self._imported_all = False
+
+    def get(self, key):
+        obj = super(LazyRegistry, self).get(key)
+        if obj is not None:
+            return obj
+        scope, real_key = self.split_scope_key(key)
+        if scope is not None and scope != self._scope:
+            return None
+        if import_registered_module(real_key, self._packages):
+            obj = super(LazyRegistry, self).get(key)
+        if obj is None and not self._imported_all:
+            self._imported_all = True
+            import_all_registered_modules(self._packages)
+            obj = super(LazyRegistry, self).get(key)
+        return obj
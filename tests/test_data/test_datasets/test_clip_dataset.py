@@ -0,0 +1,194 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import itertools
+import pickle
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+import torch
+from mmcv.parallel import DataContainer as DC
+
+from mmdet.datasets import DATASETS
+from mmdet.datasets.frame_cache import LRUFrameCache
+from mmdet.datasets.pipelines import Compose
+from mmdet.datasets.samplers import (DistributedVideoSampler,
+                                     InfiniteClipBatchSampler,
+                                     InfiniteVideoBatchSampler)
+from mmdet.datasets.samplers.video_sampler import split_video_chunks
+
+
+def _reference_clip(dataset, idx, frame_interval):
+    """Neighbour sampling of ``prepare_train_clip`` by scanning
+    ``data_infos``."""
+    vid, frame_id = dataset.data_infos[idx]
+    valid = [(vid, i) for i in range(len(dataset.vid_infos[vid]['filenames']))
+             if (vid, i) in dataset.data_infos]
+    half = dataset.clip_length // 2
+    pre = [(vid, frame_id - frame_interval * i) for i in range(1, half + 1)
+           if frame_id - frame_interval * i >= valid[0][1]
+           and (vid, frame_id - frame_interval * i) in valid]
+    pre += [valid[0]] * (half - len(pre))
+    post = [(vid, frame_id + frame_interval * i) for i in range(1, half + 1)
+            if frame_id + frame_interval * i <= valid[-1][1]
+            and (vid, frame_id + frame_interval * i) in valid]
+    post += [valid[-1]] * (half - len(post))
+    return sorted([idx] + [dataset.data_infos.index(_) for _ in pre + post])
+
+
+@pytest.mark.parametrize('dataset, frame_interval',
+                         [('Gaze360Dataset', 1), ('MPEblinkDataset', 2),
+                          ('YoutubeVISDataset_Sampled', 2),
+                          ('YoutubeVISDataset', 2)])
+def test_prepare_train_clip_index(dataset, frame_interval):
+    if dataset.startswith('YoutubeVIS'):
+        pytest.importorskip('pycocotools.ytvos')
+    dataset_class = DATASETS.get(dataset)
+    dataset = dataset_class.__new__(dataset_class)
+    dataset.clip_length = 7
+    dataset.pipeline = Compose(
+        [lambda results: dict(idx=DC(torch.tensor(results['idx'])))])
+    dataset.vid_infos = [dict(filenames=[None] * n) for n in (12, 3, 9)]
+    # frames dropped by the filter leave holes in the videos
+    dataset.data_infos = [(vid, frame_id)
+                          for vid, n in enumerate((12, 3, 9))
+                          for frame_id in range(n)
+                          if (vid, frame_id) not in [(0, 0), (0, 5), (2, 4)]]
+    dataset._prepare_train_results = lambda i: dict(idx=i)
+    dataset._build_clip_index()
+
+    assert dataset.frame2idx[(0, 1)] == 0
+    assert dataset.vid2valid_frames[2].tolist() == [0, 1, 2, 3, 5, 6, 7, 8]
+    for idx in range(len(dataset.data_infos)):
+        data = dataset.prepare_train_clip(idx)
+        assert data['idx'].data.tolist() == _reference_clip(
+            dataset, idx, frame_interval)
+
+
+def test_lru_frame_cache():
+    cache = LRUFrameCache(2)
+    assert cache.get('a') is None
+    cache.put('a', np.zeros(1))
+    cache.put('b', np.ones(1))
+    assert cache.get('a') is not None
+    # 'b' is the least recently used frame
+    cache.put('c', np.ones(1))
+    assert len(cache) == 2
+    assert cache.get('b') is None
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert cache.hit_rate == pytest.approx(1 / 3)
+
+    # the frames are not copied to the workers
+    cache = pickle.loads(pickle.dumps(cache))
+    assert len(cache) == 0
+    cache.put('a', np.zeros(1))
+    assert cache.get('a') is not None
+
+
+def test_infinite_clip_batch_sampler():
+    dataset = MagicMock()
+    dataset.data_infos = [(vid, frame_id)
+                          for vid, n in enumerate((10, 3, 9))
+                          for frame_id in range(n)]
+    dataset.flag = np.zeros(len(dataset.data_infos), dtype=np.uint8)
+    dataset.__len__.return_value = len(dataset.data_infos)
+    sampler = InfiniteClipBatchSampler(
+        dataset, batch_size=4, world_size=1, rank=0, chunk_size=4)
+    assert [len(chunk) for chunk in sampler.chunks] == [4, 4, 2, 3, 4, 4, 1]
+
+    batches = list(itertools.islice(iter(sampler), 22))
+    assert all(len(batch) == 4 for batch in batches)
+    # every frame is sampled once per epoch of chunks
+    indices = sum(batches, [])
+    assert sorted(indices) == sorted(list(range(len(dataset.data_infos))) * 4)
+    # chunks are not split
+    epoch = indices[:len(dataset.data_infos)]
+    for chunk in sampler.chunks:
+        start = epoch.index(chunk[0])
+        assert epoch[start:start + len(chunk)] == chunk
+
+    # the ranks sample different chunks
+    chunks = [
+        list(itertools.islice(
+            InfiniteClipBatchSampler(
+                dataset, world_size=2, rank=rank, chunk_size=4).indices,
+            len(sampler.chunks) // 2)) for rank in range(2)
+    ]
+    assert not set(map(tuple, chunks[0])) & set(map(tuple, chunks[1]))
+
+
+def _video_dataset(lengths):
+    dataset = MagicMock()
+    dataset.data_infos = [(vid, frame_id) for vid, n in enumerate(lengths)
+                          for frame_id in range(n)]
+    dataset.__len__.return_value = len(dataset.data_infos)
+    return dataset
+
+
+def test_distributed_video_sampler():
+    dataset = _video_dataset((10, 3, 9, 6, 4, 8))
+    samplers = [
+        DistributedVideoSampler(
+            dataset, num_replicas=2, rank=rank, seed=3, chunk_size=4)
+        for rank in range(2)
+    ]
+    epochs = []
+    for epoch in range(2):
+        indices = []
+        for sampler in samplers:
+            sampler.set_epoch(epoch)
+            indices.append(list(sampler))
+            assert len(indices[-1]) == len(sampler) == 20
+            # deterministic under the seed
+            assert list(sampler) == indices[-1]
+        # the ranks read disjoint videos
+        vids = [{dataset.data_infos[i][0] for i in rank_indices}
+                for rank_indices in indices]
+        assert not vids[0] & vids[1]
+        epochs.append(indices)
+    assert epochs[0] != epochs[1]
+
+    # chunks of a video are not split
+    for chunks in split_video_chunks(dataset.data_infos, 4):
+        for chunk in chunks:
+            if chunk[0] in indices[0]:
+                start = indices[0].index(chunk[0])
+                segment = indices[0][start:start + len(chunk)]
+                assert segment == chunk[:len(segment)]
+
+
+def test_infinite_video_batch_sampler():
+    dataset = _video_dataset((10, 3, 9, 6, 4, 8))
+    sampler = InfiniteVideoBatchSampler(
+        dataset, batch_size=3, world_size=2, rank=1, seed=3, chunk_size=4)
+    batches = list(itertools.islice(iter(sampler), 30))
+    assert sum(batches[:20], []) == sum(
+        (sampler._epoch_indices(epoch) for epoch in range(3)), [])
+    # the same epochs as the epoch based sampler
+    epoch_sampler = DistributedVideoSampler(
+        dataset, num_replicas=2, rank=1, seed=3, chunk_size=4)
+    epoch_sampler.set_epoch(1)
+    assert sum(batches, [])[20:40] == list(epoch_sampler)
+
+    # resumed training continues the sequence
+    sampler.set_start_iter(7)
+    assert list(itertools.islice(iter(sampler), 23)) == batches[7:]
+
+
+def test_video_sampler_more_ranks_than_videos():
+    dataset = _video_dataset((5, 3))
+    samplers = [
+        InfiniteVideoBatchSampler(
+            dataset, batch_size=2, world_size=3, rank=rank, seed=3)
+        for rank in range(3)
+    ]
+    for epoch in range(3):
+        # the rank without a video reads the video of another rank
+        for sampler in samplers:
+            indices = sampler._epoch_indices(epoch)
+            assert len(indices) == sampler.num_samples == 3
+            assert len({dataset.data_infos[i][0] for i in indices}) == 1
+    for sampler in samplers:
+        assert len(list(itertools.islice(iter(sampler), 4))) == 4
+
+    with pytest.raises(AssertionError):
+        DistributedVideoSampler(_video_dataset(()), num_replicas=2, rank=0)
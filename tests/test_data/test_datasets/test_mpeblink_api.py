@@ -0,0 +1,145 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import os
+import os.path as osp
+
+import mmcv
+import pytest
+
+from mmdet.datasets.mpeblink_api import (JsonlAnnWriter, MPEblink,
+                                         PackedMPEblink, StreamMPEblink,
+                                         load_ann_file)
+
+
+def _create_ann_file(ann_file):
+    videos = [
+        dict(id=vid_id, width=64, height=48, file_names=['a.png', 'b.png'])
+        for vid_id in (1, 3, 2)
+    ]
+    annotations = []
+    # annotations of a video are not contiguous in the file
+    for ann_id, (vid_id, cat_id) in enumerate([(1, 1), (3, 2), (1, 2),
+                                                (2, 1), (3, 1), (1, 1)], 10):
+        annotations.append(
+            dict(
+                id=ann_id,
+                video_id=vid_id,
+                category_id=cat_id,
+                iscrowd=int(ann_id == 12),
+                avg_area=float(ann_id),
+                bboxes=[[0, 0, ann_id, ann_id], None],
+                blinks_binary=[0, 1]))
+    categories = [dict(id=1, name='eye'), dict(id=2, name='face')]
+    mmcv.dump(
+        dict(videos=videos, annotations=annotations, categories=categories),
+        ann_file)
+
+
+def test_packed_mpeblink(tmp_path):
+    ann_file = osp.join(tmp_path, 'train.json')
+    _create_ann_file(ann_file)
+    api = MPEblink(ann_file)
+    packed = PackedMPEblink(ann_file)
+    assert osp.exists(osp.join(tmp_path, 'train.packed.npy'))
+
+    assert packed.getCatIds() == api.getCatIds()
+    assert packed.getVidIds() == api.getVidIds()
+    assert sorted(packed.getVidIds(catIds=[2])) == sorted(
+        api.getVidIds(catIds=[2]))
+    for kwargs in [
+            dict(),
+            dict(vidIds=[1]),
+            dict(vidIds=[3, 1]),
+            dict(vidIds=1, catIds=[1]),
+            dict(vidIds=[4]),
+            dict(areaRng=[10.5, 14]),
+            dict(iscrowd=False),
+    ]:
+        assert packed.getAnnIds(**kwargs) == api.getAnnIds(**kwargs)
+    ann_ids = api.getAnnIds(vidIds=[3, 1])
+    assert packed.loadAnns(ann_ids) == api.loadAnns(ann_ids)
+    assert packed.loadAnns(13) == api.loadAnns(13)
+    assert packed.loadVids([2, 1]) == api.loadVids([2, 1])
+    with pytest.raises(KeyError):
+        packed.loadAnns([99])
+
+    # the packed files are reused until the annotation file changes
+    mtime = os.stat(osp.join(tmp_path, 'train.packed.npz')).st_mtime_ns
+    PackedMPEblink(ann_file)
+    assert os.stat(osp.join(tmp_path,
+                            'train.packed.npz')).st_mtime_ns == mtime
+    _create_ann_file(ann_file)
+    os.utime(ann_file, ns=(mtime + 10**9, mtime + 10**9))
+    PackedMPEblink(ann_file)
+    assert os.stat(osp.join(tmp_path,
+                            'train.packed.npz')).st_mtime_ns != mtime
+
+
+def test_stream_mpeblink(tmp_path):
+    ann_file = osp.join(tmp_path, 'train.json')
+    _create_ann_file(ann_file)
+    dataset = mmcv.load(ann_file)
+    jsonl_file = osp.join(tmp_path, 'train.jsonl')
+    with JsonlAnnWriter(
+            jsonl_file, categories=dataset['categories']) as writer:
+        for video in dataset['videos']:
+            writer.add_video(video, [
+                ann for ann in dataset['annotations']
+                if ann['video_id'] == video['id']
+            ])
+    assert not osp.exists(jsonl_file + f'.{os.getpid()}.tmp')
+    loaded = load_ann_file(jsonl_file)
+    assert loaded['videos'] == dataset['videos']
+    assert loaded['categories'] == dataset['categories']
+    assert sorted(loaded['annotations'], key=lambda ann: ann['id']) == \
+        dataset['annotations']
+
+    # the json lines file is the same dataset as the json one
+    json_api = MPEblink(ann_file)
+    api = MPEblink(jsonl_file)
+    assert sorted(api.getAnnIds()) == json_api.getAnnIds()
+    assert api.loadAnns(api.getAnnIds()) == json_api.loadAnns(
+        api.getAnnIds())
+
+    stream = StreamMPEblink(jsonl_file)
+    assert osp.exists(osp.join(tmp_path, 'train.index.npz'))
+    assert stream.getCatIds() == api.getCatIds()
+    assert stream.getVidIds() == api.getVidIds()
+    assert sorted(stream.getVidIds(catIds=[2])) == sorted(
+        api.getVidIds(catIds=[2]))
+    for kwargs in [
+            dict(),
+            dict(vidIds=[1]),
+            dict(vidIds=[3, 1]),
+            dict(vidIds=1, catIds=[1]),
+            dict(vidIds=[4]),
+            dict(areaRng=[10.5, 14]),
+            dict(iscrowd=False),
+    ]:
+        assert stream.getAnnIds(**kwargs) == api.getAnnIds(**kwargs)
+    ann_ids = api.getAnnIds(vidIds=[3, 1])
+    assert stream.loadAnns(ann_ids) == api.loadAnns(ann_ids)
+    assert stream.loadAnns(13) == api.loadAnns(13)
+    assert stream.loadVids([2, 1]) == api.loadVids([2, 1])
+    with pytest.raises(KeyError):
+        stream.loadVids([99])
+
+    # a .json file is written in the json format
+    json_file = osp.join(tmp_path, 'written.json')
+    with JsonlAnnWriter(
+            json_file, info=dict(year='2022'),
+            categories=dataset['categories']) as writer:
+        for video in dataset['videos']:
+            writer.add_video(video, [
+                ann for ann in dataset['annotations']
+                if ann['video_id'] == video['id']
+            ])
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
+    written = mmcv.load(json_file)
+    assert written == dict(loaded, info=dict(year='2022'))
+
+    # an interrupted writer leaves the previous file
+    with pytest.raises(RuntimeError):
+        with JsonlAnnWriter(jsonl_file) as writer:
+            writer.add_video(dict(id=5, file_names=[]))
+            raise RuntimeError
+    assert load_ann_file(jsonl_file) == loaded
@@ -0,0 +1,148 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import os.path as osp
+from unittest.mock import MagicMock
+
+import mmcv
+import numpy as np
+import pytest
+
+from mmdet.datasets import DATASETS
+from mmdet.datasets.video_ann_store import VideoAnnStore
+
+
+def _create_ann_file(ann_file):
+    lengths = (4, 3)
+    videos = [
+        dict(
+            id=vid + 1,
+            width=64,
+            height=48,
+            length=length,
+            file_names=[f'{vid}/{t:05d}.png' for t in range(length)])
+        for vid, length in enumerate(lengths)
+    ]
+    annotations = []
+    rng = np.random.RandomState(0)
+    for vid, length in enumerate(lengths):
+        for cat_id in (1, 2, 3):
+            bboxes = rng.uniform(-5, 30, (length, 4)).tolist()
+            # the first frame of the first video has no annotation
+            if vid == 0:
+                bboxes[0] = None
+            if cat_id == 2:
+                bboxes[-1] = None
+            annotations.append(
+                dict(
+                    id=len(annotations) + 1,
+                    video_id=vid + 1,
+                    category_id=cat_id,
+                    iscrowd=int(vid == 1 and cat_id == 3),
+                    bboxes=bboxes,
+                    gaze=rng.uniform(-1, 1, (length, 2)).tolist(),
+                    blinks_binary=rng.randint(0, 2, length).tolist()))
+    categories = [
+        dict(id=i, name=name)
+        for i, name in enumerate(('head', 'face', 'eyes'), 1)
+    ]
+    mmcv.dump(
+        dict(videos=videos, annotations=annotations, categories=categories),
+        ann_file)
+
+
+def _parse_ann_reference(dataset, anns, frame_id):
+    """Per instance parsing of the original ``_parse_ann_info``."""
+    with_gazes = hasattr(dataset, 'gaze_dim')
+    bboxes, labels, ids, bboxes_ignore, blinks, gazes = [], [], [], [], [], []
+    for ann in anns:
+        bbox = ann['bboxes'][frame_id]
+        if bbox is None:
+            continue
+        x1, y1, w, h = bbox
+        if with_gazes:
+            x1, y1 = max(x1, 0.), max(y1, 0.)
+        bbox = [x1, y1, x1 + w, y1 + h]
+        if ann.get('iscrowd', False):
+            bboxes_ignore.append(bbox)
+            continue
+        bboxes.append(bbox)
+        ids.append(ann['id'] - 1)
+        labels.append(dataset.cat2label[ann['category_id']])
+        if with_gazes:
+            yaw, pitch = ann['gaze'][frame_id]
+            gazes.append([
+                np.cos(pitch) * np.sin(yaw),
+                np.sin(pitch), -np.cos(pitch) * np.cos(yaw)
+            ])
+        else:
+            blinks.append(ann['blinks_binary'][frame_id])
+    ann = dict(
+        bboxes=np.array(bboxes, dtype=np.float32).reshape(-1, 4),
+        labels=np.array(labels, dtype=np.int64),
+        bboxes_ignore=np.array(bboxes_ignore, dtype=np.float32).reshape(
+            -1, 4),
+        blinks=np.array(blinks, dtype=np.int64),
+        ids=ids)
+    if with_gazes:
+        ann['gazes'] = np.array(gazes, dtype=np.float32)
+    return ann
+
+
+def _assert_ann_equal(ann, ref):
+    assert set(ann) == set(ref)
+    for key in ref:
+        np.testing.assert_allclose(
+            np.asarray(ann[key]).reshape(-1),
+            np.asarray(ref[key], dtype=np.float64).reshape(-1),
+            rtol=1e-6)
+
+
+@pytest.mark.parametrize('ann_backend', ['json', 'packed'])
+@pytest.mark.parametrize('dataset', ['Gaze360Dataset', 'MPEblinkDataset'])
+def test_video_ann_store(tmp_path, dataset, ann_backend):
+    ann_file = osp.join(tmp_path, 'train.json')
+    _create_ann_file(ann_file)
+    dataset_class = DATASETS.get(dataset)
+    dataset = dataset_class(
+        ann_file=ann_file,
+        pipeline=[],
+        clip_length=3,
+        ann_backend=ann_backend)
+
+    # the frame without annotations is filtered out
+    assert (0, 0) not in dataset.data_infos
+    assert len(dataset) == 6
+    assert osp.exists(osp.join(tmp_path, 'train.anns.npz'))
+    video = dataset.ann_store.video(0)
+    assert video['bboxes'].shape == (4, 3, 4)
+    assert video['valid'].tolist() == [[False] * 3] + [[True] * 3] * 2 + [
+        [True, False, True]
+    ]
+    if 'gazes' in video:
+        assert video['gazes'].shape == (4, 3, 3)
+
+    for idx, (vid, frame_id) in enumerate(dataset.data_infos):
+        anns = dataset.mpeblink.loadAnns(
+            dataset.mpeblink.getAnnIds(vidIds=[vid + 1]))
+        _assert_ann_equal(
+            dataset.get_ann_info(idx),
+            _parse_ann_reference(dataset, anns, frame_id))
+        assert dataset.get_cat_ids(idx) == [1, 2, 3]
+
+    # the second dataset loads the arrays from the cache
+    build = MagicMock(side_effect=AssertionError)
+    store = VideoAnnStore.load_or_build(ann_file, build,
+                                        **_store_options(dataset))
+    build.assert_not_called()
+    for key, value in dataset.ann_store.arrays.items():
+        np.testing.assert_array_equal(store.arrays[key], value)
+
+    # a change of the options rebuilds the store
+    build = MagicMock(return_value=store)
+    VideoAnnStore.load_or_build(ann_file, build, gaze_dim=2)
+    build.assert_called_once()
+
+
+def _store_options(dataset):
+    if hasattr(dataset, 'gaze_dim'):
+        return dict(gaze_dim=dataset.gaze_dim, clip_border=True)
+    return dict(with_blinks=True)
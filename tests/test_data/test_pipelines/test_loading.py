@@ -5,8 +5,13 @@ import os.path as osp
 import mmcv
 import numpy as np
 
-from mmdet.datasets.pipelines import (LoadImageFromFile, LoadImageFromWebcam,
-                                      LoadMultiChannelImageFromFiles)
+from mmdet.datasets.frame_cache import (FrameCache, LRUFrameCache,
+                                         center_crop_rescale)
+from mmdet.datasets.pipelines import (CenterCrop, Compose, LoadImageFromFile,
+                                      LoadImageFromFrameCache,
+                                      LoadImageFromWebcam,
+                                      LoadMultiChannelImageFromFiles, Resize)
+from mmdet.datasets.video_shard import VideoShard
 
 
 class TestLoading:
@@ -28,7 +33,7 @@ class TestLoading:
         assert results['ori_shape'] == (288, 512, 3)
         assert repr(transform) == transform.__class__.__name__ + \
             "(to_float32=False, color_type='color', channel_order='bgr', " + \
-            "file_client_args={'backend': 'disk'})"
+            "imdecode_backend='cv2', file_client_args={'backend': 'disk'})"
 
         # no img_prefix
         results = dict(
@@ -78,6 +83,125 @@ class TestLoading:
             "(to_float32=False, color_type='unchanged', " + \
             "file_client_args={'backend': 'disk'})"
 
+    def test_load_img_from_frame_cache(self, tmp_path):
+        img = mmcv.imread(osp.join(self.data_prefix, 'color.jpg'))
+        cached_img, crop_box = center_crop_rescale(img, 0.68, (224, 224))
+        frames = [('color.jpg', cached_img, img.shape, crop_box)]
+        prefix = osp.join(tmp_path, 'cache')
+        FrameCache.write(prefix, frames, crop_ratio=0.68)
+        assert 'color.jpg' in FrameCache(prefix)
+        assert 'gray.jpg' not in FrameCache(prefix)
+
+        # the box is clipped by the crop
+        gt_bboxes = np.array([[50, 20, 300, 200]], dtype=np.float32)
+        results = dict(
+            img_prefix=self.data_prefix,
+            img_info=dict(filename='color.jpg'),
+            gt_bboxes=gt_bboxes,
+            gt_labels=np.array([0]),
+            bbox_fields=['gt_bboxes'])
+        ref = LoadImageFromFile()(copy.deepcopy(results))
+        ref = CenterCrop(crop_size=(0.68, 0.68), crop_type='relative')(ref)
+        ref = Resize(img_scale=(224, 224), keep_ratio=True)(ref)
+
+        transform = LoadImageFromFrameCache(prefix)
+        results = transform(copy.deepcopy(results))
+        assert results['filename'] == osp.join(self.data_prefix, 'color.jpg')
+        assert results['ori_shape'] == (288, 512, 3)
+        np.testing.assert_array_equal(results['img'], ref['img'])
+        assert results['img_shape'] == ref['img_shape']
+        np.testing.assert_allclose(results['scale_factor'],
+                                   ref['scale_factor'])
+        np.testing.assert_allclose(results['gt_bboxes'], ref['gt_bboxes'])
+        np.testing.assert_array_equal(results['gt_labels'], ref['gt_labels'])
+        # the frame is a copy, not a view of the cache
+        assert results['img'].flags.writeable
+
+        # the frame is dropped if no box is left in the crop
+        results = dict(
+            img_prefix=self.data_prefix,
+            img_info=dict(filename='color.jpg'),
+            gt_bboxes=np.array([[0, 0, 40, 40]], dtype=np.float32),
+            gt_labels=np.array([0]),
+            bbox_fields=['gt_bboxes'])
+        assert transform(results) is None
+
+    def test_load_img_from_video_shard(self, tmp_path):
+        root = osp.join(tmp_path, 'rawframes')
+        rng = np.random.RandomState(0)
+        frames = []
+        for vid in (2, 10):
+            for frame_id in range(5):
+                filename = f'{vid}/{frame_id:05d}.png'
+                mmcv.imwrite(
+                    rng.randint(0, 255, (16, 24, 3), dtype=np.uint8),
+                    osp.join(root, filename))
+                with open(osp.join(root, filename), 'rb') as f:
+                    frames.append((filename, f.read()))
+        VideoShard.write(root, frames)
+        shard = VideoShard(root)
+        assert len(shard) == 10
+        assert '10/00004.png' in shard
+        assert '10/00005.png' not in shard
+        contents = dict(frames)
+        assert shard.get('2/00003.png') == contents['2/00003.png']
+        # a clip with repeated frames, and frames of two videos
+        for filenames in (['10/00001.png', '10/00001.png', '10/00003.png'],
+                          ['2/00000.png', '10/00004.png']):
+            assert shard.get_many(filenames) == [
+                contents[filename] for filename in filenames
+            ]
+        # a read after close opens the file again
+        shard.close()
+        assert shard._fd is None
+        assert shard.get('2/00003.png') == contents['2/00003.png']
+        shard.close()
+
+        file_client_args = dict(backend='video_shard', root=root)
+        results = dict(img_prefix=root, img_info=dict(filename='2/00001.png'))
+        ref = LoadImageFromFile()(copy.deepcopy(results))
+        transform = LoadImageFromFile(file_client_args=file_client_args)
+        results = transform(results)
+        assert results['filename'] == ref['filename']
+        np.testing.assert_array_equal(results['img'], ref['img'])
+
+        # the frames of a clip are read at once
+        pipeline = Compose(
+            [dict(type='LoadImageFromFile',
+                  file_client_args=file_client_args)])
+        clip = [
+            dict(img_prefix=root, img_info=dict(filename=f'10/0000{i}.png'))
+            for i in range(3)
+        ]
+        pipeline.prefetch_clip(clip)
+        assert [results['img_bytes'] for results in clip
+                ] == [contents[f'10/0000{i}.png'] for i in range(3)]
+        for results in pipeline.clip_call(clip):
+            assert 'img_bytes' not in results
+            ref = LoadImageFromFile()(
+                dict(img_prefix=root, img_info=results['img_info']))
+            np.testing.assert_array_equal(results['img'], ref['img'])
+
+        # the frames in the frame cache are not read again
+        frame_cache = LRUFrameCache(capacity=4)
+        clip = [
+            dict(
+                img_prefix=root,
+                img_info=dict(filename=f'10/0000{i}.png'),
+                frame_cache=frame_cache) for i in range(3)
+        ]
+        pipeline.transforms[0](copy.copy(clip[1]))
+        assert osp.join(root, '10/00001.png') in frame_cache
+        pipeline.prefetch_clip(clip)
+        assert ['img_bytes' in results
+                for results in clip] == [True, False, True]
+        assert frame_cache.hits == 0
+        for results in pipeline.clip_call(clip):
+            ref = LoadImageFromFile()(
+                dict(img_prefix=root, img_info=results['img_info']))
+            np.testing.assert_array_equal(results['img'], ref['img'])
+        assert frame_cache.hits == 1
+
     def test_load_webcam_img(self):
         img = mmcv.imread(osp.join(self.data_prefix, 'color.jpg'))
         results = dict(img=img)
@@ -1,9 +1,10 @@
 # Copyright (c) OpenMMLab. All rights reserved.
 import torch
 
-from mmdet.core.bbox.assigners import MaxIoUAssigner
-from mmdet.core.bbox.samplers import (OHEMSampler, RandomSampler,
-                                      ScoreHLRSampler)
+from mmdet.core.bbox.assigners import (AssignResult, FixedAssigner,
+                                       MaxIoUAssigner)
+from mmdet.core.bbox.samplers import (OHEMSampler, PseudoSampler,
+                                      RandomSampler, ScoreHLRSampler)
 
 
 def test_random_sampler():
@@ -327,3 +328,41 @@ def test_score_hlr_sampler_empty_pred():
         assign_result, bboxes, gt_bboxes, gt_labels, feats=feats)
     assert len(sample_result.pos_bboxes) == len(sample_result.pos_inds)
     assert len(sample_result.neg_bboxes) == len(sample_result.neg_inds)
+
+
+def test_pseudo_sampler_sample_batch():
+    sampler = PseudoSampler()
+    bboxes = [torch.rand(4, 4) for _ in range(3)]
+    gt_bboxes = [torch.rand(3, 4), torch.rand(1, 4), torch.empty(0, 4)]
+    assign_results = [
+        AssignResult(3, torch.LongTensor([1, 2, 3, -1]), None,
+                     torch.LongTensor([0, 1, 2, -1])),
+        AssignResult(1, torch.LongTensor([0, 0, 0, 1]), None,
+                     torch.LongTensor([-1, -1, -1, 2])),
+        AssignResult(0, torch.LongTensor([0, 0, 0, 0]), None,
+                     torch.LongTensor([-1, -1, -1, -1])),
+    ]
+    sample_results = sampler.sample_batch(assign_results, bboxes, gt_bboxes)
+    assert len(sample_results) == 3
+    for i, sample_result in enumerate(sample_results):
+        expected = sampler.sample(assign_results[i], bboxes[i], gt_bboxes[i])
+        for key in ('pos_inds', 'neg_inds', 'pos_bboxes', 'neg_bboxes',
+                    'pos_assigned_gt_inds', 'pos_gt_bboxes', 'pos_gt_labels'):
+            assert torch.equal(
+                getattr(sample_result, key), getattr(expected, key))
+    assert sampler.sample_batch([], [], []) == []
+
+    # the indices set by the fixed assigner are used as they are
+    gt_bboxes = [torch.rand(3, 4), torch.rand(1, 4)]
+    assign_results = FixedAssigner().assign_batch(
+        torch.rand(2, 3, 4), gt_bboxes, 2)
+    bboxes = [torch.rand(3, 4) for _ in range(2)]
+    sample_results = sampler.sample_batch(assign_results, bboxes, gt_bboxes)
+    for i, sample_result in enumerate(sample_results):
+        expected = sampler.sample(assign_results[i], bboxes[i], gt_bboxes[i])
+        assert sample_result.pos_inds is assign_results[
+            i].get_extra_property('pos_inds')
+        assert torch.equal(sample_result.pos_inds, expected.pos_inds)
+        assert torch.equal(sample_result.neg_inds, expected.neg_inds)
+        assert torch.equal(sample_result.pos_gt_labels,
+                           expected.pos_gt_labels)
@@ -1020,3 +1020,75 @@ def test_photo_metric_distortion():
     results['img'] = img.astype(np.float32)
     results = distortion_module(results)
     assert results['img'].dtype == np.float32
+
+
+def test_clip_consistent_transforms():
+    from mmdet.datasets.pipelines import Compose
+    img = mmcv.imread(
+        osp.join(osp.dirname(__file__), '../../../data/color.jpg'), 'color')
+    pipeline = Compose([
+        dict(
+            type='CenterCrop',
+            crop_size=(0.5, 0.5),
+            crop_type='relative_range'),
+        dict(
+            type='Resize',
+            img_scale=[(200, 100), (400, 300)],
+            multiscale_mode='range',
+            keep_ratio=True),
+        dict(type='RandomFlip', flip_ratio=0.5),
+    ])
+    gt_bboxes = np.array([[60, 50, 200, 190]], dtype=np.float32)
+    gt_gazes = np.array([[0.3, -0.2, -0.9]], dtype=np.float32)
+
+    shapes, flips = set(), set()
+    for _ in range(20):
+        clip = pipeline.clip_call([
+            dict(
+                img=img.copy(),
+                img_shape=img.shape,
+                gt_bboxes=gt_bboxes.copy(),
+                gt_gazes=gt_gazes.copy(),
+                bbox_fields=['gt_bboxes'],
+                gaze_fields=['gt_gazes']) for _ in range(5)
+        ])
+        # every frame of a clip is augmented the same way
+        for results in clip[1:]:
+            assert np.array_equal(results['img'], clip[0]['img'])
+            assert np.array_equal(results['gt_bboxes'], clip[0]['gt_bboxes'])
+            assert np.array_equal(results['gt_gazes'], clip[0]['gt_gazes'])
+            assert results['flip'] == clip[0]['flip']
+        shapes.add(clip[0]['img_shape'])
+        flips.add(clip[0]['flip'])
+    # while clips are augmented differently
+    assert len(shapes) > 1 and flips == {True, False}
+    # and the transforms keep no state between calls
+    for t in pipeline.transforms:
+        assert not hasattr(t, 'isfix') and not hasattr(t, 'rec')
+
+
+def test_clip_call_threads():
+    from mmdet.datasets.pipelines import Compose
+    transforms = [
+        dict(type='LoadImageFromFile'),
+        dict(type='Resize', img_scale=[(200, 100), (400, 300)],
+             keep_ratio=True),
+        dict(type='RandomFlip', flip_ratio=0.5),
+        dict(type='Normalize', mean=[0, 0, 0], std=[1, 1, 1]),
+    ]
+    img_prefix = osp.join(osp.dirname(__file__), '../../../data')
+    clips = []
+    for num_threads in (0, 2):
+        np.random.seed(0)
+        pipeline = Compose(transforms, num_threads=num_threads)
+        clips.append(
+            pipeline.clip_call([
+                dict(
+                    img_prefix=img_prefix,
+                    img_info=dict(filename='color.jpg')) for _ in range(4)
+            ]))
+        # the pool is not pickled with the pipeline
+        assert copy.deepcopy(pipeline)._executor is None
+    for results, ref in zip(*clips):
+        assert np.array_equal(results['img'], ref['img'])
+        assert results['flip'] == ref['flip']
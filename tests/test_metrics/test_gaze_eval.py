@@ -0,0 +1,101 @@
+import math
+
+import pytest
+import torch
+
+from mmdet.core.evaluation import Gaze360Evaluator, smooth_video_gazes
+
+
+def _smooth_reference(gazes, alpha=0.6):
+    if gazes.size(0) < 2:
+        return gazes
+    output = alpha * gazes
+    output[0, :] += (1 - alpha) * gazes[1, :]
+    output[-1, :] += (1 - alpha) * gazes[-2, :]
+    output[1:-1, :] += (1 - alpha) * (gazes[0:-2, :] + gazes[2:, :]) / 2
+    return output / torch.norm(output, dim=1).unsqueeze(1)
+
+
+def _gaze_error_reference(eval_data, anno_data, gaze_name):
+    """The former per video and per frame evaluation of
+    ``tools/calculate_mae_gaze360.py``."""
+    totals = [[0, 0.], [0, 0.], [0, 0.]]
+    for anno_id, video in enumerate(eval_data):
+        preds = _smooth_reference(torch.tensor(video[gaze_name]))
+        gts = torch.tensor(anno_data['annotations'][anno_id]['gaze'])
+        for pred, gt in zip(preds, gts):
+            gt = gt / torch.norm(gt)
+            yaw = 180 * abs(math.atan2(gt[0], -gt[2])) / math.pi
+            error = 180 * torch.acos(torch.dot(gt, pred)).item() / math.pi
+            for total, thr in zip(totals, (360, 90, 20)):
+                if yaw <= thr:
+                    total[0] += 1
+                    total[1] += error
+    return tuple(error / num for num, error in totals)
+
+
+def _random_gazes(num_frames):
+    gazes = torch.randn(num_frames, 3)
+    # mostly frontal gazes so that the front 20 subset is not empty
+    gazes[:, 2] = -gazes[:, 2].abs() - 2
+    return gazes / torch.norm(gazes, dim=1, keepdim=True)
+
+
+def test_smooth_video_gazes():
+    video_lens = [5, 1, 2, 3]
+    gazes = _random_gazes(sum(video_lens))
+    smoothed = smooth_video_gazes(gazes, video_lens)
+    expected = torch.cat([
+        _smooth_reference(video_gazes)
+        for video_gazes in gazes.split(video_lens)
+    ])
+    assert torch.allclose(smoothed, expected)
+    assert torch.equal(smoothed[5], gazes[5])
+
+    # alpha=1 only normalizes
+    assert torch.allclose(smooth_video_gazes(gazes, video_lens, 1.), gazes)
+
+
+def test_gaze360_evaluator():
+    video_lens = [7, 1, 12, 4, 30]
+    anno_data = dict(annotations=[
+        dict(gaze=_random_gazes(video_len).tolist())
+        for video_len in video_lens
+    ])
+    eval_data = [
+        dict(
+            fusion_gazes=_random_gazes(video_len).tolist(),
+            head_gazes=_random_gazes(video_len).tolist())
+        for video_len in video_lens
+    ]
+
+    evaluator = Gaze360Evaluator(
+        anno_data, cues=('fusion_gazes', 'head_gazes'))
+    with pytest.raises(AssertionError):
+        evaluator.evaluate()
+    with pytest.raises(AssertionError):
+        evaluator.update(1, eval_data[0])
+
+    # results added in any order
+    for video_idx in (3, 0, 4):
+        evaluator.update(video_idx, eval_data[video_idx])
+    assert len(evaluator) == 3
+    maes = evaluator.evaluate()
+    subset = [0, 3, 4]
+    expected = _gaze_error_reference(
+        [eval_data[i] for i in subset],
+        dict(annotations=[anno_data['annotations'][i] for i in subset]),
+        'fusion_gazes')
+    assert maes['fusion_gazes'] == pytest.approx(expected, rel=1e-4)
+
+    # tensor results of the remaining videos
+    for video_idx in (1, 2):
+        evaluator.update(
+            video_idx, {
+                cue: torch.tensor(gazes)
+                for cue, gazes in eval_data[video_idx].items()
+            })
+    maes = evaluator.evaluate()
+    for cue in ('fusion_gazes', 'head_gazes'):
+        expected = _gaze_error_reference(eval_data, anno_data, cue)
+        assert maes[cue] == pytest.approx(expected, rel=1e-4)
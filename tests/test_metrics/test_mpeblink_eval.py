@@ -0,0 +1,284 @@
+import mmcv
+import numpy as np
+import pandas as pd
+import pytest
+
+from mmdet.datasets.mpeblink_api import MPEblink
+from mmdet.datasets.mpeblink_eval_api import MPEblinkEval
+
+
+def _iou_seq_reference(d_seq, g_seq):
+    """Per frame sequence IoU of the original ``computeIoU``."""
+    evaluator = MPEblinkEval(iouType='bbox')
+    i = u = .0
+    for d, g in zip(d_seq, g_seq):
+        if d and g:
+            i += evaluator.compute_frame_i(d, g)
+            u += evaluator.compute_frame_u(d, g)
+        elif not d and g:
+            u += g[2] * g[3]
+        elif d and not g:
+            u += d[2] * d[3]
+    return i / u if u > .0 else .0
+
+
+def _match_reference(ious, iou_thrs, gt_ids, dt_ids, gt_ignore):
+    """Per threshold, per dt and per gt matching of ``evaluateVid``."""
+    T, D, G = len(iou_thrs), len(dt_ids), len(gt_ids)
+    gtm, dtm, dtIg = np.zeros((T, G)), np.zeros((T, D)), np.zeros((T, D))
+    for tind, t in enumerate(iou_thrs):
+        for dind in range(D):
+            iou = min([t, 1 - 1e-10])
+            m = -1
+            for gind in range(G):
+                if gtm[tind, gind] > 0:
+                    continue
+                if m > -1 and gt_ignore[m] == 0 and gt_ignore[gind] == 1:
+                    break
+                if ious[dind, gind] < iou:
+                    continue
+                iou = ious[dind, gind]
+                m = gind
+            if m == -1:
+                continue
+            dtIg[tind, dind] = gt_ignore[m]
+            dtm[tind, dind] = gt_ids[m]
+            gtm[tind, m] = dt_ids[dind]
+    return dtm, gtm, dtIg
+
+
+def _pr_curves_reference(tps, fps, npig, scores, rec_thrs):
+    """Per threshold and per dt loops of the original ``accumulate``."""
+    tp_sum = np.cumsum(tps, axis=1).astype(float)
+    fp_sum = np.cumsum(fps, axis=1).astype(float)
+    recall = np.zeros(len(tps))
+    precision = np.zeros((len(tps), len(rec_thrs)))
+    all_ss = np.zeros((len(tps), len(rec_thrs)))
+    for t, (tp, fp) in enumerate(zip(tp_sum, fp_sum)):
+        nd = len(tp)
+        rc = tp / npig
+        pr = (tp / (fp + tp + np.spacing(1))).tolist()
+        q, ss = [0.] * len(rec_thrs), [0.] * len(rec_thrs)
+        recall[t] = rc[-1] if nd else 0
+        for i in range(nd - 1, 0, -1):
+            if pr[i] > pr[i - 1]:
+                pr[i - 1] = pr[i]
+        inds = np.searchsorted(rc, rec_thrs, side='left')
+        try:
+            for ri, pi in enumerate(inds):
+                q[ri] = pr[pi]
+                ss[ri] = scores[pi]
+        except IndexError:
+            pass
+        precision[t] = q
+        all_ss[t] = ss
+    return recall, precision, all_ss
+
+
+def _action_ap_reference(ground_truth, prediction, tiou_thresholds):
+    """The ``iterrows`` loop of the original
+    ``compute_average_precision_detection``."""
+    evaluator = MPEblinkEval(iouType='bbox')
+    lock_gt = np.ones((len(tiou_thresholds), len(ground_truth))) * -1
+    sort_idx = prediction['score'].values.argsort()[::-1]
+    prediction = prediction.loc[sort_idx].reset_index(drop=True)
+    tp = np.zeros((len(tiou_thresholds), len(prediction)))
+    fp = np.zeros((len(tiou_thresholds), len(prediction)))
+    ground_truth_gbvn = ground_truth.groupby('video-id')
+    for idx, this_pred in prediction.iterrows():
+        try:
+            ground_truth_videoid = ground_truth_gbvn.get_group(
+                this_pred['video-id'])
+        except KeyError:
+            fp[:, idx] = 1
+            continue
+        this_gt = ground_truth_videoid.reset_index()
+        tiou_arr = evaluator.segment_iou(
+            this_pred[['t-start', 't-end']].values,
+            this_gt[['t-start', 't-end']].values)
+        tiou_sorted_idx = tiou_arr.argsort()[::-1]
+        for tidx, tiou_thr in enumerate(tiou_thresholds):
+            for jdx in tiou_sorted_idx:
+                if tiou_arr[jdx] < tiou_thr:
+                    fp[tidx, idx] = 1
+                    break
+                if lock_gt[tidx, this_gt.loc[jdx]['index']] >= 0:
+                    continue
+                tp[tidx, idx] = 1
+                lock_gt[tidx, this_gt.loc[jdx]['index']] = idx
+                break
+            if fp[tidx, idx] == 0 and tp[tidx, idx] == 0:
+                fp[tidx, idx] = 1
+    tp_cumsum = np.cumsum(tp, axis=1)
+    fp_cumsum = np.cumsum(fp, axis=1)
+    recall = tp_cumsum / len(ground_truth)
+    precision = tp_cumsum / (tp_cumsum + fp_cumsum)
+    ap = np.zeros(len(tiou_thresholds))
+    for tidx in range(len(tiou_thresholds)):
+        mprec = np.hstack([[0], precision[tidx], [0]])
+        mrec = np.hstack([[0], recall[tidx], [1]])
+        for i in range(len(mprec) - 1)[::-1]:
+            mprec[i] = max(mprec[i], mprec[i + 1])
+        inds = np.where(mrec[1::] != mrec[0:-1])[0] + 1
+        ap[tidx] = np.sum((mrec[inds] - mrec[inds - 1]) * mprec[inds])
+    return ap
+
+
+def _random_seq(rng, num_frames):
+    # integer boxes on a small grid, some frames without a box
+    boxes = []
+    for _ in range(num_frames):
+        if rng.rand() < 0.2:
+            boxes.append(None)
+        else:
+            x, y = rng.randint(0, 12, 2).tolist()
+            w, h = rng.randint(1, 8, 2).tolist()
+            boxes.append([x, y, w, h])
+    return boxes
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_compute_iou(seed):
+    rng = np.random.RandomState(seed)
+    evaluator = MPEblinkEval(iouType='bbox')
+    gts = [
+        dict(id=i + 1, bboxes=_random_seq(rng, 20)) for i in range(3)
+    ]
+    # a gt without any box, and detections of different lengths
+    gts.append(dict(id=4, bboxes=[None] * 20))
+    dts = [
+        dict(
+            id=i + 1,
+            score=float(rng.rand()),
+            bboxes=_random_seq(rng, 20 if i else 15)) for i in range(8)
+    ]
+    dts.append(dict(id=9, score=0.5, bboxes=[None] * 20))
+    evaluator._gts[1, 1] = gts
+    evaluator._dts[1, 1] = dts
+    ious = evaluator.computeIoU(1, 1)
+
+    order = np.argsort([-d['score'] for d in dts], kind='mergesort')
+    expected = np.array([[
+        _iou_seq_reference(dts[i]['bboxes'], g['bboxes']) for g in gts
+    ] for i in order])
+    assert ious.shape == (len(dts), len(gts))
+    assert np.allclose(ious, expected)
+
+    evaluator._gts[2, 1] = gts
+    assert evaluator.computeIoU(2, 1).shape == (0, len(gts))
+    assert evaluator.computeIoU(3, 1) == []
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_evaluate_vid_matching(seed):
+    rng = np.random.RandomState(seed)
+    evaluator = MPEblinkEval(iouType='bbox')
+    num_dts, num_gts = 12, 5
+    evaluator._gts[1, 1] = [dict(id=10 + i) for i in range(num_gts)]
+    evaluator._dts[1, 1] = [
+        dict(id=100 + i, score=float(rng.rand()), avg_area=float(i * 5000))
+        for i in range(num_dts)
+    ]
+    # coarse ious so that several gts tie for a detection
+    ious = rng.randint(0, 11, (num_dts, num_gts)) / 10
+    evaluator.ious[1, 1] = ious
+    aRng = [0, 32**2]
+    result = evaluator.evaluateVid(1, 1, aRng, 100)
+
+    order = np.argsort(
+        [-d['score'] for d in evaluator._dts[1, 1]], kind='mergesort')
+    dt_ids = [100 + i for i in order]
+    dtm, gtm, dtIg = _match_reference(ious, evaluator.params.iouThrs,
+                                      [10 + i for i in range(num_gts)],
+                                      dt_ids, np.zeros(num_gts))
+    area_ignore = np.array(
+        [i * 5000 > aRng[1] for i in order]).reshape(1, -1)
+    dtIg = np.logical_or(dtIg, np.logical_and(dtm == 0, area_ignore))
+    assert result['dtIds'] == dt_ids
+    assert np.array_equal(result['dtMatches'], dtm)
+    assert np.array_equal(result['gtMatches'], gtm)
+    assert np.array_equal(result['dtIgnore'], dtIg)
+
+
+@pytest.mark.parametrize('num_dets', [0, 1, 50])
+def test_pr_curves(num_dets):
+    rng = np.random.RandomState(num_dets)
+    matched = rng.rand(10, num_dets) < np.linspace(0.9, 0.2, 10)[:, None]
+    ignored = rng.rand(10, num_dets) < 0.1
+    tps = matched & ~ignored
+    fps = ~matched & ~ignored
+    scores = np.sort(rng.rand(num_dets))[::-1]
+    rec_thrs = MPEblinkEval(iouType='bbox').params.recThrs
+    npig = max(num_dets // 2, 1)
+    results = MPEblinkEval._pr_curves(tps, fps, npig, scores, rec_thrs)
+    expected = _pr_curves_reference(tps, fps, npig, scores, rec_thrs)
+    for result, value in zip(results, expected):
+        assert np.allclose(result, value)
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_average_precision_detection(seed):
+    rng = np.random.RandomState(seed)
+    gt_starts = rng.randint(0, 100, 30)
+    ground_truth = pd.DataFrame({
+        'video-id': rng.randint(1, 8, 30),
+        't-start': gt_starts,
+        't-end': gt_starts + rng.randint(1, 10, 30)
+    })
+    # predictions near the gts, and predictions of videos without a gt
+    pred_inds = rng.randint(0, 30, 50)
+    pred_starts = gt_starts[pred_inds] + rng.randint(-2, 3, 50)
+    prediction = pd.DataFrame({
+        'video-id': np.where(
+            rng.rand(50) < 0.1, 9,
+            ground_truth['video-id'].values[pred_inds]).astype(float),
+        't-start': pred_starts.astype(float),
+        't-end': (pred_starts + rng.randint(1, 10, 50)).astype(float),
+        # coarse scores so that several predictions tie
+        'score': rng.randint(0, 10, 50) / 10
+    })
+    tiou_thresholds = np.linspace(0.5, 0.95, 10)
+    ap = MPEblinkEval(iouType='bbox').compute_average_precision_detection(
+        ground_truth, prediction, tiou_thresholds)
+    expected = _action_ap_reference(ground_truth, prediction, tiou_thresholds)
+    assert np.allclose(ap, expected)
+
+
+def test_mpeblink_eval_perfect_detections(tmp_path):
+    videos, annotations, results = [], [], []
+    rng = np.random.RandomState(0)
+    for vid_id in range(1, 4):
+        videos.append(dict(id=vid_id, width=64, height=48, length=10))
+        for _ in range(2):
+            bboxes = _random_seq(rng, 10)
+            blinks = [[1, 3], [6, 8]]
+            annotations.append(
+                dict(
+                    id=len(annotations) + 1,
+                    video_id=vid_id,
+                    category_id=1,
+                    iscrowd=0,
+                    bboxes=bboxes,
+                    blinks=blinks))
+            results.append(
+                dict(
+                    video_id=vid_id,
+                    category_id=1,
+                    score=float(rng.rand()),
+                    bboxes=bboxes,
+                    blinks_converted=[blink + [0.9] for blink in blinks]))
+    ann_file = str(tmp_path / 'test.json')
+    mmcv.dump(
+        dict(
+            videos=videos,
+            annotations=annotations,
+            categories=[dict(id=1, name='eye')]), ann_file)
+    gt = MPEblink(ann_file)
+    evaluator = MPEblinkEval(gt, gt.loadRes(results), iouType='bbox')
+    evaluator.evaluate()
+    evaluator.accumulate()
+    assert np.allclose(evaluator.eval['precision'][:, :, :, 0, 2], 1)
+    assert np.allclose(evaluator.eval['recall'][:, :, 0, 2], 1)
+    for config in evaluator.blink_eval_info[:10]:
+        assert len(config['gt_data']) == len(annotations)
+    evaluator.action_ap()
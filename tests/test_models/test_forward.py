@@ -922,3 +922,257 @@ def test_mask2former_forward():
                                       rescale=True,
                                       return_loss=False)
         batch_results.append(result)
+
+
+@pytest.mark.skipif(
+    not hasattr(torch, 'autocast'), reason='requires torch>=1.10')
+def test_multiclue_gaze_bf16_autocast():
+    import math
+
+    from mmdet.apis import inference_autocast
+    from mmdet.models import build_detector
+
+    model = _get_detector_cfg('multiclue_gaze/multiclue_gaze_r50_gaze360.py')
+    model = _replace_r50_with_r18(model)
+    model.backbone.init_cfg = None
+    model.train_cfg = None
+    torch.manual_seed(0)
+    detector = build_detector(model)
+    detector.eval()
+
+    # fixed set of clips, bf16 must stay within a bounded angular error of
+    # the fp32 gaze vectors
+    T, H, W = 3, 64, 64
+    img_metas = [
+        dict(
+            img_shape=(H, W, 3),
+            ori_shape=(H, W, 3),
+            pad_shape=(H, W, 3),
+            scale_factor=np.ones(4, dtype=np.float32),
+            flip=False,
+            flip_direction=None) for _ in range(T)
+    ]
+    generator = torch.Generator().manual_seed(0)
+    clips = torch.rand(4, T, 3, H, W, generator=generator)
+    for clip in clips:
+        with torch.no_grad():
+            _, fp32_gazes = detector.forward([clip], [img_metas],
+                                             return_loss=False)
+            with inference_autocast('bf16', 'cpu'):
+                (det_bboxes, _), bf16_gazes = detector.forward(
+                    [clip], [img_metas], return_loss=False)
+        assert det_bboxes[0].dtype == torch.float32
+        for key, fp32_gaze in fp32_gazes.items():
+            bf16_gaze = bf16_gazes[key]
+            assert bf16_gaze.dtype == torch.float32
+            assert torch.allclose(
+                bf16_gaze.norm(dim=-1), torch.ones(T), atol=1e-5)
+            cos = (fp32_gaze * bf16_gaze).sum(-1).clamp(-1, 1)
+            error = torch.acos(cos) * 180 / math.pi
+            assert error.mean() < 3.0
+
+    with pytest.raises(ValueError):
+        inference_autocast('fp16', 'cpu')
+    with pytest.raises(ValueError):
+        inference_autocast('int8', 'cpu')
+
+
+def test_multiclue_gaze_batched_clips_match_single_clips():
+    from mmdet.models import build_detector
+
+    model = _get_detector_cfg('multiclue_gaze/multiclue_gaze_r50_gaze360.py')
+    model = _replace_r50_with_r18(model)
+    model.backbone.init_cfg = None
+    model.train_cfg = None
+    torch.manual_seed(0)
+    detector = build_detector(model)
+    detector.eval()
+
+    N, T, H, W = 3, 3, 64, 64
+    img_metas = [
+        dict(
+            img_shape=(H, W, 3),
+            ori_shape=(H, W, 3),
+            pad_shape=(H, W, 3),
+            scale_factor=np.ones(4, dtype=np.float32),
+            flip=False,
+            flip_direction=None) for _ in range(T)
+    ]
+    generator = torch.Generator().manual_seed(0)
+    clips = torch.rand(N, T, 3, H, W, generator=generator)
+    with torch.no_grad():
+        (batch_bboxes, batch_labels), batch_gazes = detector.simple_test(
+            clips.flatten(0, 1), img_metas * N, clip_length=T)
+        single_results = [
+            detector.simple_test(clip, img_metas) for clip in clips
+        ]
+
+    # one forward over N clips gives the boxes and gazes of N forwards
+    assert len(batch_bboxes) == len(batch_labels) == N * T
+    for n, ((det_bboxes, det_labels), det_gazes) in enumerate(
+            single_results):
+        frames = slice(n * T, (n + 1) * T)
+        for batch_bbox, det_bbox in zip(batch_bboxes[frames], det_bboxes):
+            assert torch.allclose(batch_bbox, det_bbox, atol=1e-4)
+        assert batch_labels[frames] == det_labels
+        for key, det_gaze in det_gazes.items():
+            assert torch.allclose(
+                batch_gazes[key][frames], det_gaze, atol=1e-4)
+
+
+def _quantized_engine():
+    engines = torch.backends.quantized.supported_engines
+    for engine in ('fbgemm', 'qnnpack'):
+        if engine in engines:
+            return engine
+    pytest.skip('no quantized engine is available')
+
+
+@pytest.mark.parametrize('mode', ['dynamic', 'static'])
+def test_multiclue_gaze_int8_quantization(mode):
+    import math
+
+    from mmdet.apis import fuse_gaze_heads
+    from mmdet.core.export import quantize_dynamic, quantize_static
+    from mmdet.models import build_detector
+
+    engine = _quantized_engine()
+    model = _get_detector_cfg('multiclue_gaze/multiclue_gaze_r50_gaze360.py')
+    model = _replace_r50_with_r18(model)
+    model.backbone.init_cfg = None
+    model.train_cfg = None
+    torch.manual_seed(0)
+    detector = build_detector(model)
+    detector.eval()
+
+    T, H, W = 3, 64, 64
+    img_metas = [
+        dict(
+            img_shape=(H, W, 3),
+            ori_shape=(H, W, 3),
+            pad_shape=(H, W, 3),
+            scale_factor=np.ones(4, dtype=np.float32),
+            flip=False,
+            flip_direction=None) for _ in range(T)
+    ]
+    generator = torch.Generator().manual_seed(0)
+    clips = [
+        dict(img=[clip], img_metas=[img_metas])
+        for clip in torch.rand(4, T, 3, H, W, generator=generator)
+    ]
+    qdetector = copy.deepcopy(detector)
+    if mode == 'static':
+        qdetector = quantize_static(qdetector, clips[:2], engine=engine)
+        assert any(
+            isinstance(m, torch.quantization.QuantWrapper)
+            for m in qdetector.backbone.modules())
+    else:
+        torch.backends.quantized.engine = engine
+        # the fused gaze heads would bypass the quantized layers
+        with pytest.raises(ValueError, match='mutually exclusive'):
+            quantize_dynamic(fuse_gaze_heads(copy.deepcopy(detector)))
+        qdetector = quantize_dynamic(qdetector)
+        assert not any(
+            type(m) is torch.nn.Linear for m in qdetector.roi_head.modules())
+
+    # the INT8 gazes must stay within a bounded angular error of the fp32
+    # ones
+    for clip in clips:
+        with torch.no_grad():
+            (fp32_bboxes, _), fp32_gazes = detector(
+                return_loss=False, **clip)
+            (int8_bboxes, _), int8_gazes = qdetector(
+                return_loss=False, **clip)
+        assert len(int8_bboxes) == len(fp32_bboxes)
+        for key, fp32_gaze in fp32_gazes.items():
+            int8_gaze = int8_gazes[key]
+            assert int8_gaze.shape == fp32_gaze.shape
+            cos = (fp32_gaze * int8_gaze).sum(-1).clamp(-1, 1)
+            error = torch.acos(cos) * 180 / math.pi
+            assert error.mean() < 10.0
+
+
+def test_yolo_head_quantize_int8():
+    import importlib.util
+    pytest.importorskip('torchvision')
+
+    engine = _quantized_engine()
+    spec = importlib.util.spec_from_file_location(
+        'yolo_torch_utils',
+        join(
+            dirname(_get_config_directory()), 'MCGaze_demo', 'yolo_head',
+            'utils', 'torch_utils.py'))
+    torch_utils = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(torch_utils)
+
+    torch.manual_seed(0)
+    model = torch.nn.Sequential(
+        torch.nn.Conv2d(3, 8, 3, padding=1), torch.nn.ReLU(),
+        torch.nn.Conv2d(8, 4, 3, stride=2, padding=1)).eval()
+    imgs = [torch.rand(1, 3, 32, 32) for _ in range(4)]
+    with torch.no_grad():
+        fp32_outs = [model(img) for img in imgs]
+    qmodel = torch_utils.quantize_int8(
+        copy.deepcopy(model), imgs, engine=engine)
+    assert sum(
+        isinstance(m, torch.quantization.QuantWrapper)
+        for m in qmodel.modules()) == 2
+    with torch.no_grad():
+        for img, fp32_out in zip(imgs, fp32_outs):
+            int8_out = qmodel(img)
+            assert int8_out.dtype == torch.float32
+            scale = fp32_out.abs().max()
+            assert (int8_out - fp32_out).abs().max() < 0.05 * scale
+
+
+def test_init_detector_cached(tmp_path):
+    from mmdet.apis import init_detector_cached
+    from mmdet.models import build_detector
+
+    config = _get_config_module('multiclue_gaze/multiclue_gaze_r50_gaze360.py')
+    config.model = _replace_r50_with_r18(config.model)
+    config.model.backbone.init_cfg = None
+    config.model.train_cfg = None
+    checkpoint = str(tmp_path / 'gaze.pth')
+    torch.save(
+        dict(
+            state_dict=build_detector(config.model).state_dict(),
+            meta=dict(CLASSES=('face', 'eyes', 'head'))), checkpoint)
+
+    cache_dir = str(tmp_path / 'cache')
+    model = init_detector_cached(
+        copy.deepcopy(config), checkpoint, device='cpu', cache_dir=cache_dir)
+    cache_files = list((tmp_path / 'cache').iterdir())
+    assert len(cache_files) == 1
+    # only the tensors are cached, the model is rebuilt from the config
+    assert set(torch.load(str(cache_files[0]))) == {'state_dict', 'CLASSES'}
+
+    # the second call loads the serialized model
+    cached_model = init_detector_cached(
+        copy.deepcopy(config), checkpoint, device='cpu', cache_dir=cache_dir)
+    assert list((tmp_path / 'cache').iterdir()) == cache_files
+    assert cached_model.CLASSES == ('face', 'eyes', 'head')
+    assert not cached_model.training
+    state_dict = model.state_dict()
+    for name, value in cached_model.state_dict().items():
+        assert torch.equal(value, state_dict[name])
+
+    # another config gets its own cache entry
+    init_detector_cached(
+        copy.deepcopy(config),
+        checkpoint,
+        device='cpu',
+        cfg_options={'model.test_cfg.rcnn.max_per_img': 3},
+        cache_dir=cache_dir)
+    assert len(list((tmp_path / 'cache').iterdir())) == 2
+
+    # an entry that does not match the model any more is rebuilt
+    torch.save(dict(state_dict={}, CLASSES=None), str(cache_files[0]))
+    with pytest.warns(UserWarning, match='stale cache'):
+        rebuilt_model = init_detector_cached(
+            copy.deepcopy(config),
+            checkpoint,
+            device='cpu',
+            cache_dir=cache_dir)
+    for name, value in rebuilt_model.state_dict().items():
+        assert torch.equal(value, state_dict[name])
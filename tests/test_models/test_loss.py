@@ -5,7 +5,8 @@ from mmcv.utils import digit_version
 
 from mmdet.models.losses import (BalancedL1Loss, CrossEntropyLoss, DiceLoss,
                                  DistributionFocalLoss, FocalLoss,
-                                 GaussianFocalLoss,
+                                 GaussianFocalLoss, GazeArccosLoss,
+                                 GazeTempLoss,
                                  KnowledgeDistillationKLDivLoss, L1Loss,
                                  MSELoss, QualityFocalLoss, SeesawLoss,
                                  SmoothL1Loss, VarifocalLoss)
@@ -230,3 +231,84 @@ def test_dice_loss(naive_dice):
     with pytest.raises(AssertionError):
         weight = torch.rand((8))
         loss_class(naive_dice=naive_dice)(pred, target, weight)
+
+
+def _gaze_temp_loss_reference(pred, target, clip_len):
+    """The per slice implementation of the gaze temp loss."""
+    pred = pred.view(-1, clip_len, pred.size(-1))
+    loss = pred.new_zeros(pred.size(0), clip_len)
+    loss[:, 0] = torch.sum(torch.abs(2 * pred[:, 0] - 2 * pred[:, 1]), dim=-1)
+    loss[:, -1] = torch.sum(
+        torch.abs(2 * pred[:, -1] - 2 * pred[:, -2]), dim=-1)
+    loss[:, 1:-1] = torch.sum(
+        torch.abs(2 * pred[:, 1:-1] - pred[:, 2:] - pred[:, 0:-2]), dim=-1)
+    return loss.view(-1)
+
+
+def _gaze_arccos_loss_reference(pred, target, clip_len):
+    """The per column implementation of the gaze arccos loss."""
+
+    def yaw_pitch_to_vector(x):
+        x = torch.reshape(x, (-1, 2))
+        output = x.new_zeros((x.shape[0], 3))
+        output[:, 2] = -torch.cos(x[:, 1]) * torch.cos(x[:, 0])
+        output[:, 0] = torch.cos(x[:, 1]) * torch.sin(x[:, 0])
+        output[:, 1] = torch.sin(x[:, 1])
+        return output
+
+    if target.size(1) != 3:
+        pred = yaw_pitch_to_vector(pred)
+        target = yaw_pitch_to_vector(target)
+    sim = torch.nn.functional.cosine_similarity(pred, target, dim=-1, eps=1e-6)
+    sim = torch.nn.functional.hardtanh(sim, -1.0 + 1e-6, 1.0 - 1e-6)
+    return torch.acos(sim)
+
+
+@pytest.mark.parametrize('gaze_dim', [2, 3])
+@pytest.mark.parametrize('loss_class,reference', [
+    (GazeTempLoss, _gaze_temp_loss_reference),
+    (GazeArccosLoss, _gaze_arccos_loss_reference),
+])
+def test_gaze_losses(loss_class, reference, gaze_dim):
+    clip_len = 7
+    kwargs = dict(clip_len=clip_len) if loss_class is GazeTempLoss else {}
+    loss_fn = loss_class(loss_weight=2.0, **kwargs)
+    pred = torch.randn((3 * clip_len, gaze_dim), dtype=torch.float64)
+    target = torch.randn((3 * clip_len, gaze_dim), dtype=torch.float64)
+    weight = torch.rand((3 * clip_len, gaze_dim), dtype=torch.float64)
+
+    # same loss and gradient as the reference implementation
+    pred1 = pred.clone().requires_grad_()
+    pred2 = pred.clone().requires_grad_()
+    loss = loss_fn(pred1, target)
+    ref_loss = 2.0 * reference(pred2, target, clip_len).mean()
+    assert torch.allclose(loss, ref_loss)
+    loss.backward()
+    ref_loss.backward()
+    assert torch.allclose(pred1.grad, pred2.grad)
+
+    # test weight, avg_factor and reduction
+    ref_loss = 2.0 * reference(pred, target, clip_len)
+    loss = loss_fn(pred, target, weight, reduction_override='none')
+    assert loss.shape == (3 * clip_len, )
+    assert torch.allclose(loss, ref_loss * weight.mean(-1))
+    loss = loss_fn(pred, target, weight[:, 0], reduction_override='sum')
+    assert torch.allclose(loss, (ref_loss * weight[:, 0]).sum())
+    loss = loss_fn(pred, target, weight, avg_factor=5.)
+    assert torch.allclose(loss, (ref_loss * weight.mean(-1)).sum() / 5.)
+
+    # zero weight
+    loss = loss_fn(pred, target, torch.zeros_like(weight), avg_factor=5.)
+    assert loss == 0.
+
+    with pytest.raises(AssertionError):
+        loss_fn(pred, target, reduction_override=True)
+
+
+def test_gaze_arccos_loss_empty():
+    pred = torch.empty((0, 3)).requires_grad_()
+    target = torch.empty((0, 3))
+    loss = GazeArccosLoss()(
+        pred, target, torch.empty((0, 3)), avg_factor=torch.tensor(0.))
+    assert loss == 0.
+    loss.backward()
@@ -4,8 +4,8 @@ import numpy as np
 import pytest
 import torch
 
-from mmdet.core import bbox2roi
-from mmdet.models.roi_heads.bbox_heads import BBoxHead
+from mmdet.core import bbox2roi, build_assigner, build_sampler, multi_apply
+from mmdet.models.roi_heads.bbox_heads import BBoxHead, GazeSTQIHead
 from .utils import _dummy_bbox_sampling
 
 
@@ -67,6 +67,118 @@ def test_bbox_head_loss():
     assert losses.get('loss_bbox', 0) > 0, 'box-loss should be non-zero'
 
 
+def _gaze_stqi_sampling(num_frames, head_only_frames=(1, )):
+    assigner = build_assigner(dict(type='FixedAssigner'))
+    sampler = build_sampler(dict(type='PseudoSampler'))
+    gt_bboxes, gt_labels, gt_ids, proposals = [], [], [], []
+    for i in range(num_frames):
+        xy = torch.rand(3, 2) * 50
+        bboxes = torch.cat([xy, xy + 10 + torch.rand(3, 2) * 50], dim=1)
+        labels = torch.LongTensor([0, 1, 2])
+        if i in head_only_frames:
+            bboxes, labels = bboxes[2:], labels[2:]
+        gt_bboxes.append(bboxes)
+        gt_labels.append(labels)
+        gt_ids.append(labels.clone())
+        xy = torch.rand(3, 2) * 50
+        proposals.append(
+            torch.cat([xy, xy + 10 + torch.rand(3, 2) * 50], dim=1))
+    assign_results = assigner.assign(
+        proposals, [torch.rand(3, 1) for _ in range(num_frames)],
+        gt_bboxes,
+        gt_labels,
+        dict(),
+        gt_ids=gt_ids)
+    sampling_results = [
+        sampler.sample(*args)
+        for args in zip(assign_results, proposals, gt_bboxes)
+    ]
+    return sampling_results, gt_bboxes, gt_labels
+
+
+def test_gaze_stqi_head_loss():
+    """The batched targets and loss match the per frame and per region
+    implementation."""
+    self = GazeSTQIHead(
+        num_classes=3,
+        in_channels=16,
+        feedforward_channels=32,
+        dynamic_conv_cfg=dict(
+            type='DynamicConv',
+            in_channels=16,
+            feat_channels=8,
+            out_channels=16,
+            input_feat_shape=7,
+            act_cfg=dict(type='ReLU', inplace=True),
+            norm_cfg=dict(type='LN')),
+        loss_bbox=dict(type='L1Loss', loss_weight=5.0),
+        loss_iou=dict(type='GIoULoss', loss_weight=2.0),
+        loss_cls=dict(
+            type='FocalLoss',
+            use_sigmoid=True,
+            gamma=2.0,
+            alpha=0.25,
+            loss_weight=2.0))
+    target_cfg = mmcv.Config(dict(pos_weight=1))
+    num_frames = 4
+    sampling_results, gt_bboxes, gt_labels = _gaze_stqi_sampling(num_frames)
+
+    targets = self.get_targets(sampling_results, gt_bboxes, gt_labels,
+                               target_cfg, False)
+    ref_targets = multi_apply(
+        self._get_target_single,
+        [res.pos_inds for res in sampling_results],
+        [res.neg_inds for res in sampling_results],
+        [res.pos_bboxes for res in sampling_results],
+        [res.neg_bboxes for res in sampling_results],
+        [res.pos_gt_bboxes for res in sampling_results],
+        [res.pos_gt_labels for res in sampling_results],
+        cfg=target_cfg)
+    for target, ref_target in zip(targets, ref_targets):
+        assert len(target) == num_frames
+        for x, ref_x in zip(target, ref_target):
+            assert torch.equal(x, ref_x)
+    assert targets[0][1].tolist() == [-1, -1, 2]
+
+    cls_score = torch.randn(num_frames, 3, 1, requires_grad=True)
+    bbox_pred = torch.rand(num_frames, 3, 4) * 30
+    bbox_pred[..., 2:] += 40
+    bbox_pred.requires_grad_()
+    imgs_whwh = torch.full((num_frames, 3, 4), 112.)
+
+    losses = self.loss(
+        cls_score,
+        list(bbox_pred),
+        *self.get_targets(sampling_results, gt_bboxes, gt_labels,
+                          target_cfg),
+        imgs_whwh=imgs_whwh)
+    grads = torch.autograd.grad(
+        sum(v for loss in losses.values() for k, v in loss.items()
+            if k.startswith('loss')), (cls_score, bbox_pred))
+
+    labels, label_weights, bbox_targets, bbox_weights = [
+        torch.stack(x) for x in ref_targets
+    ]
+    ref_losses = {
+        region: self.head_loss(cls_score[:, i], bbox_pred[:, i],
+                               labels[:, i].clone(), label_weights[:, i],
+                               bbox_targets[:, i], bbox_weights[:, i],
+                               imgs_whwh[:, i])
+        for i, region in enumerate(('face', 'eyes', 'head'))
+    }
+    ref_grads = torch.autograd.grad(
+        sum(v for loss in ref_losses.values() for k, v in loss.items()
+            if k.startswith('loss')), (cls_score, bbox_pred))
+
+    assert losses.keys() == ref_losses.keys()
+    for region, loss in losses.items():
+        assert loss.keys() == ref_losses[region].keys()
+        for key, value in loss.items():
+            assert torch.allclose(value, ref_losses[region][key], atol=1e-6)
+    for grad, ref_grad in zip(grads, ref_grads):
+        assert torch.allclose(grad, ref_grad, atol=1e-6)
+
+
 @pytest.mark.parametrize('num_sample', [0, 1, 2])
 def test_bbox_head_get_bboxes(num_sample):
     self = BBoxHead(reg_class_agnostic=True)
@@ -1,9 +1,10 @@
 # Copyright (c) OpenMMLab. All rights reserved.
 import mmcv
+import pytest
 import torch
 
 from mmdet.models.roi_heads.mask_heads import (DynamicMaskHead, FCNMaskHead,
-                                               MaskIoUHead)
+                                               GazeHead, MaskIoUHead)
 from .utils import _dummy_bbox_sampling
 
 
@@ -95,3 +96,39 @@ def test_mask_head_loss():
     loss_mask = dynamic_mask_head.loss(mask_pred, mask_target, pos_labels)
     loss_mask = loss_mask['loss_mask'].sum()
     assert loss_mask.item() >= 0
+
+
+def test_gaze_head_fuse_regions():
+    """Test the fused forward of the region MLPs of GazeHead."""
+    for gaze_dim in (3, 2):
+        self = GazeHead(in_channels=16, gaze_dim=gaze_dim)
+        for p in self.parameters():
+            torch.nn.init.normal_(p)
+        self.eval()
+        attn_feats = torch.rand(7, 3, 16)
+        cls_score = torch.rand(7, 3, 1)
+        with torch.no_grad():
+            expected = self(attn_feats, cls_score)
+            state_dict = self.state_dict()
+            self.fuse_regions()
+            # the packed weights are not saved in checkpoints
+            assert self.state_dict().keys() == state_dict.keys()
+            results = self(attn_feats, cls_score)
+        for result, expect in zip(results, expected):
+            assert result.shape == expect.shape
+            assert torch.allclose(result, expect, atol=1e-5)
+
+        # the per region layers are trained
+        self.train()
+        gaze_score = self(attn_feats, cls_score)[0]
+        gaze_score.sum().backward()
+        assert self.gaze_face_fcs[0].weight.grad is not None
+
+    # the fused forward would bypass dynamically quantized layers
+    if 'fbgemm' in torch.backends.quantized.supported_engines or \
+            'qnnpack' in torch.backends.quantized.supported_engines:
+        self = GazeHead(in_channels=16).eval()
+        self = torch.quantization.quantize_dynamic(self, {torch.nn.Linear},
+                                                   dtype=torch.qint8)
+        with pytest.raises(TypeError, match='mutually exclusive'):
+            self.fuse_regions()
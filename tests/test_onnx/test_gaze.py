@@ -0,0 +1,158 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import os
+import os.path as osp
+import mmcv
+import numpy as np
+import pytest
+import torch
+
+from mmdet import digit_version
+from mmdet.models import build_detector
+from mmdet.models.roi_heads.mask_heads import GazeHead
+from .utils import ort_validate
+
+if digit_version(torch.__version__) <= digit_version('1.5.0'):
+    pytest.skip(
+        'ort backend does not support version below 1.5.0',
+        allow_module_level=True)
+
+config_path = './configs/multiclue_gaze/multiclue_gaze_r50_gaze360.py'
+
+
+def _build_gaze_model():
+    cfg = mmcv.Config.fromfile(config_path)
+    cfg.model.backbone.init_cfg = None
+    cfg.model.train_cfg = None
+    model = build_detector(cfg.model)
+    return model.eval()
+
+
+def _meta(h, w):
+    return dict(
+        img_shape=(h, w, 3),
+        ori_shape=(h, w, 3),
+        pad_shape=(h, w, 3),
+        scale_factor=np.ones(4, dtype=np.float32),
+        flip=False,
+        flip_direction=None)
+
+
+def _export_gaze(model, onnx_file, H, W, dynamic=True):
+    from mmdet.core.export.model_wrappers import ONNXRuntimeMultiClueGaze
+
+    def forward(img, img_shape):
+        return model.onnx_export(img, [_meta(H, W)], img_shape=img_shape)
+
+    input_names = ['input', 'img_shape']
+    output_names = list(ONNXRuntimeMultiClueGaze.output_names)
+    dynamic_axes = None
+    if dynamic:
+        dynamic_axes = {
+            name: {
+                0: 'batch',
+                1: 'clip'
+            }
+            for name in input_names + output_names
+        }
+    img_shape = torch.tensor([H, W], dtype=torch.float32).repeat(1, 3, 1)
+    model.forward = forward
+    with torch.no_grad():
+        torch.onnx.export(
+            model, (torch.rand(1, 3, 3, H, W), img_shape),
+            onnx_file,
+            input_names=input_names,
+            output_names=output_names,
+            keep_initializers_as_inputs=True,
+            do_constant_folding=True,
+            verbose=False,
+            opset_version=11,
+            dynamic_axes=dynamic_axes)
+    return ONNXRuntimeMultiClueGaze(onnx_file)
+
+
+def test_gaze_head_onnx_export():
+    gaze_head = GazeHead(in_channels=16)
+    attn_feats = torch.rand(7, 3, 16)
+    cls_score = torch.rand(7, 3, 1)
+    ort_validate(gaze_head, (attn_feats, cls_score))
+
+
+def test_multiclue_gaze_onnx_export_matches_simple_test():
+    model = _build_gaze_model()
+    T, H, W = 3, 64, 64
+    clip = torch.rand(T, 3, H, W)
+    with torch.no_grad():
+        (det_bboxes, _), det_gazes = model.simple_test(
+            clip, [_meta(H, W) for _ in range(T)])
+        dets, gaze, face_gaze, eyes_gaze, head_gaze = model.onnx_export(
+            clip[None], [_meta(H, W)])
+    assert dets.shape == (1, T, 3, 5)
+    assert torch.allclose(dets[0], torch.stack(det_bboxes), atol=1e-4)
+    for out, key in zip((gaze, face_gaze, eyes_gaze, head_gaze),
+                        ('gaze_score', 'face_gaze_score', 'eyes_gaze_score',
+                         'head_gaze_score')):
+        assert out.shape == (1, T, 3)
+        assert torch.allclose(out[0], det_gazes[key], atol=1e-4)
+
+
+def test_multiclue_gaze_onnx_runtime_dynamic_axes(tmp_path):
+    model = _build_gaze_model()
+    H, W = 64, 64
+    onnx_file = osp.join(tmp_path, 'gaze.onnx')
+    ort_model = _export_gaze(model, onnx_file, H, W)
+    for B, T in [(1, 3), (2, 5)]:
+        clip = torch.rand(B, T, 3, H, W)
+        with torch.no_grad():
+            torch_outputs = model.onnx_export(clip, [_meta(H, W)])
+        onnx_outputs = ort_model.forward_test([clip], [[_meta(H, W)]])
+        for torch_out, onnx_out in zip(torch_outputs, onnx_outputs):
+            np.testing.assert_allclose(
+                torch_out.numpy(), onnx_out.numpy(), rtol=1e-03, atol=1e-05)
+
+    (det_bboxes, det_labels), det_gazes = ort_model(
+        [clip[0]], [[_meta(H, W) for _ in range(5)]], rescale=True)
+    assert len(det_bboxes) == len(det_labels) == 5
+    assert all(labels == [0, 1, 2] for labels in det_labels)
+    assert det_gazes['gaze_score'].shape == (5, 3)
+    if osp.exists(onnx_file):
+        os.remove(onnx_file)
+
+
+def test_multiclue_gaze_onnx_runtime_static_shape(tmp_path):
+    model = _build_gaze_model()
+    H, W = 64, 64
+    onnx_file = osp.join(tmp_path, 'gaze_static.onnx')
+    ort_model = _export_gaze(model, onnx_file, H, W, dynamic=False)
+    (det_bboxes, _), _ = ort_model([torch.rand(3, 3, H, W)],
+                                   [[_meta(H, W) for _ in range(3)]])
+    assert len(det_bboxes) == 3
+    # a static graph only takes clips of the exported length
+    with pytest.raises(ValueError, match='dynamic batch and clip axes'):
+        ort_model([torch.rand(5, 3, H, W)], [[_meta(H, W) for _ in range(5)]])
+
+
+def test_multiclue_gaze_onnx_runtime_non_square_crop(tmp_path):
+    model = _build_gaze_model()
+    # a 48x64 crop padded to 64x64, as Resize(keep_ratio) and Pad do
+    T, H, W, h = 3, 64, 64, 48
+    metas = [dict(_meta(H, W), img_shape=(h, W, 3)) for _ in range(T)]
+    clip = torch.zeros(T, 3, H, W)
+    clip[:, :, :h] = torch.rand(T, 3, h, W)
+    onnx_file = osp.join(tmp_path, 'gaze_crop.onnx')
+    ort_model = _export_gaze(model, onnx_file, H, W)
+    with torch.no_grad():
+        (det_bboxes, _), det_gazes = model.simple_test(clip, metas)
+    dets, gaze, face_gaze, eyes_gaze, head_gaze = ort_model.forward_test(
+        [clip[None]], [metas])
+    np.testing.assert_allclose(
+        dets[0].numpy(),
+        torch.stack(det_bboxes).numpy(),
+        rtol=1e-03,
+        atol=1e-04)
+    for out, key in zip((gaze, face_gaze, eyes_gaze, head_gaze),
+                        ('gaze_score', 'face_gaze_score', 'eyes_gaze_score',
+                         'head_gaze_score')):
+        np.testing.assert_allclose(
+            out[0].numpy(), det_gazes[key].numpy(), rtol=1e-03, atol=1e-04)
+    if osp.exists(onnx_file):
+        os.remove(onnx_file)
@@ -9,7 +9,8 @@ import pytest
 import torch
 
 from mmdet.core.bbox.assigners import (ApproxMaxIoUAssigner,
-                                       CenterRegionAssigner, HungarianAssigner,
+                                       CenterRegionAssigner, FixedAssigner,
+                                       HungarianAssigner,
                                        MaskHungarianAssigner, MaxIoUAssigner,
                                        PointAssigner, TaskAlignedAssigner,
                                        UniformAssigner)
@@ -428,6 +429,58 @@ def test_hungarian_match_assigner():
     assert (assign_result.labels > -1).sum() == gt_bboxes.size(0)
 
 
+def test_fixed_assigner():
+    self = FixedAssigner()
+    num_query = 3
+    face_eyes_head = torch.FloatTensor([[0, 0, 5, 7], [1, 1, 4, 3],
+                                        [0, 0, 8, 9]])
+    head = torch.FloatTensor([[0, 0, 8, 9]])
+    empty = torch.empty((0, 4)).float()
+
+    # clip of 3 frames, the second one only has the head
+    gt_bboxes = [face_eyes_head, head, face_eyes_head]
+    bbox_pred = torch.rand((3, num_query, 4))
+    assign_results = self.assign(bbox_pred, None, gt_bboxes, None, None)
+    assert len(assign_results) == 3
+    for i in (0, 2):
+        assert assign_results[i].num_gts == 3
+        assert assign_results[i].gt_inds.tolist() == [1, 2, 3]
+        assert assign_results[i].labels.tolist() == [0, 1, 2]
+    assert assign_results[1].num_gts == 1
+    assert assign_results[1].gt_inds.tolist() == [0, 0, 1]
+    assert assign_results[1].labels.tolist() == [-1, -1, 2]
+
+    # test a batch of 2 clips of 2 frames, the second clip has no gt
+    gt_bboxes = [head, face_eyes_head, empty, empty]
+    bbox_pred = torch.rand((4, num_query, 4))
+    assign_results = self.assign_batch(bbox_pred, gt_bboxes, 2)
+    assert [res.num_gts for res in assign_results] == [1, 3, 0, 0]
+    assert assign_results[0].gt_inds.tolist() == [0, 0, 1]
+    assert assign_results[1].gt_inds.tolist() == [1, 2, 3]
+    for res in assign_results[2:]:
+        assert torch.all(res.gt_inds == 0)
+        assert torch.all(res.labels == -1)
+    # the fixed positive and negative indices come with the results
+    pos_inds = [res.get_extra_property('pos_inds') for res in assign_results]
+    neg_inds = [res.get_extra_property('neg_inds') for res in assign_results]
+    assert [inds.tolist() for inds in pos_inds] == [[2], [0, 1, 2], [], []]
+    assert [inds.tolist() for inds in neg_inds] == [[0, 1], [], [0, 1, 2],
+                                                    [0, 1, 2]]
+
+    # the results do not share memory
+    assign_results[0].gt_inds[0] = 5
+    assert assign_results[1].gt_inds.tolist() == [1, 2, 3]
+    assert self.assign_batch(bbox_pred, gt_bboxes,
+                             2)[0].gt_inds.tolist() == [0, 0, 1]
+
+    # test no queries
+    assign_results = self.assign_batch(
+        torch.rand((2, 0, 4)), [face_eyes_head, head], 2)
+    for res in assign_results:
+        assert res.gt_inds.numel() == 0
+        assert res.labels.numel() == 0
+
+
 def test_uniform_assigner():
     self = UniformAssigner(0.15, 0.7, 1)
     pred_bbox = torch.FloatTensor([
@@ -0,0 +1,92 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import os.path as osp
+import subprocess
+import sys
+
+from mmdet.utils.lazy_import import _get_register_index
+
+IMPORT_SCRIPT = """
+import sys
+import mmdet.apis
+{extra}
+print(' '.join(sys.modules))
+"""
+
+REPO_ROOT = osp.dirname(osp.dirname(osp.dirname(osp.abspath(__file__))))
+
+
+def _import_in_subprocess(extra=''):
+    out = subprocess.check_output(
+        [sys.executable, '-c',
+         IMPORT_SCRIPT.format(extra=extra)],
+        cwd=REPO_ROOT).decode().splitlines()
+    return set(out[-1].split())
+
+
+def test_register_index():
+    index = _get_register_index('mmdet.models')
+    assert index['MultiClueGaze'] == ['mmdet.models.detectors.multiclue_gaze']
+    assert index['SingleRoIExtractor'] == [
+        'mmdet.models.roi_heads.roi_extractors.single_level_roi_extractor'
+    ]
+    # stale copies of a head that are not exported by their package
+    assert index['GazeHead'] == ['mmdet.models.roi_heads.mask_heads.gaze_head']
+    # registered with an explicit name
+    index = _get_register_index('mmdet.datasets')
+    assert index['LVISDataset'] == ['mmdet.datasets.lvis']
+
+
+def test_lazy_package_attributes():
+    from mmdet.models import GazeHead, build_detector  # noqa: F401
+    from mmdet.models.roi_heads import mask_heads
+    assert GazeHead is mask_heads.gaze_head.GazeHead
+    assert 'GazeHead' in dir(mask_heads)
+
+    # the names of the subpackages are exported by their parents
+    import mmdet.models
+    from mmdet.models.roi_heads import roi_extractors
+    assert mmdet.models.SingleRoIExtractor is \
+        roi_extractors.SingleRoIExtractor
+    assert {'GazeHead', 'MultiClueGaze', 'PanopticFPNHead'} <= set(
+        dir(mmdet.models))
+
+
+def test_lazy_module_imports():
+    # importing the apis does not import every detector and dataset
+    modules = _import_in_subprocess()
+    assert 'mmdet.models.detectors.yolact' not in modules
+    assert 'mmdet.models.dense_heads.mask2former_head' not in modules
+    assert 'mmdet.datasets.lvis' not in modules
+    assert 'mmdet.datasets.cityscapes' not in modules
+
+    # building the gaze model only imports what its config refers to
+    config_path = osp.join(REPO_ROOT, 'configs', 'multiclue_gaze',
+                           'multiclue_gaze_r50_gaze360.py')
+    modules = _import_in_subprocess(
+        extra='import mmcv\n'
+        'from mmdet.models import build_detector\n'
+        f'cfg = mmcv.Config.fromfile({config_path!r})\n'
+        'cfg.model.backbone.init_cfg = None\n'
+        'build_detector(cfg.model)')
+    assert 'mmdet.models.detectors.multiclue_gaze' in modules
+    assert 'mmdet.models.roi_heads.bbox_heads.gaze_stqi_head' in modules
+    assert 'mmdet.models.detectors.yolact' not in modules
+
+
+def test_mmcv_registries():
+    # the layers mmdet registers into the registries of mmcv are there
+    # without any lookup in the lazy registries
+    modules = _import_in_subprocess(
+        extra='from mmcv.cnn import PLUGIN_LAYERS\n'
+        'from mmcv.cnn.bricks.registry import (POSITIONAL_ENCODING,\n'
+        '                                      TRANSFORMER_LAYER_SEQUENCE)\n'
+        'from mmcv.runner.hooks import HOOKS\n'
+        "for registry, name in ((PLUGIN_LAYERS, 'PixelDecoder'),\n"
+        "                       (PLUGIN_LAYERS, 'DropBlock'),\n"
+        "                       (POSITIONAL_ENCODING,\n"
+        "                        'SinePositionalEncoding'),\n"
+        "                       (TRANSFORMER_LAYER_SEQUENCE,\n"
+        "                        'DetrTransformerDecoder'),\n"
+        "                       (HOOKS, 'NumClassCheckHook')):\n"
+        '    assert registry.get(name) is not None, name')
+    assert 'mmdet.models.plugins.pixel_decoder' in modules
@@ -0,0 +1,67 @@
+import pytest
+import torch
+
+from mmdet.core.post_processing import ClipMerger
+
+
+def _merge_reference(clips, person_threshold=0.5):
+    """The concatenation based merge of tools/test_gaze360_gaze.py."""
+    bboxes, gazes = None, None
+    for start, clip_bboxes, clip_gazes in clips:
+        clip_bboxes = clip_bboxes.clone()
+        for bbox in clip_bboxes.view(-1, 5):
+            if bbox[4] < person_threshold:
+                bbox[:4] = 0
+        if bboxes is None:
+            bboxes, gazes = clip_bboxes, clip_gazes
+            continue
+        overlap = bboxes.size(0) - start
+        new_bboxes = clip_bboxes[:overlap].clone()
+        for old, cur, new in zip(bboxes[start:].view(-1, 5),
+                                 clip_bboxes[:overlap].reshape(-1, 5),
+                                 new_bboxes.view(-1, 5)):
+            if old[4] < person_threshold or cur[4] < person_threshold:
+                new[:4] = 0
+            else:
+                new[:4] = (old[:4] + cur[:4]) / 2
+            new[4] = (old[4] + cur[4]) / 2
+        bboxes = torch.cat(
+            [bboxes[:start], new_bboxes, clip_bboxes[overlap:]])
+        gazes = torch.cat([
+            gazes[:start], (gazes[start:] + clip_gazes[:overlap]) / 2,
+            clip_gazes[overlap:]
+        ])
+    return bboxes, gazes
+
+
+@pytest.mark.parametrize('video_len,starts', [(5, [0]), (7, [0]),
+                                              (16, [0, 4, 9]),
+                                              (20, [0, 4, 8, 13])])
+def test_clip_merger(video_len, starts):
+    torch.manual_seed(video_len)
+    clip_len = min(video_len, 7)
+    clips = []
+    # the sliding windows of clip_len 7 and stride 4
+    for start in starts:
+        bboxes = torch.rand(clip_len, 3, 5) * 100
+        # scores around the threshold
+        bboxes[..., 4] = torch.rand(clip_len, 3)
+        clips.append((start, bboxes, torch.rand(clip_len, 3)))
+
+    merger = ClipMerger(video_len)
+    for start, bboxes, gazes in clips:
+        merger.add(start, bboxes, fusion_gazes=gazes)
+    results = merger.results()
+    ref_bboxes, ref_gazes = _merge_reference(clips)
+    assert results['bboxes'].shape == (video_len, 3, 5)
+    assert torch.allclose(results['bboxes'], ref_bboxes)
+    assert torch.allclose(results['fusion_gazes'], ref_gazes)
+
+
+def test_clip_merger_gaps():
+    merger = ClipMerger(10)
+    merger.add(0, fusion_gazes=torch.rand(4, 3))
+    with pytest.raises(AssertionError):
+        merger.add(5, fusion_gazes=torch.rand(4, 3))
+    with pytest.raises(AssertionError):
+        merger.results()
@@ -0,0 +1,191 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+"""Compare frame directories of a split encoded with different codecs.
+
+Each frame directory (e.g. built by ``tools/gaze360_img_reorganize.py`` with
+``--codec png``, ``--codec jpeg --quality 90``, ...) is measured on:
+
+- its disk footprint, the total size of the frames of the annotations,
+- the decode throughput of a single thread on a sample of frames, read
+  into memory first,
+- the PSNR of the sampled frames against the first directory,
+- with ``--config`` and ``--checkpoint``, the Gaze360 mean angular errors
+  of the model on the directory, run by ``tools/test_gaze360_gaze.py``,
+  and their delta to the first directory.
+
+The first directory is the reference, e.g. the lossless png frames. The
+fastest directory whose fusion error is within ``--tolerance`` of it is
+reported.
+
+Example:
+    python tools/analysis_tools/benchmark_frame_codecs.py \
+    data/gaze360/test.json data/gaze360/test_rawframes \
+    data/gaze360_jpeg95/test_rawframes data/gaze360_webp90/test_rawframes \
+    --config configs/multiclue_gaze/multiclue_gaze_r50_gaze360.py \
+    --checkpoint ckpts/multiclue_gaze_r50_gaze360.pth
+"""
+import argparse
+import json
+import os
+import os.path as osp
+import subprocess
+import sys
+import time
+
+import mmcv
+import numpy as np
+
+from mmdet.core.evaluation import Gaze360Evaluator
+from mmdet.datasets.mpeblink_api import load_ann_file
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the codecs of frame directories')
+    parser.add_argument('ann_file', help='Annotation file of the split')
+    parser.add_argument(
+        'img_prefixes',
+        nargs='+',
+        help='Frame directories to compare, the first one is the reference')
+    parser.add_argument(
+        '--num-frames',
+        type=int,
+        default=1000,
+        help='Number of frames the decoding is measured on')
+    parser.add_argument(
+        '--repeat-num',
+        type=int,
+        default=3,
+        help='Number of decoding passes over the sampled frames')
+    parser.add_argument(
+        '--imdecode-backend',
+        default='cv2',
+        help='Backend of mmcv.imfrombytes, as in LoadImageFromFile')
+    parser.add_argument('--config', help='Test config file of the model')
+    parser.add_argument('--checkpoint', help='Checkpoint file of the model')
+    parser.add_argument(
+        '--device', default='cuda:0', help='Device used for inference')
+    parser.add_argument(
+        '--work-dir',
+        default='work_dirs/benchmark_frame_codecs',
+        help='Directory of the results of the model on each directory')
+    parser.add_argument(
+        '--tolerance',
+        type=float,
+        default=0.1,
+        help='Largest increase of the fusion 360 error in degrees of an '
+        'acceptable directory')
+    parser.add_argument('--out', help='Save the measures to this json file')
+    args = parser.parse_args()
+    return args
+
+
+def sample_frames(videos, num_frames):
+    """Evenly spaced frames of all videos."""
+    filenames = [name for video in videos for name in video['file_names']]
+    step = max(len(filenames) // num_frames, 1)
+    return filenames, filenames[::step][:num_frames]
+
+
+def measure_decoding(img_prefix, filenames, repeat_num, backend):
+    """Decode throughput in frames per second, and the decoded frames."""
+    contents = []
+    for filename in filenames:
+        with open(osp.join(img_prefix, filename), 'rb') as f:
+            contents.append(f.read())
+    imgs = [mmcv.imfrombytes(content, backend=backend) for content in contents]
+    start = time.perf_counter()
+    for _ in range(repeat_num):
+        for content in contents:
+            mmcv.imfrombytes(content, backend=backend)
+    elapsed = time.perf_counter() - start
+    return len(contents) * repeat_num / elapsed, imgs
+
+
+def psnr(imgs, ref_imgs):
+    """Mean PSNR of frames against reference frames, inf if identical."""
+    values = []
+    for img, ref_img in zip(imgs, ref_imgs):
+        mse = np.mean((img.astype(np.float64) - ref_img)**2)
+        values.append(np.inf if mse == 0 else 10 * np.log10(255**2 / mse))
+    return float(np.mean(values))
+
+
+def evaluate_model(args, img_prefix, index):
+    """Gaze360 errors of the fusion gazes of the model on a directory."""
+    out = osp.join(args.work_dir, f'{index}_results.json')
+    test_script = osp.join(osp.dirname(__file__), '..', 'test_gaze360_gaze.py')
+    cmd = [
+        sys.executable, test_script, args.config, args.checkpoint, '--json',
+        args.ann_file, '--root', img_prefix, '--device', args.device,
+        '--out', out, '--no-eval'
+    ]
+    subprocess.run(cmd, check=True)
+    with open(out) as f:
+        results = json.load(f)
+    evaluator = Gaze360Evaluator(
+        load_ann_file(args.ann_file), cues=('fusion_gazes', ))
+    for video_idx, result in enumerate(results):
+        evaluator.update(video_idx, result)
+    return evaluator.evaluate()['fusion_gazes']
+
+
+def main():
+    args = parse_args()
+    assert (args.config is None) == (args.checkpoint is None), \
+        '--config and --checkpoint must be given together'
+    videos = load_ann_file(args.ann_file)['videos']
+    filenames, samples = sample_frames(videos, args.num_frames)
+    if args.config is not None:
+        os.makedirs(args.work_dir, exist_ok=True)
+
+    measures = []
+    ref_imgs = None
+    for index, img_prefix in enumerate(args.img_prefixes):
+        size = sum(
+            osp.getsize(osp.join(img_prefix, filename))
+            for filename in filenames)
+        fps, imgs = measure_decoding(img_prefix, samples, args.repeat_num,
+                                     args.imdecode_backend)
+        if ref_imgs is None:
+            ref_imgs = imgs
+        measure = dict(
+            img_prefix=img_prefix,
+            size_gb=size / 1024**3,
+            decode_fps=fps,
+            psnr=psnr(imgs, ref_imgs))
+        if args.config is not None:
+            maes = evaluate_model(args, img_prefix, index)
+            measure['mae'] = maes
+            measure['mae_delta'] = [
+                mae - ref_mae for mae, ref_mae in zip(maes, measures[0]['mae'])
+            ] if measures else [0.] * 3
+        measures.append(measure)
+
+    header = f'{"frames":<48}{"GB":>8}{"fps":>10}{"PSNR":>8}'
+    if args.config is not None:
+        header += f'{"MAE 360":>10}{"d 360":>8}{"d 90":>8}{"d 20":>8}'
+    print(header)
+    for measure in measures:
+        line = (f'{measure["img_prefix"]:<48}{measure["size_gb"]:>8.2f}'
+                f'{measure["decode_fps"]:>10.1f}{measure["psnr"]:>8.2f}')
+        if args.config is not None:
+            line += (f'{measure["mae"][0]:>10.3f}'
+                     f'{measure["mae_delta"][0]:>+8.3f}'
+                     f'{measure["mae_delta"][1]:>+8.3f}'
+                     f'{measure["mae_delta"][2]:>+8.3f}')
+        print(line)
+
+    if args.config is not None:
+        accepted = [
+            measure for measure in measures
+            if measure['mae_delta'][0] <= args.tolerance
+        ]
+        best = max(accepted, key=lambda measure: measure['decode_fps'])
+        print(f'Fastest to decode within {args.tolerance} degrees: '
+              f'{best["img_prefix"]}')
+    if args.out:
+        mmcv.dump(measures, args.out)
+
+
+if __name__ == '__main__':
+    main()
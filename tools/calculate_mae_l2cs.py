@@ -5,11 +5,13 @@ import json
 from tqdm import tqdm
 import numpy as np
 
+from mmdet.datasets.mpeblink_api import load_ann_file
+
 def parse_args():
     parser = ArgumentParser()
     parser.add_argument('--evalfile', help='pred_gaze json file',
                         default="results/results_multiclue_gaze_r50_l2cs_test.json")
-    parser.add_argument('--anno', help='annotation json file', default="data/l2cs/test.json")
+    parser.add_argument('--anno', help='annotation file, .json or .jsonl', default="data/l2cs/test.json")
     args = parser.parse_args()
     return args
 
@@ -87,8 +89,7 @@ def main(args):
     
     with open(args.evalfile, 'r') as eval_file:
         eval_data = json.load(eval_file)
-    with open(args.anno, 'r') as anno_file:
-        anno_data = json.load(anno_file)
+    anno_data = load_ann_file(args.anno)
     #gaze_error(eval_data, anno_data, 'gazes')
     gaze_error(eval_data, anno_data, 'fusion_gazes')
     # gaze_error(eval_data, anno_data, 'face_gazes')
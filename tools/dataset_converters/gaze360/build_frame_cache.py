@@ -0,0 +1,85 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+"""Build a frame cache of center cropped and rescaled Gaze360 frames.
+
+Decoding the full size frames and throwing most of their pixels away in
+``CenterCrop`` and ``Resize`` dominates the data loading time of training.
+This script does it once, the cached frames are loaded with
+``LoadImageFromFrameCache``, see
+``configs/multiclue_gaze/multiclue_gaze_r50_gaze360_frame_cache.py``.
+
+Example:
+    python tools/dataset_converters/gaze360/build_frame_cache.py \
+    data/gaze360/train.json data/gaze360/train_rawframes/ \
+    data/gaze360/train_frame_cache --nproc 16
+"""
+import argparse
+import os.path as osp
+from functools import partial
+from multiprocessing import Pool
+
+import mmcv
+
+from mmdet.datasets.frame_cache import FrameCache, center_crop_rescale
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Build a frame cache')
+    parser.add_argument('ann_file', help='Annotation file of the split')
+    parser.add_argument('img_prefix', help='Directory of the frames')
+    parser.add_argument(
+        'out_prefix',
+        help='Prefix of the cache files, <out_prefix>.bin and .npz')
+    parser.add_argument(
+        '--crop-ratio',
+        type=float,
+        default=0.68,
+        help='Relative size of the center crop')
+    parser.add_argument(
+        '--img-scale',
+        type=int,
+        nargs=2,
+        default=[224, 224],
+        help='Scale the crop is rescaled to, keeping the aspect ratio')
+    parser.add_argument(
+        '--nproc', default=8, type=int, help='Processes used to read frames')
+    args = parser.parse_args()
+    return args
+
+
+def process_frame(filename, img_prefix, crop_ratio, img_scale):
+    img = mmcv.imread(osp.join(img_prefix, filename))
+    ori_shape = img.shape
+    img, crop_box = center_crop_rescale(img, crop_ratio, img_scale)
+    return filename, img, ori_shape, crop_box
+
+
+def main():
+    args = parse_args()
+    videos = mmcv.load(args.ann_file)['videos']
+    filenames = [name for video in videos for name in video['file_names']]
+    img_scale = tuple(args.img_scale)
+    func = partial(
+        process_frame,
+        img_prefix=args.img_prefix,
+        crop_ratio=args.crop_ratio,
+        img_scale=img_scale)
+
+    prog_bar = mmcv.ProgressBar(len(filenames))
+
+    def frames(pool):
+        # frames are written in order as they are processed
+        for frame in pool.imap(func, filenames, chunksize=64):
+            prog_bar.update()
+            yield frame
+
+    with Pool(args.nproc) as pool:
+        FrameCache.write(
+            args.out_prefix,
+            frames(pool),
+            crop_ratio=args.crop_ratio,
+            img_scale=img_scale)
+    print(f'\nSaved {len(filenames)} frames to {args.out_prefix}.bin')
+
+
+if __name__ == '__main__':
+    main()
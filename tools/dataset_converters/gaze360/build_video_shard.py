@@ -0,0 +1,61 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+"""Pack the frames of a ``<split>_rawframes`` directory in a video shard.
+
+The frame files are copied as they are, the frames of each video next to
+each other, into ``<frame dir>.bin`` with an index ``<frame dir>.npz``. The
+shard is read with the ``video_shard`` file client backend, see
+``configs/multiclue_gaze/multiclue_gaze_r50_gaze360_video_shard.py``.
+
+Example:
+    python tools/dataset_converters/gaze360/build_video_shard.py \
+    data/gaze360/train.json data/gaze360/train_rawframes/ --nproc 16
+"""
+import argparse
+import os.path as osp
+from multiprocessing.pool import ThreadPool
+
+import mmcv
+
+from mmdet.datasets.video_shard import VideoShard
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Build a video shard')
+    parser.add_argument('ann_file', help='Annotation file of the split')
+    parser.add_argument('img_prefix', help='Directory of the frames')
+    parser.add_argument(
+        '--out-prefix',
+        help='Prefix of the shard files, <out_prefix>.bin and .npz. '
+        'Defaults to the frame directory')
+    parser.add_argument(
+        '--nproc', default=8, type=int, help='Threads used to read frames')
+    args = parser.parse_args()
+    return args
+
+
+def main():
+    args = parse_args()
+    img_prefix = osp.normpath(args.img_prefix)
+    out_prefix = args.out_prefix or img_prefix
+    videos = mmcv.load(args.ann_file)['videos']
+    # the frames of a video are stored in frame order
+    filenames = [name for video in videos for name in video['file_names']]
+
+    prog_bar = mmcv.ProgressBar(len(filenames))
+
+    def read(filename):
+        with open(osp.join(img_prefix, filename), 'rb') as f:
+            return filename, f.read()
+
+    def frames(pool):
+        for frame in pool.imap(read, filenames, chunksize=64):
+            prog_bar.update()
+            yield frame
+
+    with ThreadPool(args.nproc) as pool:
+        VideoShard.write(out_prefix, frames(pool))
+    print(f'\nSaved {len(filenames)} frames to {out_prefix}.bin')
+
+
+if __name__ == '__main__':
+    main()
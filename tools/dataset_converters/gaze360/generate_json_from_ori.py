@@ -1,10 +1,11 @@
 import os
-import json
 from tqdm import tqdm
 import shutil
 import cv2
 import time
 
+from mmdet.datasets.mpeblink_api import JsonlAnnWriter
+
 ori_dataset_root = "/data/data4/zengwenzheng/data/gaze/gaze360/imgs/"
 target_dataset_root = "/data/data4/zengwenzheng/data/gaze/gaze360/converted/"
 
@@ -23,13 +24,19 @@ for split in splits:
     height = 0 
     width = 0
 
-    dataset = {}
     info = {'info': {'description': 'converted_gaze360', 'url': '1', 'version': '1', 'year': '2022', 'contributor': 'Wenzheng Zeng', 'data_created': time.strftime('%Y-%m-%d %H:%M:%S',time.localtime(time.time()))}   }
     licenses = {'licenses': 'only for research'}
     categories = {'categories': [{'supercategory': 'object', 'id': 1, 'name': 'person_face'}] }
 
-    videos = []
-    annotations = []
+    # the videos are written as soon as they are complete, and assembled
+    # into the annotations/<split>.json of the configs on close
+    final_json_root = os.path.join(target_dataset_root, 'annotations')
+    os.makedirs(final_json_root, exist_ok=True)
+    writer = JsonlAnnWriter(
+        os.path.join(final_json_root, f'{split}.json'),
+        info=info['info'],
+        licenses=licenses['licenses'],
+        categories=categories['categories'])
     anno_id = 1
     
     file_names = []
@@ -52,10 +59,9 @@ for split in splits:
             # 说明上一个video的信息收集已经结束了，先将其进行存储
 
             video = {'height': height, 'width': width, 'length': length, 'file_names': file_names, 'id': vid_id}
-            videos.append(video)
-            
             anno = {'height': height, 'width': width, 'length': 1, 'category_id': 1, 'gaze': anno_gaze, 'video_id': vid_id, 'id': vid_id} # 因为gaze360是单人，所以anno_id = vid
-            annotations.append(anno)
+            if vid_id != 0: # 由于代码的结构，第一个是空的，不写
+                writer.add_video(video, [anno])
 
 
             # 开启新的vid_id，清空length和file_names，以及anno
@@ -113,23 +119,9 @@ for split in splits:
     # 把最后一个收集的video信息进行存储
 
     video = {'height': height, 'width': width, 'length': length, 'file_names': file_names, 'id': vid_id}
-    videos.append(video)
-    
     anno = {'height': height, 'width': width, 'length': 1, 'category_id': 1, 'gaze': anno_gaze, 'video_id': vid_id, 'id': vid_id} # 因为gaze360是单人，所以anno_id = vid
-    annotations.append(anno)
-
-    videos = videos[1:] # 由于代码的结构，第一个是空的，去掉
-    annotations = annotations[1:]
-
-    dataset.update(info)
-    dataset.update(licenses)
-    dataset.update({'videos': videos})
-    dataset.update(categories)
-    dataset.update({'annotations': annotations})
-
-    final_json_root = os.path.join(target_dataset_root, 'annotations')
-    os.makedirs(final_json_root, exist_ok=True)
-    json.dump(dataset, open(os.path.join(final_json_root, f'{split}.json'), 'w'))
+    writer.add_video(video, [anno])
+    writer.close()
     print('Done')
     print(time.strftime('%Y-%m-%d %H:%M:%S',time.localtime(time.time())))
 
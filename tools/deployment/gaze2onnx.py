@@ -0,0 +1,199 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import argparse
+import warnings
+from functools import partial
+
+import numpy as np
+import onnx
+import torch
+from mmcv import DictAction
+
+from mmdet.apis import init_detector
+from mmdet.core.export.model_wrappers import ONNXRuntimeMultiClueGaze
+
+
+def export_forward(model, img, img_shape, meta):
+    """The forward traced by :func:`gaze2onnx`, taking the clips and the
+    img_shape of their frames."""
+    return model.onnx_export(img, [dict(meta)], img_shape=img_shape)
+
+
+def gaze2onnx(model,
+              input_shape,
+              opset_version=11,
+              show=False,
+              output_file='tmp.onnx',
+              verify=False,
+              dynamic_export=True):
+    """Export a MultiClueGaze model to ONNX.
+
+    Args:
+        model (nn.Module): The MultiClueGaze model in eval mode.
+        input_shape (tuple[int]): Shape of the example input clip,
+            (B, T, C, H, W).
+        opset_version (int): ONNX opset version. Defaults to 11.
+        show (bool): Whether to print the exported graph.
+        output_file (str): Path of the exported ONNX file.
+        verify (bool): Whether to compare the ONNXRuntime outputs with the
+            PyTorch outputs.
+        dynamic_export (bool): Whether to export the batch and clip axes as
+            dynamic axes. Defaults to True, a static model only takes clips
+            of the length of the example input.
+    """
+    one_clip = torch.randn(*input_shape)
+    _, _, C, H, W = input_shape
+    one_meta = {
+        'img_shape': (H, W, C),
+        'ori_shape': (H, W, C),
+        'pad_shape': (H, W, C),
+        'scale_factor': np.ones(4, dtype=np.float32),
+        'flip': False,
+        'flip_direction': None
+    }
+
+    B, T = input_shape[:2]
+    one_img_shape = torch.tensor([H, W], dtype=torch.float32).repeat(B, T, 1)
+
+    origin_forward = model.forward
+    # the frames are padded, the proposals are decoded against the
+    # img_shape input like in simple_test
+    model.forward = partial(export_forward, model, meta=one_meta)
+
+    input_names = ['input', 'img_shape']
+    output_names = list(ONNXRuntimeMultiClueGaze.output_names)
+    dynamic_axes = None
+    if dynamic_export:
+        dynamic_axes = {
+            name: {
+                0: 'batch',
+                1: 'clip'
+            }
+            for name in input_names + output_names
+        }
+
+    with torch.no_grad():
+        torch.onnx.export(
+            model, (one_clip, one_img_shape),
+            output_file,
+            input_names=input_names,
+            output_names=output_names,
+            export_params=True,
+            keep_initializers_as_inputs=True,
+            do_constant_folding=True,
+            verbose=show,
+            opset_version=opset_version,
+            dynamic_axes=dynamic_axes)
+    model.forward = origin_forward
+    print(f'Successfully exported ONNX model: {output_file}')
+
+    if verify:
+        onnx_model = onnx.load(output_file)
+        onnx.checker.check_model(onnx_model)
+        ort_model = ONNXRuntimeMultiClueGaze(output_file)
+
+        input_shapes = [input_shape]
+        if dynamic_export:
+            # change batch size and clip length to test dynamic shape
+            input_shapes.append((B + 1, max(1, T - 2), C, H, W))
+        err_msg = 'The numerical values are different between Pytorch' + \
+                  ' and ONNX, but it does not necessarily mean the' + \
+                  ' exported ONNX model is problematic.'
+        # a non-square crop padded to the input shape, as in the demo
+        crop_meta = dict(one_meta, img_shape=(H * 3 // 4, W, C))
+        for shape in input_shapes:
+            clip = torch.randn(*shape)
+            img_shape = torch.tensor(
+                crop_meta['img_shape'][:2],
+                dtype=torch.float32).repeat(*shape[:2], 1)
+            with torch.no_grad():
+                pytorch_results = model.onnx_export(
+                    clip, [dict(crop_meta)], img_shape=img_shape)
+            onnx_results = ort_model.forward_test([clip], [[crop_meta]])
+            for o_res, p_res in zip(onnx_results, pytorch_results):
+                np.testing.assert_allclose(
+                    o_res.numpy(),
+                    p_res.numpy(),
+                    rtol=1e-03,
+                    atol=1e-05,
+                    err_msg=err_msg)
+        print('The numerical values are the same between Pytorch and ONNX')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Convert MultiClueGaze models to ONNX')
+    parser.add_argument('config', help='test config file path')
+    parser.add_argument('checkpoint', help='checkpoint file')
+    parser.add_argument(
+        '--show', action='store_true', help='Show onnx graph')
+    parser.add_argument('--output-file', type=str, default='tmp.onnx')
+    parser.add_argument('--opset-version', type=int, default=11)
+    parser.add_argument(
+        '--verify',
+        action='store_true',
+        help='verify the onnx model output against pytorch output')
+    parser.add_argument(
+        '--shape',
+        type=int,
+        nargs='+',
+        default=[224, 224],
+        help='input head crop size')
+    parser.add_argument(
+        '--clip-length',
+        type=int,
+        default=7,
+        help='clip length of the example input')
+    parser.add_argument(
+        '--cfg-options',
+        nargs='+',
+        action=DictAction,
+        help='Override some settings in the used config, the key-value pair '
+        'in xxx=yyy format will be merged into config file. If the value to '
+        'be overwritten is a list, it should be like key="[a,b]" or key=a,b '
+        'It also allows nested list/tuple values, e.g. key="[(a,b),(c,d)]" '
+        'Note that the quotation marks are necessary and that no white space '
+        'is allowed.')
+    parser.add_argument(
+        '--static-export',
+        dest='dynamic_export',
+        action='store_false',
+        help='Export onnx with a static batch size and clip length instead '
+        'of dynamic axes, the model then only takes clips of --clip-length '
+        'frames.')
+    args = parser.parse_args()
+    return args
+
+
+if __name__ == '__main__':
+    args = parse_args()
+
+    assert args.opset_version == 11, 'MMDet only support opset 11 now'
+
+    try:
+        from mmcv.onnx.symbolic import register_extra_symbolics
+    except ModuleNotFoundError:
+        raise NotImplementedError('please update mmcv to version>=v1.0.4')
+    register_extra_symbolics(args.opset_version)
+
+    if len(args.shape) == 1:
+        input_shape = (1, args.clip_length, 3, args.shape[0], args.shape[0])
+    elif len(args.shape) == 2:
+        input_shape = (1, args.clip_length, 3) + tuple(args.shape)
+    else:
+        raise ValueError('invalid input shape')
+    if input_shape[3] % 32 or input_shape[4] % 32:
+        warnings.warn('The exported model decodes its proposals against the '
+                      'input shape, use unpadded inputs divisible by 32.')
+
+    model = init_detector(
+        args.config, args.checkpoint, device='cpu',
+        cfg_options=args.cfg_options)
+
+    gaze2onnx(
+        model,
+        input_shape,
+        opset_version=args.opset_version,
+        show=args.show,
+        output_file=args.output_file,
+        verify=args.verify,
+        dynamic_export=args.dynamic_export)
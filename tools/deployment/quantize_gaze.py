@@ -0,0 +1,181 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import argparse
+import copy
+import time
+
+import torch
+from mmcv import DictAction
+from mmcv.parallel import collate
+
+from mmdet.apis import init_detector
+from mmdet.core.evaluation import Gaze360Evaluator
+from mmdet.core.export import quantize_dynamic, quantize_static
+from mmdet.datasets.mpeblink_api import load_ann_file
+from mmdet.datasets.pipelines import Compose
+
+
+def load_clip(file_names, img_prefix, test_pipeline):
+    """Run a clip of frames through the test pipeline and collate it."""
+    datas = [
+        test_pipeline(dict(img_info=dict(filename=name), img_prefix=img_prefix))
+        for name in file_names
+    ]
+    datas = collate(datas, samples_per_gpu=len(file_names))
+    datas['img_metas'] = datas['img_metas'].data
+    datas['img'] = datas['img'].data
+    return datas
+
+
+def iter_clips(file_names, clip_length):
+    """Split a video into non-overlapping clips, the last one is aligned to
+    the end of the video."""
+    if len(file_names) <= clip_length:
+        yield 0, file_names
+        return
+    for start in range(0, len(file_names), clip_length):
+        start = min(start, len(file_names) - clip_length)
+        yield start, file_names[start:start + clip_length]
+
+
+def inference(model, anno, img_prefix, test_pipeline, clip_length):
+    """Run the model over all videos and collect the results in the format
+    of ``tools/test_gaze360_gaze.py``."""
+    results = []
+    num_clips, forward_time = 0, 0.
+    for video in anno['videos']:
+        video_gazes = {
+            key: [None] * len(video['file_names'])
+            for key in ('fusion_gazes', 'face_gazes', 'eyes_gazes',
+                        'head_gazes')
+        }
+        for start, clip in iter_clips(video['file_names'], clip_length):
+            datas = load_clip(clip, img_prefix, test_pipeline)
+            with torch.no_grad():
+                start_time = time.time()
+                _, det_gazes = model(
+                    return_loss=False, rescale=True, format=False, **datas)
+                forward_time += time.time() - start_time
+            num_clips += 1
+            for key, gaze_key in (('fusion_gazes', 'gaze_score'),
+                                  ('face_gazes', 'face_gaze_score'),
+                                  ('eyes_gazes', 'eyes_gaze_score'),
+                                  ('head_gazes', 'head_gaze_score')):
+                gazes = det_gazes[gaze_key].cpu().tolist()
+                video_gazes[key][start:start + len(clip)] = gazes
+        results.append(dict(video_id=video['id'], **video_gazes))
+    return results, num_clips / forward_time
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Post-training INT8 quantization of MultiClueGaze models')
+    parser.add_argument('config', help='test config file path')
+    parser.add_argument('checkpoint', help='checkpoint file')
+    parser.add_argument(
+        '--mode',
+        choices=['dynamic', 'static', 'both'],
+        default='both',
+        help='dynamic quantizes the linear layers of the RoI head, static '
+        'quantizes the convs of the backbone and the neck')
+    parser.add_argument(
+        '--calib-json',
+        default='data/gaze360/train.json',
+        help='annotation json file the calibration clips are drawn from')
+    parser.add_argument(
+        '--calib-root',
+        default='data/gaze360/train_rawframes/',
+        help='image root of the calibration clips')
+    parser.add_argument(
+        '--num-calib-clips',
+        type=int,
+        default=64,
+        help='number of calibration clips, one per video')
+    parser.add_argument(
+        '--json',
+        default='data/gaze360/test.json',
+        help='annotation json file used for the accuracy report')
+    parser.add_argument(
+        '--root',
+        default='data/gaze360/test_rawframes/',
+        help='image root used for the accuracy report')
+    parser.add_argument(
+        '--num-eval-videos',
+        type=int,
+        default=None,
+        help='only evaluate the first videos of the annotation file')
+    parser.add_argument('--clip-length', type=int, default=7)
+    parser.add_argument(
+        '--engine',
+        choices=['fbgemm', 'qnnpack'],
+        default='fbgemm',
+        help='quantized engine, fbgemm for x86 and qnnpack for ARM')
+    parser.add_argument(
+        '--out', help='file to save the quantized model to with torch.save')
+    parser.add_argument(
+        '--cfg-options',
+        nargs='+',
+        action=DictAction,
+        help='override some settings in the used config, the key-value pair '
+        'in xxx=yyy format will be merged into config file. If the value to '
+        'be overwritten is a list, it should be like key="[a,b]" or key=a,b '
+        'It also allows nested list/tuple values, e.g. key="[(a,b),(c,d)]" '
+        'Note that the quotation marks are necessary and that no white space '
+        'is allowed.')
+    args = parser.parse_args()
+    return args
+
+
+def main(args):
+    model = init_detector(
+        args.config,
+        args.checkpoint,
+        device='cpu',
+        cfg_options=args.cfg_options)
+    test_pipeline = Compose(model.cfg.data.test.pipeline)
+
+    anno = load_ann_file(args.json)
+    if args.num_eval_videos is not None:
+        anno['videos'] = anno['videos'][:args.num_eval_videos]
+        anno['annotations'] = anno['annotations'][:args.num_eval_videos]
+
+    qmodel = copy.deepcopy(model)
+    if args.mode in ('static', 'both'):
+        calib_anno = load_ann_file(args.calib_json)
+        calib_clips = [
+            load_clip(video['file_names'][:args.clip_length], args.calib_root,
+                      test_pipeline)
+            for video in calib_anno['videos'][:args.num_calib_clips]
+        ]
+        qmodel = quantize_static(qmodel, calib_clips, engine=args.engine)
+    if args.mode in ('dynamic', 'both'):
+        qmodel = quantize_dynamic(qmodel)
+
+    report = {}
+    for precision, m in (('fp32', model), ('int8', qmodel)):
+        print(f'Evaluating {precision} model')
+        results, clips_per_sec = inference(m, anno, args.root, test_pipeline,
+                                           args.clip_length)
+        evaluator = Gaze360Evaluator(anno, cues=('fusion_gazes', ))
+        for video_idx, result in enumerate(results):
+            evaluator.update(video_idx, result)
+        report[precision] = evaluator.evaluate()['fusion_gazes'] + (
+            clips_per_sec, )
+
+    print('%-6s %8s %8s %8s %10s' %
+          ('', 'mae 360', 'front 90', 'front 20', 'clips/s'))
+    for precision, (mae, front_90, front_20, speed) in report.items():
+        print('%-6s %8.2f %8.2f %8.2f %10.2f' %
+              (precision, mae, front_90, front_20, speed))
+    print('%-6s %8.2f %8.2f %8.2f %9.2fx' %
+          ('delta', *[q - f for q, f in zip(report['int8'][:3],
+                                             report['fp32'][:3])],
+           report['int8'][3] / report['fp32'][3]))
+
+    if args.out:
+        torch.save(qmodel, args.out)
+        print(f'Quantized model saved to {args.out}')
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    main(args)
@@ -1,159 +1,358 @@
+"""Reorganize the raw Gaze360 frames into the videos of the FULL and L2CS
+settings.
+
+The lines of ``<split>.txt`` are sorted and split into videos of
+consecutive frames of a person, the frames of the i-th video are written to
+``<out_root>/<split>_rawframes/<i>/<frame:05d>.png``. In the L2CS setting,
+the frames without a face in ``metadata.mat`` are dropped and also end the
+current video. The frames of a video are resized to the size of its first
+frame.
+
+The frames are encoded as png by default, ``--codec`` and ``--quality``
+choose a faster to decode jpeg or webp encoding instead, see
+``tools/analysis_tools/benchmark_frame_codecs.py`` for the trade-off. The
+frames keep the ``.png`` names of the annotations whatever their codec, the
+decoders of ``cv2`` and ``mmcv.imread`` detect it from the content.
+
+The metadata is loaded once and joined to the lines through a dict, the
+videos are converted in a process pool, and the frames that already exist
+are skipped, so an interrupted run can be resumed. With ``--mode`` other
+than ``encode``, the frames that need no resize are linked or copied
+instead of being decoded and encoded, they keep their original jpeg
+content.
+
+With ``--annotations``, the annotations are written video by video to
+``<out_root>/<split>.jsonl``, read by the ``stream`` annotation backend of
+the datasets.
+
+Example:
+    python tools/gaze360_img_reorganize.py \
+    DataSet/gaze360/gaze360_dataset_htrht37t43t9723kdfnJKhf_v2 \
+    --mode hardlink --nproc 16
+"""
+import argparse
+import errno
 import os
-from tqdm import tqdm
-import cv2
+import os.path as osp
+import shutil
 import time
+from functools import partial
+from multiprocessing import Pool
+
+import cv2
 import scipy.io as sio
-import numpy as np
-import torch
-
-################### you should modify the path to raw gaze360 dataset  ############################
-ori_dataset_root = "PATH to raw GAZE360 img dir eg. DataSet/gaze360/gaze360_dataset_htrht37t43t9723kdfnJKhf_v2/imgs"
-meta_data_root = "PATH to raw GAZE360 metadata eg. DataSet/gaze360/gaze360_dataset_htrht37t43t9723kdfnJKhf_v2/metadata.mat"
-origt = "PATH to raw GAZE360 dataset dir eg. DataSet/gaze360/gaze360_dataset_htrht37t43t9723kdfnJKhf_v2"
-###################################################################################################
-dataset_settings = ['FULL', 'L2CS']
-target_dataset_roots = ['data/gaze360/', 'data/l2cs/']
-splits = ['train','test']
-
-for dataset_setting, target_dataset_root in zip(dataset_settings, target_dataset_roots):
-    for split in splits:
-        msg = sio.loadmat(meta_data_root)
-        recordings = msg["recordings"]
-        face_bbox = msg["person_face_bbox"]
-        split_index = msg["split"]
-        recording_index = msg["recording"]
-        person_index = msg["person_identity"]
-        frame_index = msg["frame"]
-        total_num = recording_index.shape[1]
-        ori_gt_path = os.path.join(origt, f"{split}.txt")
-        f = open(ori_gt_path)
-        ori_gt_infos = f.readlines()
-        vid_id = 0
-        pre_path_level_0 = 0
-        pre_path_level_2 = 0
-        pre_path_level_3 = 0
-        new_frame_id = -1
-        length = 0
-        height = 0
-        new_video_flag = 0
-        width = 0
-        un_face_det = 0
-        total_frame = 0
-        file_names = []
-        ori_gt_infos.sort()
-
-        point_index = 0
-
-        for ori_gt_info in tqdm(ori_gt_infos):
-
-            ori_gt_info = ori_gt_info.split(' ')
-            ori_img_path = ori_gt_info[0].split('/')
-            cur_path_level_0 = ori_img_path[0]
-            cur_path_level_2 = ori_img_path[2]
-            cur_path_level_3 = int(ori_img_path[3].strip('.jpg'))
-
-            img_path_level_0 = recordings[0, recording_index[0, point_index]][0]
-            img_path_level_2 = '%06d' % person_index[0, point_index]
-            img_path_level_3 = int(frame_index[0, point_index])
-
-            while (img_path_level_0 != cur_path_level_0) or (img_path_level_2 != cur_path_level_2) or (
-                    img_path_level_3 != cur_path_level_3):
-                # 没能成功匹配，index指针后移
-                point_index = point_index + 1
-                if point_index == 197588:
-                    point_index = 0
-                # 重新计算path
-                img_path_level_0 = recordings[0, recording_index[0, point_index]][0]
-                img_path_level_2 = '%06d' % person_index[0, point_index]
-                img_path_level_3 = int(frame_index[0, point_index])
-
-            if ((cur_path_level_3 != pre_path_level_3 + 1) or (cur_path_level_2 != pre_path_level_2) or (
-                    cur_path_level_0 != pre_path_level_0) or new_video_flag == 1) and ((vid_id != 0 and length != 0 )or(vid_id == 0 )):
-                # 如果第三级目录名称（帧序号）和之前的不连续，或者第0级或者第二级目录名称不同，则开启一个新的vid_id
-
-                # 说明上一个video的信息收集已经结束了，先将其进行存储
-                new_video_flag = 0
-                # 开启新的vid_id，清空length和file_names，以及anno
-
-                vid_id += 1
-                # #TODO 弄个小数据集
-                # if(vid_id==30):
-                #     break
-                length = 0
-                pre_path_level_3 = cur_path_level_3
-                pre_path_level_2 = cur_path_level_2
-                pre_path_level_0 = cur_path_level_0
-
-                new_frame_id = -1  # 第一帧的index是3 pad3帧
-                # 新开一个json的子dict
-                # 根据vid_id设定新的视频目录，把当前帧存入这个目录下，帧序号从0开始
-
-                new_video_dir = os.path.join(target_dataset_root, f'{split}_rawframes', str(vid_id))
-                os.makedirs(new_video_dir, exist_ok=True)
-                file_names = []
-                anno_gaze = []
-
-
-                ########################################################################
-                first_img_path = os.path.join(ori_dataset_root, ori_gt_info[0])  #
-                img = cv2.imread(first_img_path)
-                height = img.shape[0]
-                width = img.shape[1]
-                #########################################################################
-
-            if dataset_setting =="L2CS":
-                if (face_bbox[point_index] != np.array([-1, -1, -1, -1])).all():
-                    new_frame_id += 1
-                    length += 1
-                    new_relative_img_path = os.path.join(str(vid_id), str(new_frame_id).rjust(5, '0') + '.png')
-                    new_img_path = os.path.join(target_dataset_root, f'{split}_rawframes', new_relative_img_path)
-                    ori_img_path = os.path.join(ori_dataset_root, ori_gt_info[0])
-
-                    cur_img = cv2.imread(ori_img_path)  # 当前处理的图片
-
-                    if height != cur_img.shape[0] or width != cur_img.shape[1]:
-                        #     print('spatial resolution is not always equal')
-                        cur_img = cv2.resize(cur_img, (width, height))  # resize成统一的分辨率
-
-                    cv2.imwrite(new_img_path, cur_img)
-
-                    file_names.append(new_relative_img_path.replace('\\', '/'))
-
-                    cur_gaze = torch.tensor([float(ori_gt_info[1]), float(ori_gt_info[2]), float(ori_gt_info[3])])
-                    total_frame += 1
-
-                    pre_path_level_3 = cur_path_level_3
-                    pre_path_level_2 = cur_path_level_2
-                    pre_path_level_0 = cur_path_level_0
-
-                else:
-                    if length != 0:
-                        new_video_flag = 1
-                    else:
-                        new_video_flag = 0
-            else:
-                new_frame_id += 1
-                length += 1
-                new_relative_img_path = os.path.join(str(vid_id), str(new_frame_id).rjust(5, '0') + '.png')
-                new_img_path = os.path.join(target_dataset_root, f'{split}_rawframes', new_relative_img_path)
-                ori_img_path = os.path.join(ori_dataset_root, ori_gt_info[0])
-
-                cur_img = cv2.imread(ori_img_path)  # 当前处理的图片
-
-                if height != cur_img.shape[0] or width != cur_img.shape[1]:
-                    #     print('spatial resolution is not always equal')
-                    cur_img = cv2.resize(cur_img, (width, height))  # resize成统一的分辨率
-
-                cv2.imwrite(new_img_path, cur_img)
-
-                file_names.append(new_relative_img_path.replace('\\', '/'))
-
-                cur_gaze = torch.tensor([float(ori_gt_info[1]), float(ori_gt_info[2]), float(ori_gt_info[3])])
-                total_frame += 1
-
-                pre_path_level_3 = cur_path_level_3
-                pre_path_level_2 = cur_path_level_2
-                pre_path_level_0 = cur_path_level_0
-
-        print('Done')
-        print(time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(time.time())))
+from PIL import Image
+from tqdm import tqdm
+
+from mmdet.datasets.mpeblink_api import JsonlAnnWriter
+
+# the cv2 quality flag and extension of each codec
+ENCODE_PARAMS = dict(
+    png=(cv2.IMWRITE_PNG_COMPRESSION, '.png'),
+    jpeg=(cv2.IMWRITE_JPEG_QUALITY, '.jpg'),
+    webp=(cv2.IMWRITE_WEBP_QUALITY, '.webp'))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Reorganize the Gaze360 frames into videos')
+    parser.add_argument(
+        'gaze360_root',
+        help='Path to the raw Gaze360 dataset, with imgs/, metadata.mat and '
+        '<split>.txt, e.g. DataSet/gaze360/'
+        'gaze360_dataset_htrht37t43t9723kdfnJKhf_v2')
+    parser.add_argument(
+        '--settings',
+        nargs='+',
+        default=['FULL', 'L2CS'],
+        choices=['FULL', 'L2CS'],
+        help='Dataset settings to build')
+    parser.add_argument(
+        '--out-roots',
+        nargs='+',
+        default=['data/gaze360/', 'data/l2cs/'],
+        help='Output directory of each setting')
+    parser.add_argument(
+        '--splits', nargs='+', default=['train', 'test'], help='Splits')
+    parser.add_argument(
+        '--mode',
+        default='encode',
+        choices=['encode', 'copy', 'hardlink', 'symlink'],
+        help='How the frames that need no resize are written, encode '
+        'decodes them and encodes them with --codec')
+    parser.add_argument(
+        '--codec',
+        default='png',
+        choices=list(ENCODE_PARAMS),
+        help='Encoding of the frames')
+    parser.add_argument(
+        '--quality',
+        type=int,
+        help='Quality of jpeg and webp (above 100 is lossless webp), '
+        'compression level (0-9) of png. Defaults to the one of cv2')
+    parser.add_argument(
+        '--annotations',
+        action='store_true',
+        help='Also write the annotations of each split to '
+        '<out_root>/<split>.jsonl, video by video')
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Rewrite the frames that already exist')
+    parser.add_argument(
+        '--nproc', default=8, type=int, help='Processes used to write frames')
+    args = parser.parse_args()
+    assert len(args.settings) == len(args.out_roots), \
+        'One output directory is required for each setting'
+    return args
+
+
+def load_face_index(meta_file):
+    """Whether each frame of ``metadata.mat`` has a face bbox.
+
+    Returns:
+        dict[tuple, bool]: ``(recording, person, frame)`` to whether the
+            frame has a face, ``person`` is the 6-digit directory name.
+    """
+    msg = sio.loadmat(meta_file)
+    recordings = [recording[0] for recording in msg['recordings'][0]]
+    has_face = (msg['person_face_bbox'] != -1).all(1)
+    face_index = {}
+    for recording, person, frame, face in zip(msg['recording'][0],
+                                              msg['person_identity'][0],
+                                              msg['frame'][0], has_face):
+        face_index.setdefault(
+            (recordings[recording], '%06d' % person, int(frame)), bool(face))
+    return face_index
+
+
+def split_videos(lines, face_index=None):
+    """Split the sorted lines of a split file into videos.
+
+    A video is started by a frame which does not follow the previous kept
+    frame of the same person, or by the first frame after a dropped one,
+    the empty videos are not ended. Frames without a face are dropped if
+    ``face_index`` is given.
+
+    Args:
+        lines (list[str]): Lines of ``<split>.txt``.
+        face_index (dict, optional): The result of :func:`load_face_index`,
+            None to keep all frames.
+
+    Returns:
+        list[tuple[str, list[str]]]: The image that gives the size of each
+            video and its frames, relative to ``imgs/``.
+    """
+    videos = []
+    prev = None
+    new_video = False
+    for line in lines:
+        img = line.split(' ')[0]
+        recording, _, person, frame = img.split('/')
+        cur = (recording, person, int(frame.strip('.jpg')))
+        if (not videos or videos[-1][1]) and (
+                new_video or prev is None or cur[:2] != prev[:2]
+                or cur[2] != prev[2] + 1):
+            new_video = False
+            prev = cur
+            videos.append((img, []))
+        if face_index is not None and not face_index[cur]:
+            # a dropped frame ends a non-empty video
+            new_video = bool(videos[-1][1])
+            continue
+        videos[-1][1].append(img)
+        prev = cur
+    return videos
+
+
+def encode_frame(img, codec='png', quality=None):
+    """Encode a frame.
+
+    Args:
+        img (np.ndarray): The frame.
+        codec (str): One of 'png', 'jpeg' and 'webp'.
+        quality (int, optional): Quality of jpeg and webp, compression level
+            of png, None for the default of cv2.
+
+    Returns:
+        bytes: The encoded frame.
+    """
+    flag, ext = ENCODE_PARAMS[codec]
+    params = [] if quality is None else [flag, quality]
+    ok, buffer = cv2.imencode(ext, img, params)
+    assert ok, f'Failed to encode a frame as {codec}'
+    return buffer.tobytes()
+
+
+def _link(src, dst, mode):
+    if mode == 'symlink':
+        os.symlink(osp.abspath(src), dst)
+        return
+    if mode == 'hardlink':
+        try:
+            os.link(src, dst)
+            return
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+    shutil.copyfile(src, dst)
+
+
+def convert_video(video,
+                  img_root,
+                  out_dir,
+                  mode='encode',
+                  codec='png',
+                  quality=None,
+                  force=False):
+    """Write the frames of a video.
+
+    Args:
+        video (tuple[int, str, list[str]]): Id of the video, its size image
+            and its frames.
+        img_root (str): ``imgs/`` of the raw dataset.
+        out_dir (str): ``<split>_rawframes`` of the setting.
+        mode (str): How the frames that need no resize are written, one of
+            'encode', 'copy', 'hardlink' and 'symlink'.
+        codec (str): Encoding of the frames, see :func:`encode_frame`.
+        quality (int, optional): See :func:`encode_frame`.
+        force (bool): Rewrite the frames that already exist.
+
+    Returns:
+        tuple[int, tuple[int]]: Number of frames written and the (height,
+            width) of the frames of the video.
+    """
+    vid_id, size_img, imgs = video
+    video_dir = osp.join(out_dir, str(vid_id))
+    os.makedirs(video_dir, exist_ok=True)
+    ref_shape = None
+    ref_size = None
+    num_written = 0
+    for frame_id, img in enumerate(imgs):
+        name = str(frame_id).rjust(5, '0') + '.png'
+        dst = osp.join(video_dir, name)
+        if not force and osp.exists(dst):
+            continue
+        src = osp.join(img_root, img)
+        # written next to the frame and renamed, an interrupted write never
+        # leaves a frame that would be skipped
+        tmp = osp.join(video_dir, '.tmp' + name)
+        if osp.lexists(tmp):
+            os.remove(tmp)
+        if mode != 'encode':
+            if ref_size is None:
+                ref_size = Image.open(osp.join(img_root, size_img)).size
+            if Image.open(src).size == ref_size:
+                _link(src, tmp, mode)
+                os.replace(tmp, dst)
+                num_written += 1
+                continue
+        if ref_shape is None:
+            ref_shape = cv2.imread(osp.join(img_root, size_img)).shape[:2]
+        cur_img = cv2.imread(src)
+        if cur_img.shape[:2] != ref_shape:
+            # resize成统一的分辨率
+            cur_img = cv2.resize(cur_img, (ref_shape[1], ref_shape[0]))
+        with open(tmp, 'wb') as f:
+            f.write(encode_frame(cur_img, codec, quality))
+        os.replace(tmp, dst)
+        num_written += 1
+    if ref_shape is None:
+        width, height = Image.open(osp.join(img_root, size_img)).size
+        ref_shape = (height, width)
+    return num_written, ref_shape
+
+
+def video_annotation(vid_id, imgs, shape, gazes):
+    """The video and annotation records of a video, in the format of
+    ``tools/dataset_converters/gaze360/generate_json_from_ori.py``."""
+    height, width = shape
+    file_names = [
+        f'{vid_id}/{str(frame_id).rjust(5, "0")}.png'
+        for frame_id in range(len(imgs))
+    ]
+    video = dict(
+        height=height,
+        width=width,
+        length=len(imgs),
+        file_names=file_names,
+        id=vid_id)
+    # gaze360是单人，所以anno_id = vid
+    ann = dict(
+        height=height,
+        width=width,
+        length=1,
+        category_id=1,
+        gaze=[gazes[img] for img in imgs],
+        video_id=vid_id,
+        id=vid_id)
+    return video, ann
+
+
+def main():
+    args = parse_args()
+    img_root = osp.join(args.gaze360_root, 'imgs')
+    face_index = None
+    if 'L2CS' in args.settings:
+        face_index = load_face_index(
+            osp.join(args.gaze360_root, 'metadata.mat'))
+
+    with Pool(args.nproc) as pool:
+        for setting, out_root in zip(args.settings, args.out_roots):
+            for split in args.splits:
+                with open(osp.join(args.gaze360_root, f'{split}.txt')) as f:
+                    lines = f.readlines()
+                lines.sort()
+                videos = split_videos(
+                    lines, face_index if setting == 'L2CS' else None)
+                out_dir = osp.join(out_root, f'{split}_rawframes')
+                func = partial(
+                    convert_video,
+                    img_root=img_root,
+                    out_dir=out_dir,
+                    mode=args.mode,
+                    codec=args.codec,
+                    quality=args.quality,
+                    force=args.force)
+                # video ids start from 1
+                tasks = [(vid_id, size_img, imgs)
+                         for vid_id, (size_img, imgs) in enumerate(videos, 1)]
+                num_frames = sum(len(imgs) for _, imgs in videos)
+                num_written = 0
+                writer = None
+                if args.annotations:
+                    gazes = {
+                        info[0]: [float(value) for value in info[1:4]]
+                        for info in (line.split(' ') for line in lines)
+                    }
+                    writer = JsonlAnnWriter(
+                        osp.join(out_root, f'{split}.jsonl'),
+                        info=dict(
+                            description=f'converted_gaze360_{setting}',
+                            data_created=time.strftime('%Y-%m-%d %H:%M:%S')),
+                        licenses='only for research',
+                        categories=[
+                            dict(
+                                supercategory='object',
+                                id=1,
+                                name='person_face')
+                        ])
+                with tqdm(total=num_frames, desc=f'{setting} {split}') as bar:
+                    for (vid_id, _, imgs), (written, shape) in zip(
+                            tasks, pool.imap(func, tasks, chunksize=4)):
+                        num_written += written
+                        bar.update(len(imgs))
+                        if writer is not None and imgs:
+                            writer.add_video(*video_annotation(
+                                vid_id, imgs, shape, gazes))
+                if writer is not None:
+                    writer.close()
+                print(f'{setting} {split}: {len(videos)} videos, '
+                      f'{num_frames} frames, {num_written} written to '
+                      f'{out_dir}')
+    print('Done')
+    print(time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(time.time())))
+
+
+if __name__ == '__main__':
+    main()